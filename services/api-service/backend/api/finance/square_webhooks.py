@@ -16,7 +16,6 @@ from django.http import HttpResponse
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
-from django_ratelimit.decorators import ratelimit
 
 from config.sentry import add_webhook_breadcrumb
 from modules.core.rate_limiting import enforce_webhook_rate_limit
@@ -29,12 +28,6 @@ logger = logging.getLogger(__name__)
 
 @csrf_exempt
 @require_POST
-@ratelimit(
-    key="ip",
-    rate=settings.WEBHOOK_RATE_LIMITS["square"],
-    method="POST",
-    block=False,
-)
 def square_webhook(request):
     """
     Handle Square webhook events (SEC-1: Idempotency tracking, SEC-2: Rate limiting).
@@ -49,7 +42,10 @@ def square_webhook(request):
     SEC-2: Rate limited per settings to prevent webhook flooding.
     """
     rate_limit_response = enforce_webhook_rate_limit(
-        request, provider="square", endpoint="square_webhook"
+        request,
+        provider="square",
+        endpoint="square_webhook",
+        rate=settings.WEBHOOK_RATE_LIMITS["square"],
     )
     if rate_limit_response:
         return rate_limit_response
@@ -336,21 +336,22 @@ class RevenueByProjectMonthMVViewSet(QueryTimeoutMixin, FirmScopedMixin, viewset
     @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated, DenyPortalAccess])
     def refresh(self, request):
         """
-        Manually refresh the materialized view.
+        Manually refresh the revenue summary.
         
-        Triggers an on-demand refresh of all revenue data.
+        Triggers an on-demand refresh of the request firm's dirty revenue buckets.
         Use sparingly - scheduled refresh is preferred.
         
         Request body (optional):
-        - concurrently: bool (default: True) - Use CONCURRENT refresh
+        - concurrently: bool (ignored; kept for compatibility)
         
         Response:
         - status: "success" or "failed"
         - duration_seconds: Time taken to refresh
-        - rows_affected: Number of rows in refreshed view
+        - buckets_refreshed: Number of dirty buckets recomputed
+        - rows_affected: Number of summary rows written
         """
-        concurrently = request.data.get("concurrently", True)
-        result = RevenueByProjectMonthMV.refresh(concurrently=concurrently)
+        firm = get_request_firm(request)
+        result = RevenueByProjectMonthMV.refresh(firm_id=firm.id)
         
         if result["status"] == "success":
             return Response(result, status=status.HTTP_200_OK)
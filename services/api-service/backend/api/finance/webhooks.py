@@ -16,7 +16,6 @@ from django.http import HttpResponse
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
-from django_ratelimit.decorators import ratelimit
 
 from config.sentry import add_webhook_breadcrumb
 from .stripe_schema import ValidationError, validate_stripe_event_payload
@@ -107,12 +106,6 @@ def sanitize_webhook_payload(payload: object, key: str | None = None) -> object:
 
 @csrf_exempt
 @require_POST
-@ratelimit(
-    key="ip",
-    rate=settings.WEBHOOK_RATE_LIMITS["stripe"],
-    method="POST",
-    block=False,
-)
 def stripe_webhook(request):
     """
     Handle Stripe webhook events (SEC-1: Idempotency tracking, SEC-2: Rate limiting).
@@ -127,7 +120,10 @@ def stripe_webhook(request):
     SEC-2: Rate limited per settings to prevent webhook flooding.
     """
     rate_limit_response = enforce_webhook_rate_limit(
-        request, provider="stripe", endpoint="stripe_webhook"
+        request,
+        provider="stripe",
+        endpoint="stripe_webhook",
+        rate=settings.WEBHOOK_RATE_LIMITS["stripe"],
     )
     if rate_limit_response:
         return rate_limit_response
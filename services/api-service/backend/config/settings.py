@@ -218,6 +218,9 @@ STATICFILES_DIRS = [BASE_DIR / "frontend" / "build" / "static"]
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Firm offboarding export archives (streamed NDJSON zip files); keep outside MEDIA_ROOT
+FIRM_EXPORT_ROOT = os.environ.get("FIRM_EXPORT_ROOT", str(BASE_DIR / "exports" / "firms"))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -226,6 +229,68 @@ TRACKING_PUBLIC_KEY = os.environ.get("TRACKING_PUBLIC_KEY")
 TRACKING_INGEST_ENABLED = os.environ.get("TRACKING_INGEST_ENABLED", "True") == "True"
 TRACKING_INGEST_RATE_LIMIT_PER_MINUTE = int(os.environ.get("TRACKING_INGEST_RATE_LIMIT_PER_MINUTE", "300"))
 TRACKING_MAX_PROPERTIES_BYTES = int(os.environ.get("TRACKING_MAX_PROPERTIES_BYTES", "16384"))
+# Serve unfiltered TrackingSummaryView and TrackingWebVitalsSummaryView requests from rollups. Off by
+# default: rollups only cover events ingested since they were added, so run rebuild_tracking_rollups
+# before turning this on.
+TRACKING_SUMMARY_USE_ROLLUPS = os.environ.get("TRACKING_SUMMARY_USE_ROLLUPS", "False") == "True"
+
+# Firm context cache (slug/id/membership/break-glass lookups in FirmContextMiddleware)
+FIRM_CONTEXT_CACHE_TTL_SECONDS = int(os.environ.get("FIRM_CONTEXT_CACHE_TTL_SECONDS", "60"))
+
+# iCal feed cache used for availability: serve as-is below the TTL, serve and refresh in the
+# background up to the max-stale age, refresh inline beyond it (see refresh_ical_feeds)
+ICAL_FEED_CACHE_TTL_SECONDS = int(os.environ.get("ICAL_FEED_CACHE_TTL_SECONDS", "900"))
+ICAL_FEED_CACHE_MAX_STALE_SECONDS = int(os.environ.get("ICAL_FEED_CACHE_MAX_STALE_SECONDS", "86400"))
+
+# Materialized per-day availability for booking pages (invalidated by calendar signals).
+# Off by default: invalidation is cross-process only with a shared cache backend (e.g. Redis),
+# and the default cache is per-process LocMem, so other workers would serve stale slots.
+AVAILABILITY_CACHE_ENABLED = os.environ.get("AVAILABILITY_CACHE_ENABLED", "False") == "True"
+AVAILABILITY_CACHE_DAYS = int(os.environ.get("AVAILABILITY_CACHE_DAYS", "60"))
+AVAILABILITY_CACHE_TTL_SECONDS = int(os.environ.get("AVAILABILITY_CACHE_TTL_SECONDS", "3600"))
+
+# Background job workers (run_job_worker): claims are leases renewed by heartbeat; expired
+# leases are requeued (or moved to the DLQ when out of attempts) by the reaper
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "300"))
+JOB_HEARTBEAT_INTERVAL_SECONDS = int(os.environ.get("JOB_HEARTBEAT_INTERVAL_SECONDS", "60"))
+JOB_REAPER_INTERVAL_SECONDS = int(os.environ.get("JOB_REAPER_INTERVAL_SECONDS", "60"))
+# Fair scheduling at claim time: max in-flight jobs per category ("export=2,sync=20") and per
+# firm (0 = unlimited), per-firm weights ("<firm_id>=<weight>,..."), and the wait after which a
+# job's effective priority improves by one level
+JOB_CATEGORY_CONCURRENCY = {
+    category: int(limit)
+    for category, _, limit in (
+        item.partition("=") for item in os.environ.get("JOB_CATEGORY_CONCURRENCY", "export=2").split(",") if item
+    )
+}
+JOB_FIRM_CONCURRENCY = int(os.environ.get("JOB_FIRM_CONCURRENCY", "8"))
+JOB_FIRM_WEIGHTS = {
+    int(firm_id): float(weight)
+    for firm_id, _, weight in (
+        item.partition("=") for item in os.environ.get("JOB_FIRM_WEIGHTS", "").split(",") if item
+    )
+}
+JOB_PRIORITY_AGING_SECONDS = int(os.environ.get("JOB_PRIORITY_AGING_SECONDS", "300"))
+
+# Campaign sends: contacts per fan-out insert, recipients per send job (shard), and recipients
+# per bulk send / status checkpoint within a shard
+CAMPAIGN_FANOUT_CHUNK_SIZE = int(os.environ.get("CAMPAIGN_FANOUT_CHUNK_SIZE", "2000"))
+CAMPAIGN_SEND_SHARD_SIZE = int(os.environ.get("CAMPAIGN_SEND_SHARD_SIZE", "1000"))
+CAMPAIGN_SEND_CHUNK_SIZE = int(os.environ.get("CAMPAIGN_SEND_CHUNK_SIZE", "200"))
+
+# Recurrence generation: rules per set-based batch and rows per bulk insert
+RECURRENCE_GENERATION_BATCH_SIZE = int(os.environ.get("RECURRENCE_GENERATION_BATCH_SIZE", "1000"))
+# Active rules per recurrence_generate job; smaller firms get one job each
+RECURRENCE_SHARD_SIZE = int(os.environ.get("RECURRENCE_SHARD_SIZE", "5000"))
+
+# Billing runs (modules.finance.billing_runs): invoices per keyset chunk and
+# concurrent payment-processor calls during autopay
+BILLING_RUN_CHUNK_SIZE = int(os.environ.get("BILLING_RUN_CHUNK_SIZE", "500"))
+BILLING_PAYMENT_CONCURRENCY = int(os.environ.get("BILLING_PAYMENT_CONCURRENCY", "8"))
+
+# Reporting summaries (modules.finance.reporting): dirty buckets claimed and
+# recomputed per chunk by refresh_materialized_views
+REPORTING_REFRESH_CHUNK_SIZE = int(os.environ.get("REPORTING_REFRESH_CHUNK_SIZE", "500"))
 
 # Django REST Framework
 REST_FRAMEWORK = {
@@ -287,6 +352,11 @@ SIMPLE_JWT = {
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
     "TOKEN_TYPE_CLAIM": "token_type",
 }
+# In-process cache of verified access tokens (modules.auth.authentication); revocations are
+# checked against the Django cache on every request, so they reach other processes only with a
+# shared cache backend
+JWT_VERIFIED_TOKEN_CACHE_SIZE = int(os.environ.get("JWT_VERIFIED_TOKEN_CACHE_SIZE", "4096"))
+JWT_VERIFIED_TOKEN_CACHE_TTL_SECONDS = int(os.environ.get("JWT_VERIFIED_TOKEN_CACHE_TTL_SECONDS", "60"))
 
 # CORS Settings (for React frontend)
 _default_cors_origins = os.environ.get(
@@ -313,11 +383,18 @@ AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID", "")
 AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY", "")
 AWS_STORAGE_BUCKET_NAME = os.environ.get("AWS_STORAGE_BUCKET_NAME", "")
 AWS_S3_REGION_NAME = os.environ.get("AWS_S3_REGION_NAME", "us-east-1")
+# Thread pool size for HEAD requests during S3 reconciliation (reconcile_s3)
+S3_RECONCILIATION_HEAD_WORKERS = int(os.environ.get("S3_RECONCILIATION_HEAD_WORKERS", "8"))
 
 # E2EE / KMS Configuration
 # SECURITY: No hardcoded fallback keys/backends. Fail fast if unset.
 DEFAULT_FIRM_KMS_KEY_ID = os.environ.get("DEFAULT_FIRM_KMS_KEY_ID")
 KMS_BACKEND = os.environ.get("KMS_BACKEND")
+# "envelope": local AES-GCM with per-firm data keys wrapped by KMS (legacy ciphertexts stay readable)
+# "kms": encrypt every field value directly with the KMS backend (legacy format)
+FIELD_ENCRYPTION_MODE = os.environ.get("FIELD_ENCRYPTION_MODE", "envelope")
+FIELD_ENCRYPTION_DATA_KEY_CACHE_SIZE = int(os.environ.get("FIELD_ENCRYPTION_DATA_KEY_CACHE_SIZE", "1024"))
+FIELD_ENCRYPTION_DATA_KEY_CACHE_TTL_SECONDS = int(os.environ.get("FIELD_ENCRYPTION_DATA_KEY_CACHE_TTL_SECONDS", "300"))
 
 # Stripe Configuration (for Finance module)
 STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY", "")
@@ -560,6 +637,9 @@ if not DEBUG:
 # Format: 'N/period' where period can be 's' (second), 'm' (minute), 'h' (hour), 'd' (day)
 # Examples: '100/m' = 100/minute, '10/s' = 10/second, '1000/h' = 1000/hour
 # Can be overridden per webhook endpoint if needed
+# Enforced by the sliding-window limiter in modules.core.rate_limiting.
+# RATE_LIMIT_STORE: 'auto' (one Lua call per check on RedisCache, DB counters on DatabaseCache), 'cache' or 'db'
+RATE_LIMIT_STORE = os.environ.get("RATE_LIMIT_STORE", "auto")
 WEBHOOK_RATE_LIMIT = os.environ.get("WEBHOOK_RATE_LIMIT", "100/m")
 WEBHOOK_RATE_LIMITS = {
     "stripe": os.environ.get("STRIPE_WEBHOOK_RATE_LIMIT", WEBHOOK_RATE_LIMIT),
@@ -1,7 +1,92 @@
+import hashlib
+import math
+import time
+
 from django.conf import settings
+from django.core.cache import cache
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken
-from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import AccessToken, Token
+
+from modules.core.ttl_cache import BoundedTTLCache
+
+# Attribute on the underlying HttpRequest holding the per-request auth memo.
+REQUEST_AUTH_MEMO_ATTR = "_cookie_jwt_auth_memo"
+
+# Process-wide cache of recently verified access tokens, keyed by a digest of
+# the raw token. Entries never outlive the token's own ``exp`` claim.
+verified_token_cache = BoundedTTLCache(
+    max_entries=getattr(settings, "JWT_VERIFIED_TOKEN_CACHE_SIZE", 4096),
+    ttl_seconds=getattr(settings, "JWT_VERIFIED_TOKEN_CACHE_TTL_SECONDS", 60),
+)
+
+# Revocations live in the Django cache (shared across processes when CACHES
+# points at Redis/Memcached) and are checked on every request, cached or not:
+# a revoked token's jti until it expires, and a per-user "issued before" cutoff
+# for one access-token lifetime.
+REVOCATION_CACHE_PREFIX = "jwt_revoked"
+
+
+def _revoked_token_key(jti) -> str:
+    return f"{REVOCATION_CACHE_PREFIX}:jti:{jti}"
+
+
+def _revoked_user_key(user_id) -> str:
+    return f"{REVOCATION_CACHE_PREFIX}:user:{user_id}"
+
+
+def _user_id_claim() -> str:
+    return settings.SIMPLE_JWT.get("USER_ID_CLAIM", "user_id")
+
+
+def _token_digest(raw_token: str | bytes) -> str:
+    if isinstance(raw_token, str):
+        raw_token = raw_token.encode()
+    return hashlib.sha256(raw_token).hexdigest()
+
+
+def _http_request(request):
+    """Return the Django HttpRequest behind a DRF Request (or the request itself)."""
+    return getattr(request, "_request", request)
+
+
+def revoke_cached_token(raw_token: str | bytes | None) -> None:
+    """Revoke a single access token (e.g. on logout) in every process sharing the cache."""
+    if not raw_token:
+        return
+    verified_token_cache.pop(_token_digest(raw_token))
+    try:
+        token = AccessToken(raw_token)
+    except TokenError:
+        return  # Invalid or expired tokens are rejected anyway
+    remaining = token.get("exp", 0) - time.time()
+    jti = token.get(settings.SIMPLE_JWT.get("JTI_CLAIM", "jti"))
+    if jti and remaining > 0:
+        cache.set(_revoked_token_key(jti), True, math.ceil(remaining))
+
+
+def revoke_cached_tokens_for_user(user_id) -> int:
+    """
+    Revoke every access token issued to a user so far (e.g. on password change).
+
+    ``iat`` has one-second resolution, so tokens issued later in the same
+    second as the revocation stay valid.
+    """
+    lifetime = settings.SIMPLE_JWT.get("ACCESS_TOKEN_LIFETIME")
+    timeout = math.ceil(lifetime.total_seconds()) if lifetime else None
+    cache.set(_revoked_user_key(user_id), int(time.time()), timeout)
+    return verified_token_cache.pop_where(lambda _key, token: str(token.get(_user_id_claim())) == str(user_id))
+
+
+def is_token_revoked(token: Token) -> bool:
+    """Check a validated token against the shared revocation entries (one cache round trip)."""
+    jti_key = _revoked_token_key(token.get(settings.SIMPLE_JWT.get("JTI_CLAIM", "jti")))
+    user_key = _revoked_user_key(token.get(_user_id_claim()))
+    revoked = cache.get_many([jti_key, user_key])
+    if revoked.get(jti_key):
+        return True
+    revoked_before = revoked.get(user_key)
+    return revoked_before is not None and token.get("iat", 0) < revoked_before
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -10,6 +95,14 @@ class CookieJWTAuthentication(JWTAuthentication):
 
     This preserves header-based auth for compatibility while enabling
     Secure + HttpOnly cookie delivery for the SPA.
+
+    Validation happens at most once per request: FirmContextMiddleware and the
+    DRF authentication pass share the result via a memo on the HttpRequest. Across
+    requests, verified tokens are kept in ``verified_token_cache`` so the signature
+    check is skipped for a recently seen token. Revocations (logout, password
+    change) are checked against the shared cache on every request, so a cached
+    entry never outlives a revocation made in another process. User lookup (and
+    simplejwt's CHECK_REVOKE_TOKEN check) still runs once per request.
     """
 
     def get_raw_token_from_request(self, request) -> str | None:
@@ -24,20 +117,47 @@ class CookieJWTAuthentication(JWTAuthentication):
 
         return request.COOKIES.get(settings.ACCESS_TOKEN_COOKIE_NAME)
 
+    def get_validated_token(self, raw_token) -> Token:
+        digest = _token_digest(raw_token)
+        validated_token = verified_token_cache.get(digest)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            remaining = validated_token.get("exp", 0) - time.time()
+            if remaining > 0:
+                verified_token_cache.set(digest, validated_token, ttl_seconds=remaining)
+        if is_token_revoked(validated_token):
+            raise InvalidToken("Token has been revoked")
+        return validated_token
+
+    def _memoized_validation(self, request, raw_token) -> dict:
+        """Validate ``raw_token`` once per request, memoizing success or failure."""
+        http_request = _http_request(request)
+        memo = getattr(http_request, REQUEST_AUTH_MEMO_ATTR, None)
+        if memo is None or memo["raw_token"] != raw_token:
+            memo = {"raw_token": raw_token, "token": None, "error": None}
+            try:
+                memo["token"] = self.get_validated_token(raw_token)
+            except InvalidToken as exc:
+                memo["error"] = exc
+            setattr(http_request, REQUEST_AUTH_MEMO_ATTR, memo)
+        return memo
+
     def get_validated_token_from_request(self, request) -> Token | None:
         raw_token = self.get_raw_token_from_request(request)
         if raw_token is None:
             return None
 
-        try:
-            return self.get_validated_token(raw_token)
-        except InvalidToken:
-            return None
+        return self._memoized_validation(request, raw_token)["token"]
 
     def authenticate(self, request):
         raw_token = self.get_raw_token_from_request(request)
         if raw_token is None:
             return None
 
-        validated_token = self.get_validated_token(raw_token)
-        return self.get_user(validated_token), validated_token
+        memo = self._memoized_validation(request, raw_token)
+        if memo["error"] is not None:
+            raise memo["error"]
+        validated_token = memo["token"]
+        if "user" not in memo:
+            memo["user"] = self.get_user(validated_token)
+        return memo["user"], validated_token
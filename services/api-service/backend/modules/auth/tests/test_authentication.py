@@ -0,0 +1,138 @@
+"""
+Tests for the verified-token cache and access-token revocation.
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from modules.auth.authentication import (
+    CookieJWTAuthentication,
+    _token_digest,
+    revoke_cached_token,
+    revoke_cached_tokens_for_user,
+    verified_token_cache,
+)
+from modules.core import ttl_cache
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    verified_token_cache.clear()
+    cache.clear()
+    yield
+    verified_token_cache.clear()
+    cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="jwt-user", password="testpass123")
+
+
+@pytest.fixture
+def signature_checks(monkeypatch):
+    """Count how often the (uncached) simplejwt validation runs."""
+    calls = []
+    validate = JWTAuthentication.get_validated_token
+
+    def counting(self, raw_token):
+        calls.append(raw_token)
+        return validate(self, raw_token)
+
+    monkeypatch.setattr(JWTAuthentication, "get_validated_token", counting)
+    return calls
+
+
+def _raw(token) -> str:
+    return str(token)
+
+
+def _issued_earlier(user) -> str:
+    token = AccessToken.for_user(user)
+    token.set_iat(at_time=timezone.now() - timedelta(minutes=5))
+    return _raw(token)
+
+
+@pytest.mark.django_db
+def test_verified_token_is_served_from_cache(user, signature_checks):
+    raw_token = _raw(AccessToken.for_user(user))
+    auth = CookieJWTAuthentication()
+
+    first = auth.get_validated_token(raw_token)
+    second = auth.get_validated_token(raw_token)
+
+    assert second is first
+    assert second["user_id"] == str(user.id)
+    assert len(signature_checks) == 1
+
+
+@pytest.mark.django_db
+def test_cache_entries_expire_with_the_token(user, signature_checks, monkeypatch):
+    token = AccessToken.for_user(user)
+    token.set_exp(lifetime=timedelta(seconds=30))
+    raw_token = _raw(token)
+    auth = CookieJWTAuthentication()
+    auth.get_validated_token(raw_token)
+
+    class LaterClock:
+        @staticmethod
+        def monotonic(now=ttl_cache.time.monotonic):
+            return now() + 31
+
+    monkeypatch.setattr(ttl_cache, "time", LaterClock)
+
+    assert verified_token_cache.get(_token_digest(raw_token)) is None
+    auth.get_validated_token(raw_token)
+    assert len(signature_checks) == 2
+
+
+@pytest.mark.django_db
+def test_logout_revokes_the_token_even_where_it_is_still_cached(user):
+    raw_token = _raw(AccessToken.for_user(user))
+    other_token = _raw(AccessToken.for_user(user))
+    auth = CookieJWTAuthentication()
+    cached = auth.get_validated_token(raw_token)
+
+    revoke_cached_token(raw_token)
+    # Another process still holds the verified token in its local cache
+    verified_token_cache.set(_token_digest(raw_token), cached)
+
+    with pytest.raises(InvalidToken):
+        auth.get_validated_token(raw_token)
+    assert auth.get_validated_token(other_token)["user_id"] == str(user.id)
+
+
+@pytest.mark.django_db
+def test_password_change_revokes_earlier_tokens(user):
+    raw_token = _issued_earlier(user)
+    auth = CookieJWTAuthentication()
+    auth.get_validated_token(raw_token)
+
+    assert revoke_cached_tokens_for_user(user.pk) == 1
+
+    with pytest.raises(InvalidToken):
+        auth.get_validated_token(raw_token)
+    assert auth.get_validated_token(_raw(AccessToken.for_user(user)))["user_id"] == str(user.id)
+
+
+@pytest.mark.django_db
+def test_authenticate_rejects_revoked_header_token(user):
+    raw_token = _issued_earlier(user)
+    factory = APIRequestFactory()
+
+    def authenticate():
+        return CookieJWTAuthentication().authenticate(factory.get("/", HTTP_AUTHORIZATION=f"Bearer {raw_token}"))
+
+    assert authenticate()[0] == user
+    revoke_cached_token(raw_token)
+    with pytest.raises(InvalidToken):
+        authenticate()
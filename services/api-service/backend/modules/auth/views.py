@@ -27,6 +27,11 @@ from .serializers import (
     RegisterSerializer,
     UserSerializer,
 )
+from modules.auth.authentication import (
+    CookieJWTAuthentication,
+    revoke_cached_token,
+    revoke_cached_tokens_for_user,
+)
 from modules.auth.cookies import clear_auth_cookies, set_auth_cookies
 from modules.firm.provisioning import provision_firm
 
@@ -203,6 +208,7 @@ def logout_view(request):
             # If the token is already invalid/expired, proceed with cookie clearing
             response.data = {"message": "Logout successful (token already invalidated)"}
 
+    revoke_cached_token(CookieJWTAuthentication().get_raw_token_from_request(request))
     clear_auth_cookies(response)
     return response
 
@@ -246,5 +252,6 @@ class ChangePasswordView(generics.UpdateAPIView):
         # Set new password
         user.set_password(serializer.validated_data["new_password"])
         user.save()
+        revoke_cached_tokens_for_user(user.pk)
 
         return Response({"message": "Password changed successfully"}, status=status.HTTP_200_OK)
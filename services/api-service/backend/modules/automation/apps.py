@@ -0,0 +1,16 @@
+"""App configuration for automation module."""
+
+from django.apps import AppConfig
+
+
+class AutomationConfig(AppConfig):
+    """Automation app configuration."""
+
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "modules.automation"
+    label = "automation"
+    verbose_name = "Automation Workflows"
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import modules.automation.signals  # noqa: F401
@@ -10,6 +10,10 @@ Implements:
 - If/else branching logic
 
 Integrates with job queue system for async execution.
+
+Graph traversal uses the workflow's compiled graph (see graph), and the
+per-node ContactFlowState rows and execution path are written in one flush
+when the execution waits, reaches a goal, completes or fails.
 """
 
 from datetime import datetime, timedelta
@@ -22,9 +26,9 @@ from modules.firm.utils import firm_db_session
 from modules.jobs.models import JobQueue
 
 from .actions import get_action_executor
+from .graph import get_compiled_workflow
 from .models import (
     ContactFlowState,
-    WorkflowEdge,
     WorkflowExecution,
     WorkflowNode,
 )
@@ -55,6 +59,8 @@ class WorkflowExecutor:
         self.workflow = execution.workflow
         self.contact = execution.contact
         self.firm = execution.firm
+        self.graph = None
+        self._pending_flow_states: List[ContactFlowState] = []
 
     @staticmethod
     def queue_execution(execution: WorkflowExecution) -> None:
@@ -83,6 +89,8 @@ class WorkflowExecutor:
         Continues execution from current_node or starts from beginning.
         """
         try:
+            self.graph = get_compiled_workflow(self.workflow)
+
             # Get starting node
             current_node = self._get_starting_node()
             if not current_node:
@@ -124,22 +132,12 @@ class WorkflowExecutor:
 
     def _get_starting_node(self) -> Optional[WorkflowNode]:
         """Get starting node for execution."""
-        if self.execution.current_node:
+        if self.execution.current_node_id:
             # Resume from current node
-            return self.execution.current_node
-
-        # Find first node (no incoming edges)
-        nodes_with_incoming = WorkflowEdge.objects.filter(
-            workflow=self.workflow
-        ).values_list("target_node_id", flat=True)
-
-        first_node = WorkflowNode.objects.filter(
-            workflow=self.workflow
-        ).exclude(
-            id__in=nodes_with_incoming
-        ).first()
+            return self.graph.node(self.execution.current_node_id)
 
-        return first_node
+        # First node (no incoming edges)
+        return self.graph.start_node()
 
     def _execute_node(self, node: WorkflowNode) -> Dict[str, Any]:
         """
@@ -151,19 +149,20 @@ class WorkflowExecutor:
         Returns:
             Execution result dictionary
         """
-        # Create flow state for tracking
-        flow_state = ContactFlowState.objects.create(
+        # Track flow state; written by _flush_flow_states()
+        flow_state = ContactFlowState(
             firm=self.firm,
             execution=self.execution,
             node=node,
+            entered_at=timezone.now(),
         )
+        self._pending_flow_states.append(flow_state)
 
         # Update execution path
         if not self.execution.execution_path:
             self.execution.execution_path = []
         self.execution.execution_path.append(node.node_id)
         self.execution.current_node = node
-        self.execution.save()
 
         try:
             # Execute based on node type
@@ -208,7 +207,6 @@ class WorkflowExecutor:
             flow_state.action_status = result.get("status", "completed")
             flow_state.action_result = result
             flow_state.exited_at = timezone.now()
-            flow_state.save()
 
             return result
 
@@ -246,7 +244,6 @@ class WorkflowExecutor:
         flow_state.action_status = "evaluated"
         flow_state.action_result = {"condition_met": result}
         flow_state.exited_at = timezone.now()
-        flow_state.save()
 
         return {
             "status": "success",
@@ -330,9 +327,8 @@ class WorkflowExecutor:
                     
                     if parsed_date is None:
                         # Invalid date format, log error and continue
-                        flow_state.status = "failed"
-                        flow_state.error_message = f"Invalid date format: {wait_until_date}"
-                        flow_state.save()
+                        flow_state.action_status = "failed"
+                        flow_state.action_result = {"error": f"Invalid date format: {wait_until_date}"}
                         return {
                             "status": "failed",
                             "error": f"Invalid date format: {wait_until_date}",
@@ -345,9 +341,8 @@ class WorkflowExecutor:
                     wait_until_date = parsed_date
                 except (ValueError, TypeError) as e:
                     # Handle parsing errors
-                    flow_state.status = "failed"
-                    flow_state.error_message = f"Error parsing date: {str(e)}"
-                    flow_state.save()
+                    flow_state.action_status = "failed"
+                    flow_state.action_result = {"error": f"Error parsing date: {str(e)}"}
                     return {
                         "status": "failed",
                         "error": f"Error parsing date: {str(e)}",
@@ -385,7 +380,6 @@ class WorkflowExecutor:
         # Store variant in flow state
         flow_state.variant = variant
         flow_state.exited_at = timezone.now()
-        flow_state.save()
 
         return {
             "status": "success",
@@ -396,7 +390,6 @@ class WorkflowExecutor:
         """Execute goal node."""
         flow_state.action_status = "goal_reached"
         flow_state.exited_at = timezone.now()
-        flow_state.save()
 
         return {
             "status": "goal",
@@ -414,34 +407,20 @@ class WorkflowExecutor:
         Returns:
             Next node or None if no more nodes
         """
-        # Get outgoing edges
-        edges = WorkflowEdge.objects.filter(
-            workflow=self.workflow,
-            source_node=current_node,
-        )
-
-        if not edges.exists():
-            return None
-
-        # If condition node, follow appropriate edge
-        if current_node.node_type == "condition":
-            condition_met = result.get("condition_met", False)
-            edge = edges.filter(
-                condition_type="yes" if condition_met else "no"
-            ).first()
-            if edge:
-                return edge.target_node
-
-        # If split node, follow variant edge
-        elif current_node.node_type == "split":
-            variant = result.get("variant", "A")
-            edge = edges.filter(condition_type=variant).first()
-            if edge:
-                return edge.target_node
-
-        # Otherwise, follow first edge
-        edge = edges.first()
-        return edge.target_node if edge else None
+        return self.graph.next_node(current_node, result)
+
+    def _flush_flow_states(self) -> None:
+        """Write flow states tracked since the last flush in one bulk insert."""
+        if not self._pending_flow_states:
+            return
+        flow_states, self._pending_flow_states = self._pending_flow_states, []
+        entered_at = [flow_state.entered_at for flow_state in flow_states]
+        ContactFlowState.objects.bulk_create(flow_states)
+        # entered_at is auto_now_add, so bulk_create stamped the flush time
+        if all(flow_state.pk for flow_state in flow_states):
+            for flow_state, entered in zip(flow_states, entered_at):
+                flow_state.entered_at = entered
+            ContactFlowState.objects.bulk_update(flow_states, ["entered_at"])
 
     def _set_waiting(
         self,
@@ -454,6 +433,7 @@ class WorkflowExecutor:
         self.execution.current_node = node
         self.execution.waiting_until = wait_until
         self.execution.waiting_for_condition = wait_condition or {}
+        self._flush_flow_states()
         self.execution.save()
 
     def _complete_with_goal(self, goal_node: WorkflowNode) -> None:
@@ -463,6 +443,7 @@ class WorkflowExecutor:
         self.execution.goal_node = goal_node
         self.execution.goal_reached_at = timezone.now()
         self.execution.completed_at = timezone.now()
+        self._flush_flow_states()
         self.execution.save()
 
         # Update goal analytics
@@ -478,6 +459,7 @@ class WorkflowExecutor:
         """Complete execution successfully."""
         self.execution.status = "completed"
         self.execution.completed_at = timezone.now()
+        self._flush_flow_states()
         self.execution.save()
 
     def _handle_error(self, node: WorkflowNode, error: str) -> None:
@@ -490,6 +472,7 @@ class WorkflowExecutor:
         if self.execution.error_count < max_retries:
             # Queue retry
             self.execution.status = "running"
+            self._flush_flow_states()
             self.execution.save()
             WorkflowExecutor.queue_execution(self.execution)
         else:
@@ -501,6 +484,7 @@ class WorkflowExecutor:
         self.execution.status = "failed"
         self.execution.last_error = error
         self.execution.completed_at = timezone.now()
+        self._flush_flow_states()
         self.execution.save()
 
 
@@ -0,0 +1,135 @@
+"""
+Compiled workflow graphs for WorkflowExecutor.
+
+A workflow's nodes and edges are loaded once (two queries) and compiled into
+an immutable adjacency structure: node id -> ordered successors tagged with
+the edge's condition_type ("yes"/"no" for conditions, "A"/"B" for splits).
+The executor walks this structure in memory instead of querying edges on
+every transition.
+
+Compiled graphs are memoized per process, keyed by the workflow's
+(structure_revision, updated_at) as currently stored in the database.
+bump_structure_revision() increments Workflow.structure_revision whenever one
+of its nodes or edges changes (modules.automation.signals), and any save of
+the workflow row moves updated_at, so every process sees a new key and
+recompiles on its next execution without relying on a shared cache. The
+user-visible Workflow.version is left alone. Node instances in a compiled
+graph are shared between executions and must be treated as read-only.
+"""
+
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import F
+
+from modules.core.ttl_cache import BoundedTTLCache
+
+from .models import Workflow, WorkflowEdge, WorkflowNode
+
+_compiled = BoundedTTLCache(
+    max_entries=getattr(settings, "WORKFLOW_GRAPH_CACHE_SIZE", 256),
+    ttl_seconds=getattr(settings, "WORKFLOW_GRAPH_CACHE_TTL_SECONDS", 3600),
+)
+
+
+class CompiledWorkflow:
+    """Immutable node/edge adjacency for one workflow structure revision."""
+
+    __slots__ = ("workflow_id", "structure_revision", "nodes", "successors", "start_node_id")
+
+    def __init__(
+        self,
+        workflow_id: int,
+        structure_revision: int,
+        nodes: Dict[int, WorkflowNode],
+        successors: Dict[int, Tuple[Tuple[str, int], ...]],
+        start_node_id: Optional[int],
+    ):
+        self.workflow_id = workflow_id
+        self.structure_revision = structure_revision
+        self.nodes: Mapping[int, WorkflowNode] = MappingProxyType(nodes)
+        self.successors: Mapping[int, Tuple[Tuple[str, int], ...]] = MappingProxyType(successors)
+        self.start_node_id = start_node_id
+
+    @classmethod
+    def compile(cls, workflow: Workflow, structure_revision: Optional[int] = None) -> "CompiledWorkflow":
+        # Same tie-breaks as the previous per-step queries: nodes in canvas
+        # order, edges in creation (pk) order per source node.
+        nodes = {
+            node.pk: node
+            for node in WorkflowNode.objects.filter(workflow=workflow).order_by("position_y", "position_x", "pk")
+        }
+        successors: Dict[int, list] = {}
+        targets = set()
+        edges = (
+            WorkflowEdge.objects.filter(workflow=workflow)
+            .order_by("source_node_id", "pk")
+            .values_list("source_node_id", "target_node_id", "condition_type")
+        )
+        for source_id, target_id, condition_type in edges:
+            if source_id not in nodes or target_id not in nodes:
+                continue
+            successors.setdefault(source_id, []).append((condition_type or "", target_id))
+            targets.add(target_id)
+
+        start_node_id = next((pk for pk in nodes if pk not in targets), None)
+        return cls(
+            workflow_id=workflow.pk,
+            structure_revision=(
+                workflow.structure_revision if structure_revision is None else structure_revision
+            ),
+            nodes=nodes,
+            successors={source_id: tuple(edges) for source_id, edges in successors.items()},
+            start_node_id=start_node_id,
+        )
+
+    def node(self, node_id: Optional[int]) -> Optional[WorkflowNode]:
+        return self.nodes.get(node_id) if node_id is not None else None
+
+    def start_node(self) -> Optional[WorkflowNode]:
+        """First node in canvas order with no incoming edges."""
+        return self.node(self.start_node_id)
+
+    def next_node(self, node: WorkflowNode, result: Dict) -> Optional[WorkflowNode]:
+        """
+        Successor of ``node`` for an execution result.
+
+        Condition nodes follow their "yes"/"no" edge and split nodes their
+        variant edge; anything else (or a missing branch) takes the first edge.
+        """
+        edges = self.successors.get(node.pk, ())
+        if not edges:
+            return None
+
+        branch = None
+        if node.node_type == "condition":
+            branch = "yes" if result.get("condition_met", False) else "no"
+        elif node.node_type == "split":
+            branch = result.get("variant", "A")
+
+        if branch is not None:
+            for condition_type, target_id in edges:
+                if condition_type == branch:
+                    return self.nodes[target_id]
+        return self.nodes[edges[0][1]]
+
+
+def get_compiled_workflow(workflow: Workflow) -> CompiledWorkflow:
+    """Return the compiled graph for the workflow's current structure, compiling it on a miss."""
+    # Read the key from the database: the instance may predate a node/edge edit
+    current = Workflow.objects.filter(pk=workflow.pk).values_list("structure_revision", "updated_at").first()
+    if current is None:
+        return CompiledWorkflow.compile(workflow)
+    structure_revision, updated_at = current
+    key = (workflow.pk, structure_revision, updated_at)
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = CompiledWorkflow.compile(workflow, structure_revision=structure_revision)
+        _compiled.set(key, compiled)
+    return compiled
+
+
+def bump_structure_revision(workflow_id) -> None:
+    """Move the workflow to a new structure revision so every process recompiles its graph."""
+    Workflow.objects.filter(pk=workflow_id).update(structure_revision=F("structure_revision") + 1)
@@ -0,0 +1,18 @@
+# Compiled workflow graphs are keyed on structure_revision, bumped by node/edge changes, instead of Workflow.version
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('automation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflow',
+            name='structure_revision',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Incremented on every node or edge change; keys compiled graphs'),
+        ),
+    ]
@@ -85,6 +85,11 @@ class Workflow(models.Model):
         default=1,
         help_text="Workflow version number",
     )
+    structure_revision = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Incremented on every node or edge change; keys compiled graphs",
+    )
 
     # Workflow canvas data (visual representation)
     canvas_data = models.JSONField(
@@ -0,0 +1,21 @@
+"""
+Automation Signals.
+
+Bumps the workflow's structure revision when one of its nodes or edges
+changes, which moves every process onto a freshly compiled graph (see graph).
+The user-visible Workflow.version is not touched.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .graph import bump_structure_revision
+from .models import WorkflowEdge, WorkflowNode
+
+
+@receiver(post_save, sender=WorkflowNode)
+@receiver(post_delete, sender=WorkflowNode)
+@receiver(post_save, sender=WorkflowEdge)
+@receiver(post_delete, sender=WorkflowEdge)
+def invalidate_workflow_structure(sender, instance, **kwargs):
+    bump_structure_revision(instance.workflow_id)
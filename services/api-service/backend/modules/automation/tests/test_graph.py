@@ -0,0 +1,77 @@
+"""
+Tests for compiled workflow graph traversal.
+"""
+import pytest
+
+from modules.automation.graph import CompiledWorkflow, get_compiled_workflow
+from modules.automation.models import Workflow, WorkflowEdge, WorkflowNode
+from modules.firm.models import Firm
+
+
+def _graph():
+    nodes = {
+        1: WorkflowNode(pk=1, node_id="start", node_type="condition"),
+        2: WorkflowNode(pk=2, node_id="yes", node_type="split"),
+        3: WorkflowNode(pk=3, node_id="no", node_type="send_email"),
+        4: WorkflowNode(pk=4, node_id="variant_a", node_type="goal"),
+        5: WorkflowNode(pk=5, node_id="variant_b", node_type="goal"),
+    }
+    successors = {
+        1: (("no", 3), ("yes", 2)),
+        2: (("A", 4), ("B", 5)),
+    }
+    return CompiledWorkflow(workflow_id=1, structure_revision=1, nodes=nodes, successors=successors, start_node_id=1)
+
+
+def test_condition_and_split_follow_their_branch():
+    graph = _graph()
+    start = graph.start_node()
+
+    assert graph.next_node(start, {"condition_met": True}).node_id == "yes"
+    assert graph.next_node(start, {"condition_met": False}).node_id == "no"
+    assert graph.next_node(graph.node(2), {"variant": "B"}).node_id == "variant_b"
+
+
+def test_missing_branch_falls_back_to_first_edge_and_leaf_ends():
+    graph = _graph()
+
+    assert graph.next_node(graph.node(2), {"variant": "C"}).node_id == "variant_a"
+    assert graph.next_node(graph.node(3), {"status": "success"}) is None
+    assert graph.node(None) is None
+
+
+@pytest.mark.django_db
+def test_node_and_edge_edits_recompile_for_stale_instances():
+    firm = Firm.objects.create(name="Graph Firm", slug="graph-firm")
+    workflow = Workflow.objects.create(firm=firm, name="Nurture")
+    first = WorkflowNode.objects.create(
+        firm=firm, workflow=workflow, node_id="first", node_type="send_email", label="First"
+    )
+    compiled = get_compiled_workflow(workflow)
+    assert compiled.start_node().node_id == "first"
+    assert get_compiled_workflow(workflow) is compiled
+
+    first.position_y = 100
+    first.save()
+    WorkflowNode.objects.create(
+        firm=firm, workflow=workflow, node_id="second", node_type="goal", label="Second"
+    )
+    recompiled = get_compiled_workflow(workflow)
+
+    assert recompiled is not compiled
+    stored = Workflow.objects.get(pk=workflow.pk)
+    assert recompiled.structure_revision == stored.structure_revision > workflow.structure_revision
+    # Structure edits do not touch the user-visible version
+    assert stored.version == workflow.version == 1
+    assert recompiled.start_node().node_id == "second"
+
+    WorkflowEdge.objects.create(
+        firm=firm, workflow=workflow, source_node=recompiled.start_node(), target_node=first
+    )
+    with_edge = get_compiled_workflow(workflow)
+    assert with_edge.next_node(with_edge.start_node(), {}).node_id == "first"
+
+    # A stale save of the workflow row rewinds structure_revision but still moves the key
+    workflow.name = "Nurture v2"
+    workflow.save()
+    assert get_compiled_workflow(workflow) is not with_edge
@@ -18,7 +18,7 @@ Meta-commentary:
 - **Missing:** Additional signal hooks (site tracking events, form submissions, email events, score/date-based triggers) must call TriggerDetector elsewhere.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional
 
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
@@ -44,6 +44,7 @@ class TriggerDetector:
         trigger_type: str,
         event_data: Dict[str, Any],
         contact: Contact = None,
+        triggers: Optional[Iterable[WorkflowTrigger]] = None,
     ) -> List[WorkflowExecution]:
         """
         Detect matching triggers and initiate workflows.
@@ -53,17 +54,20 @@ class TriggerDetector:
             trigger_type: Type of trigger event
             event_data: Event context data
             contact: Contact to execute workflow for (optional)
+            triggers: Preloaded active triggers for this firm/trigger_type (optional;
+                lets batch callers skip the per-event trigger query)
 
         Returns:
             List of created workflow executions
         """
         # Find active triggers matching this event type
-        triggers = WorkflowTrigger.objects.filter(
-            firm=firm,
-            trigger_type=trigger_type,
-            is_active=True,
-            workflow__status="active",
-        ).select_related("workflow")
+        if triggers is None:
+            triggers = WorkflowTrigger.objects.filter(
+                firm=firm,
+                trigger_type=trigger_type,
+                is_active=True,
+                workflow__status="active",
+            ).select_related("workflow")
 
         executions = []
 
@@ -0,0 +1,217 @@
+"""
+Materialized availability cache for booking pages.
+
+Free slots are cached per (availability profile, appointment type, staff user,
+profile-local day) for the next AVAILABILITY_CACHE_DAYS days. Each entry holds
+the day's slots after conflicts with appointments and external calendars are
+removed, but before the time-dependent min notice / max future limits; those
+are applied on every read so an entry never goes stale just because time
+passes.
+
+Entry keys embed version tokens for the profile, the appointment type, the
+staff user and the staff user's day. Invalidation deletes the relevant version
+keys (see modules.calendar.signals and the calendar sync services), which
+orphans only the affected entries:
+
+- Appointment booked, cancelled or rescheduled -> the staff user's days around
+  the old and new times
+- AvailabilityProfile or AppointmentType changed -> everything for it
+- External calendar sync completed -> everything for the staff user
+
+Entries also expire after AVAILABILITY_CACHE_TTL_SECONDS as a backstop.
+Invalidation only happens through signals, so the cache stays disabled when
+CALENDAR_ENABLE_SIGNALS is off. Cross-process invalidation requires a shared
+cache backend, so AVAILABILITY_CACHE_ENABLED defaults to off; enable it only
+when CACHES points at one (e.g. Redis), never with the per-process LocMem default.
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+CACHE_PREFIX = "cal_avail"
+
+Interval = Tuple[datetime, datetime]
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "AVAILABILITY_CACHE_ENABLED", False) and getattr(
+        settings, "CALENDAR_ENABLE_SIGNALS", True
+    )
+
+
+def _ttl() -> int:
+    return getattr(settings, "AVAILABILITY_CACHE_TTL_SECONDS", 3600)
+
+
+def _days() -> int:
+    return getattr(settings, "AVAILABILITY_CACHE_DAYS", 60)
+
+
+def _profile_version_key(profile_id) -> str:
+    return f"{CACHE_PREFIX}:v:profile:{profile_id}"
+
+
+def _type_version_key(appointment_type_id) -> str:
+    return f"{CACHE_PREFIX}:v:type:{appointment_type_id}"
+
+
+def _staff_version_key(staff_id) -> str:
+    return f"{CACHE_PREFIX}:v:staff:{staff_id}"
+
+
+def _staff_day_version_key(staff_id, day: date) -> str:
+    return f"{CACHE_PREFIX}:v:staff_day:{staff_id}:{day.isoformat()}"
+
+
+def _versions(keys: List[str]) -> Dict[str, str]:
+    """Return current version tokens, creating missing ones (cache.add keeps concurrent creators consistent)."""
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            token = uuid.uuid4().hex[:12]
+            cache.add(key, token, _ttl())
+            versions[key] = cache.get(key) or token
+    return versions
+
+
+def _to_epochs(slots: List[Interval]) -> List[List[int]]:
+    return [[int(start.timestamp()), int(end.timestamp())] for start, end in slots]
+
+
+def _from_epochs(rows: List[List[int]]) -> List[Interval]:
+    return [(datetime.fromtimestamp(start, pytz.UTC), datetime.fromtimestamp(end, pytz.UTC)) for start, end in rows]
+
+
+def get_available_slots(
+    service,
+    profile,
+    appointment_type,
+    start_date: date,
+    end_date: date,
+    staff_user=None,
+) -> List[Interval]:
+    """
+    Cached equivalent of AvailabilityService.compute_available_slots.
+
+    Days outside today..today + AVAILABILITY_CACHE_DAYS (profile-local) are
+    computed directly.
+    """
+    if not is_enabled():
+        return service.compute_available_slots(profile, appointment_type, start_date, end_date, staff_user)
+
+    today = timezone.now().astimezone(pytz.timezone(profile.timezone)).date()
+    cached_start = max(start_date, today)
+    cached_end = min(end_date, today + timedelta(days=_days()))
+    if cached_start > cached_end:
+        return service.compute_available_slots(profile, appointment_type, start_date, end_date, staff_user)
+
+    slots = []
+    if start_date < cached_start:
+        slots.extend(
+            service.compute_available_slots(
+                profile, appointment_type, start_date, cached_start - timedelta(days=1), staff_user
+            )
+        )
+
+    earliest_start, latest_start = service.booking_window(profile)
+    slots.extend(
+        slot
+        for slot in _cached_days(service, profile, appointment_type, cached_start, cached_end, staff_user)
+        if earliest_start <= slot[0] <= latest_start
+    )
+
+    if end_date > cached_end:
+        slots.extend(
+            service.compute_available_slots(
+                profile, appointment_type, cached_end + timedelta(days=1), end_date, staff_user
+            )
+        )
+    return slots
+
+
+def _cached_days(service, profile, appointment_type, start_date: date, end_date: date, staff_user) -> List[Interval]:
+    staff_id = staff_user.pk if staff_user is not None else None
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+    shared_keys = [_profile_version_key(profile.pk), _type_version_key(appointment_type.pk)]
+    if staff_id is not None:
+        shared_keys.append(_staff_version_key(staff_id))
+    day_keys = {day: _staff_day_version_key(staff_id, day) for day in days} if staff_id is not None else {}
+    versions = _versions(shared_keys + list(day_keys.values()))
+    shared = ":".join(versions[key] for key in shared_keys)
+
+    entry_keys = {
+        day: (
+            f"{CACHE_PREFIX}:slots:{profile.pk}:{appointment_type.pk}:{staff_id or 'none'}:{day.isoformat()}:"
+            f"{shared}:{versions[day_keys[day]] if day_keys else ''}"
+        )
+        for day in days
+    }
+    entries = cache.get_many(list(entry_keys.values()))
+
+    missing = [day for day in days if entry_keys[day] not in entries]
+    if missing:
+        computed = _compute_days(service, profile, appointment_type, missing, staff_user)
+        cache.set_many({entry_keys[day]: _to_epochs(computed[day]) for day in missing}, _ttl())
+        for day in missing:
+            entries[entry_keys[day]] = _to_epochs(computed[day])
+
+    slots = []
+    for day in days:
+        slots.extend(_from_epochs(entries[entry_keys[day]]))
+    return slots
+
+
+def _compute_days(service, profile, appointment_type, days: List[date], staff_user) -> Dict[date, List[Interval]]:
+    """Compute free slots (without the booking window) for the given days with one busy-interval load."""
+    candidates = {
+        day: service._candidate_slots(profile, appointment_type, day, day, apply_booking_window=False) for day in days
+    }
+    if staff_user is None:
+        return candidates
+
+    all_slots = [slot for day_slots in candidates.values() for slot in day_slots]
+    if not all_slots:
+        return candidates
+    busy = service.load_busy_intervals(
+        staff_user, min(start for start, _ in all_slots), max(end for _, end in all_slots)
+    )
+    return {day: busy.free_slots(day_slots) for day, day_slots in candidates.items()}
+
+
+def invalidate_staff_days(staff_id, start_time: datetime, end_time: Optional[datetime] = None) -> None:
+    """
+    Drop a staff user's cached days around a time range.
+
+    Days are profile-local, so the UTC range is widened by a day on each side
+    to cover every timezone offset.
+    """
+    if staff_id is None or start_time is None:
+        return
+    first = (start_time - timedelta(days=1)).astimezone(pytz.UTC).date()
+    last = ((end_time or start_time) + timedelta(days=1)).astimezone(pytz.UTC).date()
+    cache.delete_many(
+        [_staff_day_version_key(staff_id, first + timedelta(days=offset)) for offset in range((last - first).days + 1)]
+    )
+
+
+def invalidate_staff(staff_id) -> None:
+    """Drop every cached day for a staff user (e.g. after an external calendar sync)."""
+    if staff_id is not None:
+        cache.delete(_staff_version_key(staff_id))
+
+
+def invalidate_profile(profile_id) -> None:
+    """Drop every cached day computed from an availability profile."""
+    cache.delete(_profile_version_key(profile_id))
+
+
+def invalidate_appointment_type(appointment_type_id) -> None:
+    """Drop every cached day for an appointment type."""
+    cache.delete(_type_version_key(appointment_type_id))
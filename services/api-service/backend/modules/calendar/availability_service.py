@@ -8,18 +8,22 @@ Enhanced with AVAIL-2: Comprehensive availability rules (recurring unavailabilit
 """
 
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Any, List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 
 import pytz
 from django.utils import timezone
 
+from . import availability_cache
+from .busy_intervals import BusyIntervalSet
 from .holiday_service import HolidayService
 from .google_service import GoogleCalendarService
-from .ical_service import ICalService
+from .ical_cache import ICalFeedCacheService
 from .microsoft_service import MicrosoftCalendarService
 from .models import Appointment, AppointmentType, AvailabilityProfile
 from .oauth_models import OAuthConnection
+from .team_availability import TeamAvailability
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +35,10 @@ class AvailabilityService:
     Implements docs/03-reference/requirements/DOC-34.md section 4: availability computation with buffers and constraints.
 
     Meta-commentary:
-    - **Current Status:** External conflict checks for Google/Microsoft are placeholders; only iCal and internal overlap checks enforce conflicts today.
+    - **Current Status:** External conflict checks for Google/Microsoft are placeholders; only iCal and internal overlap checks enforce conflicts today. iCal feeds are read from ICalFeedCache (see ical_cache.py), not downloaded per check.
     - **Follow-up (T-067):** Add provider event→appointment mapping with sync cursors so stale external mappings and cancelled events stop surfacing as available slots.
     - **Assumption:** OAuth connections supply up-to-date availability; missing backfill means stale tokens or paused sync can yield optimistic availability windows.
+    - **Design Rationale:** compute_available_slots loads busy time once per source for the whole window into a BusyIntervalSet and sweeps candidate slots against it; `_has_conflict` remains for single-slot checks.
     - **Limitation:** Conflict detection is single-staff focused and does not reconcile simultaneous edits across multiple connected calendars.
     """
 
@@ -55,18 +60,43 @@ class AvailabilityService:
         2. Buffers enforced
         3. Min notice and max future booking enforced
         4. Conflicts with existing appointments considered
+
+        Candidate slots are generated first; conflicts are then resolved with one
+        appointment query and one fetch per external calendar for the whole window.
         """
-        # Get profile timezone
-        profile_tz = pytz.timezone(profile.timezone)
-        now = timezone.now()
+        candidates = self._candidate_slots(profile, appointment_type, start_date, end_date)
+        if not staff_user or not candidates:
+            return candidates
 
-        # Enforce min notice (per docs/03-reference/requirements/DOC-34.md section 4.3)
-        earliest_start = now + timedelta(minutes=profile.min_notice_minutes)
+        # Check for conflicts (per docs/03-reference/requirements/DOC-34.md section 4.4)
+        window_start = min(start for start, _ in candidates)
+        window_end = max(end for _, end in candidates)
+        busy = self.load_busy_intervals(staff_user, window_start, window_end)
+        return busy.free_slots(candidates)
 
-        # Enforce max future booking (per docs/03-reference/requirements/DOC-34.md section 4.3)
-        latest_start = now + timedelta(days=profile.max_future_days)
+    def _candidate_slots(
+        self,
+        profile: AvailabilityProfile,
+        appointment_type: AppointmentType,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        apply_booking_window: bool = True,
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Generate the profile's bookable slots (UTC) before conflicts are considered.
+
+        With ``apply_booking_window=False`` the time-dependent min notice / max future
+        limits are skipped, so the result can be cached and filtered later with
+        booking_window().
+        """
+        # Get profile timezone
+        profile_tz = pytz.timezone(profile.timezone)
+        if apply_booking_window:
+            earliest_start, latest_start = self.booking_window(profile)
+        else:
+            earliest_start = latest_start = None
 
-        slots = []
+        candidates = []
 
         # Iterate through each day
         current_date = start_date
@@ -75,7 +105,7 @@ class AvailabilityService:
             day_start_naive = datetime.combine(current_date, datetime.min.time())
             day_start_aware = profile_tz.localize(day_start_naive)
 
-            if day_start_aware.astimezone(pytz.UTC) > latest_start:
+            if latest_start is not None and day_start_aware.astimezone(pytz.UTC) > latest_start:
                 break
 
             # Check if day is in exceptions
@@ -130,26 +160,106 @@ class AvailabilityService:
                     slot_end_utc = slot_end.astimezone(pytz.UTC)
 
                     # Check constraints
-                    if slot_start_utc < earliest_start:
+                    if earliest_start is not None and slot_start_utc < earliest_start:
                         current_slot_start += timedelta(minutes=profile.slot_rounding_minutes)
                         continue
 
-                    if slot_start_utc > latest_start:
+                    if latest_start is not None and slot_start_utc > latest_start:
                         break
 
-                    # Check for conflicts (per docs/03-reference/requirements/DOC-34.md section 4.4)
-                    if staff_user and self._has_conflict(
-                        staff_user, slot_start_utc, slot_end_utc, appointment_type, profile
-                    ):
-                        current_slot_start += timedelta(minutes=profile.slot_rounding_minutes)
-                        continue
-
-                    slots.append((slot_start_utc, slot_end_utc))
+                    candidates.append((slot_start_utc, slot_end_utc))
                     current_slot_start += timedelta(minutes=profile.slot_rounding_minutes)
 
             current_date += timedelta(days=1)
 
-        return slots
+        return candidates
+
+    def booking_window(self, profile: AvailabilityProfile, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+        """Return the (earliest_start, latest_start) bounds a slot start must fall within."""
+        now = now or timezone.now()
+
+        # Enforce min notice (per docs/03-reference/requirements/DOC-34.md section 4.3)
+        earliest_start = now + timedelta(minutes=profile.min_notice_minutes)
+
+        # Enforce max future booking (per docs/03-reference/requirements/DOC-34.md section 4.3)
+        latest_start = now + timedelta(days=profile.max_future_days)
+        return earliest_start, latest_start
+
+    def cached_available_slots(
+        self,
+        profile: AvailabilityProfile,
+        appointment_type: AppointmentType,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        staff_user=None,
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        compute_available_slots backed by the materialized per-day availability cache.
+
+        Intended for public booking pages; see availability_cache for invalidation.
+        """
+        return availability_cache.get_available_slots(
+            self, profile, appointment_type, start_date, end_date, staff_user
+        )
+
+    def team_availability(
+        self,
+        appointment_type: AppointmentType,
+        host_profiles: Dict[int, Tuple[Any, AvailabilityProfile]],
+        start_date: datetime.date,
+        end_date: datetime.date,
+    ) -> Optional[TeamAvailability]:
+        """
+        Build free-slot bitmaps for several hosts at once.
+
+        Args:
+            appointment_type: AppointmentType whose duration defines the slots
+            host_profiles: {host_id: (host, profile)}
+            start_date: Start date for availability search
+            end_date: End date for availability search
+
+        Returns:
+            TeamAvailability keyed by host id, or None when no host offers any slot.
+            Busy time for all hosts is loaded with one appointment query and one
+            connection query.
+        """
+        candidates = {}
+        for host_id, (host, profile) in host_profiles.items():
+            try:
+                candidates[host_id] = self._candidate_slots(profile, appointment_type, start_date, end_date)
+            except Exception as e:
+                logger.warning(f"Error computing slots for host {host_id}: {e}")
+                candidates[host_id] = []
+
+        all_slots = [slot for slots in candidates.values() for slot in slots]
+        if not all_slots:
+            return None
+
+        window_start = min(start for start, _ in all_slots)
+        window_end = max(end for _, end in all_slots)
+        busy = self.load_team_busy_intervals(
+            [host for host, _ in host_profiles.values()], window_start, window_end
+        )
+
+        team = TeamAvailability(window_start, appointment_type.duration_minutes)
+        for host_id, slots in candidates.items():
+            team.add_host(host_id, slots, busy.get(host_id, BusyIntervalSet()))
+        return team
+
+    def staff_profiles(
+        self,
+        appointment_type: AppointmentType,
+        staff_users: List[Any],
+    ) -> Dict[int, AvailabilityProfile]:
+        """Load staff availability profiles for a firm in one query ({staff_id: profile})."""
+        profiles = {}
+        for profile in AvailabilityProfile.objects.filter(
+            firm=appointment_type.firm,
+            owner_type="staff",
+            owner_staff_user__in=staff_users,
+        ).order_by("pk"):
+            profiles.setdefault(profile.owner_staff_user_id, profile)
+        return profiles
 
     def compute_collective_available_slots(
         self,
@@ -184,69 +294,38 @@ class AvailabilityService:
             return []
 
         # Get availability profiles for all hosts
+        profiles = self.staff_profiles(appointment_type, required_hosts + optional_hosts)
         host_profiles = {}
         for host in required_hosts + optional_hosts:
-            try:
-                profile = AvailabilityProfile.objects.get(
-                    firm=appointment_type.firm,
-                    owner_type="staff",
-                    owner_staff_user=host,
-                )
-                host_profiles[host.id] = profile
-            except AvailabilityProfile.DoesNotExist:
+            profile = profiles.get(host.id)
+            if profile is None:
                 if host in required_hosts:
                     logger.warning(f"Required host {host.username} has no availability profile, cannot compute collective slots.")
                     return []
                 logger.warning(f"No availability profile for optional host {host.username}")
+                continue
+            host_profiles[host.id] = (host, profile)
         if not host_profiles:
             return []
 
-        # Get available slots for each host
-        host_slots = {}
-        for host_id, profile in host_profiles.items():
-            try:
-                host = next(h for h in required_hosts + optional_hosts if h.id == host_id)
-                slots = self.compute_available_slots(
-                    profile=profile,
-                    appointment_type=appointment_type,
-                    start_date=start_date,
-                    end_date=end_date,
-                    staff_user=host,
-                )
-                host_slots[host_id] = set(slots)
-            except Exception as e:
-                logger.warning(f"Error computing slots for host {host_id}: {e}")
-                host_slots[host_id] = set()
-
-        # Find overlapping slots for required hosts
-        collective_slots = []
-
-        # Create a list of slot sets for each required host
-        required_host_slot_sets = [
-            host_slots.get(host.id, set()) for host in required_hosts
-        ]
-
-        # If any required host has no slots, no collective availability
-        if any(not slots for slots in required_host_slot_sets):
+        # Build every host's free-slot bitmap, then intersect required hosts in bulk
+        team = self.team_availability(appointment_type, host_profiles, start_date, end_date)
+        if team is None:
             return []
 
-        # Find intersection of all required host slots
-        overlapping_slots = required_host_slot_sets[0].copy()
-        for other_slots in required_host_slot_sets[1:]:
-            overlapping_slots.intersection_update(other_slots)
-
-        if not overlapping_slots:
+        overlapping = team.intersect(host.id for host in required_hosts)
+        if not overlapping:
             return []
 
         # For each overlapping slot, determine which optional hosts are also available
-        for slot_start, slot_end in sorted(list(overlapping_slots)):
+        optional_bitmaps = [(host, team.bitmap(host.id)) for host in optional_hosts]
+        collective_slots = []
+        for slot_start, slot_end in team.slots(overlapping):
             available_hosts = list(required_hosts)
-
-            for optional_host in optional_hosts:
-                optional_slots_set = host_slots.get(optional_host.id, set())
-                if (slot_start, slot_end) in optional_slots_set:
+            offset = int((slot_start - team.origin).total_seconds() // 60)
+            for optional_host, bitmap in optional_bitmaps:
+                if bitmap >> offset & 1:
                     available_hosts.append(optional_host)
-
             collective_slots.append((slot_start, slot_end, available_hosts))
 
         return collective_slots
@@ -356,6 +435,88 @@ class AvailabilityService:
 
         return result_hours
 
+    def load_busy_intervals(
+        self,
+        staff_user,
+        start_time: datetime,
+        end_time: datetime,
+    ) -> BusyIntervalSet:
+        """
+        Load every busy interval for a staff user overlapping [start_time, end_time).
+
+        Issues one appointment query, one connection query and one fetch per
+        external calendar regardless of how many slots are checked afterwards.
+        """
+        return self.load_team_busy_intervals([staff_user], start_time, end_time).get(
+            staff_user.pk, BusyIntervalSet()
+        )
+
+    def load_team_busy_intervals(
+        self,
+        staff_users: List[Any],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> Dict[int, BusyIntervalSet]:
+        """
+        Load busy intervals for several staff users with one appointment query and one connection query.
+
+        Returns {staff_user_id: BusyIntervalSet}; users without busy time are omitted.
+        """
+        intervals = defaultdict(list)
+        for staff_user_id, busy_start, busy_end in Appointment.objects.filter(
+            staff_user__in=staff_users,
+            status__in=["requested", "confirmed"],
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+        ).values_list("staff_user_id", "start_time", "end_time"):
+            intervals[staff_user_id].append((busy_start, busy_end))
+
+        for connection in OAuthConnection.objects.filter(
+            user__in=staff_users,
+            status="active",
+            sync_enabled=True,
+        ).select_related("ical_feed_cache"):
+            intervals[connection.user_id].extend(
+                self._external_busy_intervals(connection, start_time, end_time)
+            )
+
+        return {staff_user_id: BusyIntervalSet(busy) for staff_user_id, busy in intervals.items()}
+
+    def _external_connections(self, staff_user) -> List[OAuthConnection]:
+        """Return the staff user's connected calendars that participate in conflict checks."""
+        return list(
+            OAuthConnection.objects.filter(
+                user=staff_user,
+                status="active",
+                sync_enabled=True,
+            ).select_related("ical_feed_cache")
+        )
+
+    def _external_busy_intervals(
+        self,
+        connection: OAuthConnection,
+        start_time: datetime,
+        end_time: datetime,
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Return busy intervals from one external calendar for the window.
+
+        iCal feeds are answered from the feed cache. Google/Microsoft are placeholders,
+        and an iCal feed that was never readable blocks the whole window rather than
+        showing it as free.
+        """
+        if connection.provider in ("ical", "apple"):
+            if not connection.ical_feed_url:
+                return []
+            try:
+                return ICalFeedCacheService().busy_intervals(connection, start_time, end_time)
+            except Exception as e:
+                logger.warning(f"Error loading iCal busy intervals: {e}")
+                return [(start_time, end_time)]
+
+        # Google/Microsoft event fetching is not implemented yet (see _check_google_conflict)
+        return []
+
     def _has_conflict(
         self,
         staff_user,
@@ -368,6 +529,8 @@ class AvailabilityService:
         Check for conflicts for a staff user.
 
         Per docs/03-reference/requirements/DOC-34.md section 4.4: checks internal appointments and external calendars.
+        All-day/tentative handling comes from each OAuthConnection; ``profile`` is accepted for
+        backwards compatibility. Use load_busy_intervals when checking many slots.
 
         Returns True if any conflict found, False otherwise.
         """
@@ -382,92 +545,33 @@ class AvailabilityService:
         if internal_conflict:
             return True
 
-        if profile is None:
-            try:
-                profile = AvailabilityProfile.objects.get(
-                    firm=appointment_type.firm,
-                    owner_type="staff",
-                    owner_staff_user=staff_user,
-                )
-            except AvailabilityProfile.DoesNotExist:
-                return False
-
-        # Check external calendar conflicts if enabled
-        if profile.check_external_calendars:
-            connections = OAuthConnection.objects.filter(
-                user=staff_user,
-                is_active=True,
-            )
-
-            for connection in connections:
-                if connection.provider == "google":
-                    if self._check_google_conflict(
-                        connection,
-                        start_time,
-                        end_time,
-                        profile.treat_all_day_as_busy,
-                        profile.treat_tentative_as_busy,
-                    ):
-                        return True
-                elif connection.provider == "microsoft":
-                    if self._check_microsoft_conflict(
-                        connection,
-                        start_time,
-                        end_time,
-                        profile.treat_all_day_as_busy,
-                        profile.treat_tentative_as_busy,
-                    ):
-                        return True
-                elif connection.provider == "ical":
-                    # Check iCal feed
-                    if connection.ical_feed_url:
-                        if self._check_ical_conflict(
-                            connection.ical_feed_url,
-                            start_time,
-                            end_time,
-                            profile.treat_all_day_as_busy,
-                            profile.treat_tentative_as_busy,
-                        ):
-                            return True
+        # Check external calendar conflicts (AVAIL-1: busy rules are configured per connection)
+        for connection in self._external_connections(staff_user):
+            if connection.provider == "google":
+                if self._check_google_conflict(
+                    connection,
+                    start_time,
+                    end_time,
+                    connection.treat_all_day_as_busy,
+                    connection.treat_tentative_as_busy,
+                ):
+                    return True
+            elif connection.provider == "microsoft":
+                if self._check_microsoft_conflict(
+                    connection,
+                    start_time,
+                    end_time,
+                    connection.treat_all_day_as_busy,
+                    connection.treat_tentative_as_busy,
+                ):
+                    return True
+            elif connection.provider in ("ical", "apple"):
+                # Check iCal feed (cached interval lookup)
+                if self._external_busy_intervals(connection, start_time, end_time):
+                    return True
 
         return False
 
-    def _check_ical_conflict(
-        self,
-        feed_url: str,
-        start_time: datetime,
-        end_time: datetime,
-        treat_all_day_as_busy: bool,
-        treat_tentative_as_busy: bool,
-    ) -> bool:
-        """
-        Check for conflicts in an iCal feed.
-
-        Args:
-            feed_url: iCal feed URL
-            start_time: Start of time slot to check
-            end_time: End of time slot to check
-            treat_all_day_as_busy: Whether to treat all-day events as busy
-            treat_tentative_as_busy: Whether to treat tentative events as busy
-
-        Returns:
-            True if conflict found, False otherwise
-        """
-        try:
-            ical_service = ICalService()
-            is_available = ical_service.check_availability(
-                feed_url=feed_url,
-                start_time=start_time,
-                end_time=end_time,
-                treat_all_day_as_busy=treat_all_day_as_busy,
-                treat_tentative_as_busy=treat_tentative_as_busy,
-            )
-            # If not available, there's a conflict
-            return not is_available
-        except Exception as e:
-            logger.warning(f"Error checking iCal availability: {e}")
-            return False
-
     def _check_google_conflict(
         self,
         connection: OAuthConnection,
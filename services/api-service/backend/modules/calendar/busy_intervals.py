@@ -0,0 +1,79 @@
+"""
+Busy-interval engine for availability computation.
+
+Availability used to be decided slot by slot: every candidate slot issued its own
+appointment query, connection query and external calendar fetch. The engine below
+loads busy time for a whole window once, merges it into a sorted list of disjoint
+half-open intervals, and checks candidate slots against it either individually
+(binary search) or in bulk (a single linear sweep).
+"""
+
+from bisect import bisect_right
+from datetime import datetime
+from typing import Iterable, List, Sequence, Tuple
+
+Interval = Tuple[datetime, datetime]
+
+
+class BusyIntervalSet:
+    """
+    Sorted, merged set of busy [start, end) intervals.
+
+    Overlapping and touching intervals are coalesced on construction, so the set
+    holds at most one interval per contiguous busy block.
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self._intervals: List[Interval] = self._merge(intervals)
+        self._starts = [start for start, _ in self._intervals]
+
+    @staticmethod
+    def _merge(intervals: Iterable[Interval]) -> List[Interval]:
+        merged: List[Interval] = []
+        for start, end in sorted(interval for interval in intervals if interval[0] < interval[1]):
+            if merged and start <= merged[-1][1]:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        return merged
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def __iter__(self):
+        return iter(self._intervals)
+
+    def __bool__(self) -> bool:
+        return bool(self._intervals)
+
+    def union(self, other: "BusyIntervalSet") -> "BusyIntervalSet":
+        return BusyIntervalSet([*self._intervals, *other._intervals])
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """Return True if [start, end) intersects any busy interval."""
+        index = bisect_right(self._starts, start) - 1
+        if index >= 0 and self._intervals[index][1] > start:
+            return True
+        index += 1
+        return index < len(self._intervals) and self._intervals[index][0] < end
+
+    def free_slots(self, slots: Sequence[Interval]) -> List[Interval]:
+        """
+        Return the slots that do not intersect any busy interval, in their original order.
+
+        Slots are visited in start order with a cursor that only moves forward, so
+        the cost is O(n log n) for the sort plus O(n + m) for the sweep.
+        """
+        if not self._intervals:
+            return list(slots)
+
+        intervals = self._intervals
+        free = [False] * len(slots)
+        cursor = 0
+        for position in sorted(range(len(slots)), key=lambda i: slots[i][0]):
+            start, end = slots[position]
+            while cursor < len(intervals) and intervals[cursor][1] <= start:
+                cursor += 1
+            free[position] = cursor == len(intervals) or intervals[cursor][0] >= end
+        return [slot for slot, is_free in zip(slots, free) if is_free]
@@ -0,0 +1,310 @@
+"""
+iCal feed cache for availability lookups.
+
+Availability checks used to download and re-parse a connection's whole feed for
+every candidate slot. ICalFeedCacheService keeps one ICalFeedCache row per
+connection instead:
+
+- Refreshes are conditional (If-None-Match / If-Modified-Since) and skip parsing
+  when the payload is unchanged.
+- Busy events are compiled to sorted ``[start, end, flags]`` epoch rows; recurring
+  masters keep their RRULE and are expanded only over the requested window.
+- Rows younger than ICAL_FEED_CACHE_TTL_SECONDS are served as-is. Older rows are
+  still served while a JobQueue refresh is queued; rows older than
+  ICAL_FEED_CACHE_MAX_STALE_SECONDS (or built from another URL) are refreshed
+  inline before answering.
+
+Cancelled and transparent events are dropped at compile time; all-day and
+tentative events are flagged so each connection's busy preferences apply at
+lookup time.
+"""
+
+import hashlib
+import logging
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil.rrule import rrulestr
+from django.conf import settings
+from django.utils import timezone
+
+from modules.core.ttl_cache import BoundedTTLCache
+
+from . import availability_cache
+from .ical_service import ICalService
+from .oauth_models import ICalFeedCache, OAuthConnection
+
+logger = logging.getLogger(__name__)
+
+FLAG_ALL_DAY = 1
+FLAG_TENTATIVE = 2
+
+# Upper bound on occurrences expanded per recurring event per lookup
+MAX_OCCURRENCES_PER_LOOKUP = 5000
+
+_compiled_feeds = BoundedTTLCache(max_entries=512, ttl_seconds=3600)
+
+
+def feed_url_hash(feed_url: str) -> str:
+    return hashlib.sha256(feed_url.encode('utf-8')).hexdigest()
+
+
+def _epoch(value: datetime) -> int:
+    return int(value.timestamp())
+
+
+def _from_epoch(value: int) -> datetime:
+    return datetime.fromtimestamp(value, dt_timezone.utc)
+
+
+def _flags(event: Dict) -> int:
+    flags = 0
+    if event.get('is_all_day'):
+        flags |= FLAG_ALL_DAY
+    if event.get('status') == 'TENTATIVE':
+        flags |= FLAG_TENTATIVE
+    return flags
+
+
+def compile_events(events: Iterable[Dict]) -> Dict:
+    """
+    Compile parsed feed events into the cache layout.
+
+    RECURRENCE-ID overrides replace the master occurrence they modify: the
+    original start is added to the master's exdates and the override (unless it
+    is cancelled or transparent) is stored as a regular event.
+    """
+    events = list(events)
+    overridden: Dict[str, List[int]] = {}
+    for event in events:
+        if event.get('recurrence_id'):
+            overridden.setdefault(event['id'], []).append(_epoch(event['recurrence_id']))
+
+    singles = []
+    recurring = []
+    for event in events:
+        if not event.get('is_busy', True) or event.get('status') == 'CANCELLED':
+            continue
+        start = _epoch(event['start'])
+        end = _epoch(event['end'])
+        if event.get('recurrence_rule') and not event.get('recurrence_id'):
+            recurring.append(
+                {
+                    'start': start,
+                    'duration': max(end - start, 0),
+                    'flags': _flags(event),
+                    'rrule': event['recurrence_rule'],
+                    'tzid': event.get('tzid') or 'UTC',
+                    'exdates': sorted(
+                        {_epoch(value) for value in event.get('exdates', [])} | set(overridden.get(event['id'], []))
+                    ),
+                }
+            )
+        elif end > start:
+            singles.append([start, end, _flags(event)])
+
+    singles.sort()
+    return {
+        'events': singles,
+        'recurring_events': recurring,
+        'max_duration_seconds': max((end - start for start, end, _ in singles), default=0),
+    }
+
+
+class CompiledFeed:
+    """In-memory view of an ICalFeedCache row answering window queries."""
+
+    def __init__(self, events: List[List[int]], recurring_events: List[Dict], max_duration_seconds: int):
+        self.events = events
+        self.recurring_events = recurring_events
+        self.max_duration_seconds = max_duration_seconds
+        self._starts = [row[0] for row in events]
+
+    @classmethod
+    def from_cache(cls, cache: ICalFeedCache) -> 'CompiledFeed':
+        key = (cache.pk, cache.content_hash)
+        compiled = _compiled_feeds.get(key)
+        if compiled is None:
+            compiled = _compiled_feeds.set(
+                key, cls(cache.events or [], cache.recurring_events or [], cache.max_duration_seconds)
+            )
+        return compiled
+
+    def busy_intervals(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        treat_all_day_as_busy: bool = False,
+        treat_tentative_as_busy: bool = True,
+    ) -> List[Tuple[datetime, datetime]]:
+        """Return busy (start, end) intervals overlapping [start_time, end_time), sorted by start."""
+        skip = 0
+        if not treat_all_day_as_busy:
+            skip |= FLAG_ALL_DAY
+        if not treat_tentative_as_busy:
+            skip |= FLAG_TENTATIVE
+
+        window_start = _epoch(start_time)
+        window_end = _epoch(end_time)
+        lo = bisect_left(self._starts, window_start - self.max_duration_seconds)
+        hi = bisect_left(self._starts, window_end)
+
+        intervals = [
+            (_from_epoch(start), _from_epoch(end))
+            for start, end, flags in self.events[lo:hi]
+            if end > window_start and not flags & skip
+        ]
+        for rule in self.recurring_events:
+            if rule['flags'] & skip:
+                continue
+            intervals.extend(self._expand(rule, start_time, end_time))
+
+        intervals.sort()
+        return intervals
+
+    def _expand(self, rule: Dict, start_time: datetime, end_time: datetime) -> List[Tuple[datetime, datetime]]:
+        """Expand one recurring master over the window in its own timezone (DST-correct)."""
+        try:
+            zone = ZoneInfo(rule['tzid'])
+        except (ZoneInfoNotFoundError, ValueError):
+            zone = ZoneInfo('UTC')
+        duration = timedelta(seconds=rule['duration'])
+        dtstart = datetime.fromtimestamp(rule['start'], zone)
+        after = start_time - duration
+        try:
+            recurrence = rrulestr(rule['rrule'], dtstart=dtstart)
+        except ValueError:
+            # Floating UNTIL values cannot be combined with an aware DTSTART
+            try:
+                recurrence = rrulestr(rule['rrule'], dtstart=dtstart.replace(tzinfo=None))
+            except ValueError as e:
+                logger.warning(f"Skipping unparseable iCal RRULE: {e}")
+                return []
+            after = timezone.make_naive(after, zone)
+            end_time = timezone.make_naive(end_time, zone)
+
+        exdates = set(rule.get('exdates') or [])
+        intervals = []
+        for occurrence in recurrence.xafter(after, count=MAX_OCCURRENCES_PER_LOOKUP):
+            if occurrence >= end_time:
+                break
+            if occurrence.tzinfo is None:
+                occurrence = occurrence.replace(tzinfo=zone)
+            occurrence = occurrence.astimezone(dt_timezone.utc)
+            if _epoch(occurrence) in exdates:
+                continue
+            intervals.append((occurrence, occurrence + duration))
+        return intervals
+
+
+class ICalFeedCacheService:
+    """Serve iCal busy intervals from the per-connection cache."""
+
+    def __init__(self, ical_service: Optional[ICalService] = None):
+        self.ical_service = ical_service or ICalService()
+
+    @staticmethod
+    def ttl_seconds() -> int:
+        return getattr(settings, 'ICAL_FEED_CACHE_TTL_SECONDS', 900)
+
+    @staticmethod
+    def max_stale_seconds() -> int:
+        return getattr(settings, 'ICAL_FEED_CACHE_MAX_STALE_SECONDS', 86400)
+
+    def busy_intervals(
+        self,
+        connection: OAuthConnection,
+        start_time: datetime,
+        end_time: datetime,
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Return busy intervals for a connection's feed, applying its all-day/tentative preferences.
+
+        Raises:
+            Exception: If no usable cache exists and the feed cannot be fetched
+        """
+        return self.get_feed(connection).busy_intervals(
+            start_time,
+            end_time,
+            treat_all_day_as_busy=connection.treat_all_day_as_busy,
+            treat_tentative_as_busy=connection.treat_tentative_as_busy,
+        )
+
+    def get_feed(self, connection: OAuthConnection) -> CompiledFeed:
+        cache = self._cache_for(connection)
+        url_hash = feed_url_hash(connection.ical_feed_url)
+        usable = cache is not None and cache.fetched_at is not None and cache.feed_url_hash == url_hash
+
+        if not usable:
+            cache = self.refresh(connection, cache)
+        else:
+            age = (timezone.now() - cache.fetched_at).total_seconds()
+            if age > self.max_stale_seconds():
+                cache = self.refresh(connection, cache)
+            elif age > self.ttl_seconds():
+                from .queue import queue_ical_feed_refresh
+
+                queue_ical_feed_refresh(connection)
+
+        return CompiledFeed.from_cache(cache)
+
+    def refresh(self, connection: OAuthConnection, cache: Optional[ICalFeedCache] = None) -> ICalFeedCache:
+        """
+        Conditionally re-download a connection's feed and recompile the cache.
+
+        A failed refresh keeps serving previously compiled events for the same
+        URL (recording the error); it only raises when nothing usable is cached.
+        """
+        if cache is None:
+            cache = self._cache_for(connection)
+        url_hash = feed_url_hash(connection.ical_feed_url)
+        if cache is None:
+            cache = ICalFeedCache(connection=connection, firm_id=connection.firm_id, feed_url_hash=url_hash)
+        same_feed = cache.pk is not None and cache.feed_url_hash == url_hash and cache.fetched_at is not None
+
+        try:
+            response = self.ical_service.fetch_feed(
+                connection.ical_feed_url,
+                etag=cache.etag if same_feed else '',
+                last_modified=cache.last_modified if same_feed else '',
+            )
+            now = timezone.now()
+            if response.not_modified:
+                cache.fetched_at = now
+                cache.last_error = ''
+                cache.save(update_fields=['fetched_at', 'last_error', 'updated_at'])
+                return cache
+
+            content_hash = hashlib.sha256(response.content or b'').hexdigest()
+            if not (same_feed and content_hash == cache.content_hash):
+                compiled = compile_events(self.ical_service.parse_feed(response.content))
+                cache.events = compiled['events']
+                cache.recurring_events = compiled['recurring_events']
+                cache.max_duration_seconds = compiled['max_duration_seconds']
+                cache.content_hash = content_hash
+                availability_cache.invalidate_staff(connection.user_id)
+            cache.feed_url_hash = url_hash
+            cache.etag = response.etag
+            cache.last_modified = response.last_modified
+            cache.fetched_at = now
+            cache.last_error = ''
+            cache.save()
+        except Exception as e:
+            if not same_feed:
+                raise
+            logger.warning(f"iCal feed refresh failed for connection {connection.pk}, serving cached events: {e}")
+            cache.last_error = str(e)[:1000]
+            cache.save(update_fields=['last_error', 'updated_at'])
+
+        connection.ical_feed_cache = cache
+        return cache
+
+    @staticmethod
+    def _cache_for(connection: OAuthConnection) -> Optional[ICalFeedCache]:
+        try:
+            return connection.ical_feed_cache
+        except ICalFeedCache.DoesNotExist:
+            return None
@@ -5,15 +5,15 @@ Provides support for iCloud Calendar and generic iCal/vCal feed integration.
 Implements AVAIL-1: Expand calendar integrations.
 
 Meta-commentary:
-- **Current Status:** Recurrence rules are parsed and stored as strings without expansion into individual occurrences.
+- **Current Status:** This service parses raw feeds; recurrence rules are returned as RFC 5545 strings and expanded by `ical_cache.CompiledFeed`.
 - **Design Rationale:** The service normalizes `webcal://` URLs to HTTPS to reuse standard HTTP tooling.
 - **Assumption:** Feed URLs are reachable without interactive authentication and return RFC-compliant iCal payloads.
-- **Limitation:** Fetching uses a fixed timeout and no caching (ETag/If-Modified-Since), so repeated calls may be slow.
+- **Limitation:** `fetch_events`/`check_availability` always download the feed; availability checks go through `ICalFeedCacheService`, which uses `fetch_feed` conditional requests (ETag/If-Modified-Since).
 """
 
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from urllib.parse import urlparse
 
 import requests
@@ -23,6 +23,15 @@ from icalendar import Calendar
 logger = logging.getLogger(__name__)
 
 
+class FeedResponse(NamedTuple):
+    """Result of a (conditional) feed download; ``content`` is None when not modified."""
+
+    not_modified: bool
+    content: Optional[bytes]
+    etag: str
+    last_modified: str
+
+
 class ICalService:
     """
     Service for iCal/vCal calendar integration.
@@ -91,26 +100,10 @@ class ICalService:
             List of event dictionaries
         """
         try:
-            # Convert webcal:// to https://
-            if feed_url.startswith('webcal://'):
-                feed_url = feed_url.replace('webcal://', 'https://')
-
-            # Fetch the iCal feed
-            response = requests.get(feed_url, timeout=self.timeout)
-            response.raise_for_status()
-
-            # Parse the iCal feed
-            cal = Calendar.from_ical(response.content)
+            response = self.fetch_feed(feed_url)
 
             events = []
-            for component in cal.walk():
-                if component.name != 'VEVENT':
-                    continue
-
-                event = self._parse_event(component)
-                if not event:
-                    continue
-
+            for event in self.parse_feed(response.content):
                 # Filter by date range
                 if start_date and event['end'] < start_date:
                     continue
@@ -133,6 +126,62 @@ class ICalService:
             logger.error(f"Failed to fetch iCal events: {e}")
             raise
 
+    def fetch_feed(self, feed_url: str, etag: str = '', last_modified: str = '') -> FeedResponse:
+        """
+        Download a feed, sending If-None-Match/If-Modified-Since when validators are known.
+
+        Args:
+            feed_url: iCal feed URL
+            etag: ETag from the previous response
+            last_modified: Last-Modified header from the previous response
+
+        Returns:
+            FeedResponse; ``not_modified`` is True on HTTP 304
+
+        Raises:
+            requests.RequestException: If the feed cannot be downloaded
+        """
+        # Convert webcal:// to https://
+        if feed_url.startswith('webcal://'):
+            feed_url = feed_url.replace('webcal://', 'https://')
+
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        response = requests.get(feed_url, timeout=self.timeout, headers=headers)
+        if response.status_code == 304:
+            return FeedResponse(True, None, etag, last_modified)
+        response.raise_for_status()
+        return FeedResponse(
+            False,
+            response.content,
+            response.headers.get('ETag', ''),
+            response.headers.get('Last-Modified', ''),
+        )
+
+    def parse_feed(self, content: bytes) -> List[Dict]:
+        """
+        Parse every VEVENT in a feed (recurring masters are returned unexpanded).
+
+        Args:
+            content: Raw iCal payload
+
+        Returns:
+            List of event dictionaries
+        """
+        cal = Calendar.from_ical(content)
+        events = []
+        for component in cal.walk():
+            if component.name != 'VEVENT':
+                continue
+            event = self._parse_event(component)
+            if event:
+                events.append(event)
+        return events
+
     def _parse_event(self, component) -> Optional[Dict]:
         """
         Parse an iCal VEVENT component into a dictionary.
@@ -187,7 +236,17 @@ class ICalService:
 
             # Parse recurrence rules if present
             rrule = component.get('RRULE')
-            recurrence_rule = str(rrule) if rrule else None
+            if isinstance(rrule, list):
+                rrule = rrule[0] if rrule else None
+            if rrule is None:
+                recurrence_rule = None
+            elif hasattr(rrule, 'to_ical'):
+                recurrence_rule = rrule.to_ical().decode()
+            else:
+                recurrence_rule = str(rrule)
+
+            recurrence_id = component.get('RECURRENCE-ID')
+            exdates = self._parse_date_list(component.get('EXDATE'))
 
             # Parse attendees and organizer
             attendees = []
@@ -215,6 +274,9 @@ class ICalService:
                 'status': status,
                 'is_busy': is_busy,
                 'recurrence_rule': recurrence_rule,
+                'recurrence_id': self._as_aware(recurrence_id.dt) if recurrence_id else None,
+                'exdates': exdates,
+                'tzid': self._tzid(dtstart.dt),
                 'attendees': attendees,
                 'organizer': organizer_email,
             }
@@ -223,6 +285,89 @@ class ICalService:
             logger.warning(f"Failed to parse iCal event: {e}")
             return None
 
+    def busy_intervals(
+        self,
+        feed_url: str,
+        start_time: datetime,
+        end_time: datetime,
+        treat_all_day_as_busy: bool = False,
+        treat_tentative_as_busy: bool = True,
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Fetch the feed once and return the busy (start, end) intervals overlapping a window.
+
+        Args:
+            feed_url: iCal feed URL
+            start_time: Start of the window
+            end_time: End of the window
+            treat_all_day_as_busy: Whether to treat all-day events as busy (default: False)
+            treat_tentative_as_busy: Whether to treat tentative events as busy (default: True)
+
+        Returns:
+            List of (start, end) tuples for events that block the window
+
+        Raises:
+            Exception: If the feed cannot be fetched or parsed
+        """
+        events = self.fetch_events(
+            feed_url=feed_url,
+            start_date=start_time - timedelta(days=1),
+            end_date=end_time + timedelta(days=1),
+            include_all_day=treat_all_day_as_busy,
+            include_tentative=treat_tentative_as_busy,
+        )
+
+        intervals = []
+        for event in events:
+            # Skip cancelled events
+            if event.get('status') == 'CANCELLED':
+                continue
+
+            # Skip free/transparent events
+            if not event.get('is_busy'):
+                continue
+
+            # Skip all-day events if configured
+            if event.get('is_all_day') and not treat_all_day_as_busy:
+                continue
+
+            # Skip tentative events if configured
+            if event.get('status') == 'TENTATIVE' and not treat_tentative_as_busy:
+                continue
+
+            if self._times_overlap(start_time, end_time, event['start'], event['end']):
+                intervals.append((event['start'], event['end']))
+
+        return intervals
+
+    def _as_aware(self, value) -> datetime:
+        """Normalize an iCal DATE or DATE-TIME value to an aware datetime."""
+        if isinstance(value, date) and not isinstance(value, datetime):
+            value = datetime.combine(value, datetime.min.time())
+        if not timezone.is_aware(value):
+            value = timezone.make_aware(value)
+        return value
+
+    def _parse_date_list(self, prop) -> List[datetime]:
+        """Flatten EXDATE/RDATE properties (single or repeated) into aware datetimes."""
+        if not prop:
+            return []
+        values = []
+        for entry in prop if isinstance(prop, list) else [prop]:
+            for item in getattr(entry, 'dts', []):
+                values.append(self._as_aware(item.dt))
+        return values
+
+    def _tzid(self, value) -> str:
+        """Return the IANA zone an event's wall-clock times are defined in."""
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            zone = getattr(value.tzinfo, 'zone', None) or getattr(value.tzinfo, 'key', None)
+            if zone:
+                return zone
+            if value.utcoffset() == timedelta(0):
+                return 'UTC'
+        return timezone.get_default_timezone_name()
+
     def check_availability(
         self,
         feed_url: str,
@@ -245,44 +390,16 @@ class ICalService:
             True if available (no conflicts), False if busy
         """
         try:
-            # Fetch events in the time window
-            events = self.fetch_events(
+            intervals = self.busy_intervals(
                 feed_url=feed_url,
-                start_date=start_time - timedelta(days=1),
-                end_date=end_time + timedelta(days=1),
-                include_all_day=treat_all_day_as_busy,
-                include_tentative=treat_tentative_as_busy,
+                start_time=start_time,
+                end_time=end_time,
+                treat_all_day_as_busy=treat_all_day_as_busy,
+                treat_tentative_as_busy=treat_tentative_as_busy,
             )
-
-            # Check for conflicts
-            for event in events:
-                # Skip cancelled events
-                if event.get('status') == 'CANCELLED':
-                    continue
-
-                # Skip free/transparent events
-                if not event.get('is_busy'):
-                    continue
-
-                # Skip all-day events if configured
-                if event.get('is_all_day') and not treat_all_day_as_busy:
-                    continue
-
-                # Skip tentative events if configured
-                if event.get('status') == 'TENTATIVE' and not treat_tentative_as_busy:
-                    continue
-
-                # Check for overlap
-                event_start = event['start']
-                event_end = event['end']
-
-                if self._times_overlap(start_time, end_time, event_start, event_end):
-                    logger.debug(
-                        f"Conflict found: {event.get('summary')} "
-                        f"({event_start} - {event_end})"
-                    )
-                    return False
-
+            if intervals:
+                logger.debug(f"Conflict found: {intervals[0][0]} - {intervals[0][1]}")
+                return False
             return True
 
         except Exception as e:
@@ -0,0 +1,52 @@
+"""
+Calendar background job handlers.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from modules.calendar.ical_cache import ICalFeedCacheService
+from modules.calendar.oauth_models import OAuthConnection
+from modules.firm.utils import firm_db_session
+from modules.jobs.models import JobQueue
+
+logger = logging.getLogger(__name__)
+
+
+def process_ical_feed_refresh_job(job: JobQueue) -> None:
+    """
+    Refresh one connection's iCal feed cache.
+
+    This function is designed to be invoked by a worker process.
+    """
+    with firm_db_session(job.firm_id):
+        payload = job.payload or {}
+        connection_id = payload.get("connection_id")
+        if not connection_id:
+            job.mark_failed("non_retryable", "Missing connection_id in payload", should_retry=False)
+            return
+
+        connection = (
+            OAuthConnection.objects.filter(firm_id=job.firm_id, pk=connection_id)
+            .select_related("ical_feed_cache")
+            .first()
+        )
+        if connection is None or not connection.ical_feed_url:
+            job.mark_completed(result={"skipped": True})
+            return
+
+        try:
+            cache = ICalFeedCacheService().refresh(connection)
+        except Exception as e:
+            logger.warning(f"iCal feed refresh failed for connection {connection_id}: {e}")
+            job.mark_failed("transient", "iCal feed refresh failed")
+            return
+
+        job.mark_completed(
+            result={
+                "events": len(cache.events),
+                "recurring_events": len(cache.recurring_events),
+                "error": bool(cache.last_error),
+            }
+        )
@@ -0,0 +1,70 @@
+"""
+Django management command to refresh cached iCal feeds.
+
+Runs conditional (ETag/Last-Modified) refreshes for every active iCal/Apple
+connection whose cache is older than ICAL_FEED_CACHE_TTL_SECONDS, so booking
+pages rarely find a stale feed. Intended to run from cron every few minutes.
+
+Usage:
+    python manage.py refresh_ical_feeds
+    python manage.py refresh_ical_feeds --all
+    python manage.py refresh_ical_feeds --firm-id 123
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from modules.calendar.ical_cache import ICalFeedCacheService
+from modules.calendar.oauth_models import OAuthConnection
+
+
+class Command(BaseCommand):
+    help = "Refresh stale iCal feed caches used for availability lookups"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Refresh every feed, not only stale ones",
+        )
+        parser.add_argument(
+            "--firm-id",
+            type=int,
+            help="Only refresh feeds for this firm",
+        )
+
+    def handle(self, *args, **options):
+        service = ICalFeedCacheService()
+        connections = (
+            OAuthConnection.objects.filter(provider__in=["ical", "apple"], status="active", sync_enabled=True)
+            .exclude(ical_feed_url="")
+            .select_related("ical_feed_cache")
+        )
+        if options.get("firm_id"):
+            connections = connections.filter(firm_id=options["firm_id"])
+        if not options["all"]:
+            stale_before = timezone.now() - timedelta(seconds=service.ttl_seconds())
+            connections = connections.filter(
+                Q(ical_feed_cache__isnull=True)
+                | Q(ical_feed_cache__fetched_at__isnull=True)
+                | Q(ical_feed_cache__fetched_at__lt=stale_before)
+            )
+
+        refreshed = 0
+        failed = 0
+        for connection in connections.iterator():
+            try:
+                cache = service.refresh(connection)
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"Connection {connection.pk}: {e}"))
+                continue
+            if cache.last_error:
+                failed += 1
+            else:
+                refreshed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {refreshed} iCal feeds ({failed} failed)"))
@@ -0,0 +1,38 @@
+# Generated manually for the iCal feed cache
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firm', '0016_firmoffboardingrecord_export_archive_path'),
+        ('calendar', '0017_add_group_event_models'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ICalFeedCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feed_url_hash', models.CharField(help_text='SHA-256 of the feed URL the cache was built from', max_length=64)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.CharField(blank=True, max_length=64)),
+                ('content_hash', models.CharField(blank=True, help_text='SHA-256 of the last downloaded payload', max_length=64)),
+                ('events', models.JSONField(blank=True, default=list, help_text='Sorted [start, end, flags] rows for non-recurring busy events')),
+                ('recurring_events', models.JSONField(blank=True, default=list, help_text='Recurring masters: start, duration, flags, rrule, tzid, exdates')),
+                ('max_duration_seconds', models.IntegerField(default=0, help_text='Longest non-recurring event (bounds interval lookups)')),
+                ('fetched_at', models.DateTimeField(blank=True, help_text='Last successful fetch (200 or 304)', null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('connection', models.OneToOneField(help_text='Connection whose feed is cached', on_delete=django.db.models.deletion.CASCADE, related_name='ical_feed_cache', to='calendar.oauthconnection')),
+                ('firm', models.ForeignKey(help_text='Firm this cache belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='ical_feed_caches', to='firm.firm')),
+            ],
+            options={
+                'db_table': 'calendar_ical_feed_caches',
+                'indexes': [models.Index(fields=['fetched_at'], name='calendar_ica_fet_idx')],
+            },
+        ),
+    ]
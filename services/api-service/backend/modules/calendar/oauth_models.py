@@ -307,3 +307,79 @@ class OAuthAuthorizationCode(models.Model):
             # Default: 10 minutes
             self.expires_at = timezone.now() + timezone.timedelta(minutes=10)
         super().save(*args, **kwargs)
+
+
+class ICalFeedCache(models.Model):
+    """
+    Parsed iCal/vCal feed for a connection, kept for availability lookups.
+
+    Busy events are stored as compact ``[start, end, flags]`` rows (epoch seconds,
+    sorted by start) plus unexpanded recurring masters, so conflict checks are
+    interval lookups rather than downloads and parses. Refreshes use the stored
+    ETag/Last-Modified validators for conditional requests.
+    """
+
+    connection = models.OneToOneField(
+        OAuthConnection,
+        on_delete=models.CASCADE,
+        related_name='ical_feed_cache',
+        help_text='Connection whose feed is cached'
+    )
+    firm = models.ForeignKey(
+        Firm,
+        on_delete=models.CASCADE,
+        related_name='ical_feed_caches',
+        help_text='Firm this cache belongs to'
+    )
+
+    # Conditional fetch validators
+    feed_url_hash = models.CharField(
+        max_length=64,
+        help_text='SHA-256 of the feed URL the cache was built from'
+    )
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text='SHA-256 of the last downloaded payload'
+    )
+
+    # Compiled events
+    events = models.JSONField(
+        default=list,
+        blank=True,
+        help_text='Sorted [start, end, flags] rows for non-recurring busy events'
+    )
+    recurring_events = models.JSONField(
+        default=list,
+        blank=True,
+        help_text='Recurring masters: start, duration, flags, rrule, tzid, exdates'
+    )
+    max_duration_seconds = models.IntegerField(
+        default=0,
+        help_text='Longest non-recurring event (bounds interval lookups)'
+    )
+
+    # Refresh tracking
+    fetched_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Last successful fetch (200 or 304)'
+    )
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = models.Manager()
+    firm_scoped = FirmScopedManager()
+
+    class Meta:
+        db_table = 'calendar_ical_feed_caches'
+        indexes = [
+            models.Index(fields=['fetched_at'], name='calendar_ica_fet_idx'),
+        ]
+
+    def __str__(self):
+        return f"iCal cache for connection {self.connection_id}"
@@ -0,0 +1,48 @@
+"""
+Calendar queue integration.
+
+Queues background iCal feed refreshes so availability reads never wait on a
+download while the cached feed is still within its stale window.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+
+from modules.calendar.oauth_models import OAuthConnection
+from modules.jobs.models import JobQueue
+
+ICAL_FEED_REFRESH_JOB_TYPE = "calendar_ical_feed_refresh"
+
+
+def queue_ical_feed_refresh(connection: OAuthConnection) -> JobQueue:
+    """
+    Queue a conditional refresh of a connection's iCal feed cache.
+
+    At most one job is queued per connection per TTL period: the idempotency
+    key includes the TTL bucket, so concurrent stale reads share one job.
+    """
+    from modules.calendar.ical_cache import ICalFeedCacheService
+
+    bucket = int(time.time() // max(ICalFeedCacheService.ttl_seconds(), 1))
+    idempotency_key = f"ical_feed_refresh_{connection.pk}_{bucket}"
+    correlation_id = uuid.uuid4()
+    job, _ = JobQueue.objects.get_or_create(
+        firm_id=connection.firm_id,
+        idempotency_key=idempotency_key,
+        defaults={
+            "category": "sync",
+            "job_type": ICAL_FEED_REFRESH_JOB_TYPE,
+            "payload_version": "1.0",
+            "payload": {
+                "tenant_id": connection.firm_id,
+                "correlation_id": str(correlation_id),
+                "idempotency_key": idempotency_key,
+                "connection_id": connection.pk,
+            },
+            "correlation_id": correlation_id,
+            "priority": 3,
+        },
+    )
+    return job
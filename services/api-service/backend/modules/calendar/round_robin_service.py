@@ -2,10 +2,12 @@
 
 import logging
 from datetime import datetime, timedelta
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+
+from django.db.models import Count
 
 from .availability_service import AvailabilityService
-from .models import Appointment, AppointmentType, AvailabilityProfile
+from .models import Appointment, AppointmentType
 
 logger = logging.getLogger(__name__)
 
@@ -19,8 +21,35 @@ class RoundRobinService:
     - Optimize for availability (favor most available)
     - Weighted distribution (configurable weights)
     - Prioritize by capacity (route to least-booked)
+
+    Per-staff data (profiles, busy time, appointment counts) is loaded for the
+    whole pool with one grouped query per source rather than one query per member.
     """
 
+    def _appointment_counts(
+        self,
+        appointment_type: AppointmentType,
+        staff_list: List[any],
+        statuses: List[str],
+        **filters,
+    ) -> Dict[int, int]:
+        """Count appointments of this type per staff member with a single grouped aggregate."""
+        counts = {staff.id: 0 for staff in staff_list}
+        rows = (
+            Appointment.objects.filter(
+                appointment_type=appointment_type,
+                staff_user__in=staff_list,
+                status__in=statuses,
+                **filters,
+            )
+            .values("staff_user_id")
+            .annotate(count=Count("appointment_id"))
+            .order_by()
+        )
+        for row in rows:
+            counts[row["staff_user_id"]] = row["count"]
+        return counts
+
     def select_round_robin_staff(
         self,
         appointment_type: AppointmentType,
@@ -113,25 +142,21 @@ class RoundRobinService:
         appointment_type: AppointmentType,
     ) -> List[any]:
         """Filter staff to only those available at the requested time."""
-        available = []
         availability_service = AvailabilityService()
+        profiles = availability_service.staff_profiles(appointment_type, staff_list)
+        busy = availability_service.load_team_busy_intervals(
+            [staff for staff in staff_list if staff.id in profiles], start_time, end_time
+        )
 
+        available = []
         for staff in staff_list:
-            # Get availability profile
-            try:
-                profile = AvailabilityProfile.objects.get(
-                    firm=appointment_type.firm,
-                    owner_type="staff",
-                    owner_staff_user=staff,
-                )
-            except AvailabilityProfile.DoesNotExist:
+            if staff.id not in profiles:
                 logger.debug(f"No availability profile for {staff.username}, skipping")
                 continue
 
             # Check for conflicts
-            if not availability_service._has_conflict(
-                staff, start_time, end_time, appointment_type, profile
-            ):
+            staff_busy = busy.get(staff.id)
+            if staff_busy is None or not staff_busy.overlaps(start_time, end_time):
                 available.append(staff)
 
         return available
@@ -151,17 +176,18 @@ class RoundRobinService:
         day_start = start_time.replace(hour=0, minute=0, second=0, microsecond=0)
         day_end = day_start + timedelta(days=1)
 
+        # Count appointments for each staff member on this day
+        counts = self._appointment_counts(
+            appointment_type,
+            staff_list,
+            ["requested", "confirmed"],
+            start_time__gte=day_start,
+            start_time__lt=day_end,
+        )
+
         available = []
         for staff in staff_list:
-            # Count appointments for this staff on this day
-            count = Appointment.objects.filter(
-                appointment_type=appointment_type,
-                staff_user=staff,
-                start_time__gte=day_start,
-                start_time__lt=day_end,
-                status__in=["requested", "confirmed"],
-            ).count()
-
+            count = counts[staff.id]
             if count < capacity_limit:
                 available.append(staff)
             else:
@@ -183,14 +209,8 @@ class RoundRobinService:
         Selects the staff member with the fewest total appointments for this type.
         """
         # Count appointments for each staff member
-        staff_counts = []
-        for staff in staff_list:
-            count = Appointment.objects.filter(
-                appointment_type=appointment_type,
-                staff_user=staff,
-                status__in=["requested", "confirmed"],
-            ).count()
-            staff_counts.append((staff, count))
+        counts = self._appointment_counts(appointment_type, staff_list, ["requested", "confirmed"])
+        staff_counts = [(staff, counts[staff.id]) for staff in staff_list]
 
         # Sort by count (ascending) to find least-assigned
         staff_counts.sort(key=lambda x: x[1])
@@ -211,30 +231,20 @@ class RoundRobinService:
         Calculates available slots for each staff member and selects the one with most availability.
         """
         availability_service = AvailabilityService()
-        staff_availability = []
 
         # Look ahead 7 days to assess availability
         search_end = start_time.date() + timedelta(days=7)
 
-        for staff in staff_list:
-            try:
-                profile = AvailabilityProfile.objects.get(
-                    firm=appointment_type.firm,
-                    owner_type="staff",
-                    owner_staff_user=staff,
-                )
-
-                slots = availability_service.compute_available_slots(
-                    profile=profile,
-                    appointment_type=appointment_type,
-                    start_date=start_time.date(),
-                    end_date=search_end,
-                    staff_user=staff,
-                )
-
-                staff_availability.append((staff, len(slots)))
-            except AvailabilityProfile.DoesNotExist:
-                staff_availability.append((staff, 0))
+        profiles = availability_service.staff_profiles(appointment_type, staff_list)
+        team = availability_service.team_availability(
+            appointment_type,
+            {staff.id: (staff, profiles[staff.id]) for staff in staff_list if staff.id in profiles},
+            start_time.date(),
+            search_end,
+        )
+        staff_availability = [
+            (staff, team.slot_count(staff.id) if team is not None else 0) for staff in staff_list
+        ]
 
         # Sort by availability (descending) to find most available
         staff_availability.sort(key=lambda x: x[1], reverse=True)
@@ -255,15 +265,11 @@ class RoundRobinService:
         weights = appointment_type.round_robin_weights or {}
 
         # Count appointments and calculate weighted ratios
+        counts = self._appointment_counts(appointment_type, staff_list, ["requested", "confirmed"])
         staff_ratios = []
         for staff in staff_list:
             weight = weights.get(str(staff.id), 1.0)  # Default weight 1.0
-
-            count = Appointment.objects.filter(
-                appointment_type=appointment_type,
-                staff_user=staff,
-                status__in=["requested", "confirmed"],
-            ).count()
+            count = counts[staff.id]
 
             # Ratio = actual count / expected count (based on weight)
             # Lower ratio = under-assigned relative to weight
@@ -289,15 +295,13 @@ class RoundRobinService:
         """
         lookback_start = start_time - timedelta(days=30)
 
-        staff_recent_counts = []
-        for staff in staff_list:
-            count = Appointment.objects.filter(
-                appointment_type=appointment_type,
-                staff_user=staff,
-                start_time__gte=lookback_start,
-                status__in=["requested", "confirmed", "completed"],
-            ).count()
-            staff_recent_counts.append((staff, count))
+        counts = self._appointment_counts(
+            appointment_type,
+            staff_list,
+            ["requested", "confirmed", "completed"],
+            start_time__gte=lookback_start,
+        )
+        staff_recent_counts = [(staff, counts[staff.id]) for staff in staff_list]
 
         # Sort by recent count (ascending) to find least busy
         staff_recent_counts.sort(key=lambda x: x[1])
@@ -318,14 +322,7 @@ class RoundRobinService:
         threshold = float(appointment_type.round_robin_rebalancing_threshold or 0.20)
 
         # Count appointments for each pool member
-        counts = []
-        for staff in pool:
-            count = Appointment.objects.filter(
-                appointment_type=appointment_type,
-                staff_user=staff,
-                status__in=["requested", "confirmed"],
-            ).count()
-            counts.append(count)
+        counts = list(self._appointment_counts(appointment_type, pool, ["requested", "confirmed"]).values())
 
         if not counts:
             return False
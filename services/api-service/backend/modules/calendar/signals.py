@@ -3,14 +3,16 @@ Calendar Signals.
 
 Handles workflow triggering when appointments change state.
 Implements automatic workflow execution per MISSINGFEATURES.md requirements.
+Also invalidates the materialized availability cache (see availability_cache).
 """
 
 import logging
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.db import transaction
 
-from .models import Appointment, AppointmentStatusHistory
+from . import availability_cache
+from .models import Appointment, AppointmentStatusHistory, AppointmentType, AvailabilityProfile
 from .workflow_services import WorkflowExecutionEngine
 
 logger = logging.getLogger(__name__)
@@ -90,6 +92,7 @@ def track_appointment_status_change(sender, instance, **kwargs):
     if instance.pk:  # Only for existing appointments
         try:
             old_instance = Appointment.objects.get(pk=instance.pk)
+            instance._old_schedule = (old_instance.staff_user_id, old_instance.start_time, old_instance.end_time)
             if old_instance.status != instance.status:
                 # Status changed - create history record after save
                 instance._status_changed = True
@@ -120,3 +123,36 @@ def create_status_history(sender, instance, created, **kwargs):
         delattr(instance, '_old_status')
         if hasattr(instance, '_status_change_actor'):
             delattr(instance, '_status_change_actor')
+
+
+def _on_commit_too(invalidate, *args):
+    """Invalidate now and again after commit, so a read racing the transaction cannot re-cache old data."""
+    invalidate(*args)
+    transaction.on_commit(lambda: invalidate(*args))
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_appointment_availability(sender, instance, **kwargs):
+    """Drop cached availability for the staff days an appointment occupied or now occupies."""
+    schedules = {(instance.staff_user_id, instance.start_time, instance.end_time)}
+    old_schedule = getattr(instance, '_old_schedule', None)
+    if old_schedule:
+        schedules.add(old_schedule)
+        delattr(instance, '_old_schedule')
+    for staff_id, start_time, end_time in schedules:
+        _on_commit_too(availability_cache.invalidate_staff_days, staff_id, start_time, end_time)
+
+
+@receiver(post_save, sender=AvailabilityProfile)
+@receiver(post_delete, sender=AvailabilityProfile)
+def invalidate_profile_availability(sender, instance, **kwargs):
+    """Drop cached availability computed from a changed profile."""
+    _on_commit_too(availability_cache.invalidate_profile, instance.pk)
+
+
+@receiver(post_save, sender=AppointmentType)
+@receiver(post_delete, sender=AppointmentType)
+def invalidate_appointment_type_availability(sender, instance, **kwargs):
+    """Drop cached availability for a changed appointment type."""
+    _on_commit_too(availability_cache.invalidate_appointment_type, instance.pk)
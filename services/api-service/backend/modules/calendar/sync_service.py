@@ -12,6 +12,7 @@ from typing import Dict, List, Optional
 from django.db import transaction
 from django.utils import timezone
 
+from . import availability_cache
 from .models import Appointment
 from .oauth_models import OAuthConnection
 from .google_service import GoogleCalendarService
@@ -100,6 +101,7 @@ class CalendarSyncService:
             # Update connection sync timestamp
             connection.last_sync_at = timezone.now()
             connection.save(update_fields=['last_sync_at'])
+            availability_cache.invalidate_staff(connection.user_id)
 
             return {
                 'success': len(errors) == 0,
@@ -0,0 +1,105 @@
+"""
+Team availability bitmaps.
+
+Each host's bookable slot starts over a window are held as one minute-resolution
+bitmap (a Python int): bit ``i`` is set when a slot starting ``i`` minutes after
+the window origin is offered by the host's profile and does not overlap any of
+the host's busy time. Collective availability is then a bitwise AND across
+required hosts, pool-wide availability a bitwise OR, and per-host slot counts a
+popcount, with no per-slot Python set operations.
+
+Busy time is subtracted by dilating the busy-minute bitmap by the appointment
+duration: a start ``i`` is blocked when any busy bit lies in ``[i, i + duration)``.
+The dilation uses O(log duration) shift/OR steps.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+from .busy_intervals import BusyIntervalSet
+
+Interval = Tuple[datetime, datetime]
+
+
+def _ceil_minutes(delta: timedelta) -> int:
+    return -((-int(delta.total_seconds())) // 60)
+
+
+class TeamAvailability:
+    """Minute-resolution free-slot bitmaps for a set of hosts over one window."""
+
+    def __init__(self, origin: datetime, duration_minutes: int):
+        self.origin = origin.replace(second=0, microsecond=0)
+        self.duration_minutes = duration_minutes
+        self._bitmaps: Dict[Hashable, int] = {}
+
+    def _offset(self, moment: datetime) -> int:
+        return int((moment - self.origin).total_seconds() // 60)
+
+    def _busy_bits(self, busy: BusyIntervalSet) -> int:
+        bits = 0
+        for start, end in busy:
+            first = max(self._offset(start), 0)
+            last = _ceil_minutes(end - self.origin)
+            if last > first:
+                bits |= ((1 << (last - first)) - 1) << first
+        return bits
+
+    def _blocked_starts(self, busy_bits: int) -> int:
+        """Dilate busy minutes so bit i is set when [i, i + duration) touches a busy minute."""
+        blocked = busy_bits
+        span = 1
+        while span < self.duration_minutes:
+            shift = min(span, self.duration_minutes - span)
+            blocked |= blocked >> shift
+            span += shift
+        return blocked
+
+    def add_host(self, host_id: Hashable, candidates: Iterable[Interval], busy: BusyIntervalSet) -> int:
+        """Record a host's free slot starts: candidate starts minus busy-overlapping starts."""
+        starts = 0
+        for start, _ in candidates:
+            offset = self._offset(start)
+            if offset >= 0:
+                starts |= 1 << offset
+        if busy:
+            starts &= ~self._blocked_starts(self._busy_bits(busy))
+        self._bitmaps[host_id] = starts
+        return starts
+
+    def bitmap(self, host_id: Hashable) -> int:
+        return self._bitmaps.get(host_id, 0)
+
+    def intersect(self, host_ids: Iterable[Hashable]) -> int:
+        """Slot starts free for every host (0 if any host is missing)."""
+        result = None
+        for host_id in host_ids:
+            result = self.bitmap(host_id) if result is None else result & self.bitmap(host_id)
+            if not result:
+                return 0
+        return result or 0
+
+    def union(self, host_ids: Iterable[Hashable]) -> int:
+        """Slot starts free for at least one host."""
+        result = 0
+        for host_id in host_ids:
+            result |= self.bitmap(host_id)
+        return result
+
+    def slot_count(self, host_id: Hashable) -> int:
+        return bin(self.bitmap(host_id)).count("1")
+
+    def is_free(self, host_id: Hashable, start: datetime) -> bool:
+        offset = self._offset(start)
+        return offset >= 0 and bool(self.bitmap(host_id) >> offset & 1)
+
+    def slots(self, bits: int) -> List[Interval]:
+        """Decode a bitmap into sorted (start, end) slots."""
+        duration = timedelta(minutes=self.duration_minutes)
+        slots = []
+        while bits:
+            lowest = bits & -bits
+            start = self.origin + timedelta(minutes=lowest.bit_length() - 1)
+            slots.append((start, start + duration))
+            bits ^= lowest
+        return slots
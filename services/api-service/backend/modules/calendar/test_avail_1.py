@@ -233,8 +233,8 @@ class MultipleCalendarSupportTest(TestCase):
 
         self.assertFalse(conn.treat_tentative_as_busy)
 
-    @patch('modules.calendar.availability_service.ICalService.check_availability')
-    def test_external_calendar_conflict_checking(self, mock_check_availability):
+    @patch('modules.calendar.availability_service.ICalFeedCacheService.busy_intervals')
+    def test_external_calendar_conflict_checking(self, mock_busy_intervals):
         """Test that external calendars are checked for conflicts."""
         # Create an iCal connection
         OAuthConnection.objects.create(
@@ -248,14 +248,14 @@ class MultipleCalendarSupportTest(TestCase):
             treat_tentative_as_busy=True,
         )
 
-        # Mock the iCal service to return unavailable (conflict)
-        mock_check_availability.return_value = False
-
         # Try to get available slots
         service = AvailabilityService()
         start_time = timezone.now() + timedelta(hours=1)
         end_time = start_time + timedelta(minutes=30)
 
+        # Mock the cached feed to report a busy block (conflict)
+        mock_busy_intervals.return_value = [(start_time, end_time)]
+
         # Check for conflict
         has_conflict = service._has_conflict(
             staff_user=self.staff_user,
@@ -266,10 +266,10 @@ class MultipleCalendarSupportTest(TestCase):
 
         # Verify that external calendar was checked
         self.assertTrue(has_conflict)
-        mock_check_availability.assert_called_once()
+        mock_busy_intervals.assert_called_once()
 
-    @patch('modules.calendar.availability_service.ICalService.check_availability')
-    def test_disabled_connections_not_checked(self, mock_check_availability):
+    @patch('modules.calendar.availability_service.ICalFeedCacheService.busy_intervals')
+    def test_disabled_connections_not_checked(self, mock_busy_intervals):
         """Test that disabled connections are not checked for conflicts."""
         # Create a disabled connection
         OAuthConnection.objects.create(
@@ -295,10 +295,10 @@ class MultipleCalendarSupportTest(TestCase):
 
         # Verify that external calendar was NOT checked
         self.assertFalse(has_conflict)
-        mock_check_availability.assert_not_called()
+        mock_busy_intervals.assert_not_called()
 
-    @patch('modules.calendar.availability_service.ICalService.check_availability')
-    def test_multiple_calendars_checked(self, mock_check_availability):
+    @patch('modules.calendar.availability_service.ICalFeedCacheService.busy_intervals')
+    def test_multiple_calendars_checked(self, mock_busy_intervals):
         """Test that all active calendars are checked for conflicts."""
         # Create multiple connections
         OAuthConnection.objects.create(
@@ -319,14 +319,14 @@ class MultipleCalendarSupportTest(TestCase):
             ical_feed_url='https://icloud.com/calendar.ics',
         )
 
-        # Mock the first calendar as available, second as unavailable
-        mock_check_availability.side_effect = [True, False]
-
         # Try to check for conflicts
         service = AvailabilityService()
         start_time = timezone.now() + timedelta(hours=1)
         end_time = start_time + timedelta(minutes=30)
 
+        # Mock the first calendar as available, second as unavailable
+        mock_busy_intervals.side_effect = [[], [(start_time, end_time)]]
+
         has_conflict = service._has_conflict(
             staff_user=self.staff_user,
             start_time=start_time,
@@ -337,4 +337,4 @@ class MultipleCalendarSupportTest(TestCase):
         # Should detect conflict from the second calendar
         self.assertTrue(has_conflict)
         # Should have checked both calendars
-        self.assertEqual(mock_check_availability.call_count, 2)
+        self.assertEqual(mock_busy_intervals.call_count, 2)
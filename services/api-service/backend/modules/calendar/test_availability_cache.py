@@ -0,0 +1,137 @@
+"""
+Tests for the materialized availability cache.
+"""
+
+from datetime import datetime, timedelta
+
+import pytz
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from modules.calendar import availability_cache
+from modules.calendar.models import Appointment, AppointmentType, AvailabilityProfile
+from modules.calendar.services import AvailabilityService
+from modules.firm.models import Firm
+
+User = get_user_model()
+
+
+@override_settings(CALENDAR_ENABLE_SIGNALS=True, AVAILABILITY_CACHE_ENABLED=True, AVAILABILITY_CACHE_DAYS=30)
+class AvailabilityCacheTest(TestCase):
+    """Test cached reads and targeted invalidation."""
+
+    def setUp(self):
+        cache.clear()
+        self.firm = Firm.objects.create(name="Test Firm", slug="test-firm")
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.staff_user = User.objects.create_user(username="staff", password="testpass")
+        self.appointment_type = AppointmentType.objects.create(
+            firm=self.firm,
+            name="30-min Consultation",
+            duration_minutes=30,
+            location_mode="video",
+            routing_policy="fixed_staff",
+            fixed_staff_user=self.staff_user,
+            created_by=self.user,
+        )
+        self.profile = AvailabilityProfile.objects.create(
+            firm=self.firm,
+            name="Staff Availability",
+            owner_type="staff",
+            owner_staff_user=self.staff_user,
+            timezone="UTC",
+            weekly_hours={
+                day: [{"start": "09:00", "end": "17:00"}]
+                for day in ("monday", "tuesday", "wednesday", "thursday", "friday")
+            },
+            exceptions=[],
+            min_notice_minutes=0,
+            max_future_days=60,
+            slot_rounding_minutes=30,
+            created_by=self.user,
+        )
+        self.service = AvailabilityService()
+        self.start_date = timezone.now().date() + timedelta(days=1)
+        self.end_date = self.start_date + timedelta(days=13)
+
+    def _cached(self):
+        return self.service.cached_available_slots(
+            self.profile, self.appointment_type, self.start_date, self.end_date, self.staff_user
+        )
+
+    def test_cached_read_matches_computation_and_skips_queries(self):
+        expected = self.service.compute_available_slots(
+            self.profile, self.appointment_type, self.start_date, self.end_date, self.staff_user
+        )
+
+        self.assertEqual(self._cached(), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._cached(), expected)
+
+    def test_booking_invalidates_affected_days(self):
+        slots = self._cached()
+        booked_start, booked_end = slots[0]
+        Appointment.objects.create(
+            firm=self.firm,
+            appointment_type=self.appointment_type,
+            staff_user=self.staff_user,
+            start_time=booked_start,
+            end_time=booked_end,
+            status="confirmed",
+            booked_by=self.user,
+        )
+
+        # The appointment signal orphans only the booked day's entry
+        with self.assertNumQueries(2):
+            refreshed = self._cached()
+
+        self.assertNotIn((booked_start, booked_end), refreshed)
+        self.assertEqual(len(refreshed), len(slots) - 1)
+
+    def test_profile_invalidation_picks_up_new_hours(self):
+        self._cached()
+        self.profile.weekly_hours = {
+            day: [{"start": "09:00", "end": "10:00"}]
+            for day in ("monday", "tuesday", "wednesday", "thursday", "friday")
+        }
+        self.profile.save()
+        availability_cache.invalidate_profile(self.profile.pk)
+
+        self.assertTrue(all(start.hour == 9 for start, _ in self._cached()))
+
+    def test_booking_window_applies_on_read(self):
+        self._cached()
+        self.profile.max_future_days = 0
+
+        self.assertEqual(self._cached(), [])
+
+
+class AvailabilityCacheDisabledTest(TestCase):
+    """Without calendar signals nothing would invalidate entries, so reads are computed."""
+
+    @override_settings(CALENDAR_ENABLE_SIGNALS=False)
+    def test_disabled_by_default(self):
+        with self.settings():
+            del settings.AVAILABILITY_CACHE_ENABLED
+            self.assertFalse(availability_cache.is_enabled())
+
+    @override_settings(CALENDAR_ENABLE_SIGNALS=False)
+    def test_disabled_without_signals(self):
+        self.assertFalse(availability_cache.is_enabled())
+        with override_settings(CALENDAR_ENABLE_SIGNALS=True, AVAILABILITY_CACHE_ENABLED=True):
+            self.assertTrue(availability_cache.is_enabled())
+
+    def test_invalidate_staff_days_covers_timezone_offsets(self):
+        start = pytz.UTC.localize(datetime(2030, 1, 7, 23, 30))
+        keys = [
+            availability_cache._staff_day_version_key(7, day)
+            for day in (start.date() - timedelta(days=1), start.date(), start.date() + timedelta(days=1))
+        ]
+        cache.set_many({key: "v" for key in keys})
+
+        availability_cache.invalidate_staff_days(7, start, start + timedelta(minutes=30))
+
+        self.assertEqual(cache.get_many(keys), {})
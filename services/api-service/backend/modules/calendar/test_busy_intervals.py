@@ -0,0 +1,116 @@
+"""
+Tests for the busy-interval engine used by availability computation.
+"""
+
+from datetime import datetime, timedelta
+
+import pytz
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from modules.calendar.busy_intervals import BusyIntervalSet
+from modules.calendar.models import Appointment, AppointmentType, AvailabilityProfile
+from modules.calendar.services import AvailabilityService
+from modules.firm.models import Firm
+
+User = get_user_model()
+
+
+def _at(hour, minute=0):
+    return datetime(2030, 1, 7, hour, minute, tzinfo=pytz.UTC)
+
+
+class BusyIntervalSetTest(SimpleTestCase):
+    """Test interval merging and slot sweeps."""
+
+    def test_overlapping_and_touching_intervals_are_merged(self):
+        busy = BusyIntervalSet(
+            [(_at(11), _at(12)), (_at(9), _at(10)), (_at(9, 30), _at(10, 30)), (_at(12), _at(13))]
+        )
+
+        self.assertEqual(list(busy), [(_at(9), _at(10, 30)), (_at(11), _at(13))])
+
+    def test_overlaps_uses_half_open_intervals(self):
+        busy = BusyIntervalSet([(_at(10), _at(11))])
+
+        self.assertTrue(busy.overlaps(_at(10, 30), _at(11, 30)))
+        self.assertTrue(busy.overlaps(_at(9, 30), _at(10, 30)))
+        self.assertFalse(busy.overlaps(_at(11), _at(11, 30)))
+        self.assertFalse(busy.overlaps(_at(9, 30), _at(10)))
+
+    def test_free_slots_matches_per_slot_checks_and_keeps_order(self):
+        busy = BusyIntervalSet([(_at(10), _at(11)), (_at(13, 15), _at(13, 45))])
+        slots = [
+            (_at(hour, minute), _at(hour, minute) + timedelta(minutes=30))
+            for hour in range(9, 15)
+            for minute in (0, 30)
+        ]
+        slots.reverse()
+
+        expected = [slot for slot in slots if not busy.overlaps(*slot)]
+
+        self.assertEqual(busy.free_slots(slots), expected)
+        self.assertNotIn((_at(10), _at(10, 30)), expected)
+        self.assertIn((_at(11), _at(11, 30)), expected)
+
+
+class ComputeAvailableSlotsBusyTest(TestCase):
+    """Test that slot computation resolves conflicts with window-level queries."""
+
+    def setUp(self):
+        self.firm = Firm.objects.create(name="Test Firm", slug="test-firm")
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.staff_user = User.objects.create_user(username="staff", password="testpass")
+        self.appointment_type = AppointmentType.objects.create(
+            firm=self.firm,
+            name="30-min Consultation",
+            duration_minutes=30,
+            location_mode="video",
+            routing_policy="fixed_staff",
+            fixed_staff_user=self.staff_user,
+            created_by=self.user,
+        )
+        self.profile = AvailabilityProfile.objects.create(
+            firm=self.firm,
+            name="Staff Availability",
+            owner_type="staff",
+            owner_staff_user=self.staff_user,
+            timezone="UTC",
+            weekly_hours={
+                day: [{"start": "09:00", "end": "17:00"}]
+                for day in ("monday", "tuesday", "wednesday", "thursday", "friday")
+            },
+            exceptions=[],
+            min_notice_minutes=0,
+            max_future_days=60,
+            slot_rounding_minutes=15,
+            created_by=self.user,
+        )
+
+    def test_query_count_is_independent_of_window_length(self):
+        start_date = timezone.now().date() + timedelta(days=1)
+        booked_start = pytz.UTC.localize(datetime.combine(start_date, datetime.min.time()).replace(hour=10))
+        Appointment.objects.create(
+            firm=self.firm,
+            appointment_type=self.appointment_type,
+            staff_user=self.staff_user,
+            start_time=booked_start,
+            end_time=booked_start + timedelta(minutes=30),
+            status="confirmed",
+            booked_by=self.user,
+        )
+
+        service = AvailabilityService()
+        with self.assertNumQueries(2):
+            slots = service.compute_available_slots(
+                profile=self.profile,
+                appointment_type=self.appointment_type,
+                start_date=start_date,
+                end_date=start_date + timedelta(days=30),
+                staff_user=self.staff_user,
+            )
+
+        self.assertTrue(slots)
+        for start, end in slots:
+            self.assertFalse(start < booked_start + timedelta(minutes=30) and end > booked_start)
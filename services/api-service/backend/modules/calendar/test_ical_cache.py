@@ -0,0 +1,162 @@
+"""
+Tests for the iCal feed cache (compiled intervals, recurrence expansion, conditional refresh).
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytz
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from modules.calendar.ical_cache import CompiledFeed, ICalFeedCacheService, compile_events
+from modules.calendar.ical_service import FeedResponse
+from modules.calendar.oauth_models import OAuthConnection
+from modules.firm.models import Firm
+
+User = get_user_model()
+
+NY = pytz.timezone("America/New_York")
+
+
+def _event(start, end, **extra):
+    event = {
+        "id": extra.pop("id", "evt"),
+        "start": start,
+        "end": end,
+        "status": "CONFIRMED",
+        "is_busy": True,
+        "is_all_day": False,
+        "recurrence_rule": None,
+        "recurrence_id": None,
+        "exdates": [],
+        "tzid": "UTC",
+    }
+    event.update(extra)
+    return event
+
+
+def _feed(events):
+    compiled = compile_events(events)
+    return CompiledFeed(compiled["events"], compiled["recurring_events"], compiled["max_duration_seconds"])
+
+
+class CompiledFeedTest(SimpleTestCase):
+    """Test compiled interval lookups."""
+
+    def test_window_lookup_respects_busy_preferences(self):
+        day = datetime(2030, 3, 4, tzinfo=pytz.UTC)
+        feed = _feed(
+            [
+                _event(day.replace(hour=9), day.replace(hour=10), id="a"),
+                _event(day, day + timedelta(days=1), id="b", is_all_day=True),
+                _event(day.replace(hour=13), day.replace(hour=14), id="c", status="TENTATIVE"),
+                _event(day.replace(hour=15), day.replace(hour=16), id="d", is_busy=False),
+                _event(day.replace(hour=17), day.replace(hour=18), id="e", status="CANCELLED"),
+            ]
+        )
+
+        self.assertEqual(
+            feed.busy_intervals(day.replace(hour=8), day.replace(hour=20)),
+            [(day.replace(hour=9), day.replace(hour=10)), (day.replace(hour=13), day.replace(hour=14))],
+        )
+        self.assertEqual(
+            len(feed.busy_intervals(day, day + timedelta(days=1), treat_all_day_as_busy=True)),
+            3,
+        )
+        self.assertEqual(
+            feed.busy_intervals(day.replace(hour=10), day.replace(hour=13), treat_tentative_as_busy=False),
+            [],
+        )
+
+    def test_weekly_recurrence_expands_in_event_timezone(self):
+        # Monday 09:00-09:30 New York, across the March 2030 DST change (March 10)
+        first = NY.localize(datetime(2030, 3, 4, 9, 0))
+        skipped = NY.localize(datetime(2030, 3, 18, 9, 0))
+        feed = _feed(
+            [
+                _event(
+                    first,
+                    first + timedelta(minutes=30),
+                    recurrence_rule="FREQ=WEEKLY;BYDAY=MO",
+                    tzid="America/New_York",
+                    exdates=[skipped],
+                )
+            ]
+        )
+
+        intervals = feed.busy_intervals(
+            pytz.UTC.localize(datetime(2030, 3, 1)), pytz.UTC.localize(datetime(2030, 3, 26))
+        )
+
+        starts = [start.astimezone(NY).replace(tzinfo=None) for start, _ in intervals]
+        self.assertEqual(
+            starts,
+            [datetime(2030, 3, 4, 9, 0), datetime(2030, 3, 11, 9, 0), datetime(2030, 3, 25, 9, 0)],
+        )
+        self.assertTrue(all(end - start == timedelta(minutes=30) for start, end in intervals))
+
+    def test_recurrence_override_replaces_occurrence(self):
+        first = pytz.UTC.localize(datetime(2030, 1, 7, 9, 0))
+        moved_from = first + timedelta(days=1)
+        moved_to = moved_from.replace(hour=15)
+        feed = _feed(
+            [
+                _event(first, first + timedelta(hours=1), id="daily", recurrence_rule="FREQ=DAILY;COUNT=3"),
+                _event(moved_to, moved_to + timedelta(hours=1), id="daily", recurrence_id=moved_from),
+            ]
+        )
+
+        intervals = feed.busy_intervals(first, first + timedelta(days=3))
+
+        self.assertEqual(
+            [start for start, _ in intervals],
+            [first, moved_to, first + timedelta(days=2)],
+        )
+
+
+class ICalFeedCacheRefreshTest(TestCase):
+    """Test conditional refreshes of the per-connection cache."""
+
+    def setUp(self):
+        self.firm = Firm.objects.create(name="Test Firm", slug="test-firm")
+        self.staff_user = User.objects.create_user(username="staff", password="testpass")
+        self.connection = OAuthConnection.objects.create(
+            firm=self.firm,
+            user=self.staff_user,
+            provider="ical",
+            status="active",
+            ical_feed_url="https://example.com/calendar.ics",
+        )
+        start = pytz.UTC.localize(datetime(2030, 1, 7, 9, 0))
+        self.busy = (start, start + timedelta(hours=1))
+        self.ical_service = MagicMock()
+        self.ical_service.parse_feed.return_value = [_event(*self.busy)]
+
+    def test_not_modified_response_skips_parse(self):
+        self.ical_service.fetch_feed.return_value = FeedResponse(False, b"BEGIN:VCALENDAR", '"v1"', "")
+        service = ICalFeedCacheService(ical_service=self.ical_service)
+
+        cache = service.refresh(self.connection)
+        self.assertEqual(cache.etag, '"v1"')
+
+        self.ical_service.fetch_feed.return_value = FeedResponse(True, None, '"v1"', "")
+        service.refresh(self.connection)
+
+        self.ical_service.fetch_feed.assert_called_with(self.connection.ical_feed_url, etag='"v1"', last_modified="")
+        self.assertEqual(self.ical_service.parse_feed.call_count, 1)
+        self.assertEqual(
+            service.busy_intervals(self.connection, self.busy[0] - timedelta(hours=2), self.busy[1]),
+            [self.busy],
+        )
+
+    def test_failed_refresh_serves_cached_events(self):
+        self.ical_service.fetch_feed.return_value = FeedResponse(False, b"BEGIN:VCALENDAR", "", "")
+        service = ICalFeedCacheService(ical_service=self.ical_service)
+        service.refresh(self.connection)
+
+        self.ical_service.fetch_feed.side_effect = ConnectionError("feed down")
+        cache = service.refresh(self.connection)
+
+        self.assertIn("feed down", cache.last_error)
+        self.assertEqual(cache.events, [[int(self.busy[0].timestamp()), int(self.busy[1].timestamp()), 0]])
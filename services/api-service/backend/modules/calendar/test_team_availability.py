@@ -0,0 +1,124 @@
+"""
+Tests for team availability bitmaps and pooled round robin queries.
+"""
+
+from datetime import datetime, timedelta
+
+import pytz
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from modules.calendar.busy_intervals import BusyIntervalSet
+from modules.calendar.models import Appointment, AppointmentType, AvailabilityProfile
+from modules.calendar.services import RoundRobinService
+from modules.calendar.team_availability import TeamAvailability
+from modules.firm.models import Firm
+
+User = get_user_model()
+
+ORIGIN = pytz.UTC.localize(datetime(2030, 1, 7, 9, 0))
+
+
+def _slots(duration, step=15, count=32):
+    return [
+        (ORIGIN + timedelta(minutes=minute), ORIGIN + timedelta(minutes=minute + duration))
+        for minute in range(0, step * count, step)
+    ]
+
+
+class TeamAvailabilityTest(SimpleTestCase):
+    """Test bitmap construction, intersection and decoding."""
+
+    def test_bitmap_matches_interval_sweep(self):
+        busy = BusyIntervalSet(
+            [
+                (ORIGIN + timedelta(minutes=50), ORIGIN + timedelta(minutes=95, seconds=30)),
+                (ORIGIN + timedelta(hours=5), ORIGIN + timedelta(hours=5, minutes=1)),
+            ]
+        )
+        candidates = _slots(45)
+        team = TeamAvailability(ORIGIN, 45)
+        team.add_host("a", candidates, busy)
+
+        self.assertEqual(team.slots(team.bitmap("a")), busy.free_slots(candidates))
+
+    def test_intersect_and_union(self):
+        team = TeamAvailability(ORIGIN, 30)
+        team.add_host("a", _slots(30), BusyIntervalSet([(ORIGIN, ORIGIN + timedelta(hours=1))]))
+        team.add_host("b", _slots(30), BusyIntervalSet([(ORIGIN + timedelta(hours=2), ORIGIN + timedelta(hours=3))]))
+
+        both = team.slots(team.intersect(["a", "b"]))
+        either = team.slots(team.union(["a", "b"]))
+
+        self.assertEqual(both[0][0], ORIGIN + timedelta(hours=1))
+        self.assertNotIn(ORIGIN + timedelta(hours=2), [start for start, _ in both])
+        self.assertEqual(len(either), len(_slots(30)))
+        self.assertEqual(team.intersect(["a", "missing"]), 0)
+        self.assertTrue(team.is_free("b", ORIGIN))
+        self.assertFalse(team.is_free("a", ORIGIN))
+
+
+class RoundRobinPooledQueriesTest(TestCase):
+    """Test that pool-wide counts do not issue one query per staff member."""
+
+    def setUp(self):
+        self.firm = Firm.objects.create(name="Test Firm", slug="test-firm")
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.staff = [User.objects.create_user(username=f"pool{i}", password="testpass") for i in range(6)]
+        self.rr_type = AppointmentType.objects.create(
+            firm=self.firm,
+            name="Round Robin Consultation",
+            event_category="one_on_one",
+            duration_minutes=30,
+            location_mode="video",
+            routing_policy="round_robin_pool",
+            round_robin_strategy="strict",
+            fixed_staff_user=self.staff[0],
+            created_by=self.user,
+        )
+        self.rr_type.round_robin_pool.set(self.staff)
+        for staff in self.staff:
+            AvailabilityProfile.objects.create(
+                firm=self.firm,
+                name=f"{staff.username} Availability",
+                owner_type="staff",
+                owner_staff_user=staff,
+                timezone="UTC",
+                weekly_hours={"monday": [{"start": "09:00", "end": "17:00"}]},
+                min_notice_minutes=0,
+                max_future_days=30,
+                slot_rounding_minutes=30,
+                created_by=self.user,
+            )
+
+        start = pytz.UTC.localize(datetime(2030, 1, 7, 9, 0))
+        for index, staff in enumerate(self.staff[:-1]):
+            Appointment.objects.create(
+                firm=self.firm,
+                appointment_type=self.rr_type,
+                staff_user=staff,
+                start_time=start + timedelta(hours=index),
+                end_time=start + timedelta(hours=index, minutes=30),
+                status="confirmed",
+                booked_by=self.user,
+            )
+
+    def test_strict_selection_uses_grouped_counts(self):
+        service = RoundRobinService()
+
+        with self.assertNumQueries(1):
+            selected, _ = service._strict_round_robin(self.staff, self.rr_type)
+
+        self.assertEqual(selected, self.staff[-1])
+
+    def test_availability_filter_query_count_is_constant(self):
+        service = RoundRobinService()
+        start = pytz.UTC.localize(datetime(2030, 1, 7, 9, 0))
+
+        with self.assertNumQueries(3):
+            available = service._filter_available_staff(
+                self.staff, start, start + timedelta(minutes=30), self.rr_type
+            )
+
+        self.assertNotIn(self.staff[0], available)
+        self.assertEqual(len(available), len(self.staff) - 1)
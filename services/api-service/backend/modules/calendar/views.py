@@ -406,7 +406,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
 
         # Compute available slots
         availability_service = AvailabilityService()
-        slots = availability_service.compute_available_slots(
+        slots = availability_service.cached_available_slots(
             profile=profile,
             appointment_type=appointment_type,
             start_date=serializer.validated_data["start_date"],
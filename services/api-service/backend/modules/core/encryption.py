@@ -1,22 +1,40 @@
 """Encryption utilities for field-level E2EE.
 
-Implements a lightweight envelope encryption service that can run against
-AWS KMS or a local, Fernet-backed test key. The service is intentionally
-stateless: ciphertexts are prefixed so that downstream serializers and
-services can detect whether a value needs decryption.
+Implements an envelope encryption service that can run against AWS KMS or a
+local, Fernet-backed test key. Ciphertexts are prefixed so that downstream
+serializers and services can detect whether a value needs decryption.
+
+Two ciphertext formats are supported:
+
+- ``enc::<kms-ciphertext>`` (legacy): every value is encrypted directly by the
+  KMS backend, costing one KMS round-trip per field.
+- ``enc::v2:<base64(nonce || aes-gcm-ciphertext)>`` (envelope): values are
+  encrypted locally with a per-firm AES-256 data key. The data key is stored
+  on the Firm wrapped by KMS and unwrapped once into a bounded, TTL'd
+  in-process cache.
+
+Legacy ciphertexts remain readable in envelope mode.
 """
 
 import base64
 import hashlib
 import os
-from dataclasses import dataclass
-from typing import Protocol
+from dataclasses import dataclass, field
+from typing import Any, Iterable, NamedTuple, Protocol
 
 import boto3
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from django.conf import settings
 
+from modules.core.ttl_cache import BoundedTTLCache
+
 ENCRYPTED_PREFIX = "enc::"
+DECRYPTED_VALUES_ATTR = "_decrypted_field_values"
+ENVELOPE_VERSION_PREFIX = "v2:"
+DATA_KEY_BYTES = 32
+NONCE_BYTES = 12
 
 
 class EncryptionBackend(Protocol):
@@ -28,6 +46,16 @@ class EncryptionBackend(Protocol):
     def decrypt(self, key_id: str, ciphertext: str) -> str:  # pragma: no cover - interface
         ...
 
+    def generate_data_key(self, key_id: str) -> tuple[bytes, str]:  # pragma: no cover - interface
+        """Return a new data key as ``(plaintext_bytes, wrapped_ciphertext)``."""
+        ...
+
+    def wrap_data_key(self, key_id: str, data_key: bytes) -> str:  # pragma: no cover - interface
+        ...
+
+    def unwrap_data_key(self, key_id: str, wrapped: str) -> bytes:  # pragma: no cover - interface
+        ...
+
 
 class LocalKMSBackend:
     """Deterministic Fernet-based backend for tests and local runs."""
@@ -52,6 +80,19 @@ class LocalKMSBackend:
         except InvalidToken as exc:  # pragma: no cover - defensive
             raise ValueError("Invalid ciphertext for provided key") from exc
 
+    def generate_data_key(self, key_id: str) -> tuple[bytes, str]:
+        data_key = os.urandom(DATA_KEY_BYTES)
+        return data_key, self.wrap_data_key(key_id, data_key)
+
+    def wrap_data_key(self, key_id: str, data_key: bytes) -> str:
+        return self._derive_key(key_id).encrypt(data_key).decode()
+
+    def unwrap_data_key(self, key_id: str, wrapped: str) -> bytes:
+        try:
+            return self._derive_key(key_id).decrypt(wrapped.encode())
+        except InvalidToken as exc:  # pragma: no cover - defensive
+            raise ValueError("Invalid wrapped data key for provided key") from exc
+
 
 class AWSKMSBackend:
     """AWS KMS-backed envelope encryption for production."""
@@ -72,6 +113,18 @@ class AWSKMSBackend:
         response = self.client.decrypt(KeyId=key_id, CiphertextBlob=base64.b64decode(ciphertext.encode()))
         return response["Plaintext"].decode()
 
+    def generate_data_key(self, key_id: str) -> tuple[bytes, str]:
+        response = self.client.generate_data_key(KeyId=key_id, KeySpec="AES_256")
+        return response["Plaintext"], base64.b64encode(response["CiphertextBlob"]).decode()
+
+    def wrap_data_key(self, key_id: str, data_key: bytes) -> str:
+        response = self.client.encrypt(KeyId=key_id, Plaintext=data_key)
+        return base64.b64encode(response["CiphertextBlob"]).decode()
+
+    def unwrap_data_key(self, key_id: str, wrapped: str) -> bytes:
+        response = self.client.decrypt(KeyId=key_id, CiphertextBlob=base64.b64decode(wrapped.encode()))
+        return response["Plaintext"]
+
 
 def _get_backend() -> EncryptionBackend:
     """
@@ -106,12 +159,9 @@ def _get_backend() -> EncryptionBackend:
         )
 
 
-def _firm_key_id(firm_id: int) -> str:
-    from modules.firm.models import Firm
-
-    firm = Firm.objects.only("id", "kms_key_id").get(id=firm_id)
-    if firm.kms_key_id:
-        return firm.kms_key_id
+def _resolve_key_id(kms_key_id: str) -> str:
+    if kms_key_id:
+        return kms_key_id
     if settings.DEFAULT_FIRM_KMS_KEY_ID:
         return settings.DEFAULT_FIRM_KMS_KEY_ID
     raise ValueError(
@@ -120,28 +170,115 @@ def _firm_key_id(firm_id: int) -> str:
     )
 
 
+def _firm_key_id(firm_id: int) -> str:
+    from modules.firm.models import Firm
+
+    firm = Firm.objects.only("id", "kms_key_id").get(id=firm_id)
+    return _resolve_key_id(firm.kms_key_id)
+
+
+class FirmKeyMaterial(NamedTuple):
+    """Resolved key material for a firm, as held in the data key cache."""
+
+    key_id: str
+    data_key: bytes | None
+
+
+class DataKeyCache(BoundedTTLCache):
+    """
+    Bounded, TTL'd, thread-safe LRU cache of unwrapped per-firm key material.
+
+    Entries hold plaintext data keys, so the cache is kept in-process only and
+    never written to a shared cache backend.
+    """
+
+    def get(self, firm_id: int) -> FirmKeyMaterial | None:
+        return super().get(firm_id)
+
+    def set(self, firm_id: int, key_id: str, data_key: bytes | None) -> FirmKeyMaterial:
+        return super().set(firm_id, FirmKeyMaterial(key_id, data_key))
+
+    def invalidate(self, firm_id: int | None = None) -> None:
+        if firm_id is None:
+            self.clear()
+        else:
+            self.pop(firm_id)
+
+
+def _default_data_key_cache() -> DataKeyCache:
+    return DataKeyCache(
+        max_entries=getattr(settings, "FIELD_ENCRYPTION_DATA_KEY_CACHE_SIZE", 1024),
+        ttl_seconds=getattr(settings, "FIELD_ENCRYPTION_DATA_KEY_CACHE_TTL_SECONDS", 300),
+    )
+
+
+def _envelope_enabled() -> bool:
+    return getattr(settings, "FIELD_ENCRYPTION_MODE", "envelope") == "envelope"
+
+
 @dataclass
 class FieldEncryptionService:
     """
     Encrypt/decrypt content fields with firm-scoped keys.
 
     Meta-commentary:
-    - **Current Status:** Firm-scoped encryption helpers implemented with per-firm key lookup.
+    - **Current Status:** Firm-scoped envelope encryption. Each firm has an AES-256 data key
+      wrapped by its KMS key (Firm.wrapped_data_key); the unwrapped key and key id are cached
+      in-process so field encrypt/decrypt is local and costs no DB or KMS round-trip on a hit.
     - **Security Update (T-126):** Fail-fast when KMS backend/key configuration is missing.
     - **Follow-up (T-065):** Add per-firm key rotation and audit logging for key usage.
     - **Assumption:** Firm.kms_key_id or DEFAULT_FIRM_KMS_KEY_ID is configured via env.
     - **Missing:** Rotation workflows and key retirement validation.
-    - **Limitation:** Key selection is request-time only; no cache invalidation strategy yet.
+    - **Limitation:** Cached key material lives until its TTL expires or invalidate_firm() is
+      called; changing Firm.kms_key_id must invalidate the firm entry.
     """
 
     backend: EncryptionBackend
+    key_cache: DataKeyCache = field(default_factory=_default_data_key_cache)
+
+    def _key_material(self, firm_id: int, *, require_data_key: bool = False) -> FirmKeyMaterial:
+        """Resolve (and cache) the firm's key id and unwrapped data key."""
+        entry = self.key_cache.get(firm_id)
+        if entry is not None and (entry.data_key is not None or not require_data_key):
+            return entry
+
+        from modules.firm.models import Firm
+
+        firm = Firm.objects.only("id", "kms_key_id", "wrapped_data_key").get(id=firm_id)
+        key_id = _resolve_key_id(firm.kms_key_id)
+        wrapped = firm.wrapped_data_key
+        if not wrapped and require_data_key:
+            wrapped = self._provision_data_key(firm_id, key_id)
+        data_key = self.backend.unwrap_data_key(key_id, wrapped) if wrapped else None
+        return self.key_cache.set(firm_id, key_id, data_key)
+
+    def _provision_data_key(self, firm_id: int, key_id: str) -> str:
+        """Create and persist a wrapped data key, deferring to a concurrent writer if one won."""
+        from modules.firm.models import Firm
+
+        _, wrapped = self.backend.generate_data_key(key_id)
+        updated = Firm.objects.filter(id=firm_id, wrapped_data_key="").update(wrapped_data_key=wrapped)
+        if updated:
+            return wrapped
+        return Firm.objects.only("id", "wrapped_data_key").get(id=firm_id).wrapped_data_key
+
+    @staticmethod
+    def _aad(firm_id: int) -> bytes:
+        # Bind ciphertexts to their firm so values cannot be replayed across tenants.
+        return f"firm:{firm_id}".encode()
 
     def encrypt_for_firm(self, firm_id: int, plaintext: str | None) -> str | None:
         if plaintext in (None, ""):
             return plaintext
         if self.is_encrypted(plaintext):
             return plaintext
-        key_id = _firm_key_id(firm_id)
+        if _envelope_enabled():
+            material = self._key_material(firm_id, require_data_key=True)
+            nonce = os.urandom(NONCE_BYTES)
+            sealed = AESGCM(material.data_key).encrypt(nonce, plaintext.encode(), self._aad(firm_id))
+            payload = base64.b64encode(nonce + sealed).decode()
+            return f"{ENCRYPTED_PREFIX}{ENVELOPE_VERSION_PREFIX}{payload}"
+        key_id = self._key_material(firm_id).key_id
         ciphertext = self.backend.encrypt(key_id, plaintext)
         return f"{ENCRYPTED_PREFIX}{ciphertext}"
 
@@ -150,19 +287,100 @@ class FieldEncryptionService:
             return value
         if not self.is_encrypted(value):
             return value
-        key_id = _firm_key_id(firm_id)
         ciphertext = value[len(ENCRYPTED_PREFIX) :]
-        return self.backend.decrypt(key_id, ciphertext)
+        envelope = ciphertext.startswith(ENVELOPE_VERSION_PREFIX)
+        material = self._key_material(firm_id, require_data_key=envelope)
+        return self._decrypt_with(material, firm_id, ciphertext)
+
+    def decrypt_many(self, firm_id: int, values: Iterable[str | None]) -> list[str | None]:
+        """
+        Decrypt many values for one firm, resolving key material once.
+
+        Envelope ciphertexts are decrypted locally; legacy KMS ciphertexts still cost one
+        backend call each but share the single key id lookup.
+        """
+        values = list(values)
+        encrypted = [value[len(ENCRYPTED_PREFIX) :] for value in values if self.is_encrypted(value)]
+        if not encrypted:
+            return values
+        envelope = any(ciphertext.startswith(ENVELOPE_VERSION_PREFIX) for ciphertext in encrypted)
+        material = self._key_material(firm_id, require_data_key=envelope)
+        return [
+            self._decrypt_with(material, firm_id, value[len(ENCRYPTED_PREFIX) :]) if self.is_encrypted(value) else value
+            for value in values
+        ]
+
+    def _decrypt_with(self, material: FirmKeyMaterial, firm_id: int, ciphertext: str) -> str:
+        if ciphertext.startswith(ENVELOPE_VERSION_PREFIX):
+            raw = base64.b64decode(ciphertext[len(ENVELOPE_VERSION_PREFIX) :].encode())
+            try:
+                plaintext = AESGCM(material.data_key).decrypt(
+                    raw[:NONCE_BYTES], raw[NONCE_BYTES:], self._aad(firm_id)
+                )
+            except InvalidTag as exc:
+                raise ValueError("Invalid ciphertext for provided key") from exc
+            return plaintext.decode()
+        return self.backend.decrypt(material.key_id, ciphertext)
 
     def fingerprint_for_firm(self, firm_id: int, value: str | None) -> str | None:
         if value in (None, ""):
             return None
-        key_material = f"{_firm_key_id(firm_id)}:{value}".encode()
+        key_material = f"{self._key_material(firm_id).key_id}:{value}".encode()
         return hashlib.sha256(key_material).hexdigest()
 
+    def rewrap_data_key(self, wrapped: str, old_key_id: str, new_key_id: str) -> str:
+        """Re-wrap a firm data key under a new KMS key without changing the data key itself."""
+        if not wrapped or old_key_id == new_key_id:
+            return wrapped
+        data_key = self.backend.unwrap_data_key(old_key_id, wrapped)
+        return self.backend.wrap_data_key(new_key_id, data_key)
+
+    def invalidate_firm(self, firm_id: int | None = None) -> None:
+        """Drop cached key material for a firm (or all firms when firm_id is None)."""
+        self.key_cache.invalidate(firm_id)
+
     @staticmethod
     def is_encrypted(value: str | None) -> bool:
         return bool(value) and value.startswith(ENCRYPTED_PREFIX)
 
 
 field_encryption_service = FieldEncryptionService(_get_backend())
+
+
+def prefetch_decrypted_fields(instances: Iterable[Any], fields: Iterable[str]) -> list[Any]:
+    """
+    Decrypt ``fields`` for a page of firm-scoped instances in one pass.
+
+    Values are grouped by ``firm_id`` and decrypted with a single ``decrypt_many`` call per
+    firm. Plaintexts are memoized on each instance (keyed by the ciphertext they came from)
+    and picked up by ``get_decrypted_field``, so model helpers such as
+    ``Document.decrypted_s3_key()`` stop hitting the key store per row.
+    """
+    instances = list(instances)
+    fields = list(fields)
+    slots_by_firm: dict[int, list[tuple[Any, str, str]]] = {}
+    for instance in instances:
+        firm_id = getattr(instance, "firm_id", None)
+        if firm_id is None:
+            continue
+        for field_name in fields:
+            value = getattr(instance, field_name, None)
+            if field_encryption_service.is_encrypted(value):
+                slots_by_firm.setdefault(firm_id, []).append((instance, field_name, value))
+
+    for firm_id, slots in slots_by_firm.items():
+        plaintexts = field_encryption_service.decrypt_many(firm_id, [value for _, _, value in slots])
+        for (instance, field_name, ciphertext), plaintext in zip(slots, plaintexts):
+            memo = instance.__dict__.setdefault(DECRYPTED_VALUES_ATTR, {})
+            memo[field_name] = (ciphertext, plaintext)
+    return instances
+
+
+def get_decrypted_field(instance: Any, field_name: str) -> str | None:
+    """Return the plaintext of an encrypted field, using the prefetched value when current."""
+    value = getattr(instance, field_name)
+    memo = instance.__dict__.get(DECRYPTED_VALUES_ATTR, {})
+    cached = memo.get(field_name)
+    if cached is not None and cached[0] == value:
+        return cached[1]
+    return field_encryption_service.decrypt_for_firm(instance.firm_id, value)
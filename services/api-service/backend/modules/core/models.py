@@ -6,5 +6,6 @@ This module contains models that are used across multiple apps.
 
 # Import purge models to register them with Django
 from modules.core.purge import PurgedContent  # noqa: F401
+from modules.core.rate_limiting import RateLimitCounter  # noqa: F401
 
-__all__ = ["PurgedContent"]
+__all__ = ["PurgedContent", "RateLimitCounter"]
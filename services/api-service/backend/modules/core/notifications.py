@@ -15,7 +15,7 @@ from email.utils import formataddr
 from typing import Any
 
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
@@ -102,6 +102,83 @@ class EmailNotification:
         )
     """
 
+    @staticmethod
+    def build_message(
+        to: list[str] | str,
+        subject: str,
+        template: str | None = None,
+        context: dict[str, Any] | None = None,
+        html_content: str | None = None,
+        text_content: str | None = None,
+        from_email: str | None = None,
+        from_name: str | None = None,
+        cc: list[str] | None = None,
+        bcc: list[str] | None = None,
+        reply_to: list[str] | None = None,
+        compliance: EmailComplianceDetails | None = None,
+    ) -> EmailMultiAlternatives:
+        """
+        Build the message send() delivers, without sending it.
+
+        Takes the same arguments as send(); use with BulkEmailSender to deliver
+        many messages over one backend connection.
+        """
+        # Use default from_email if not provided
+        if not from_email:
+            from_email = getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@ubos.com")
+
+        if compliance and compliance.sender_email:
+            from_email = compliance.sender_email
+        if compliance and compliance.sender_name:
+            from_name = compliance.sender_name
+
+        # Render HTML content from template if provided
+        if template and context is not None:
+            html_content = render_to_string(template, context)
+
+        # Generate plain text version if not provided
+        if html_content and not text_content:
+            text_content = strip_tags(html_content)
+
+        if compliance:
+            html_content, text_content = _apply_compliance_footer(
+                html_content,
+                text_content,
+                compliance,
+            )
+
+        resolved_reply_to = reply_to
+        if compliance and compliance.reply_to:
+            resolved_reply_to = compliance.reply_to
+
+        formatted_from_email = _format_from_email(from_email, from_name)
+
+        # Create email message
+        if html_content:
+            email = EmailMultiAlternatives(
+                subject=subject,
+                body=text_content or "",
+                from_email=formatted_from_email,
+                to=to if isinstance(to, list) else [to],
+                cc=cc,
+                bcc=bcc,
+                reply_to=resolved_reply_to,
+            )
+            email.attach_alternative(html_content, "text/html")
+        else:
+            # Plain text only
+            email = EmailMultiAlternatives(
+                subject=subject,
+                body=text_content or "",
+                from_email=formatted_from_email,
+                to=to if isinstance(to, list) else [to],
+                cc=cc,
+                bcc=bcc,
+                reply_to=resolved_reply_to,
+            )
+
+        return email
+
     @staticmethod
     def send(
         to: list[str] | str,
@@ -139,59 +216,20 @@ class EmailNotification:
         """
         try:
             with track_duration("notification_email_send", channel="email"):
-                # Use default from_email if not provided
-                if not from_email:
-                    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@ubos.com")
-
-                if compliance and compliance.sender_email:
-                    from_email = compliance.sender_email
-                if compliance and compliance.sender_name:
-                    from_name = compliance.sender_name
-
-                # Render HTML content from template if provided
-                if template and context is not None:
-                    html_content = render_to_string(template, context)
-
-                # Generate plain text version if not provided
-                if html_content and not text_content:
-                    text_content = strip_tags(html_content)
-
-                if compliance:
-                    html_content, text_content = _apply_compliance_footer(
-                        html_content,
-                        text_content,
-                        compliance,
-                    )
-
-                resolved_reply_to = reply_to
-                if compliance and compliance.reply_to:
-                    resolved_reply_to = compliance.reply_to
-
-                formatted_from_email = _format_from_email(from_email, from_name)
-
-                # Create email message
-                if html_content:
-                    email = EmailMultiAlternatives(
-                        subject=subject,
-                        body=text_content or "",
-                        from_email=formatted_from_email,
-                        to=to if isinstance(to, list) else [to],
-                        cc=cc,
-                        bcc=bcc,
-                        reply_to=resolved_reply_to,
-                    )
-                    email.attach_alternative(html_content, "text/html")
-                else:
-                    # Plain text only
-                    email = EmailMultiAlternatives(
-                        subject=subject,
-                        body=text_content or "",
-                        from_email=formatted_from_email,
-                        to=to if isinstance(to, list) else [to],
-                        cc=cc,
-                        bcc=bcc,
-                        reply_to=resolved_reply_to,
-                    )
+                email = EmailNotification.build_message(
+                    to=to,
+                    subject=subject,
+                    template=template,
+                    context=context,
+                    html_content=html_content,
+                    text_content=text_content,
+                    from_email=from_email,
+                    from_name=from_name,
+                    cc=cc,
+                    bcc=bcc,
+                    reply_to=reply_to,
+                    compliance=compliance,
+                )
 
                 # Send email
                 email.send(fail_silently=False)
@@ -493,6 +531,68 @@ class EmailNotification:
         )
 
 
+class BulkEmailSender:
+    """
+    Deliver many messages over one email backend connection.
+
+    EmailNotification.send opens a backend (SMTP) connection per message. This
+    sender opens the connection once and hands each message to the backend's
+    send_messages on it. Messages go one per call so every recipient gets its
+    own outcome: a failed message resets the connection without re-sending
+    messages that already went out.
+
+    Usage:
+        with BulkEmailSender() as sender:
+            results = sender.send([EmailNotification.build_message(...), ...])
+    """
+
+    def __init__(self, connection=None):
+        self.connection = connection or get_connection(fail_silently=False)
+
+    def __enter__(self) -> "BulkEmailSender":
+        self.connection.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        try:
+            self.connection.close()
+        except Exception as e:
+            logger.warning(f"Failed to close email connection: {e.__class__.__name__}")
+
+    def _reconnect(self) -> None:
+        self.close()
+        try:
+            self.connection.open()
+        except Exception as e:
+            # send_messages opens a fresh connection for the next message
+            logger.warning(f"Failed to reopen email connection: {e.__class__.__name__}")
+
+    def send(self, messages: list[EmailMultiAlternatives]) -> list[bool]:
+        """Send messages over the shared connection; returns a success flag per message."""
+        results = []
+        for message in messages:
+            message.connection = self.connection
+            try:
+                results.append(bool(self.connection.send_messages([message])))
+            except Exception as e:
+                log_event(
+                    "notification_email_failed",
+                    channel="email",
+                    error_class=e.__class__.__name__,
+                )
+                logger.error(f"Failed to send bulk email: {e.__class__.__name__}")
+                results.append(False)
+                self._reconnect()
+
+        sent = sum(results)
+        if sent:
+            log_metric("notification_email_sent", channel="email", count=sent, status="success")
+        return results
+
+
 class SlackNotification:
     """
     Slack notification service (placeholder for future implementation).
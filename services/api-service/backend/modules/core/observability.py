@@ -57,6 +57,29 @@ def track_job_execution(job_type: str, status: str, duration_ms: int, retry_coun
     )
 
 
+def track_job_wait(job_type: str, wait_ms: int, priority: int, correlation_id: Optional[str] = None, tenant_id: Optional[int] = None):
+    """Track how long a job waited between becoming due and being claimed."""
+    log_metric(
+        "job_wait",
+        job_type=job_type,
+        wait_ms=wait_ms,
+        priority=priority,
+        correlation_id=correlation_id,
+        tenant_id=tenant_id,
+    )
+
+
+def track_queue_depth(category: str, depth: int, oldest_wait_seconds: int = 0, tenant_id: Optional[int] = None):
+    """Track pending job queue depth metrics."""
+    log_metric(
+        "queue_depth",
+        category=category,
+        depth=depth,
+        oldest_wait_seconds=oldest_wait_seconds,
+        tenant_id=tenant_id,
+    )
+
+
 def track_dlq_depth(job_type: str, depth: int, tenant_id: Optional[int] = None):
     """Track DLQ depth metrics."""
     log_metric(
@@ -1,26 +1,305 @@
 """
 Rate limiting helpers.
 
-Shared helpers for applying rate limit behavior across webhook endpoints.
+Shared sliding-window rate limiting engine plus helpers for applying rate limit
+behavior across webhook endpoints and the public tracking beacon.
+
+The engine uses the sliding-window counter algorithm: each key keeps one counter
+per fixed window, and a request is limited when
+
+    previous_window_count * (1 - elapsed_fraction) + current_window_count > limit
+
+Counters are updated with atomic increments. The store is picked from the
+rate-limit cache backend:
+
+- RedisCounterStore (Django's RedisCache): one Lua script increments every
+  current-window counter and reads every previous-window counter in a single
+  round trip.
+- DatabaseCounterStore (Django's DatabaseCache, whose ``incr`` is get-then-set):
+  a ``core_rate_limit_counter`` table updated with a single
+  ``UPDATE ... SET count = count + CASE ...`` statement.
+- CacheCounterStore (anything else, e.g. local memory or Memcached): the Django
+  cache API has no multi-key increment, so this costs one ``get_many`` for the
+  previous-window counters plus one ``incr`` per distinct key (and an ``add``
+  when a window counter is new). Each increment is still atomic.
+
+Usage:
+    from modules.core.rate_limiting import RateLimit, parse_rate, rate_limiter
+
+    limit, window = parse_rate("300/m")
+    result = rate_limiter.check([
+        RateLimit(f"tracking:firm:{firm.id}", limit, window, cost=len(events)),
+        RateLimit(f"tracking:ip:{ip}", limit, window, cost=len(events)),
+    ])
+    if result.limited:
+        ...
 """
 
 import logging
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
 
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models, transaction
+from django.db.models import BigIntegerField, Case, F, Value, When
 from django.http import HttpResponse
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
+RATE_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
 
-def enforce_webhook_rate_limit(request, provider: str, endpoint: str) -> HttpResponse | None:
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """
+    Parse a rate string such as ``"100/m"`` or ``"10/5m"`` into (limit, window_seconds).
+    """
+    try:
+        count, period = rate.split("/")
+        multiplier = int(period[:-1]) if len(period) > 1 else 1
+        return int(count), multiplier * RATE_PERIODS[period[-1]]
+    except (ValueError, KeyError) as exc:
+        raise ValueError(f"Invalid rate '{rate}'. Expected 'N/period' with period in s, m, h, d.") from exc
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A single limit to enforce: at most ``limit`` cost units per ``window_seconds`` for ``key``."""
+
+    key: str
+    limit: int
+    window_seconds: int
+    cost: int = 1
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a multi-key check. ``exceeded`` lists the limits that were breached."""
+
+    exceeded: list[RateLimit] = field(default_factory=list)
+    estimates: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def limited(self) -> bool:
+        return bool(self.exceeded)
+
+
+class RateLimitCounter(models.Model):
+    """Per-window counter row for DatabaseCounterStore."""
+
+    key = models.CharField(max_length=255, unique=True)
+    count = models.BigIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        app_label = "core"
+        db_table = "core_rate_limit_counter"
+
+    def __str__(self) -> str:
+        return f"{self.key}={self.count}"
+
+
+class CacheCounterStore:
+    """Counter store backed by a Django cache with atomic ``incr`` (one call per key)."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def increment_and_read(self, increments: dict[str, tuple[int, int]], read_keys: list[str]) -> dict[str, int]:
+        values = self.cache.get_many(read_keys) if read_keys else {}
+        for key, (cost, ttl) in increments.items():
+            try:
+                values[key] = self.cache.incr(key, cost)
+                continue
+            except ValueError:
+                pass
+            if self.cache.add(key, cost, ttl):
+                values[key] = cost
+                continue
+            try:
+                values[key] = self.cache.incr(key, cost)
+            except ValueError:
+                # Expired between add() and incr(); start a fresh window counter.
+                self.cache.set(key, cost, ttl)
+                values[key] = cost
+        return values
+
+
+class RedisCounterStore:
+    """Counter store for Django's RedisCache: all increments and reads in one EVAL."""
+
+    # KEYS: counters to increment, then counters to read.
+    # ARGV: number of increments, then (cost, ttl) per increment.
+    SCRIPT = """
+local increments = tonumber(ARGV[1])
+local values = {}
+for i = 1, increments do
+    local cost = tonumber(ARGV[2 * i])
+    local value = redis.call('INCRBY', KEYS[i], cost)
+    if value == cost then
+        redis.call('EXPIRE', KEYS[i], ARGV[2 * i + 1])
+    end
+    values[i] = value
+end
+for i = increments + 1, #KEYS do
+    values[i] = tonumber(redis.call('GET', KEYS[i])) or 0
+end
+return values
+"""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def increment_and_read(self, increments: dict[str, tuple[int, int]], read_keys: list[str]) -> dict[str, int]:
+        keys = [*increments, *read_keys]
+        args = [len(increments)]
+        for cost, ttl in increments.values():
+            args += [cost, ttl]
+        # Counters are stored as plain integers, which RedisCache reads back unpickled.
+        client = self.cache._cache.get_client(write=True)
+        values = client.eval(self.SCRIPT, len(keys), *[self.cache.make_key(key) for key in keys], *args)
+        return {key: int(value) for key, value in zip(keys, values)}
+
+
+class DatabaseCounterStore:
+    """Counter store backed by RateLimitCounter rows, atomic on any SQL database."""
+
+    PURGE_INTERVAL_SECONDS = 60
+
+    def __init__(self):
+        self._last_purge = 0.0
+
+    def increment_and_read(self, increments: dict[str, tuple[int, int]], read_keys: list[str]) -> dict[str, int]:
+        now = timezone.now()
+        with transaction.atomic():
+            RateLimitCounter.objects.bulk_create(
+                [
+                    RateLimitCounter(key=key, count=0, expires_at=now + timedelta(seconds=ttl))
+                    for key, (_, ttl) in increments.items()
+                ],
+                ignore_conflicts=True,
+            )
+            RateLimitCounter.objects.filter(key__in=list(increments)).update(
+                count=F("count")
+                + Case(
+                    *[When(key=key, then=Value(cost)) for key, (cost, _) in increments.items()],
+                    default=Value(0),
+                    output_field=BigIntegerField(),
+                )
+            )
+            values = dict(
+                RateLimitCounter.objects.filter(key__in=[*increments, *read_keys]).values_list("key", "count")
+            )
+        self._purge_expired(now)
+        return values
+
+    def _purge_expired(self, now) -> None:
+        if time.monotonic() - self._last_purge < self.PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        RateLimitCounter.objects.filter(expires_at__lt=now).delete()
+
+
+def _default_store():
+    from django.core.cache.backends.db import DatabaseCache
+    from django.core.cache.backends.redis import RedisCache
+
+    store = getattr(settings, "RATE_LIMIT_STORE", "auto")
+    cache = caches[getattr(settings, "RATE_LIMIT_CACHE_ALIAS", "default")]
+    if store == "db" or (store == "auto" and isinstance(cache, DatabaseCache)):
+        return DatabaseCounterStore()
+    if store == "auto" and isinstance(cache, RedisCache):
+        return RedisCounterStore(cache)
+    return CacheCounterStore(cache)
+
+
+class SlidingWindowRateLimiter:
+    """Sliding-window counter rate limiter with multi-key checks."""
+
+    KEY_PREFIX = "rl"
+
+    def __init__(self, store=None):
+        self._store = store
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = _default_store()
+        return self._store
+
+    def _window_keys(self, limit: RateLimit, now: float) -> tuple[str, str, float]:
+        window_index = math.floor(now / limit.window_seconds)
+        elapsed_fraction = (now - window_index * limit.window_seconds) / limit.window_seconds
+        base = f"{self.KEY_PREFIX}:{limit.key}:{limit.window_seconds}"
+        return f"{base}:{window_index}", f"{base}:{window_index - 1}", elapsed_fraction
+
+    def check(self, limits: list[RateLimit], now: float | None = None) -> RateLimitResult:
+        """
+        Record ``cost`` against every limit and report which ones are exceeded.
+
+        Limits sharing a key and window are merged, so callers can pass one entry
+        per event and still pay a single increment per distinct key.
+        """
+        now = time.time() if now is None else now
+        merged: dict[tuple[str, int], RateLimit] = {}
+        for limit in limits:
+            existing = merged.get((limit.key, limit.window_seconds))
+            if existing is not None:
+                limit = RateLimit(
+                    limit.key,
+                    min(limit.limit, existing.limit),
+                    limit.window_seconds,
+                    existing.cost + limit.cost,
+                )
+            merged[(limit.key, limit.window_seconds)] = limit
+
+        increments: dict[str, tuple[int, int]] = {}
+        read_keys: list[str] = []
+        plan: list[tuple[RateLimit, str, str, float]] = []
+        for limit in merged.values():
+            current_key, previous_key, elapsed_fraction = self._window_keys(limit, now)
+            increments[current_key] = (limit.cost, limit.window_seconds * 2)
+            read_keys.append(previous_key)
+            plan.append((limit, current_key, previous_key, elapsed_fraction))
+
+        values = self.store.increment_and_read(increments, read_keys)
+
+        result = RateLimitResult()
+        for limit, current_key, previous_key, elapsed_fraction in plan:
+            estimate = values.get(previous_key, 0) * (1 - elapsed_fraction) + values.get(current_key, 0)
+            result.estimates[limit.key] = estimate
+            if estimate > limit.limit:
+                result.exceeded.append(limit)
+        return result
+
+
+rate_limiter = SlidingWindowRateLimiter()
+
+
+def enforce_webhook_rate_limit(
+    request, provider: str, endpoint: str, rate: str | None = None
+) -> HttpResponse | None:
     """
     Return a 429 response when a webhook rate limit is exceeded.
 
-    Uses django-ratelimit's request.limited flag when block=False is configured.
+    When ``rate`` is given the shared sliding-window limiter is applied per
+    provider and client IP. django-ratelimit's request.limited flag (block=False)
+    is still honored for endpoints that keep the decorator.
     """
-    if not getattr(request, "limited", False):
+    ip_address = request.META.get("REMOTE_ADDR", "unknown")
+    limited = getattr(request, "limited", False)
+    if not limited and rate:
+        limit, window_seconds = parse_rate(rate)
+        limited = rate_limiter.check(
+            [RateLimit(f"webhook:{provider}:{endpoint}:ip:{ip_address}", limit, window_seconds)]
+        ).limited
+
+    if not limited:
         return None
 
-    ip_address = request.META.get("REMOTE_ADDR", "unknown")
     logger.warning(
         "Rate limit exceeded for %s webhook endpoint from IP %s", provider, ip_address
     )
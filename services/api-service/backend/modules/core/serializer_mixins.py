@@ -2,7 +2,8 @@
 Governance-Aware Serializers (DOC-07.1)
 
 Provides DRF serializer mixins that integrate with the governance classification registry
-to ensure proper data handling based on classification levels.
+to ensure proper data handling based on classification levels, plus page-level bulk
+decryption of firm-encrypted fields.
 
 Usage:
     from modules.core.serializer_mixins import GovernanceAwareSerializerMixin
@@ -15,8 +16,10 @@ Usage:
 
 from typing import Any, Optional
 
+from django.db import models
 from rest_framework import serializers
 
+from modules.core.encryption import get_decrypted_field, prefetch_decrypted_fields
 from modules.core.governance import (
     DataClassification,
     governance_registry,
@@ -143,6 +146,80 @@ class ExportSerializerMixin(GovernanceAwareSerializerMixin):
         return filtered_fields
 
 
+class EncryptedFieldsListSerializer(serializers.ListSerializer):
+    """
+    List serializer that decrypts all encrypted fields for a page in one pass.
+
+    Key material is resolved once per firm via ``prefetch_decrypted_fields`` before
+    the child serializer renders each row.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        instances = list(iterable)
+        if self.child.include_encrypted_content():
+            prefetch_decrypted_fields(instances, self.child.get_encrypted_fields())
+        return [self.child.to_representation(item) for item in instances]
+
+
+class EncryptedFieldsSerializerMixin:
+    """
+    Mixin for serializers of models with firm-encrypted fields.
+
+    List the encrypted model fields in ``Meta.encrypted_fields`` and set
+    ``Meta.list_serializer_class = EncryptedFieldsListSerializer`` so list endpoints
+    decrypt a whole page with O(firms) key lookups instead of O(rows x fields).
+
+    Encrypted fields are rendered as plaintext, or dropped entirely when the caller
+    is a platform operator without an active break-glass session for the firm.
+
+    Usage:
+        class DocumentSerializer(EncryptedFieldsSerializerMixin, serializers.ModelSerializer):
+            class Meta:
+                model = Document
+                fields = "__all__"
+                encrypted_fields = ["s3_key", "s3_bucket"]
+                list_serializer_class = EncryptedFieldsListSerializer
+    """
+
+    def get_encrypted_fields(self) -> list[str]:
+        meta = getattr(self, "Meta", None)
+        return list(getattr(meta, "encrypted_fields", []))
+
+    def include_encrypted_content(self) -> bool:
+        """Return whether plaintext content may be rendered; memoized per serializer context."""
+        context = self.context
+        if "_include_encrypted_content" not in context:
+            context["_include_encrypted_content"] = self._resolve_include_encrypted_content(context.get("request"))
+        return context["_include_encrypted_content"]
+
+    def _resolve_include_encrypted_content(self, request) -> bool:
+        if not request or not getattr(request, "user", None):
+            return True
+
+        user = request.user
+        if not user.is_authenticated:
+            return True
+
+        profile = getattr(user, "platform_profile", None)
+        if profile and profile.is_platform_active:
+            from modules.firm.utils import has_active_break_glass_session
+
+            firm = getattr(request, "firm", None)
+            return has_active_break_glass_session(firm) if firm else False
+        return True
+
+    def to_representation(self, instance) -> dict:
+        data = super().to_representation(instance)
+        include = self.include_encrypted_content()
+        for field_name in self.get_encrypted_fields():
+            if include:
+                data[field_name] = get_decrypted_field(instance, field_name)
+            else:
+                data.pop(field_name, None)
+        return data
+
+
 def serialize_for_logging(serializer_class, instance) -> dict:
     """
     Serialize an instance with redaction for logging.
@@ -0,0 +1,42 @@
+"""
+Tests for BulkEmailSender connection reuse.
+"""
+from unittest.mock import MagicMock
+
+from django.core import mail
+from django.core.mail import get_connection
+
+from modules.core.notifications import BulkEmailSender, EmailNotification
+
+
+def _messages(count):
+    return [
+        EmailNotification.build_message(to=f"user{i}@example.com", subject="Hello", html_content="<p>Hi</p>")
+        for i in range(count)
+    ]
+
+
+def test_bulk_sender_reuses_one_connection(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    mail.outbox = []
+    connection = get_connection()
+    connection.open = MagicMock(wraps=connection.open)
+
+    with BulkEmailSender(connection) as sender:
+        results = sender.send(_messages(3))
+
+    assert results == [True, True, True]
+    assert connection.open.call_count == 1
+    assert [message.to for message in mail.outbox] == [[f"user{i}@example.com"] for i in range(3)]
+    assert mail.outbox[0].alternatives[0][1] == "text/html"
+
+
+def test_bulk_sender_reports_per_message_failures():
+    connection = MagicMock()
+    connection.send_messages.side_effect = [1, ConnectionError("reset"), 1]
+
+    with BulkEmailSender(connection) as sender:
+        results = sender.send(_messages(3))
+
+    assert results == [True, False, True]
+    assert connection.send_messages.call_count == 3
@@ -0,0 +1,95 @@
+"""
+Tests for envelope field encryption with cached per-firm data keys.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from modules.core.encryption import (
+    ENCRYPTED_PREFIX,
+    ENVELOPE_VERSION_PREFIX,
+    DataKeyCache,
+    FieldEncryptionService,
+    LocalKMSBackend,
+)
+from modules.firm.models import Firm
+
+
+@pytest.fixture
+def firm(db):
+    """Create a test firm with an explicit KMS key id."""
+    return Firm.objects.create(name="Crypto Firm", slug="crypto-firm", kms_key_id="alias/crypto-firm")
+
+
+@pytest.fixture
+def service(settings):
+    settings.FIELD_ENCRYPTION_MODE = "envelope"
+    return FieldEncryptionService(LocalKMSBackend("test-master-key"), DataKeyCache(max_entries=8, ttl_seconds=60))
+
+
+@pytest.mark.django_db
+class TestEnvelopeEncryption:
+    def test_round_trip_uses_versioned_prefix(self, firm, service):
+        ciphertext = service.encrypt_for_firm(firm.id, "firm-1/docs/report.pdf")
+
+        assert ciphertext.startswith(f"{ENCRYPTED_PREFIX}{ENVELOPE_VERSION_PREFIX}")
+        assert service.decrypt_for_firm(firm.id, ciphertext) == "firm-1/docs/report.pdf"
+
+    def test_data_key_is_provisioned_once_and_wrapped(self, firm, service):
+        service.encrypt_for_firm(firm.id, "value")
+        firm.refresh_from_db()
+        wrapped = firm.wrapped_data_key
+
+        assert wrapped
+        service.invalidate_firm(firm.id)
+        service.encrypt_for_firm(firm.id, "another value")
+        firm.refresh_from_db()
+        assert firm.wrapped_data_key == wrapped
+
+    def test_cached_decrypt_issues_no_queries(self, firm, service):
+        values = [service.encrypt_for_firm(firm.id, f"key-{i}") for i in range(20)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            decrypted = [service.decrypt_for_firm(firm.id, value) for value in values]
+
+        assert decrypted == [f"key-{i}" for i in range(20)]
+        assert len(ctx.captured_queries) == 0
+
+    def test_legacy_ciphertext_remains_readable(self, firm, service, settings):
+        settings.FIELD_ENCRYPTION_MODE = "kms"
+        legacy = service.encrypt_for_firm(firm.id, "legacy-value")
+        settings.FIELD_ENCRYPTION_MODE = "envelope"
+
+        assert not legacy.startswith(f"{ENCRYPTED_PREFIX}{ENVELOPE_VERSION_PREFIX}")
+        assert service.decrypt_for_firm(firm.id, legacy) == "legacy-value"
+
+    def test_decrypt_many_preserves_order_and_plain_values(self, firm, service):
+        values = [service.encrypt_for_firm(firm.id, "a"), None, "plain", service.encrypt_for_firm(firm.id, "b")]
+
+        assert service.decrypt_many(firm.id, values) == ["a", None, "plain", "b"]
+
+    def test_ciphertext_is_bound_to_firm(self, firm, service):
+        other = Firm.objects.create(name="Other Firm", slug="other-firm", kms_key_id="alias/crypto-firm")
+        ciphertext = service.encrypt_for_firm(firm.id, "secret")
+
+        with pytest.raises(ValueError):
+            service.decrypt_for_firm(other.id, ciphertext)
+
+
+class TestDataKeyCache:
+    def test_evicts_least_recently_used(self):
+        cache = DataKeyCache(max_entries=2, ttl_seconds=60)
+        cache.set(1, "k1", b"a")
+        cache.set(2, "k2", b"b")
+        cache.get(1)
+        cache.set(3, "k3", b"c")
+
+        assert cache.get(2) is None
+        assert cache.get(1).key_id == "k1"
+        assert cache.get(3).key_id == "k3"
+
+    def test_expired_entries_are_dropped(self):
+        cache = DataKeyCache(max_entries=2, ttl_seconds=0)
+        cache.set(1, "k1", b"a")
+
+        assert cache.get(1) is None
@@ -0,0 +1,164 @@
+"""
+Tests for the shared sliding-window rate limiter.
+"""
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+
+from modules.core import rate_limiting
+from modules.core.rate_limiting import (
+    CacheCounterStore,
+    DatabaseCounterStore,
+    RateLimit,
+    RateLimitCounter,
+    RedisCounterStore,
+    SlidingWindowRateLimiter,
+    parse_rate,
+)
+
+
+@pytest.fixture
+def cache_limiter():
+    return SlidingWindowRateLimiter(CacheCounterStore(LocMemCache("rate-limit-tests", {})))
+
+
+def test_parse_rate():
+    assert parse_rate("100/m") == (100, 60)
+    assert parse_rate("10/5s") == (10, 5)
+    with pytest.raises(ValueError):
+        parse_rate("100/w")
+
+
+class TestSlidingWindowRateLimiter:
+    def test_limits_within_window(self, cache_limiter):
+        limit = RateLimit("webhook:stripe", limit=3, window_seconds=60)
+
+        results = [cache_limiter.check([limit], now=120.0).limited for _ in range(4)]
+
+        assert results == [False, False, False, True]
+
+    def test_previous_window_is_weighted(self, cache_limiter):
+        cache_limiter.check([RateLimit("ip:1", limit=10, window_seconds=60, cost=10)], now=119.0)
+
+        # Halfway through the next window half of the previous count still applies.
+        result = cache_limiter.check([RateLimit("ip:1", limit=10, window_seconds=60, cost=5)], now=150.0)
+
+        assert result.estimates["ip:1"] == pytest.approx(10.0)
+        assert not result.limited
+        assert cache_limiter.check([RateLimit("ip:1", limit=10, window_seconds=60)], now=150.0).limited
+
+    def test_duplicate_keys_are_merged(self, cache_limiter):
+        limits = [RateLimit("key:a", limit=2, window_seconds=60) for _ in range(3)]
+
+        result = cache_limiter.check(limits, now=60.0)
+
+        assert result.limited
+        assert result.exceeded[0].cost == 3
+
+
+@pytest.mark.django_db
+def test_database_store_increments_atomically():
+    limiter = SlidingWindowRateLimiter(DatabaseCounterStore())
+    limits = [RateLimit("firm:1", limit=5, window_seconds=60, cost=3), RateLimit("ip:1", limit=5, window_seconds=60)]
+
+    limiter.check(limits, now=60.0)
+    result = limiter.check(limits, now=60.0)
+
+    assert [limit.key for limit in result.exceeded] == ["firm:1"]
+    assert RateLimitCounter.objects.get(key="rl:firm:1:60:1").count == 6
+
+
+class TestCacheCounterStore:
+    @pytest.fixture
+    def cache(self):
+        cache = LocMemCache("rate-limit-store-tests", {})
+        cache.clear()
+        return cache
+
+    def test_increments_new_and_existing_keys_and_reads_present_keys(self, cache):
+        cache.set("existing", 4)
+        cache.set("previous", 7)
+        store = CacheCounterStore(cache)
+
+        values = store.increment_and_read({"existing": (2, 60), "new": (3, 60)}, ["previous", "missing"])
+
+        assert values == {"existing": 6, "new": 3, "previous": 7}
+        assert cache.get_many(["existing", "new"]) == {"existing": 6, "new": 3}
+
+    def test_counter_expiring_between_add_and_incr_restarts(self, cache, monkeypatch):
+        store = CacheCounterStore(cache)
+        monkeypatch.setattr(cache, "add", lambda key, value, timeout: False)
+
+        assert store.increment_and_read({"raced": (2, 60)}, []) == {"raced": 2}
+        assert cache.get("raced") == 2
+
+    def test_only_the_exceeded_limit_is_reported(self, cache):
+        limiter = SlidingWindowRateLimiter(CacheCounterStore(cache))
+        limits = [
+            RateLimit("firm:1", limit=5, window_seconds=60, cost=3),
+            RateLimit("ip:1", limit=5, window_seconds=60),
+            RateLimit("ip:1", limit=5, window_seconds=10),
+        ]
+
+        limiter.check(limits, now=60.0)
+        result = limiter.check(limits, now=60.0)
+
+        assert [limit.key for limit in result.exceeded] == ["firm:1"]
+        assert cache.get("rl:firm:1:60:1") == 6
+        assert cache.get("rl:ip:1:60:1") == cache.get("rl:ip:1:10:6") == 2
+
+
+class TestRedisCounterStore:
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        cache = RedisCache("redis://localhost:6379", {"KEY_PREFIX": "test"})
+        server = fakeredis.FakeRedis()
+        monkeypatch.setattr(cache._cache, "get_client", lambda key=None, *, write=False: server)
+        return cache
+
+    def test_increments_and_reads_in_one_call(self, cache):
+        cache.set("previous", 7)
+        cache.set("existing", 4)
+        store = RedisCounterStore(cache)
+        client = cache._cache.get_client(write=True)
+        calls = []
+        client.eval = _recording(client.eval, calls)
+
+        values = store.increment_and_read({"existing": (2, 60), "new": (3, 120)}, ["previous", "missing"])
+
+        assert len(calls) == 1
+        assert values == {"existing": 6, "new": 3, "previous": 7, "missing": 0}
+        assert cache.get_many(["existing", "new"]) == {"existing": 6, "new": 3}
+        assert 0 < client.ttl(cache.make_key("new")) <= 120
+
+    def test_limiter_reads_previous_window(self, cache):
+        limiter = SlidingWindowRateLimiter(RedisCounterStore(cache))
+        limiter.check([RateLimit("ip:1", limit=10, window_seconds=60, cost=10)], now=119.0)
+
+        result = limiter.check([RateLimit("ip:1", limit=10, window_seconds=60, cost=5)], now=150.0)
+
+        assert result.estimates["ip:1"] == pytest.approx(10.0)
+        assert limiter.check([RateLimit("ip:1", limit=10, window_seconds=60)], now=150.0).limited
+
+
+def _recording(method, calls):
+    def record(*args):
+        calls.append(args)
+        return method(*args)
+
+    return record
+
+
+def test_default_store_follows_the_cache_backend(settings):
+    settings.RATE_LIMIT_STORE = "auto"
+    settings.RATE_LIMIT_CACHE_ALIAS = "rate-limit-redis"
+    settings.CACHES = {
+        **settings.CACHES,
+        "rate-limit-redis": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://localhost"},
+    }
+    assert isinstance(rate_limiting._default_store(), RedisCounterStore)
+
+    settings.RATE_LIMIT_STORE = "cache"
+    assert isinstance(rate_limiting._default_store(), CacheCounterStore)
@@ -2,10 +2,15 @@
 Management command for S3 reconciliation (ASSESS-G18.5b).
 
 Daily cron to verify document Version records match S3 objects; detect missing files.
+
+Usage:
+    python manage.py reconcile_s3
+    python manage.py reconcile_s3 --firm-id 123 --resume
+    python manage.py reconcile_s3 --mode head --workers 16
 """
 
 from django.core.management.base import BaseCommand
-from modules.documents.reconciliation import S3ReconciliationService
+from modules.documents.reconciliation import MODE_HEAD, MODE_LIST, S3ReconciliationService
 from modules.firm.models import Firm
 
 
@@ -18,6 +23,22 @@ class Command(BaseCommand):
             type=int,
             help="Reconcile documents for a specific firm (if not provided, reconciles all firms)",
         )
+        parser.add_argument(
+            "--mode",
+            choices=[MODE_LIST, MODE_HEAD],
+            default=MODE_LIST,
+            help="list: page list_objects_v2 per firm prefix (default); head: one HEAD request per version",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue listing-mode runs from their last checkpoint",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Thread pool size for HEAD requests (default: S3_RECONCILIATION_HEAD_WORKERS)",
+        )
 
     def handle(self, *args, **options):
         firm_id = options.get("firm_id")
@@ -30,7 +51,12 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR(f"Firm with ID {firm_id} not found"))
                 return
 
-        service = S3ReconciliationService(firm=firm)
+        service = S3ReconciliationService(
+            firm=firm,
+            mode=options["mode"],
+            resume=options["resume"],
+            head_workers=options.get("workers"),
+        )
         result = service.reconcile_all_firms()
 
         self.stdout.write(self.style.SUCCESS(f"S3 Reconciliation Complete"))
@@ -45,12 +71,14 @@ class Command(BaseCommand):
                     self.stdout.write(
                         f"  Firm {firm_result['firm_name']}: {firm_result['mismatches_count']} mismatches"
                     )
+                    if firm_result.get("mismatches_truncated"):
+                        self.stdout.write(f"    (showing first {len(firm_result['mismatches'])})")
                     for mismatch in firm_result["mismatches"]:
                         self.stdout.write(
                             f"    - Version {mismatch['version_id']} (Document: {mismatch['document_name']}): {mismatch.get('mismatch_type', 'unknown')}"
                         )
 
-        if result.get("errors"):
+        if any(firm_result.get("errors") for firm_result in result["firm_results"]):
             self.stdout.write(self.style.ERROR(f"\nErrors encountered:"))
             for firm_result in result["firm_results"]:
                 if firm_result.get("errors"):
@@ -0,0 +1,31 @@
+# Generated migration for resumable S3 reconciliation checkpoints (ASSESS-G18.5b)
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0005_add_granular_permissions'),
+        ('firm', '0012_user_profiles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='S3ReconciliationCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_fingerprint', models.CharField(help_text='Firm-scoped fingerprint of the bucket being listed', max_length=128)),
+                ('last_key', models.TextField(help_text='Encrypted last S3 key reconciled')),
+                ('stats', models.JSONField(blank=True, default=dict, help_text='Counters accumulated before the checkpoint')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('firm', models.ForeignKey(help_text='Firm (workspace) this checkpoint belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='s3_reconciliation_checkpoints', to='firm.firm')),
+            ],
+            options={
+                'db_table': 'documents_s3_reconciliation_checkpoint',
+                'unique_together': {('firm', 'bucket_fingerprint')},
+            },
+        ),
+    ]
@@ -14,6 +14,7 @@ from .versions import Version
 from .access_logs import DocumentAccessLog
 from .shares import ExternalShare, SharePermission, ShareAccess
 from .file_requests import FileRequest, FileRequestReminder
+from .reconciliation import S3ReconciliationCheckpoint
 
 __all__ = [
     'Folder',
@@ -29,4 +30,5 @@ __all__ = [
     'ShareAccess',
     'FileRequest',
     'FileRequestReminder',
+    'S3ReconciliationCheckpoint',
 ]
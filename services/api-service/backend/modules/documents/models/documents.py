@@ -7,7 +7,7 @@ from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
-from modules.core.encryption import field_encryption_service
+from modules.core.encryption import field_encryption_service, get_decrypted_field
 from modules.firm.utils import FirmScopedManager
 from modules.projects.models import Project
 from .folders import Folder
@@ -425,10 +425,10 @@ class Document(models.Model):
             raise ValidationError(errors)
 
     def decrypted_s3_key(self) -> str:
-        return field_encryption_service.decrypt_for_firm(self.firm_id, self.s3_key)
+        return get_decrypted_field(self, "s3_key")
 
     def decrypted_s3_bucket(self) -> str:
-        return field_encryption_service.decrypt_for_firm(self.firm_id, self.s3_bucket)
+        return get_decrypted_field(self, "s3_bucket")
 
     def _encrypt_content_fields(self) -> None:
         if not self.firm_id:
@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class S3ReconciliationCheckpoint(models.Model):
+    """
+    Resumable progress marker for listing-mode S3 reconciliation (ASSESS-G18.5b).
+
+    Stores the last S3 key fully reconciled under a firm's prefix so an interrupted
+    run can continue with ``list_objects_v2(StartAfter=...)``. The key is stored
+    encrypted like Version.s3_key. Deleted when a run completes.
+
+    TIER 0: Belongs to exactly one Firm (tenant boundary).
+    """
+
+    firm = models.ForeignKey(
+        "firm.Firm",
+        on_delete=models.CASCADE,
+        related_name="s3_reconciliation_checkpoints",
+        help_text="Firm (workspace) this checkpoint belongs to",
+    )
+    bucket_fingerprint = models.CharField(
+        max_length=128,
+        help_text="Firm-scoped fingerprint of the bucket being listed",
+    )
+    last_key = models.TextField(help_text="Encrypted last S3 key reconciled")
+    stats = models.JSONField(default=dict, blank=True, help_text="Counters accumulated before the checkpoint")
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "documents_s3_reconciliation_checkpoint"
+        unique_together = [["firm", "bucket_fingerprint"]]
+
+    def __str__(self) -> str:
+        return f"S3 reconciliation checkpoint for firm {self.firm_id}"
@@ -2,20 +2,118 @@
 S3 Reconciliation Service (ASSESS-G18.5b).
 
 Verifies document Version records match S3 objects; detects missing files.
+
+Two modes:
+- ``list`` (default): pages through ``list_objects_v2`` under the firm's
+  ``firm-{id}/`` prefix and merge-diffs the listing against the firm's version
+  keys sorted in the same order. One LIST request covers 1000 objects, so a
+  500k-version firm needs ~500 requests instead of 500k HEADs. Versions stored in
+  another bucket or outside the prefix fall back to concurrent HEAD requests.
+  Progress is checkpointed (S3ReconciliationCheckpoint) on key boundaries so
+  interrupted runs can resume.
+- ``head``: one HEAD per version, issued from a thread pool.
+
+Audit events for mismatches are written in batches with bulk_create.
+
+Version keys are encrypted at rest, so the database cannot order them; the key
+list for a firm is decrypted in chunks and sorted in memory (a few tens of bytes
+per version) while the S3 side is streamed.
 """
 
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple
 
+from django.conf import settings
 from django.utils import timezone
 
-from modules.documents.models import Document, Version
+from modules.core.encryption import field_encryption_service
+from modules.documents.models import S3ReconciliationCheckpoint, Version
 from modules.documents.services import S3Service
 from modules.firm.audit import AuditEvent
 from modules.firm.models import Firm
 
 logger = logging.getLogger(__name__)
 
+MODE_LIST = "list"
+MODE_HEAD = "head"
+DB_CHUNK_SIZE = 2000
+AUDIT_BATCH_SIZE = 500
+CHECKPOINT_INTERVAL = 5000
+HEAD_BATCH_SIZE = 1000
+MAX_REPORTED_MISMATCHES = 1000
+MAX_ORPHAN_SAMPLES = 100
+
+
+class VersionEntry(NamedTuple):
+    """Decrypted S3 location of a Version plus the stored (encrypted) values for reporting."""
+
+    key: str
+    bucket: str
+    version_id: int
+    document_id: int
+    document_name: str
+    file_size_bytes: int | None
+    stored_key: str
+    stored_bucket: str
+
+
+def merge_diff(entries: Iterable[VersionEntry], objects: Iterable[dict]) -> Iterator[tuple]:
+    """
+    Merge-diff versions against an S3 listing, both sorted by key.
+
+    Yields (kind, entry, obj) where kind is ``matched``, ``size_mismatch``,
+    ``missing_file`` (entry without object) or ``orphan`` (object without entry).
+    """
+    entries = iter(entries)
+    objects = iter(objects)
+    entry = next(entries, None)
+    obj = next(objects, None)
+    while entry is not None or obj is not None:
+        if obj is None or (entry is not None and entry.key < obj["Key"]):
+            yield "missing_file", entry, None
+            entry = next(entries, None)
+        elif entry is None or obj["Key"] < entry.key:
+            yield "orphan", None, obj
+            obj = next(objects, None)
+        else:
+            # Several versions may point at one object; compare each of them.
+            key = obj["Key"]
+            while entry is not None and entry.key == key:
+                size_differs = entry.file_size_bytes and obj.get("Size") and entry.file_size_bytes != obj["Size"]
+                yield ("size_mismatch" if size_differs else "matched"), entry, obj
+                entry = next(entries, None)
+            obj = next(objects, None)
+
+
+class _AuditBuffer:
+    """Collects AuditEvents and writes them with bulk_create."""
+
+    def __init__(self, batch_size: int = AUDIT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.pending: List[AuditEvent] = []
+
+    def add(self, event: AuditEvent) -> None:
+        self.pending.append(event)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            AuditEvent.objects.bulk_create(self.pending, batch_size=self.batch_size)
+            self.pending = []
+
+
+class _FirmRun:
+    """Per-firm counters and capped mismatch/error details."""
+
+    def __init__(self, stats: Dict[str, int] | None = None):
+        self.stats = {"reconciled": 0, "mismatches": 0, "errors": 0, "orphaned_objects": 0}
+        self.stats.update(stats or {})
+        self.mismatches: List[Dict[str, Any]] = []
+        self.errors: List[Dict[str, Any]] = []
+        self.orphan_samples: List[str] = []
+
 
 class S3ReconciliationService:
     """
@@ -24,16 +122,32 @@ class S3ReconciliationService:
     ASSESS-G18.5b: Verify document Version records match S3 objects; detect missing files.
     """
 
-    def __init__(self, firm: Firm = None):
+    def __init__(
+        self,
+        firm: Firm = None,
+        mode: str = MODE_LIST,
+        resume: bool = False,
+        head_workers: int | None = None,
+        s3_service: S3Service | None = None,
+    ):
         """
         Initialize reconciliation service.
 
         Args:
             firm: Optional firm to reconcile (if None, reconciles all firms)
+            mode: "list" (list_objects_v2 merge-diff) or "head" (HEAD per version)
+            resume: Continue listing-mode runs from their last checkpoint
+            head_workers: Thread pool size for HEAD requests
+            s3_service: S3Service to use (defaults to a new instance)
         """
+        if mode not in (MODE_LIST, MODE_HEAD):
+            raise ValueError(f"Unknown reconciliation mode: {mode}")
         self.firm = firm
-        self.s3_service = S3Service()
-        self.mismatches = []
+        self.mode = mode
+        self.resume = resume
+        self.head_workers = head_workers or getattr(settings, "S3_RECONCILIATION_HEAD_WORKERS", 8)
+        self.s3_service = s3_service or S3Service()
+        self.audit = _AuditBuffer()
 
     def reconcile_all_firms(self) -> Dict[str, Any]:
         """
@@ -58,6 +172,7 @@ class S3ReconciliationService:
 
         return {
             "reconciliation_date": timezone.now().isoformat(),
+            "mode": self.mode,
             "firms_processed": len(firm_results),
             "total_versions": total_versions,
             "total_mismatches": total_mismatches,
@@ -74,36 +189,24 @@ class S3ReconciliationService:
         Returns:
             Dict with reconciliation results
         """
-        logger.info(f"Starting S3 reconciliation for firm {firm.id} ({firm.name})")
-
-        # Get all document versions with S3 keys
-        versions = Version.objects.filter(
-            document__firm=firm,
-        ).exclude(
-            s3_key=""
-        ).exclude(
-            s3_key__isnull=True
-        ).select_related("document")
-
-        mismatches = []
-        reconciled = 0
-        errors = []
-
-        for version in versions:
-            try:
-                mismatch = self._reconcile_version(version)
-                if mismatch:
-                    mismatches.append(mismatch)
-                else:
-                    reconciled += 1
-            except Exception as e:
-                logger.error(f"Error reconciling version {version.id}: {str(e)}")
-                errors.append({
-                    "version_id": version.id,
-                    "document_id": version.document_id,
-                    "s3_key": version.s3_key,
-                    "error": str(e),
-                })
+        logger.info(f"Starting S3 reconciliation for firm {firm.id} ({firm.name}) in {self.mode} mode")
+
+        entries = self._load_entries(firm)
+        total_versions = len(entries)
+
+        run = _FirmRun()
+        head_entries = entries
+        if self.mode == MODE_LIST:
+            bucket = self.s3_service.bucket_name
+            prefix = f"firm-{firm.id}/"
+            listed = [entry for entry in entries if entry.bucket == bucket and entry.key.startswith(prefix)]
+            head_entries = [entry for entry in entries if not (entry.bucket == bucket and entry.key.startswith(prefix))]
+            del entries
+            listed.sort(key=lambda entry: entry.key)
+            run = self._reconcile_listing(firm, bucket, prefix, listed)
+
+        self._reconcile_with_head(firm, head_entries, run)
+        self.audit.flush()
 
         # Create audit event for reconciliation run
         AuditEvent.objects.create(
@@ -111,135 +214,185 @@ class S3ReconciliationService:
             category=AuditEvent.CATEGORY_SYSTEM,
             action="s3_reconciliation_run",
             severity=AuditEvent.SEVERITY_INFO,
-            resource_type="Version",
+            target_model="Version",
             metadata={
-                "total_versions": versions.count(),
-                "reconciled": reconciled,
-                "mismatches": len(mismatches),
-                "errors": len(errors),
+                "mode": self.mode,
+                "total_versions": total_versions,
+                "reconciled": run.stats["reconciled"],
+                "mismatches": run.stats["mismatches"],
+                "errors": run.stats["errors"],
+                "orphaned_objects": run.stats["orphaned_objects"],
             },
         )
 
         return {
             "firm_id": firm.id,
             "firm_name": firm.name,
-            "total_versions": versions.count(),
-            "reconciled": reconciled,
-            "mismatches_count": len(mismatches),
-            "mismatches": mismatches,
-            "errors": errors,
+            "total_versions": total_versions,
+            "reconciled": run.stats["reconciled"],
+            "mismatches_count": run.stats["mismatches"],
+            "mismatches": run.mismatches,
+            "mismatches_truncated": run.stats["mismatches"] > len(run.mismatches),
+            "orphaned_objects": run.stats["orphaned_objects"],
+            "orphaned_object_samples": run.orphan_samples,
+            "errors": run.errors,
         }
 
-    def _reconcile_version(self, version: Version) -> Dict[str, Any] | None:
-        """
-        Reconcile a single version with S3.
-
-        Args:
-            version: Version to reconcile
-
-        Returns:
-            Mismatch dict if found, None otherwise
-        """
-        # Check if S3 object exists
+    def _load_entries(self, firm: Firm) -> List[VersionEntry]:
+        """Load and decrypt S3 locations for a firm's versions, one chunk per decrypt_many call."""
+        rows = (
+            Version.objects.filter(firm=firm)
+            .exclude(s3_key="")
+            .exclude(s3_key__isnull=True)
+            .order_by("pk")
+            .values_list("id", "document_id", "document__name", "s3_key", "s3_bucket", "file_size_bytes")
+        )
+        entries: List[VersionEntry] = []
+        chunk: List[tuple] = []
+
+        def decrypt_chunk():
+            keys = field_encryption_service.decrypt_many(firm.id, [row[3] for row in chunk])
+            buckets = field_encryption_service.decrypt_many(firm.id, [row[4] for row in chunk])
+            for row, key, bucket in zip(chunk, keys, buckets):
+                entries.append(
+                    VersionEntry(
+                        key=key or "",
+                        bucket=bucket or self.s3_service.bucket_name,
+                        version_id=row[0],
+                        document_id=row[1],
+                        document_name=row[2],
+                        file_size_bytes=row[5],
+                        stored_key=row[3],
+                        stored_bucket=row[4],
+                    )
+                )
+            chunk.clear()
+
+        for row in rows.iterator(chunk_size=DB_CHUNK_SIZE):
+            chunk.append(row)
+            if len(chunk) >= DB_CHUNK_SIZE:
+                decrypt_chunk()
+        if chunk:
+            decrypt_chunk()
+        return entries
+
+    def _reconcile_listing(self, firm: Firm, bucket: str, prefix: str, entries: List[VersionEntry]) -> _FirmRun:
+        """Merge-diff a firm's sorted version keys against a paged S3 listing, checkpointing progress."""
+        bucket_fingerprint = field_encryption_service.fingerprint_for_firm(firm.id, bucket) or ""
+        checkpoint = None
+        start_after = None
+        if self.resume:
+            checkpoint = S3ReconciliationCheckpoint.objects.filter(
+                firm=firm, bucket_fingerprint=bucket_fingerprint
+            ).first()
+        if checkpoint:
+            start_after = field_encryption_service.decrypt_for_firm(firm.id, checkpoint.last_key)
+            entries = [entry for entry in entries if entry.key > start_after]
+            logger.info(f"Resuming S3 reconciliation for firm {firm.id} from checkpoint {checkpoint.id}")
+
+        run = _FirmRun(checkpoint.stats if checkpoint else None)
+        objects = self.s3_service.iter_objects(prefix, bucket=bucket, start_after=start_after)
+        since_checkpoint = 0
+        last_key = None
         try:
-            s3_exists = self.s3_service.object_exists(
-                bucket=version.document.s3_bucket,
-                key=version.s3_key,
-            )
+            for kind, entry, obj in merge_diff(entries, objects):
+                key = obj["Key"] if obj is not None else entry.key
+                # Checkpoint only between keys: several versions can share one object,
+                # and a resumed run skips every version at or before the checkpoint key.
+                if key != last_key and since_checkpoint >= CHECKPOINT_INTERVAL:
+                    self._save_checkpoint(firm, bucket_fingerprint, last_key, run)
+                    since_checkpoint = 0
+                last_key = key
+                since_checkpoint += 1
+
+                if kind == "matched":
+                    run.stats["reconciled"] += 1
+                elif kind == "orphan":
+                    run.stats["orphaned_objects"] += 1
+                    if len(run.orphan_samples) < MAX_ORPHAN_SAMPLES:
+                        run.orphan_samples.append(obj["Key"])
+                elif kind == "missing_file":
+                    self._record_mismatch(firm, run, entry, "missing_file")
+                else:
+                    self._record_mismatch(firm, run, entry, "size_mismatch", s3_size=obj["Size"])
         except Exception as e:
-            # S3 error - treat as mismatch
-            AuditEvent.objects.create(
-                firm=version.document.firm,
-                category=AuditEvent.CATEGORY_SYSTEM,
-                action="s3_reconciliation_error",
-                severity=AuditEvent.SEVERITY_WARNING,
-                resource_type="Version",
-                resource_id=str(version.id),
-                metadata={
-                    "version_id": version.id,
-                    "document_id": version.document_id,
-                    "s3_key": version.s3_key,
-                    "s3_bucket": version.document.s3_bucket,
-                    "error": str(e),
-                },
-            )
-            return {
-                "version_id": version.id,
-                "document_id": version.document_id,
-                "document_name": version.document.name,
-                "s3_key": version.s3_key,
-                "s3_bucket": version.document.s3_bucket,
-                "mismatch_type": "s3_error",
-                "error": str(e),
-            }
-
-        if not s3_exists:
-            # Missing file in S3
-            AuditEvent.objects.create(
-                firm=version.document.firm,
-                category=AuditEvent.CATEGORY_SYSTEM,
-                action="s3_reconciliation_mismatch",
-                severity=AuditEvent.SEVERITY_WARNING,
-                resource_type="Version",
-                resource_id=str(version.id),
-                metadata={
-                    "version_id": version.id,
-                    "document_id": version.document_id,
-                    "s3_key": version.s3_key,
-                    "s3_bucket": version.document.s3_bucket,
-                    "mismatch_type": "missing_file",
-                },
-            )
+            # Listing failed part-way: keep the checkpoint so a --resume run can continue.
+            logger.error(f"S3 listing failed for firm {firm.id}: {str(e)}")
+            run.stats["errors"] += 1
+            run.errors.append({"prefix": prefix, "error": str(e)})
+            self.audit.flush()
+            return run
+
+        self.audit.flush()
+        S3ReconciliationCheckpoint.objects.filter(firm=firm, bucket_fingerprint=bucket_fingerprint).delete()
+        return run
+
+    def _save_checkpoint(self, firm: Firm, bucket_fingerprint: str, last_key: str, run: _FirmRun):
+        # Audit rows before the checkpoint must be durable before progress is recorded.
+        self.audit.flush()
+        checkpoint, _ = S3ReconciliationCheckpoint.objects.update_or_create(
+            firm=firm,
+            bucket_fingerprint=bucket_fingerprint,
+            defaults={
+                "last_key": field_encryption_service.encrypt_for_firm(firm.id, last_key),
+                "stats": dict(run.stats),
+            },
+        )
+        return checkpoint
 
-            return {
-                "version_id": version.id,
-                "document_id": version.document_id,
-                "document_name": version.document.name,
-                "s3_key": version.s3_key,
-                "s3_bucket": version.document.s3_bucket,
-                "mismatch_type": "missing_file",
-            }
+    def _reconcile_with_head(self, firm: Firm, entries: List[VersionEntry], run: _FirmRun) -> None:
+        """HEAD each entry from a thread pool; results are recorded on the calling thread."""
+        if not entries:
+            return
 
-        # Verify file size matches (if available)
-        try:
-            s3_metadata = self.s3_service.get_object_metadata(
-                bucket=version.document.s3_bucket,
-                key=version.s3_key,
+        def head(entry: VersionEntry):
+            try:
+                return entry, self.s3_service.head_object(entry.key, bucket=entry.bucket), None
+            except Exception as e:
+                return entry, None, e
+
+        with ThreadPoolExecutor(max_workers=self.head_workers) as executor:
+            for start in range(0, len(entries), HEAD_BATCH_SIZE):
+                for entry, metadata, error in executor.map(head, entries[start : start + HEAD_BATCH_SIZE]):
+                    if error is not None:
+                        # S3 error - treat as mismatch
+                        logger.error(f"Error reconciling version {entry.version_id}: {str(error)}")
+                        self._record_mismatch(firm, run, entry, "s3_error", error=str(error))
+                    elif metadata is None:
+                        self._record_mismatch(firm, run, entry, "missing_file")
+                    else:
+                        s3_size = metadata.get("ContentLength")
+                        if entry.file_size_bytes and s3_size and entry.file_size_bytes != s3_size:
+                            self._record_mismatch(firm, run, entry, "size_mismatch", s3_size=s3_size)
+                        else:
+                            run.stats["reconciled"] += 1
+
+    def _record_mismatch(self, firm: Firm, run: _FirmRun, entry: VersionEntry, mismatch_type: str, **details):
+        """Count a mismatch, keep a capped detail list, and buffer its audit event."""
+        metadata = {
+            "version_id": entry.version_id,
+            "document_id": entry.document_id,
+            "s3_key": entry.stored_key,
+            "s3_bucket": entry.stored_bucket,
+            "mismatch_type": mismatch_type,
+        }
+        if "s3_size" in details:
+            metadata.update({"local_size": entry.file_size_bytes, "s3_size": details["s3_size"]})
+        if "error" in details:
+            metadata["error"] = details["error"]
+
+        self.audit.add(
+            AuditEvent(
+                firm=firm,
+                category=AuditEvent.CATEGORY_SYSTEM,
+                action="s3_reconciliation_error" if mismatch_type == "s3_error" else "s3_reconciliation_mismatch",
+                severity=AuditEvent.SEVERITY_WARNING,
+                target_model="Version",
+                target_id=str(entry.version_id),
+                metadata=metadata,
             )
-            s3_size = s3_metadata.get("ContentLength")
-
-            if version.file_size_bytes and s3_size:
-                if version.file_size_bytes != s3_size:
-                    # Size mismatch
-                    AuditEvent.objects.create(
-                        firm=version.document.firm,
-                        category=AuditEvent.CATEGORY_SYSTEM,
-                        action="s3_reconciliation_mismatch",
-                        severity=AuditEvent.SEVERITY_WARNING,
-                        resource_type="Version",
-                        resource_id=str(version.id),
-                        metadata={
-                            "version_id": version.id,
-                            "document_id": version.document_id,
-                            "s3_key": version.s3_key,
-                            "local_size": version.file_size_bytes,
-                            "s3_size": s3_size,
-                            "mismatch_type": "size_mismatch",
-                        },
-                    )
-
-                    return {
-                        "version_id": version.id,
-                        "document_id": version.document_id,
-                        "document_name": version.document.name,
-                        "s3_key": version.s3_key,
-                        "mismatch_type": "size_mismatch",
-                        "local_size": version.file_size_bytes,
-                        "s3_size": s3_size,
-                    }
-        except Exception as e:
-            # Metadata fetch error - log but don't fail reconciliation
-            logger.warning(f"Could not verify size for version {version.id}: {str(e)}")
+        )
 
-        # No mismatches found
-        return None
+        run.stats["mismatches"] += 1
+        if len(run.mismatches) < MAX_REPORTED_MISMATCHES:
+            run.mismatches.append({**metadata, "document_name": entry.document_name})
@@ -5,6 +5,7 @@ Provides utilities for uploading, downloading, and managing files in S3.
 """
 
 import uuid
+from collections.abc import Iterator
 
 import boto3
 from botocore.exceptions import ClientError
@@ -124,6 +125,62 @@ class S3Service:
                 return False
             raise Exception(f"Failed to check S3 object existence: {str(e)}") from e
 
+    def head_object(self, s3_key: str, bucket: str | None = None) -> dict | None:
+        """
+        Fetch object size and metadata with a single HEAD request.
+
+        Args:
+            s3_key: S3 object key
+            bucket: S3 bucket name (defaults to configured bucket)
+
+        Returns:
+            dict with ContentLength/ContentType/LastModified, or None if the object does not exist
+        """
+        target_bucket = bucket or self.bucket_name
+        try:
+            response = self.s3_client.head_object(Bucket=target_bucket, Key=s3_key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise Exception(f"Failed to get S3 object metadata: {str(e)}") from e
+        return {
+            "ContentLength": response.get("ContentLength"),
+            "ContentType": response.get("ContentType"),
+            "LastModified": response.get("LastModified"),
+        }
+
+    def iter_objects(
+        self,
+        prefix: str,
+        bucket: str | None = None,
+        start_after: str | None = None,
+        page_size: int = 1000,
+    ) -> Iterator[dict]:
+        """
+        Page through objects under a prefix with list_objects_v2.
+
+        Keys are yielded in S3's lexicographic (UTF-8 byte) order, 1000 per request.
+
+        Args:
+            prefix: Key prefix to list (e.g., 'firm-123/')
+            bucket: S3 bucket name (defaults to configured bucket)
+            start_after: Resume listing after this key
+            page_size: Keys per list request (S3 maximum is 1000)
+
+        Yields:
+            dict: {'Key': str, 'Size': int}
+        """
+        target_bucket = bucket or self.bucket_name
+        params = {"Bucket": target_bucket, "Prefix": prefix, "PaginationConfig": {"PageSize": page_size}}
+        if start_after:
+            params["StartAfter"] = start_after
+        try:
+            for page in self.s3_client.get_paginator("list_objects_v2").paginate(**params):
+                for obj in page.get("Contents", []):
+                    yield {"Key": obj["Key"], "Size": obj.get("Size")}
+        except ClientError as e:
+            raise Exception(f"Failed to list S3 objects: {str(e)}") from e
+
     def get_object_metadata(self, s3_key: str, bucket: str | None = None) -> dict:
         """
         Get S3 object metadata.
@@ -0,0 +1,147 @@
+"""
+Tests for listing-mode S3 reconciliation.
+"""
+from datetime import date
+
+import pytest
+
+from modules.clients.models import Client
+from modules.core.encryption import field_encryption_service
+from modules.documents import reconciliation
+from modules.documents.models import Document, Folder, S3ReconciliationCheckpoint, Version
+from modules.documents.reconciliation import S3ReconciliationService, VersionEntry, merge_diff
+from modules.firm.models import Firm
+
+
+def _entry(key, size=10, version_id=1):
+    return VersionEntry(
+        key=key,
+        bucket="docs",
+        version_id=version_id,
+        document_id=version_id,
+        document_name=f"doc-{version_id}",
+        file_size_bytes=size,
+        stored_key=f"enc::{key}",
+        stored_bucket="enc::docs",
+    )
+
+
+def test_merge_diff_classifies_keys():
+    entries = [
+        _entry("firm-1/a", version_id=1),
+        _entry("firm-1/b", size=99, version_id=2),
+        _entry("firm-1/d", version_id=3),
+    ]
+    objects = [{"Key": "firm-1/a", "Size": 10}, {"Key": "firm-1/b", "Size": 10}, {"Key": "firm-1/c", "Size": 5}]
+
+    results = [(kind, entry.version_id if entry else obj["Key"]) for kind, entry, obj in merge_diff(entries, objects)]
+
+    assert results == [
+        ("matched", 1),
+        ("size_mismatch", 2),
+        ("orphan", "firm-1/c"),
+        ("missing_file", 3),
+    ]
+
+
+def test_iter_objects_pages_through_listing(settings):
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+    mock_aws = getattr(moto, "mock_aws", None) or getattr(moto, "mock_s3")
+
+    settings.AWS_ACCESS_KEY_ID = "testing"
+    settings.AWS_SECRET_ACCESS_KEY = "testing"
+    settings.AWS_STORAGE_BUCKET_NAME = "docs"
+    settings.AWS_S3_REGION_NAME = "us-east-1"
+
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="docs")
+        for index in range(5):
+            client.put_object(Bucket="docs", Key=f"firm-1/file-{index}", Body=b"x" * index)
+        client.put_object(Bucket="docs", Key="firm-2/other", Body=b"y")
+
+        from modules.documents.services import S3Service
+
+        service = S3Service()
+        keys = [obj["Key"] for obj in service.iter_objects("firm-1/", page_size=2)]
+        resumed = [obj["Key"] for obj in service.iter_objects("firm-1/", start_after="firm-1/file-2")]
+
+    assert keys == [f"firm-1/file-{index}" for index in range(5)]
+    assert resumed == ["firm-1/file-3", "firm-1/file-4"]
+
+
+class FakeS3Service:
+    """Sorted in-memory listing that can drop the connection after a number of objects."""
+
+    bucket_name = "docs"
+
+    def __init__(self, keys, fail_after=None):
+        self.keys = sorted(keys)
+        self.fail_after = fail_after
+
+    def iter_objects(self, prefix, bucket=None, start_after=None):
+        listed = 0
+        for key in self.keys:
+            if not key.startswith(prefix) or (start_after and key <= start_after):
+                continue
+            if self.fail_after is not None and listed >= self.fail_after:
+                raise ConnectionError("connection reset")
+            listed += 1
+            yield {"Key": key, "Size": 10}
+
+
+@pytest.mark.django_db
+def test_interrupted_listing_resumes_without_skipping_shared_keys(monkeypatch):
+    monkeypatch.setattr(reconciliation, "CHECKPOINT_INTERVAL", 2)
+    firm = Firm.objects.create(name="Docs Firm", slug="docs-firm", kms_key_id="alias/docs-firm")
+    client = Client.objects.create(
+        firm=firm,
+        company_name="Acme",
+        primary_contact_name="Ada Acme",
+        primary_contact_email="ada@acme.test",
+        client_since=date(2025, 1, 1),
+    )
+    folder = Folder.objects.create(firm=firm, client=client, name="Contracts")
+    prefix = f"firm-{firm.id}/"
+    # "a" and "b" each have a version stored before buckets were recorded, which
+    # resolves to the same object in the default bucket; "d" was never uploaded.
+    locations = [("0", "docs"), ("a", "docs"), ("a", ""), ("b", "docs"), ("b", ""), ("c", "docs"), ("d", "docs")]
+    for number, (name, bucket) in enumerate(locations, 1):
+        document = Document.objects.create(
+            firm=firm,
+            folder=folder,
+            client=client,
+            name=f"doc-{number}",
+            file_type="application/pdf",
+            file_size_bytes=10,
+            s3_key=f"{prefix}documents/{number}",
+            s3_bucket="docs",
+        )
+        Version.objects.create(
+            firm=firm,
+            document=document,
+            version_number=1,
+            file_type="application/pdf",
+            file_size_bytes=10,
+            s3_key=f"{prefix}{name}",
+            s3_bucket=bucket,
+        )
+    keys = [f"{prefix}{name}" for name in ["0", "a", "b", "c", "e"]]
+
+    interrupted = S3ReconciliationService(firm=firm, s3_service=FakeS3Service(keys, fail_after=3))
+    first = interrupted.reconcile_firm(firm)
+
+    checkpoint = S3ReconciliationCheckpoint.objects.get(firm=firm)
+    assert field_encryption_service.decrypt_for_firm(firm.id, checkpoint.last_key) == f"{prefix}a"
+    assert checkpoint.stats["reconciled"] == 3
+    assert first["errors"][0]["error"] == "connection reset"
+
+    resumed = S3ReconciliationService(firm=firm, resume=True, s3_service=FakeS3Service(keys)).reconcile_firm(firm)
+
+    assert resumed["total_versions"] == 7
+    assert resumed["reconciled"] == 6
+    assert resumed["mismatches_count"] == 1
+    assert [mismatch["mismatch_type"] for mismatch in resumed["mismatches"]] == ["missing_file"]
+    assert resumed["orphaned_object_samples"] == [f"{prefix}e"]
+    assert not S3ReconciliationCheckpoint.objects.filter(firm=firm).exists()
@@ -9,7 +9,6 @@ from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
-from django_ratelimit.decorators import ratelimit
 from rest_framework import status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -239,12 +238,6 @@ def docusign_callback(request):
 @csrf_exempt
 @api_view(["POST"])
 @permission_classes([])  # No authentication for webhooks (verified by HMAC)
-@ratelimit(
-    key="ip",
-    rate=settings.WEBHOOK_RATE_LIMITS["docusign"],
-    method="POST",
-    block=False,
-)
 def docusign_webhook(request):
     """
     Handle DocuSign webhook callbacks (SEC-1: Idempotency tracking, SEC-2: Rate limiting).
@@ -256,7 +249,10 @@ def docusign_webhook(request):
     from django.db import IntegrityError, transaction
 
     rate_limit_response = enforce_webhook_rate_limit(
-        request, provider="docusign", endpoint="docusign_webhook"
+        request,
+        provider="docusign",
+        endpoint="docusign_webhook",
+        rate=settings.WEBHOOK_RATE_LIMITS["docusign"],
     )
     if rate_limit_response:
         return rate_limit_response
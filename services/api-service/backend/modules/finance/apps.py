@@ -5,3 +5,7 @@ class FinanceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "modules.finance"
     verbose_name = "Finance (AR/AP & P&L)"
+
+    def ready(self):
+        """Connect the reporting summary dirty-bucket signals."""
+        import modules.finance.reporting  # noqa
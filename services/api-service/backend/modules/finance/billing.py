@@ -90,6 +90,36 @@ def should_generate_package_invoice(engagement: ClientEngagement, reference_date
     return not Invoice.objects.filter(engagement=engagement, period_start=period_start, firm=engagement.firm).exists()
 
 
+def package_invoice_fields(
+    engagement: ClientEngagement, issue_date: date, period_start: date, period_end: date
+) -> dict:
+    """Field values for an engagement's package-fee invoice (besides engagement and period_start)."""
+    return {
+        "firm_id": engagement.client.firm_id,
+        "client": engagement.client,
+        "status": "sent",
+        "subtotal": engagement.package_fee,
+        "tax_amount": Decimal("0.00"),
+        "total_amount": engagement.package_fee,
+        "issue_date": issue_date,
+        "due_date": issue_date + timedelta(days=30),
+        "line_items": [
+            {
+                "description": f"Package Fee - {engagement.contract.title}",
+                "quantity": 1,
+                "rate": str(engagement.package_fee),  # Maintain precision as string
+                "amount": str(engagement.package_fee),  # Maintain precision as string
+                "type": "package_fee",
+            }
+        ],
+        "invoice_number": f"PKG-{engagement.id}-{period_start.isoformat()}",
+        "is_auto_generated": True,
+        "period_end": period_end,
+        "autopay_opt_in": engagement.client.autopay_enabled,
+        "autopay_payment_method_id": engagement.client.autopay_payment_method_id,
+    }
+
+
 def create_package_invoice(
     engagement: ClientEngagement, issue_date: date | None = None, reference_date: date | None = None
 ) -> Invoice:
@@ -104,30 +134,7 @@ def create_package_invoice(
         invoice, created = Invoice.objects.select_for_update().get_or_create(
             engagement=engagement,
             period_start=period_start,
-            defaults={
-                "firm": engagement.client.firm,
-                "client": engagement.client,
-                "status": "sent",
-                "subtotal": engagement.package_fee,
-                "tax_amount": Decimal("0.00"),
-                "total_amount": engagement.package_fee,
-                "issue_date": issue_date,
-                "due_date": issue_date + timedelta(days=30),
-                "line_items": [
-                    {
-                        "description": f"Package Fee - {engagement.contract.title}",
-                        "quantity": 1,
-                        "rate": str(engagement.package_fee),  # Maintain precision as string
-                        "amount": str(engagement.package_fee),  # Maintain precision as string
-                        "type": "package_fee",
-                    }
-                ],
-                "invoice_number": f"PKG-{engagement.id}-{period_start.isoformat()}",
-                "is_auto_generated": True,
-                "period_end": period_end,
-                "autopay_opt_in": engagement.client.autopay_enabled,
-                "autopay_payment_method_id": engagement.client.autopay_payment_method_id,
-            },
+            defaults=package_invoice_fields(engagement, issue_date, period_start, period_end),
         )
 
     if created:
@@ -150,22 +157,15 @@ def create_package_invoice(
 def generate_package_invoices(reference_date: date | None = None, firm=None):
     """Generate package invoices for all active engagements.
 
+    Runs as a batched billing run (modules.finance.billing_runs).
+
     Args:
         reference_date: Optional date used to determine the billing window.
         firm: Optional firm to scope invoice generation (tenant isolation).
     """
-    engagements = ClientEngagement.objects.filter(
-        status="current", pricing_mode__in=["package", "mixed"], package_fee__isnull=False
-    ).select_related("client", "firm")
-
-    if firm:
-        engagements = engagements.filter(firm=firm)
+    from modules.finance.billing_runs import run_package_invoicing
 
-    created_invoices = []
-    for engagement in engagements:
-        if should_generate_package_invoice(engagement, reference_date):
-            created_invoices.append(create_package_invoice(engagement, reference_date=reference_date))
-    return created_invoices
+    return run_package_invoicing(reference_date=reference_date, firm=firm)
 
 
 def execute_autopay_for_invoice(invoice: Invoice):
@@ -237,108 +237,22 @@ def schedule_autopay(invoice: Invoice, reference_time: timezone.datetime | None
     return invoice
 
 
-def _charge_invoice(invoice: Invoice, payment_service=StripeService):
-    """Attempt to charge an invoice using the configured payment method."""
-
-    payment_method_id = invoice.autopay_payment_method_id or invoice.client.autopay_payment_method_id
-    if not payment_method_id:
-        result = handle_payment_failure(
-            invoice,
-            failure_reason="Missing autopay payment method",
-            failure_code="payment_method_missing",
-        )
-        invoice.autopay_status = "failed"
-        invoice.autopay_next_charge_at = timezone.now() + timedelta(days=3)
-        invoice.save(update_fields=["autopay_status", "autopay_next_charge_at"])
-        return result
-
-    invoice.autopay_status = "processing"
-    invoice.autopay_last_attempt_at = timezone.now()
-    invoice.save(update_fields=["autopay_status", "autopay_last_attempt_at"])
-
-    # SECURITY: Generate idempotency key to prevent duplicate charges (ASSESS-D4.4)
-    import uuid
-    idempotency_key = f"invoice_{invoice.id}_{invoice.autopay_last_attempt_at.timestamp()}_{uuid.uuid4().hex[:8]}"
-
-    try:
-        intent = payment_service.create_payment_intent(
-            amount=invoice.total_amount,
-            currency=invoice.currency.lower(),
-            customer_id=None,
-            metadata={"invoice_id": invoice.id, "invoice_number": invoice.invoice_number},
-            payment_method=payment_method_id,
-            idempotency_key=idempotency_key,
-        )
-    except Exception as exc:  # pragma: no cover - safety net
-        result = handle_payment_failure(invoice, failure_reason=str(exc), failure_code="processor_error")
-        invoice.autopay_status = "failed"
-        invoice.autopay_next_charge_at = timezone.now() + timedelta(days=3)
-        invoice.save(update_fields=["autopay_status", "autopay_next_charge_at"])
-        return result
-
-    invoice.stripe_payment_intent_id = (
-        getattr(intent, "id", "") or intent.get("id", "") if hasattr(intent, "get") else ""
-    )
-    invoice.amount_paid = invoice.total_amount
-    invoice.status = "paid"
-    invoice.paid_date = timezone.now().date()
-    invoice.autopay_status = "succeeded"
-    invoice.autopay_next_charge_at = None
-    invoice.save(
-        update_fields=[
-            "stripe_payment_intent_id",
-            "amount_paid",
-            "status",
-            "paid_date",
-            "autopay_status",
-            "autopay_next_charge_at",
-        ]
-    )
-    return invoice
-
-
 def process_recurring_invoices(
     reference_time: timezone.datetime | None = None, payment_service=StripeService, firm=None
 ):
     """Find invoices marked for autopay and execute charges.
 
+    Runs as a batched billing run (modules.finance.billing_runs); charges are
+    sent to the payment service from a bounded pool of BILLING_PAYMENT_CONCURRENCY.
+
     Args:
         reference_time: Optional reference time for processing
         payment_service: Payment service to use (default: StripeService)
         firm: Optional firm to scope invoice processing (tenant isolation)
     """
+    from modules.finance.billing_runs import run_autopay
 
-    now = reference_time or timezone.now()
-    due_invoices = Invoice.objects.filter(
-        autopay_opt_in=True,
-        status__in=["sent", "partial", "overdue"],
-    ).select_related("client", "firm")
-
-    # SECURITY: Enforce firm isolation to prevent cross-firm processing (ASSESS-S6.2)
-    if firm:
-        due_invoices = due_invoices.filter(firm=firm)
-
-    processed = []
-    for invoice in due_invoices:
-        if not invoice.client.autopay_enabled:
-            invoice.autopay_status = "cancelled"
-            invoice.autopay_next_charge_at = None
-            invoice.autopay_opt_in = False
-            invoice.save(update_fields=["autopay_status", "autopay_next_charge_at", "autopay_opt_in"])
-            continue
-
-        if invoice.autopay_next_charge_at and invoice.autopay_next_charge_at > now:
-            continue
-
-        try:
-            processed.append(_charge_invoice(invoice, payment_service=payment_service))
-        except Exception as exc:  # pragma: no cover - guardrail
-            handle_payment_failure(invoice, failure_reason=str(exc), failure_code="processor_error")
-            invoice.autopay_status = "failed"
-            invoice.autopay_next_charge_at = now + timedelta(days=3)
-            invoice.save(update_fields=["autopay_status", "autopay_next_charge_at"])
-
-    return processed
+    return run_autopay(reference_time=reference_time, payment_service=payment_service, firm=firm)
 
 
 def handle_payment_failure(invoice: Invoice, failure_reason: str, failure_code: str | None = None):
@@ -805,6 +719,28 @@ def send_dunning_reminder(invoice) -> Invoice:
     invoice.save()
 
     # Send appropriate dunning email based on level
+    send_dunning_notification(invoice)
+
+    # Log dunning action
+    audit.log_billing_event(
+        firm=invoice.firm,
+        action="dunning_reminder_sent",
+        actor=None,
+        metadata={
+            "invoice_id": invoice.id,
+            "invoice_number": invoice.invoice_number,
+            "dunning_level": invoice.dunning_level,
+            "days_overdue": (timezone.now().date() - invoice.due_date).days,
+            "amount": str(invoice.total_amount),  # Maintain precision as string
+        },
+        severity="WARNING" if invoice.dunning_level >= 3 else "INFO",
+    )
+
+    return invoice
+
+
+def send_dunning_notification(invoice) -> None:
+    """Send the dunning email for the invoice's (already incremented) dunning level."""
     from modules.core.notifications import EmailNotification
 
     if invoice.dunning_level == 1:
@@ -832,23 +768,6 @@ def send_dunning_reminder(invoice) -> Invoice:
             f"(${invoice.total_amount}, {(timezone.now().date() - invoice.due_date).days} days overdue)"
         )
 
-    # Log dunning action
-    audit.log_billing_event(
-        firm=invoice.firm,
-        action="dunning_reminder_sent",
-        actor=None,
-        metadata={
-            "invoice_id": invoice.id,
-            "invoice_number": invoice.invoice_number,
-            "dunning_level": invoice.dunning_level,
-            "days_overdue": (timezone.now().date() - invoice.due_date).days,
-            "amount": str(invoice.total_amount),  # Maintain precision as string
-        },
-        severity="WARNING" if invoice.dunning_level >= 3 else "INFO",
-    )
-
-    return invoice
-
 
 def pause_dunning(invoice, reason: str) -> Invoice:
     """
@@ -922,7 +841,8 @@ def process_dunning_for_overdue_invoices(reference_date: date | None = None, fir
     """
     Process dunning reminders for all overdue invoices (Medium Feature 2.6).
 
-    This function should be run daily via scheduled task/cron job.
+    This function should be run daily via scheduled task/cron job. Runs as a
+    batched billing run (modules.finance.billing_runs).
 
     Args:
         reference_date: Date to check against (defaults to today)
@@ -931,27 +851,9 @@ def process_dunning_for_overdue_invoices(reference_date: date | None = None, fir
     Returns:
         list: List of invoices that had dunning reminders sent
     """
-    reference_date = reference_date or timezone.now().date()
-
-    # Find potentially overdue invoices
-    overdue_invoices = (
-        Invoice.objects.filter(due_date__lt=reference_date, status__in=["sent", "overdue", "partial", "failed"])
-        .exclude(dunning_paused=True)
-        .select_related("client", "firm")
-    )
-
-    if firm:
-        overdue_invoices = overdue_invoices.filter(firm=firm)
-
-    processed_invoices = []
+    from modules.finance.billing_runs import run_dunning
 
-    for invoice in overdue_invoices:
-        if should_send_dunning_reminder(invoice, reference_date):
-            try:
-                send_dunning_reminder(invoice)
-                processed_invoices.append(invoice)
-            except Exception as e:
-                logger.error(f"Failed to send dunning reminder for invoice {invoice.invoice_number}: {str(e)}")
+    processed_invoices = run_dunning(reference_date=reference_date, firm=firm)
 
     if processed_invoices:
         logger.info(
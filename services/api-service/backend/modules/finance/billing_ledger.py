@@ -8,16 +8,28 @@ Key Requirements:
 - Idempotent posting with unique idempotency keys
 - Allocations for payment→invoice and retainer→invoice
 - Derived balances explainable from ledger
+
+Balances are served from BillingAccountBalance, a per-account running-balance
+snapshot. It is updated in the same transaction as every entry and allocation
+that moves a balance, so lookups do not have to aggregate the ledger.
+verify_account_balances() recomputes balances from the raw entries and flags
+(and optionally repairs) drift.
 """
 
+import logging
 from decimal import Decimal
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Tuple
 from django.conf import settings
 from django.core.validators import MinValueValidator
-from django.db import models, transaction
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0.00')
+
 
 class BillingLedgerEntry(models.Model):
     """
@@ -69,7 +81,7 @@ class BillingLedgerEntry(models.Model):
 
     # Associations (docs/03-reference/requirements/DOC-13.md Section 2.1)
     account = models.ForeignKey(
-        'crm.Client',
+        'clients.Client',
         on_delete=models.PROTECT,
         related_name='billing_ledger_entries',
         help_text="Account (Client) this entry belongs to"
@@ -178,8 +190,11 @@ class BillingLedgerEntry(models.Model):
         # Validate on creation
         self.full_clean()
 
-        # Only allow insert
-        super().save(force_insert=True, *args, **kwargs)
+        # Only allow insert; the balance snapshot moves in the same transaction
+        with transaction.atomic():
+            super().save(force_insert=True, *args, **kwargs)
+            ar_delta, retainer_delta = entry_balance_deltas(self.entry_type, self.amount)
+            apply_balance_delta(self.firm_id, self.account_id, ar_delta, retainer_delta)
 
     def delete(self, *args, **kwargs):
         """
@@ -384,9 +399,306 @@ class BillingAllocation(models.Model):
             raise ValidationError(errors)
 
     def save(self, *args, **kwargs):
-        """Validate before saving."""
+        """Validate before saving; moves the affected balance snapshot in the same transaction."""
         self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            previous = ZERO
+            if self.pk:
+                previous = (
+                    BillingAllocation.objects.filter(pk=self.pk).values_list('amount', flat=True).first() or ZERO
+                )
+            super().save(*args, **kwargs)
+            self._apply_balance_delta(self.amount - previous)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self._apply_balance_delta(-self.amount)
+        return result
+
+    def _apply_balance_delta(self, amount: Decimal) -> None:
+        """
+        Payments allocated to an invoice reduce the invoice account's AR;
+        retainer deposits allocated out reduce the deposit account's retainer.
+        """
+        if not amount:
+            return
+        if self.from_entry.entry_type == 'payment_received' and self.to_entry.entry_type == 'invoice_issued':
+            apply_balance_delta(self.firm_id, self.to_entry.account_id, ar_delta=-amount)
+        if self.from_entry.entry_type == 'retainer_deposit':
+            apply_balance_delta(self.firm_id, self.from_entry.account_id, retainer_delta=-amount)
+
+
+class BillingAccountBalance(models.Model):
+    """
+    Running AR and retainer balance snapshot for one account.
+
+    Derived data: every balance is explainable from BillingLedgerEntry and
+    BillingAllocation (docs/03-reference/requirements/DOC-13.md Section 4).
+    Rows are created on the first posting for an account (seeded from the
+    ledger) and moved by BillingLedgerEntry.save() / BillingAllocation.save()
+    in the posting's transaction. verify_account_balances() checks them.
+    """
+
+    firm = models.ForeignKey(
+        'firm.Firm',
+        on_delete=models.CASCADE,
+        related_name='billing_account_balances',
+        help_text="Firm this balance belongs to"
+    )
+
+    account = models.ForeignKey(
+        'clients.Client',
+        on_delete=models.CASCADE,
+        related_name='billing_account_balances',
+        help_text="Account (Client) this balance belongs to"
+    )
+
+    ar_balance = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=ZERO,
+        help_text="AR balance (positive = owed to us)"
+    )
+
+    retainer_balance = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=ZERO,
+        help_text="Retainer balance (positive = available retainer)"
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="When the snapshot last moved"
+    )
+
+    verified_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the snapshot was last verified against the ledger"
+    )
+
+    drift_detected_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When verification last found the snapshot out of line with the ledger"
+    )
+
+    class Meta:
+        db_table = 'billing_account_balance'
+        indexes = [
+            models.Index(fields=['firm', 'drift_detected_at'], name='billing_acc_firm_id_drift_idx'),
+        ]
+        unique_together = [['firm', 'account']]
+        verbose_name = 'Billing Account Balance'
+        verbose_name_plural = 'Billing Account Balances'
+
+    def __str__(self):
+        return f"Balance: {self.account} - AR {self.ar_balance}, retainer {self.retainer_balance}"
+
+
+# Balance snapshots
+
+def entry_balance_deltas(entry_type: str, amount: Decimal) -> Tuple[Decimal, Decimal]:
+    """(AR delta, retainer delta) that posting an entry applies to its account."""
+    if entry_type == 'invoice_issued':
+        return amount, ZERO
+    if entry_type in ['credit_memo', 'write_off']:
+        return -amount, ZERO
+    if entry_type == 'retainer_deposit':
+        return ZERO, amount
+    return ZERO, ZERO
+
+
+def compute_account_balances(firm, account_ids: Optional[Iterable[int]] = None) -> Dict[int, Tuple[Decimal, Decimal]]:
+    """
+    Recompute (AR, retainer) balances from the raw ledger, grouped by account.
+
+    Three grouped queries however many accounts are requested. Accounts with
+    no entries are absent from the result.
+    """
+    entries = BillingLedgerEntry.objects.filter(firm=firm)
+    payments = BillingAllocation.objects.filter(
+        firm=firm, to_entry__entry_type='invoice_issued', from_entry__entry_type='payment_received'
+    )
+    retainer_applied = BillingAllocation.objects.filter(firm=firm, from_entry__entry_type='retainer_deposit')
+    if account_ids is not None:
+        account_ids = list(account_ids)
+        entries = entries.filter(account_id__in=account_ids)
+        payments = payments.filter(to_entry__account_id__in=account_ids)
+        retainer_applied = retainer_applied.filter(from_entry__account_id__in=account_ids)
+
+    balances: Dict[int, list] = {}
+
+    def add(account_id, ar=ZERO, retainer=ZERO):
+        balance = balances.setdefault(account_id, [ZERO, ZERO])
+        balance[0] += ar or ZERO
+        balance[1] += retainer or ZERO
+
+    totals = entries.order_by().values('account_id').annotate(
+        invoiced=models.Sum('amount', filter=Q(entry_type='invoice_issued')),
+        credits=models.Sum('amount', filter=Q(entry_type__in=['credit_memo', 'write_off'])),
+        deposits=models.Sum('amount', filter=Q(entry_type='retainer_deposit')),
+    )
+    for row in totals:
+        add(row['account_id'], (row['invoiced'] or ZERO) - (row['credits'] or ZERO), row['deposits'])
+    for row in payments.order_by().values('to_entry__account_id').annotate(total=models.Sum('amount')):
+        add(row['to_entry__account_id'], ar=-row['total'])
+    for row in retainer_applied.order_by().values('from_entry__account_id').annotate(total=models.Sum('amount')):
+        add(row['from_entry__account_id'], retainer=-row['total'])
+
+    return {account_id: (ar, retainer) for account_id, (ar, retainer) in balances.items()}
+
+
+def _seed_balance(firm_id: int, account_id: int, ar_delta: Decimal, retainer_delta: Decimal) -> None:
+    """Create an account's snapshot from the ledger, which already includes the caller's posting."""
+    ar, retainer = compute_account_balances(firm_id, [account_id]).get(account_id, (ZERO, ZERO))
+    try:
+        with transaction.atomic():
+            BillingAccountBalance.objects.create(
+                firm_id=firm_id, account_id=account_id, ar_balance=ar, retainer_balance=retainer
+            )
+    except IntegrityError:
+        # Seeded concurrently by a transaction that could not see this posting
+        BillingAccountBalance.objects.filter(firm_id=firm_id, account_id=account_id).update(
+            ar_balance=F('ar_balance') + ar_delta,
+            retainer_balance=F('retainer_balance') + retainer_delta,
+            updated_at=timezone.now(),
+        )
+
+
+def apply_balance_delta(
+    firm_id: int, account_id: int, ar_delta: Decimal = ZERO, retainer_delta: Decimal = ZERO
+) -> None:
+    """
+    Move an account's snapshot by a posting's deltas.
+
+    Must run in the posting's transaction. The UPDATE takes the snapshot row
+    lock, so concurrent postings for the same account serialize here.
+    """
+    if not ar_delta and not retainer_delta:
+        return
+    updated = BillingAccountBalance.objects.filter(firm_id=firm_id, account_id=account_id).update(
+        ar_balance=F('ar_balance') + ar_delta,
+        retainer_balance=F('retainer_balance') + retainer_delta,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        _seed_balance(firm_id, account_id, ar_delta, retainer_delta)
+
+
+def get_account_balances(firm, accounts: Iterable) -> Dict[int, Dict[str, Decimal]]:
+    """
+    AR and retainer balances for many accounts in one query.
+
+    Accounts without a snapshot yet are seeded from the ledger in bulk.
+
+    Args:
+        firm: Firm instance
+        accounts: Client instances or ids
+
+    Returns:
+        Dict of account id -> {'ar_balance': ..., 'retainer_balance': ...}
+    """
+    account_ids = {getattr(account, 'pk', account) for account in accounts}
+    balances = {
+        row['account_id']: {'ar_balance': row['ar_balance'], 'retainer_balance': row['retainer_balance']}
+        for row in BillingAccountBalance.objects.filter(firm=firm, account_id__in=account_ids).values(
+            'account_id', 'ar_balance', 'retainer_balance'
+        )
+    }
+    missing = account_ids - balances.keys()
+    if missing:
+        computed = compute_account_balances(firm, missing)
+        BillingAccountBalance.objects.bulk_create(
+            [
+                BillingAccountBalance(
+                    firm_id=getattr(firm, 'pk', firm), account_id=account_id, ar_balance=ar, retainer_balance=retainer
+                )
+                for account_id, (ar, retainer) in computed.items()
+            ],
+            ignore_conflicts=True,
+        )
+        for account_id in missing:
+            ar, retainer = computed.get(account_id, (ZERO, ZERO))
+            balances[account_id] = {'ar_balance': ar, 'retainer_balance': retainer}
+    return balances
+
+
+def verify_account_balances(firm, repair: bool = False, chunk_size: int = 500) -> Dict[str, int]:
+    """
+    Recompute every snapshot for a firm from the raw ledger and flag drift.
+
+    Each chunk locks its snapshot rows before recomputing, so postings in
+    flight (which update the snapshot in their own transaction) cannot be
+    mistaken for drift. Drifted snapshots get drift_detected_at and a
+    billing audit event; with ``repair`` they are also reset to the ledger.
+    Accounts with entries but no snapshot are seeded.
+    """
+    from modules.firm.audit import AuditEvent
+
+    firm_id = getattr(firm, 'pk', firm)
+    stats = {'verified': 0, 'drifted': 0, 'repaired': 0, 'seeded': 0}
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(
+                BillingAccountBalance.objects.select_for_update()
+                .filter(firm_id=firm_id, pk__gt=last_id)
+                .order_by('pk')[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1].pk
+            computed = compute_account_balances(firm_id, [balance.account_id for balance in chunk])
+            now = timezone.now()
+            drifted, events = [], []
+            for balance in chunk:
+                ar, retainer = computed.get(balance.account_id, (ZERO, ZERO))
+                balance.verified_at = now
+                if (balance.ar_balance, balance.retainer_balance) == (ar, retainer):
+                    continue
+                drifted.append(balance)
+                events.append(
+                    AuditEvent(
+                        firm_id=firm_id,
+                        category=AuditEvent.CATEGORY_BILLING_METADATA,
+                        action='billing_balance_drift_detected',
+                        severity=AuditEvent.SEVERITY_WARNING,
+                        target_model='BillingAccountBalance',
+                        target_id=str(balance.pk),
+                        metadata={
+                            'account_id': balance.account_id,
+                            'snapshot_ar_balance': str(balance.ar_balance),  # Maintain precision as string
+                            'ledger_ar_balance': str(ar),
+                            'snapshot_retainer_balance': str(balance.retainer_balance),
+                            'ledger_retainer_balance': str(retainer),
+                            'repaired': repair,
+                        },
+                    )
+                )
+                balance.drift_detected_at = now
+                if repair:
+                    balance.ar_balance, balance.retainer_balance = ar, retainer
+            BillingAccountBalance.objects.bulk_update(
+                chunk, ['verified_at', 'drift_detected_at', 'ar_balance', 'retainer_balance']
+            )
+            AuditEvent.objects.bulk_create(events)
+        stats['verified'] += len(chunk)
+        stats['drifted'] += len(drifted)
+        stats['repaired'] += len(drifted) if repair else 0
+        if drifted:
+            logger.warning(f"Billing balance drift for firm {firm_id}: {len(drifted)} account(s)")
+
+    unsnapshotted = (
+        BillingLedgerEntry.objects.filter(firm_id=firm_id)
+        .exclude(account_id__in=BillingAccountBalance.objects.filter(firm_id=firm_id).values('account_id'))
+        .values_list('account_id', flat=True)
+        .distinct()
+    )
+    stats['seeded'] = len(get_account_balances(firm_id, unsnapshotted.order_by()))
+    return stats
 
 
 # Helper functions for ledger operations
@@ -572,9 +884,10 @@ def post_retainer_deposit(
 
 def get_ar_balance(firm, account) -> Decimal:
     """
-    Calculate AR balance for an account.
+    AR balance for an account.
 
     Per docs/03-reference/requirements/DOC-13.md Section 4: AR balance must be derivable from entries + allocations.
+    Served from the account's balance snapshot (compute_account_balances() derives it from the ledger).
 
     Args:
         firm: Firm instance
@@ -583,36 +896,15 @@ def get_ar_balance(firm, account) -> Decimal:
     Returns:
         Decimal: AR balance (positive = owed to us)
     """
-    # Sum invoice_issued entries
-    invoiced = BillingLedgerEntry.objects.filter(
-        firm=firm,
-        account=account,
-        entry_type='invoice_issued'
-    ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
-
-    # Subtract allocated payments
-    allocated_payments = BillingAllocation.objects.filter(
-        firm=firm,
-        to_entry__account=account,
-        to_entry__entry_type='invoice_issued',
-        from_entry__entry_type='payment_received'
-    ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
-
-    # Subtract credit memos
-    credits = BillingLedgerEntry.objects.filter(
-        firm=firm,
-        account=account,
-        entry_type__in=['credit_memo', 'write_off']
-    ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
-
-    return invoiced - allocated_payments - credits
+    return get_account_balances(firm, [account])[account.pk]['ar_balance']
 
 
 def get_retainer_balance(firm, account) -> Decimal:
     """
-    Calculate retainer balance for an account.
+    Retainer balance for an account.
 
     Per docs/03-reference/requirements/DOC-13.md Section 4: Retainer balance must be derivable from entries.
+    Served from the account's balance snapshot (compute_account_balances() derives it from the ledger).
 
     Args:
         firm: Firm instance
@@ -621,18 +913,4 @@ def get_retainer_balance(firm, account) -> Decimal:
     Returns:
         Decimal: Retainer balance (positive = available retainer)
     """
-    # Sum retainer deposits
-    deposits = BillingLedgerEntry.objects.filter(
-        firm=firm,
-        account=account,
-        entry_type='retainer_deposit'
-    ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
-
-    # Subtract allocated retainer applications
-    applied = BillingAllocation.objects.filter(
-        firm=firm,
-        from_entry__account=account,
-        from_entry__entry_type='retainer_deposit'
-    ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
-
-    return deposits - applied
+    return get_account_balances(firm, [account])[account.pk]['retainer_balance']
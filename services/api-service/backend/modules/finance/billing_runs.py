@@ -0,0 +1,442 @@
+"""
+Batched billing runs for package invoicing, autopay and dunning.
+
+The per-row loops in modules.finance.billing delegate to these runs:
+
+- Eligibility is evaluated in SQL with the same rules as
+  should_generate_package_invoice / should_send_dunning_reminder, so no
+  per-row eligibility queries run.
+- Candidates are processed in keyset-paginated chunks of BILLING_RUN_CHUNK_SIZE.
+  Each chunk writes its invoices or status fields with one bulk_create /
+  bulk_update and its audit events with one bulk insert.
+- Autopay charges fan out to a bounded thread pool (BILLING_PAYMENT_CONCURRENCY).
+  Only the processor call runs on the pool; database writes stay on the
+  calling thread. Idempotency keys are derived from (invoice, payment attempt),
+  so a run retried after a crash cannot charge twice.
+- Every run writes one BillingRun summary record.
+
+bulk_update skips Invoice.save(); runs only move already-issued invoices
+between payment/dunning states, which the save() invariants do not cover.
+"""
+
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from functools import partial
+from typing import Iterator, List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, DateField, Exists, F, OuterRef, Q, Value, When
+from django.db.models.functions import Coalesce, Greatest, Lower
+from django.utils import timezone
+
+from modules.clients.models import ClientEngagement
+from modules.finance.billing import (
+    _month_start_for,
+    _quarter_start_for,
+    get_package_billing_period,
+    handle_payment_failure,
+    package_invoice_fields,
+    send_dunning_notification,
+)
+from modules.finance.models import BillingRun, Invoice
+from modules.finance.reporting import REVENUE, mark_dirty, month_start
+from modules.finance.services import StripeService
+from modules.firm.audit import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+AUTOPAY_STATUSES = ["sent", "partial", "overdue"]
+DUNNING_STATUSES = ["sent", "overdue", "partial", "failed"]
+
+
+def _chunk_size() -> int:
+    return getattr(settings, "BILLING_RUN_CHUNK_SIZE", 500)
+
+
+def _payment_concurrency() -> int:
+    return getattr(settings, "BILLING_PAYMENT_CONCURRENCY", 8)
+
+
+def _keyset_chunks(queryset, chunk_size: int) -> Iterator[list]:
+    """Yield the queryset in primary-key order, one chunk per query."""
+    last_pk = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk).order_by("pk")[:chunk_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1].pk
+        yield chunk
+
+
+@contextmanager
+def billing_run(run_type: str, reference_date: date, firm=None):
+    """Collect a run's counters and write its BillingRun summary when it ends."""
+    started_at = timezone.now()
+    stats = Counter()
+    status, error_message = "success", ""
+    try:
+        yield stats
+    except Exception as e:
+        status, error_message = "failed", type(e).__name__
+        raise
+    finally:
+        BillingRun.objects.create(
+            run_type=run_type,
+            firm_id=firm.id if firm else None,
+            reference_date=reference_date,
+            started_at=started_at,
+            completed_at=timezone.now(),
+            status=status,
+            stats=dict(stats),
+            error_message=error_message,
+        )
+
+
+def _billing_audit_event(invoice: Invoice, action: str, metadata: dict, severity: str = AuditEvent.SEVERITY_INFO):
+    return AuditEvent(
+        firm_id=invoice.firm_id,
+        category=AuditEvent.CATEGORY_BILLING_METADATA,
+        action=action,
+        severity=severity,
+        metadata=metadata,
+    )
+
+
+# Package invoices
+
+
+def package_invoice_candidates(reference_date: date, firm=None):
+    """
+    Engagements due a package invoice for the period containing ``reference_date``.
+
+    Mirrors should_generate_package_invoice: the billing period start is
+    computed per schedule in SQL and engagements already invoiced for it are
+    excluded with NOT EXISTS.
+    """
+    schedule = Lower(Coalesce("package_fee_schedule", Value("")))
+    engagements = ClientEngagement.objects.annotate(billing_schedule=schedule).annotate(
+        billing_period_start=Greatest(
+            Case(
+                When(billing_schedule="quarterly", then=Value(_quarter_start_for(reference_date))),
+                When(billing_schedule__in=["annual", "yearly"], then=Value(reference_date.replace(month=1, day=1))),
+                When(billing_schedule__in=["one-time", "one_time", "once"], then=F("start_date")),
+                default=Value(_month_start_for(reference_date)),
+                output_field=DateField(),
+            ),
+            F("start_date"),
+        )
+    )
+    engagements = engagements.filter(
+        status="current",
+        pricing_mode__in=["package", "mixed"],
+        package_fee__isnull=False,
+        end_date__gte=F("billing_period_start"),
+    ).exclude(package_fee=0).exclude(
+        Exists(
+            Invoice.objects.filter(
+                engagement=OuterRef("pk"), period_start=OuterRef("billing_period_start"), firm=OuterRef("firm")
+            )
+        )
+    )
+    if firm:
+        engagements = engagements.filter(firm=firm)
+    return engagements
+
+
+def _not_yet_invoiced(invoices: List[Invoice]) -> List[Invoice]:
+    """
+    Drop periods invoiced since the candidate query (must run in a transaction).
+
+    Locking the engagements first serializes concurrent runs: a second run
+    waits here until the first commits, then sees its invoices.
+    """
+    engagement_ids = [invoice.engagement_id for invoice in invoices]
+    list(ClientEngagement.objects.select_for_update().filter(pk__in=engagement_ids).order_by("pk").values_list("pk"))
+    invoiced = set(
+        Invoice.objects.filter(
+            engagement_id__in=engagement_ids, period_start__in={invoice.period_start for invoice in invoices}
+        ).values_list("engagement_id", "period_start")
+    )
+    return [invoice for invoice in invoices if (invoice.engagement_id, invoice.period_start) not in invoiced]
+
+
+def _insert_package_invoices(invoices: List[Invoice]) -> List[Invoice]:
+    """Insert the invoices and return exactly the ones this call created."""
+    try:
+        with transaction.atomic():
+            return Invoice.objects.bulk_create(invoices)
+    except IntegrityError:
+        # Invoiced outside a run (create_package_invoice) since the re-check
+        created = []
+        for invoice in invoices:
+            try:
+                with transaction.atomic():
+                    Invoice.objects.bulk_create([invoice])
+            except IntegrityError:
+                continue
+            created.append(invoice)
+        return created
+
+
+def run_package_invoicing(
+    reference_date: Optional[date] = None, firm=None, issue_date: Optional[date] = None
+) -> List[Invoice]:
+    """Create package invoices for every eligible engagement; returns the created invoices."""
+    today = timezone.now().date()
+    reference_date = reference_date or today
+    issue_date = issue_date or today
+    candidates = package_invoice_candidates(reference_date, firm).select_related("client", "contract")
+
+    created = []
+    with billing_run("package_invoices", reference_date, firm) as stats:
+        for chunk in _keyset_chunks(candidates, _chunk_size()):
+            stats["candidates"] += len(chunk)
+            invoices = []
+            for engagement in chunk:
+                if engagement.client.firm_id != engagement.firm_id:
+                    stats["errors"] += 1
+                    logger.error(f"Engagement {engagement.id} firm does not match its client's firm; not invoiced")
+                    continue
+                period_start, period_end = get_package_billing_period(engagement, reference_date)
+                invoices.append(
+                    Invoice(
+                        engagement=engagement,
+                        period_start=period_start,
+                        **package_invoice_fields(engagement, issue_date, period_start, period_end),
+                    )
+                )
+            if not invoices:
+                continue
+
+            with transaction.atomic():
+                invoices = _not_yet_invoiced(invoices)
+                chunk_created = _insert_package_invoices(invoices)
+                AuditEvent.objects.bulk_create(
+                    [
+                        _billing_audit_event(
+                            invoice,
+                            "package_invoice_auto_generated",
+                            {
+                                "invoice_id": invoice.id,
+                                "engagement_id": invoice.engagement_id,
+                                "amount": str(invoice.total_amount),  # Maintain precision as string
+                                "period_start": str(invoice.period_start),
+                                "period_end": str(invoice.period_end),
+                            },
+                        )
+                        for invoice in chunk_created
+                    ]
+                )
+            stats["created"] += len(chunk_created)
+            created.extend(chunk_created)
+    return created
+
+
+# Autopay
+
+
+def _intent_id(intent) -> str:
+    return getattr(intent, "id", None) or (intent.get("id", "") if hasattr(intent, "get") else "")
+
+
+def autopay_idempotency_key(invoice: Invoice) -> str:
+    """Stable per invoice and payment attempt (payment_retry_count moves on after each failure)."""
+    return f"invoice_{invoice.id}_autopay_{invoice.payment_retry_count}"
+
+
+def _create_intent(payment_service, invoice: Invoice, payment_method_id: str):
+    return payment_service.create_payment_intent(
+        amount=invoice.total_amount,
+        currency=invoice.currency.lower(),
+        customer_id=None,
+        metadata={"invoice_id": invoice.id, "invoice_number": invoice.invoice_number},
+        payment_method=payment_method_id,
+        idempotency_key=autopay_idempotency_key(invoice),
+    )
+
+
+def _record_autopay_failure(invoice: Invoice, failure_reason: str, failure_code: str, retry_at: datetime):
+    result = handle_payment_failure(invoice, failure_reason=failure_reason, failure_code=failure_code)
+    invoice.autopay_status = "failed"
+    invoice.autopay_next_charge_at = retry_at
+    return result
+
+
+def _mark_revenue_dirty(invoices: List[Invoice]) -> None:
+    """bulk_update skips the reporting signals; status and amount_paid feed the revenue summary."""
+    buckets = [
+        (REVENUE, invoice.firm_id, invoice.project_id, month_start(invoice.issue_date))
+        for invoice in invoices
+        if invoice.project_id and invoice.issue_date
+    ]
+    if buckets:
+        transaction.on_commit(partial(mark_dirty, buckets))
+
+
+def _charge_chunk(chunk: List[Invoice], pool: ThreadPoolExecutor, payment_service, now: datetime, stats) -> list:
+    retry_at = now + timedelta(days=3)
+    results = []
+    failed = []
+    chargeable = []
+    for invoice in chunk:
+        payment_method_id = invoice.autopay_payment_method_id or invoice.client.autopay_payment_method_id
+        if payment_method_id:
+            chargeable.append((invoice, payment_method_id))
+        else:
+            results.append(
+                _record_autopay_failure(invoice, "Missing autopay payment method", "payment_method_missing", retry_at)
+            )
+            failed.append(invoice)
+
+    attempted_at = timezone.now()
+    for invoice, _ in chargeable:
+        invoice.autopay_status = "processing"
+        invoice.autopay_last_attempt_at = attempted_at
+    Invoice.objects.bulk_update([invoice for invoice, _ in chargeable], ["autopay_status", "autopay_last_attempt_at"])
+
+    futures = [
+        (invoice, pool.submit(_create_intent, payment_service, invoice, payment_method_id))
+        for invoice, payment_method_id in chargeable
+    ]
+    paid = []
+    for invoice, future in futures:
+        try:
+            intent = future.result()
+        except Exception as exc:
+            results.append(_record_autopay_failure(invoice, str(exc), "processor_error", retry_at))
+            failed.append(invoice)
+            continue
+        invoice.stripe_payment_intent_id = _intent_id(intent)
+        invoice.amount_paid = invoice.total_amount
+        invoice.status = "paid"
+        invoice.paid_date = now.date()
+        invoice.autopay_status = "succeeded"
+        invoice.autopay_next_charge_at = None
+        paid.append(invoice)
+        results.append(invoice)
+
+    with transaction.atomic():
+        Invoice.objects.bulk_update(
+            paid,
+            [
+                "stripe_payment_intent_id",
+                "amount_paid",
+                "status",
+                "paid_date",
+                "autopay_status",
+                "autopay_next_charge_at",
+            ],
+        )
+        Invoice.objects.bulk_update(failed, ["autopay_status", "autopay_next_charge_at"])
+        _mark_revenue_dirty(paid)
+    stats["charged"] += len(paid)
+    stats["failed"] += len(failed)
+    return results
+
+
+def run_autopay(reference_time: Optional[datetime] = None, payment_service=StripeService, firm=None) -> list:
+    """Charge every invoice due for autopay; returns the processed invoices."""
+    now = reference_time or timezone.now()
+    invoices = Invoice.objects.filter(autopay_opt_in=True, status__in=AUTOPAY_STATUSES)
+    # SECURITY: Enforce firm isolation to prevent cross-firm processing (ASSESS-S6.2)
+    if firm:
+        invoices = invoices.filter(firm=firm)
+
+    processed = []
+    with billing_run("autopay", now.date(), firm) as stats:
+        stats["cancelled"] = invoices.filter(client__autopay_enabled=False).update(
+            autopay_status="cancelled", autopay_next_charge_at=None, autopay_opt_in=False
+        )
+        due = (
+            invoices.filter(client__autopay_enabled=True)
+            .filter(Q(autopay_next_charge_at__isnull=True) | Q(autopay_next_charge_at__lte=now))
+            .select_related("client", "firm")
+        )
+        with ThreadPoolExecutor(max_workers=_payment_concurrency(), thread_name_prefix="billing-autopay") as pool:
+            for chunk in _keyset_chunks(due, _chunk_size()):
+                stats["candidates"] += len(chunk)
+                processed.extend(_charge_chunk(chunk, pool, payment_service, now, stats))
+    return processed
+
+
+# Dunning
+
+
+def _utc_midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def dunning_candidates(reference_date: date, firm=None):
+    """
+    Overdue invoices due their next dunning reminder (should_send_dunning_reminder in SQL).
+
+    "N days since the last reminder" compares UTC dates, as the per-row check does.
+    """
+
+    def last_sent_days_ago(days: int) -> Q:
+        return Q(last_dunning_sent_at__lt=_utc_midnight(reference_date - timedelta(days=days - 1)))
+
+    invoices = (
+        Invoice.objects.filter(due_date__lt=reference_date, status__in=DUNNING_STATUSES)
+        .exclude(dunning_paused=True)
+        .filter(
+            Q(dunning_level=0, due_date__lte=reference_date - timedelta(days=7))
+            | (Q(dunning_level__in=[1, 2]) & last_sent_days_ago(14))
+            | (Q(dunning_level=3) & last_sent_days_ago(30))
+        )
+    )
+    if firm:
+        invoices = invoices.filter(firm=firm)
+    return invoices
+
+
+def run_dunning(reference_date: Optional[date] = None, firm=None) -> List[Invoice]:
+    """Advance and send dunning reminders for every eligible invoice; returns the reminded invoices."""
+    reference_date = reference_date or timezone.now().date()
+    candidates = dunning_candidates(reference_date, firm).select_related("client", "firm")
+
+    processed = []
+    with billing_run("dunning", reference_date, firm) as stats:
+        for chunk in _keyset_chunks(candidates, _chunk_size()):
+            stats["candidates"] += len(chunk)
+            sent_at = timezone.now()
+            for invoice in chunk:
+                invoice.dunning_level += 1
+                invoice.last_dunning_sent_at = sent_at
+                if invoice.status not in ["overdue", "disputed"]:
+                    invoice.status = "overdue"
+            Invoice.objects.bulk_update(chunk, ["dunning_level", "last_dunning_sent_at", "status"])
+            _mark_revenue_dirty(chunk)
+
+            events = []
+            for invoice in chunk:
+                try:
+                    send_dunning_notification(invoice)
+                except Exception as e:
+                    stats["errors"] += 1
+                    logger.error(f"Failed to send dunning reminder for invoice {invoice.invoice_number}: {str(e)}")
+                    continue
+                processed.append(invoice)
+                stats[f"level_{min(invoice.dunning_level, 4)}"] += 1
+                events.append(
+                    _billing_audit_event(
+                        invoice,
+                        "dunning_reminder_sent",
+                        {
+                            "invoice_id": invoice.id,
+                            "invoice_number": invoice.invoice_number,
+                            "dunning_level": invoice.dunning_level,
+                            "days_overdue": (sent_at.date() - invoice.due_date).days,
+                            "amount": str(invoice.total_amount),  # Maintain precision as string
+                        },
+                        AuditEvent.SEVERITY_WARNING if invoice.dunning_level >= 3 else AuditEvent.SEVERITY_INFO,
+                    )
+                )
+            AuditEvent.objects.bulk_create(events)
+            stats["sent"] += len(events)
+    return processed
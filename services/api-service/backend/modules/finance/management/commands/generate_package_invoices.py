@@ -6,7 +6,8 @@ Automatically generates package fee invoices based on engagement schedules.
 This command:
 1. Finds all active engagements with package billing
 2. Determines which invoices are due based on schedule
-3. Generates invoices for the current billing period
+3. Generates invoices for the current billing period as one batched billing run
+   per firm (modules.finance.billing_runs)
 4. Prevents duplicate invoice generation
 
 Usage:
@@ -20,15 +21,11 @@ Options:
 import logging
 
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
 from django.utils import timezone
 
 from modules.clients.models import ClientEngagement
-from modules.finance.billing import (
-    create_package_invoice,
-    get_package_billing_period,
-    should_generate_package_invoice,
-)
+from modules.finance.billing import generate_package_invoices, get_package_billing_period
+from modules.finance.billing_runs import package_invoice_candidates
 from modules.firm.models import Firm
 
 logger = logging.getLogger(__name__)
@@ -96,78 +93,39 @@ class Command(BaseCommand):
 
     def process_firm(self, firm, dry_run=False):
         """Process all package billing engagements for a firm."""
-        generated_count = 0
-        skipped_count = 0
-
         # Find active engagements with package billing
         engagements = ClientEngagement.objects.filter(
             firm=firm, status="current", pricing_mode__in=["package", "mixed"], package_fee__isnull=False
-        ).select_related("client", "contract")
-
-        if not engagements.exists():
+        )
+        total = engagements.count()
+        if not total:
             self.stdout.write("  No package billing engagements found")
             return 0, 0
 
         reference_date = timezone.now().date()
 
-        for engagement in engagements:
-            try:
+        if dry_run:
+            candidates = package_invoice_candidates(reference_date, firm=firm).select_related("client")
+            generated_count = 0
+            for engagement in candidates.order_by("pk").iterator():
                 period_start, period_end = get_package_billing_period(engagement, reference_date=reference_date)
-
-                if self.should_generate_invoice(engagement, reference_date=reference_date):
-                    if dry_run:
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f"  [DRY RUN] Would generate invoice for: "
-                                f"{engagement.client.name} - ${engagement.package_fee} "
-                                f"({period_start} to {period_end})"
-                            )
-                        )
-                        generated_count += 1
-                    else:
-                        invoice = self.generate_invoice(
-                            engagement, issue_date=reference_date, reference_date=reference_date
-                        )
-                        self.stdout.write(
-                            self.style.SUCCESS(
-                                f"  ✓ Generated invoice {invoice.invoice_number} for "
-                                f"{engagement.client.name} - ${invoice.total_amount}"
-                            )
-                        )
-                        generated_count += 1
-                else:
-                    skipped_count += 1
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"  ✗ Error for engagement {engagement.id}: {e}"))
-                logger.exception(f"Error generating invoice for engagement {engagement.id}")
-
-        return generated_count, skipped_count
-
-    def should_generate_invoice(self, engagement, reference_date=None):
-        """
-        Determine if an invoice should be generated for this engagement.
-
-        Logic:
-        - Check if there's already an invoice for the current billing period
-        - Check based on package_fee_schedule (Monthly, Quarterly, etc.)
-        - Ensure we don't generate duplicates
-        """
-        return should_generate_package_invoice(engagement, reference_date=reference_date)
-
-    @transaction.atomic
-    def generate_invoice(self, engagement, issue_date=None, reference_date=None):
-        """
-        Generate a package fee invoice for the engagement.
-
-        Returns:
-            Invoice: The created invoice
-        """
-        invoice = create_package_invoice(engagement, issue_date=issue_date, reference_date=reference_date)
-
-        # Log generation
-        logger.info(
-            f"Generated package invoice {invoice.invoice_number} for "
-            f"engagement {engagement.id}, amount ${invoice.total_amount}"
-        )
-
-        return invoice
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"  [DRY RUN] Would generate invoice for: "
+                        f"{engagement.client.name} - ${engagement.package_fee} "
+                        f"({period_start} to {period_end})"
+                    )
+                )
+                generated_count += 1
+            return generated_count, total - generated_count
+
+        invoices = generate_package_invoices(reference_date=reference_date, firm=firm)
+        for invoice in invoices:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"  ✓ Generated invoice {invoice.invoice_number} for "
+                    f"client {invoice.client_id} - ${invoice.total_amount}"
+                )
+            )
+        logger.info(f"Generated {len(invoices)} package invoices for firm {firm.id}")
+        return len(invoices), total - len(invoices)
@@ -0,0 +1,50 @@
+"""Verify billing balance snapshots against the raw ledger and flag drift."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from modules.finance.billing_ledger import verify_account_balances
+from modules.firm.models import Firm
+
+
+class Command(BaseCommand):
+    help = "Recompute AR and retainer balance snapshots from ledger entries and flag accounts that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--firm-id",
+            type=int,
+            help="Verify balances for a specific firm only (tenant isolation)",
+        )
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Reset drifted snapshots to the balances recomputed from the ledger",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500, help="Accounts verified per transaction")
+
+    def handle(self, *args, **options):
+        firm_id = options.get("firm_id")
+        repair = options["repair"]
+
+        if firm_id:
+            try:
+                firms = [Firm.objects.get(id=firm_id)]
+            except Firm.DoesNotExist as e:
+                raise CommandError(f"Firm with ID {firm_id} not found") from e
+        else:
+            firms = Firm.objects.filter(status__in=["active", "trial"]).order_by("id")
+
+        drifted = 0
+        for firm in firms:
+            stats = verify_account_balances(firm, repair=repair, chunk_size=options["chunk_size"])
+            drifted += stats["drifted"]
+            line = (
+                f"Firm {firm.id}: {stats['verified']} verified, {stats['drifted']} drifted, "
+                f"{stats['repaired']} repaired, {stats['seeded']} seeded"
+            )
+            self.stdout.write(self.style.ERROR(line) if stats["drifted"] else line)
+
+        if drifted and not repair:
+            self.stdout.write(self.style.WARNING(f"\n{drifted} drifted balance(s); rerun with --repair to reset them"))
+        else:
+            self.stdout.write(self.style.SUCCESS("\nBilling balance verification complete"))
@@ -12,6 +12,7 @@ class Migration(migrations.Migration):
     dependencies = [
         migrations.swappable_dependency(settings.AUTH_USER_MODEL),
         ('firm', '0007_provisioninglog'),
+        ('clients', '0002_initial'),
         ('crm', '0001_initial'),
         ('finance', '0007_auto_payment_failures'),
     ]
@@ -30,7 +31,7 @@ class Migration(migrations.Migration):
                 ('reference', models.CharField(blank=True, help_text='External reference (check number, processor ref, etc.)', max_length=255)),
                 ('metadata', models.JSONField(default=dict, help_text='Bounded metadata (reason codes, processor details, etc.)')),
                 ('correlation_id', models.CharField(blank=True, help_text='Correlation ID for request tracing', max_length=255)),
-                ('account', models.ForeignKey(help_text='Account (Client) this entry belongs to', on_delete=django.db.models.deletion.PROTECT, related_name='billing_ledger_entries', to='crm.client')),
+                ('account', models.ForeignKey(help_text='Account (Client) this entry belongs to', on_delete=django.db.models.deletion.PROTECT, related_name='billing_ledger_entries', to='clients.client')),
                 ('created_by_actor', models.ForeignKey(help_text='Actor who created this entry', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_billing_ledger_entries', to=settings.AUTH_USER_MODEL)),
                 ('engagement', models.ForeignKey(blank=True, help_text='Engagement reference (nullable, Contract=Engagement per DOC-06.1)', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='billing_ledger_entries', to='crm.contract')),
                 ('firm', models.ForeignKey(help_text='Firm this ledger entry belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='billing_ledger_entries', to='firm.firm')),
@@ -0,0 +1,60 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0014_webhook_idempotency_keys"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BillingRun",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "run_type",
+                    models.CharField(
+                        choices=[
+                            ("package_invoices", "Package Invoices"),
+                            ("autopay", "Autopay"),
+                            ("dunning", "Dunning"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "firm_id",
+                    models.IntegerField(
+                        blank=True,
+                        help_text="Firm ID if the run was scoped to one firm, NULL for all firms",
+                        null=True,
+                    ),
+                ),
+                (
+                    "reference_date",
+                    models.DateField(help_text="Billing date the run evaluated eligibility against"),
+                ),
+                ("started_at", models.DateTimeField(help_text="When the run started")),
+                ("completed_at", models.DateTimeField(help_text="When the run finished")),
+                (
+                    "status",
+                    models.CharField(choices=[("success", "Success"), ("failed", "Failed")], max_length=20),
+                ),
+                (
+                    "stats",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Run counters (candidates, created, charged, failed, ...)",
+                    ),
+                ),
+                ("error_message", models.TextField(blank=True, help_text="Error class if the run failed")),
+            ],
+            options={
+                "db_table": "finance_billing_run",
+                "ordering": ["-started_at"],
+                "indexes": [models.Index(fields=["run_type", "-started_at"], name="finance_bil_run_sta_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("firm", "0007_provisioninglog"),
+        ("clients", "0002_initial"),
+        ("finance", "0015_billingrun"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BillingAccountBalance",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "ar_balance",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        help_text="AR balance (positive = owed to us)",
+                        max_digits=14,
+                    ),
+                ),
+                (
+                    "retainer_balance",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        help_text="Retainer balance (positive = available retainer)",
+                        max_digits=14,
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True, help_text="When the snapshot last moved")),
+                (
+                    "verified_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the snapshot was last verified against the ledger",
+                        null=True,
+                    ),
+                ),
+                (
+                    "drift_detected_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When verification last found the snapshot out of line with the ledger",
+                        null=True,
+                    ),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        help_text="Account (Client) this balance belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="billing_account_balances",
+                        to="clients.client",
+                    ),
+                ),
+                (
+                    "firm",
+                    models.ForeignKey(
+                        help_text="Firm this balance belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="billing_account_balances",
+                        to="firm.firm",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Billing Account Balance",
+                "verbose_name_plural": "Billing Account Balances",
+                "db_table": "billing_account_balance",
+                "indexes": [models.Index(fields=["firm", "drift_detected_at"], name="billing_acc_firm_id_drift_idx")],
+                "unique_together": {("firm", "account")},
+            },
+        ),
+    ]
@@ -0,0 +1,181 @@
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+# Retention window of each summary table (modules.finance.reporting.RETENTION_YEARS)
+RETENTION_YEARS = {
+    "mv_revenue_by_project_month": 5,
+    "mv_utilization_by_project_month": 5,
+    "mv_utilization_by_user_week": 3,
+}
+
+
+def drop_materialized_view(apps, schema_editor):
+    """The summary table replaces the materialized view of the same name (PostgreSQL only)."""
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP MATERIALIZED VIEW IF EXISTS mv_revenue_by_project_month")
+
+
+def mark_summaries_dirty(apps, schema_editor):
+    """
+    Queue every bucket with source data in the retention window, for all three summary tables.
+
+    The tables start empty; the next refresh_materialized_views run fills them
+    (same buckets as reporting.mark_all_dirty, i.e. ``--full``).
+    """
+    TimeEntry = apps.get_model("projects", "TimeEntry")
+    Expense = apps.get_model("projects", "Expense")
+    Invoice = apps.get_model("finance", "Invoice")
+    ReportingDirtyBucket = apps.get_model("finance", "ReportingDirtyBucket")
+    now = timezone.now()
+    today = now.date()
+
+    def since(view_name):
+        start = today.replace(year=today.year - RETENTION_YEARS[view_name], day=1)
+        return start - timedelta(days=start.weekday()) if view_name == "mv_utilization_by_user_week" else start
+
+    def monthly(queryset, date_field, view_name):
+        return (
+            queryset.filter(**{f"{date_field}__gte": since(view_name)})
+            .annotate(period=TruncMonth(date_field))
+            .values_list("project__firm_id", "project_id", "period")
+        )
+
+    sources = {
+        "mv_revenue_by_project_month": [
+            monthly(TimeEntry.objects.all(), "date", "mv_revenue_by_project_month"),
+            monthly(Invoice.objects.filter(project__isnull=False), "issue_date", "mv_revenue_by_project_month"),
+            monthly(Expense.objects.all(), "date", "mv_revenue_by_project_month"),
+        ],
+        "mv_utilization_by_project_month": [
+            monthly(TimeEntry.objects.all(), "date", "mv_utilization_by_project_month"),
+        ],
+        "mv_utilization_by_user_week": [
+            TimeEntry.objects.filter(date__gte=since("mv_utilization_by_user_week"))
+            .annotate(period=TruncWeek("date"))
+            .values_list("project__firm_id", "user_id", "period"),
+        ],
+    }
+    for view_name, querysets in sources.items():
+        buckets = set()
+        for queryset in querysets:
+            buckets.update(row for row in queryset.order_by().distinct() if all(row))
+        ReportingDirtyBucket.objects.bulk_create(
+            [
+                ReportingDirtyBucket(
+                    view_name=view_name, firm_id=firm_id, subject_id=subject_id, period=period, marked_at=now
+                )
+                for firm_id, subject_id, period in buckets
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("firm", "0016_firmoffboardingrecord_export_archive_path"),
+        ("finance", "0016_billingaccountbalance"),
+        ("projects", "0008_utilization_summary_tables"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_materialized_view, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="RevenueByProjectMonthMV",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "project_id",
+                    models.IntegerField(help_text="Project ID (not a foreign key - summary is denormalized)"),
+                ),
+                ("project_name", models.CharField(help_text="Project name (denormalized)", max_length=255)),
+                ("project_code", models.CharField(help_text="Project code (denormalized)", max_length=50)),
+                ("client_id", models.IntegerField(help_text="Client ID (denormalized)")),
+                ("month", models.DateField(help_text="Month start date (YYYY-MM-01)")),
+                (
+                    "total_revenue",
+                    models.DecimalField(
+                        decimal_places=2, help_text="Total revenue from paid/partial invoices", max_digits=12
+                    ),
+                ),
+                (
+                    "labor_cost",
+                    models.DecimalField(
+                        decimal_places=2, help_text="Total labor cost (time entries × rates)", max_digits=12
+                    ),
+                ),
+                (
+                    "expense_cost",
+                    models.DecimalField(decimal_places=2, help_text="Total approved expense costs", max_digits=12),
+                ),
+                (
+                    "overhead_cost",
+                    models.DecimalField(decimal_places=2, help_text="Allocated overhead (20% of labor)", max_digits=12),
+                ),
+                ("team_members", models.IntegerField(help_text="Unique team members with time entries")),
+                ("total_hours", models.DecimalField(decimal_places=2, help_text="Total hours logged", max_digits=10)),
+                (
+                    "billable_hours",
+                    models.DecimalField(decimal_places=2, help_text="Billable hours logged", max_digits=10),
+                ),
+                ("invoice_count", models.IntegerField(help_text="Total invoices")),
+                ("paid_invoice_count", models.IntegerField(help_text="Paid invoices")),
+                ("refreshed_at", models.DateTimeField(help_text="When this MV was last refreshed")),
+                (
+                    "firm",
+                    models.ForeignKey(
+                        db_column="firm_id",
+                        help_text="Firm this revenue record belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="firm.firm",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Revenue by Project Month (MV)",
+                "verbose_name_plural": "Revenue by Project Month (MV)",
+                "db_table": "mv_revenue_by_project_month",
+                "ordering": ["-month", "project_name"],
+                "indexes": [
+                    models.Index(fields=["firm", "-month"], name="idx_mv_revenue_firm_month"),
+                    models.Index(fields=["project_id", "-month"], name="idx_mv_revenue_project"),
+                    models.Index(fields=["client_id", "-month"], name="idx_mv_revenue_client_month"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(fields=("firm", "project_id", "month"), name="uniq_mv_revenue_bucket"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ReportingDirtyBucket",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("view_name", models.CharField(help_text="Summary table the bucket belongs to", max_length=255)),
+                ("firm_id", models.IntegerField(help_text="Firm ID of the bucket")),
+                (
+                    "subject_id",
+                    models.IntegerField(
+                        help_text="Project ID (project summaries) or user ID (user summaries)"
+                    ),
+                ),
+                ("period", models.DateField(help_text="Month start or week start (Monday) of the bucket")),
+                ("marked_at", models.DateTimeField(help_text="When the bucket was last marked dirty")),
+            ],
+            options={
+                "db_table": "finance_reporting_dirty_bucket",
+                "indexes": [models.Index(fields=["view_name", "firm_id"], name="finance_rep_vie_fir_idx")],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("view_name", "firm_id", "subject_id", "period"), name="uniq_reporting_dirty_bucket"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(mark_summaries_dirty, migrations.RunPython.noop),
+    ]
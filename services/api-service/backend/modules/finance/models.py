@@ -2007,30 +2007,33 @@ class ServiceLineProfitability(models.Model):
 
 class RevenueByProjectMonthMV(models.Model):
     """
-    Materialized View: Revenue reporting by project and month (Sprint 5.2).
+    Summary table: Revenue reporting by project and month (Sprint 5.2).
     
     Pre-aggregated revenue, costs, and margin metrics for fast reporting.
-    This is a READ-ONLY model backed by a PostgreSQL materialized view.
+    READ-ONLY for application code: rows are maintained per (firm, project, month)
+    bucket by modules.finance.reporting (formerly a PostgreSQL materialized view).
     
     Refresh Strategy:
-    - Scheduled: Daily at 2 AM
+    - Event-driven: Invoice, time entry and expense changes mark their buckets dirty
+    - Scheduled: refresh_materialized_views recomputes dirty buckets every few minutes
     - On-demand: Via management command or API endpoint
-    - Event-driven: On invoice payment, time entry approval
     
     TIER 0: Scoped to Firm for tenant isolation.
     """
     
+    OVERHEAD_RATE = Decimal("0.20")
+    
     # TIER 0: Firm tenancy
     firm = models.ForeignKey(
         "firm.Firm",
-        on_delete=models.DO_NOTHING,  # MV is read-only
+        on_delete=models.CASCADE,
         related_name="+",  # No reverse relation needed
         help_text="Firm this revenue record belongs to",
         db_column="firm_id",
     )
     
     # Project information
-    project_id = models.IntegerField(help_text="Project ID (not a foreign key - MV denormalized)")
+    project_id = models.IntegerField(help_text="Project ID (not a foreign key - summary is denormalized)")
     project_name = models.CharField(max_length=255, help_text="Project name (denormalized)")
     project_code = models.CharField(max_length=50, help_text="Project code (denormalized)")
     client_id = models.IntegerField(help_text="Client ID (denormalized)")
@@ -2086,11 +2089,18 @@ class RevenueByProjectMonthMV(models.Model):
     firm_scoped = FirmScopedManager()
     
     class Meta:
-        managed = False  # Django doesn't manage MV schema
         db_table = "mv_revenue_by_project_month"
         verbose_name = "Revenue by Project Month (MV)"
         verbose_name_plural = "Revenue by Project Month (MV)"
         ordering = ["-month", "project_name"]
+        indexes = [
+            models.Index(fields=["firm", "-month"], name="idx_mv_revenue_firm_month"),
+            models.Index(fields=["project_id", "-month"], name="idx_mv_revenue_project"),
+            models.Index(fields=["client_id", "-month"], name="idx_mv_revenue_client_month"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["firm", "project_id", "month"], name="uniq_mv_revenue_bucket"),
+        ]
     
     def __str__(self) -> str:
         return f"{self.project_name} ({self.month.strftime('%Y-%m')}): ${self.total_revenue}"
@@ -2136,86 +2146,19 @@ class RevenueByProjectMonthMV(models.Model):
     @classmethod
     def refresh(cls, firm_id: int = None, concurrently: bool = True) -> dict:
         """
-        Refresh the materialized view.
+        Recompute the dirty (firm, project, month) buckets.
         
         Args:
-            firm_id: If provided, only refresh data for this firm (not supported by PostgreSQL MV)
-            concurrently: If True, use CONCURRENT refresh (allows reads during refresh)
+            firm_id: If provided, only refresh this firm's buckets
+            concurrently: Ignored; kept for callers of the former materialized view refresh
+                (buckets are replaced row by row, reads are never blocked)
         
         Returns:
             dict with refresh status and metadata
         """
-        from django.db import connection
-        from django.utils import timezone
-        import time
-        
-        start_time = time.time()
-        started_at = timezone.now()
-        
-        # Log refresh start
-        MVRefreshLog.objects.create(
-            view_name="mv_revenue_by_project_month",
-            firm_id=firm_id,
-            refresh_started_at=started_at,
-            refresh_status="running",
-            triggered_by="manual",
-        )
-        
-        try:
-            with connection.cursor() as cursor:
-                # PostgreSQL REFRESH MATERIALIZED VIEW
-                # CONCURRENTLY allows reads during refresh but requires unique index
-                refresh_sql = "REFRESH MATERIALIZED VIEW"
-                if concurrently:
-                    refresh_sql += " CONCURRENTLY"
-                refresh_sql += " mv_revenue_by_project_month"
-                
-                cursor.execute(refresh_sql)
-                
-                # Get row count
-                cursor.execute("SELECT COUNT(*) FROM mv_revenue_by_project_month")
-                row_count = cursor.fetchone()[0]
-            
-            duration = time.time() - start_time
-            completed_at = timezone.now()
-            
-            # Log refresh success
-            MVRefreshLog.objects.filter(
-                view_name="mv_revenue_by_project_month",
-                refresh_started_at=started_at,
-            ).update(
-                refresh_completed_at=completed_at,
-                refresh_status="success",
-                rows_affected=row_count,
-            )
-            
-            return {
-                "status": "success",
-                "view_name": "mv_revenue_by_project_month",
-                "rows_affected": row_count,
-                "duration_seconds": round(duration, 2),
-                "completed_at": completed_at.isoformat(),
-            }
+        from modules.finance.reporting import REVENUE, refresh_view
         
-        except Exception as e:
-            completed_at = timezone.now()
-            
-            # Log refresh failure
-            MVRefreshLog.objects.filter(
-                view_name="mv_revenue_by_project_month",
-                refresh_started_at=started_at,
-            ).update(
-                refresh_completed_at=completed_at,
-                refresh_status="failed",
-                error_message=str(e),
-            )
-            
-            return {
-                "status": "failed",
-                "view_name": "mv_revenue_by_project_month",
-                "error": str(e),
-                "completed_at": completed_at.isoformat(),
-            }
+        return refresh_view(REVENUE, firm_id=firm_id)
 
 
 class MVRefreshLog(models.Model):
@@ -2281,3 +2224,82 @@ class MVRefreshLog(models.Model):
             delta = self.refresh_completed_at - self.refresh_started_at
             return delta.total_seconds()
         return 0.0
+
+
+class ReportingDirtyBucket(models.Model):
+    """
+    A reporting summary bucket whose source rows changed since its last refresh.
+    
+    One row per (summary table, firm, project or user, month or week start);
+    see modules.finance.reporting.
+    """
+    
+    view_name = models.CharField(max_length=255, help_text="Summary table the bucket belongs to")
+    firm_id = models.IntegerField(help_text="Firm ID of the bucket")
+    subject_id = models.IntegerField(help_text="Project ID (project summaries) or user ID (user summaries)")
+    period = models.DateField(help_text="Month start or week start (Monday) of the bucket")
+    marked_at = models.DateTimeField(help_text="When the bucket was last marked dirty")
+    
+    class Meta:
+        db_table = "finance_reporting_dirty_bucket"
+        indexes = [
+            models.Index(fields=["view_name", "firm_id"], name="finance_rep_vie_fir_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["view_name", "firm_id", "subject_id", "period"], name="uniq_reporting_dirty_bucket"
+            ),
+        ]
+    
+    def __str__(self) -> str:
+        return f"{self.view_name} firm {self.firm_id} #{self.subject_id} {self.period}"
+
+
+class BillingRun(models.Model):
+    """
+    Summary of one batch billing run (package invoicing, autopay or dunning).
+
+    Written once when the run finishes; see modules.finance.billing_runs.
+    """
+
+    RUN_TYPE_CHOICES = [
+        ("package_invoices", "Package Invoices"),
+        ("autopay", "Autopay"),
+        ("dunning", "Dunning"),
+    ]
+
+    STATUS_CHOICES = [
+        ("success", "Success"),
+        ("failed", "Failed"),
+    ]
+
+    run_type = models.CharField(max_length=50, choices=RUN_TYPE_CHOICES)
+    firm_id = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="Firm ID if the run was scoped to one firm, NULL for all firms",
+    )
+    reference_date = models.DateField(help_text="Billing date the run evaluated eligibility against")
+    started_at = models.DateTimeField(help_text="When the run started")
+    completed_at = models.DateTimeField(help_text="When the run finished")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    stats = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Run counters (candidates, created, charged, failed, ...)",
+    )
+    error_message = models.TextField(blank=True, help_text="Error class if the run failed")
+
+    class Meta:
+        db_table = "finance_billing_run"
+        ordering = ["-started_at"]
+        indexes = [
+            models.Index(fields=["run_type", "-started_at"], name="finance_bil_run_sta_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.run_type} - {self.status} ({self.started_at})"
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.completed_at - self.started_at).total_seconds()
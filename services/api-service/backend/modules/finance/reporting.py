@@ -0,0 +1,531 @@
+"""
+Incremental refresh of the reporting summary tables (Sprint 5.2/5.3).
+
+mv_revenue_by_project_month, mv_utilization_by_project_month and
+mv_utilization_by_user_week are plain tables, maintained bucket by bucket:
+
+- Saving or deleting a TimeEntry, Invoice or Expense (or renaming a Project)
+  marks the (firm, project or user, period) buckets it touches as dirty in
+  ReportingDirtyBucket, after the write commits. A changed row marks both its
+  old and its new buckets.
+- refresh_view() claims dirty buckets in chunks (SELECT ... FOR UPDATE SKIP
+  LOCKED on PostgreSQL, so refreshers can run side by side), recomputes only
+  those buckets from the source tables and replaces their summary rows.
+  A bucket marked again while it was being recomputed stays dirty for the
+  next pass.
+- Only the ORM is used (no materialized views or vendor SQL), so the same
+  path runs on SQLite in tests.
+
+Run ``refresh_materialized_views`` every few minutes to keep reports fresh.
+The tables start empty: finance migration 0017 marks every bucket in the
+retention window dirty for all three tables, and the first refresh fills them.
+Bulk writes (QuerySet.update, bulk_create) bypass the signals; follow them
+with ``refresh_materialized_views --full [--firm-id ID]``, which re-marks
+every bucket in the retention window from the source data.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from modules.finance.models import Invoice, MVRefreshLog, ReportingDirtyBucket, RevenueByProjectMonthMV
+from modules.projects.models import (
+    Expense,
+    Project,
+    TimeEntry,
+    UtilizationByProjectMonthMV,
+    UtilizationByUserWeekMV,
+)
+
+logger = logging.getLogger(__name__)
+
+REVENUE = "mv_revenue_by_project_month"
+UTILIZATION_PROJECT = "mv_utilization_by_project_month"
+UTILIZATION_USER = "mv_utilization_by_user_week"
+VIEW_NAMES = (REVENUE, UTILIZATION_PROJECT, UTILIZATION_USER)
+
+# Retention window of each summary table, as in the original view definitions
+RETENTION_YEARS = {REVENUE: 5, UTILIZATION_PROJECT: 5, UTILIZATION_USER: 3}
+
+Bucket = Tuple[str, int, int, date]  # (view_name, firm_id, subject_id, period)
+
+
+def _chunk_size() -> int:
+    return getattr(settings, "REPORTING_REFRESH_CHUNK_SIZE", 500)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def week_start(day: date) -> date:
+    """Monday of the ISO week, as DATE_TRUNC('week') computes it."""
+    return day - timedelta(days=day.weekday())
+
+
+def _next_period(view_name: str, period: date) -> date:
+    if view_name == UTILIZATION_USER:
+        return period + timedelta(days=7)
+    return (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def retention_start(view_name: str, today: Optional[date] = None) -> date:
+    today = today or timezone.now().date()
+    years_ago = today.replace(year=today.year - RETENTION_YEARS[view_name], day=1)
+    return week_start(years_ago) if view_name == UTILIZATION_USER else years_ago
+
+
+# Dirty marking
+
+
+def mark_dirty(buckets: Iterable[Bucket]) -> int:
+    """Mark buckets dirty (again); a re-mark moves marked_at forward so in-flight refreshes keep it."""
+    now = timezone.now()
+    rows = {
+        (view_name, firm_id, subject_id, period): ReportingDirtyBucket(
+            view_name=view_name, firm_id=firm_id, subject_id=subject_id, period=period, marked_at=now
+        )
+        for view_name, firm_id, subject_id, period in buckets
+        if firm_id and subject_id and period
+    }
+    if rows:
+        ReportingDirtyBucket.objects.bulk_create(
+            list(rows.values()),
+            update_conflicts=True,
+            unique_fields=["view_name", "firm_id", "subject_id", "period"],
+            update_fields=["marked_at"],
+        )
+    return len(rows)
+
+
+def time_entry_buckets(firm_id: int, project_id: int, user_id: int, day: date) -> List[Bucket]:
+    return [
+        (REVENUE, firm_id, project_id, month_start(day)),
+        (UTILIZATION_PROJECT, firm_id, project_id, month_start(day)),
+        (UTILIZATION_USER, firm_id, user_id, week_start(day)),
+    ]
+
+
+def _mark_on_commit(buckets: List[Bucket]) -> None:
+    if buckets:
+        transaction.on_commit(partial(mark_dirty, buckets))
+
+
+def _project_firm_id(instance) -> Optional[int]:
+    project = instance._state.fields_cache.get("project")
+    if project is not None:
+        return project.firm_id
+    return Project.objects.filter(pk=instance.project_id).values_list("firm_id", flat=True).first()
+
+
+# Before an update is saved, the stored source values are read once so the
+# save can also mark the buckets it moved out of. Inserts and saves whose
+# update_fields leave these fields alone skip the read.
+_SNAPSHOT_FIELDS = {
+    TimeEntry: ("project_id", "user_id", "date"),
+    Invoice: ("firm_id", "project_id", "issue_date"),
+    Expense: ("project_id", "date"),
+    Project: ("name", "project_code", "client_id"),
+}
+
+
+def _snapshot(instance) -> tuple:
+    return tuple(getattr(instance, field) for field in _SNAPSHOT_FIELDS[type(instance)])
+
+
+def _remember(sender, instance, update_fields=None, **kwargs):
+    instance._reporting_snapshot = None
+    if instance.pk is None or instance._state.adding:
+        return
+    fields = _SNAPSHOT_FIELDS[sender]
+    if update_fields is not None and not {sender._meta.get_field(name).attname for name in update_fields} & set(fields):
+        return
+    instance._reporting_snapshot = sender._base_manager.filter(pk=instance.pk).values_list(*fields).first()
+
+
+def _stored_snapshot(instance) -> Optional[tuple]:
+    """Values the last save replaced (None for inserts and deletes); consumed once."""
+    return instance.__dict__.pop("_reporting_snapshot", None)
+
+
+for _model in _SNAPSHOT_FIELDS:
+    pre_save.connect(_remember, sender=_model, dispatch_uid=f"reporting_snapshot_{_model.__name__}")
+
+
+@receiver(post_save, sender=TimeEntry, dispatch_uid="reporting_time_entry_saved")
+@receiver(post_delete, sender=TimeEntry, dispatch_uid="reporting_time_entry_deleted")
+def time_entry_changed(sender, instance, **kwargs):
+    buckets = []
+    firm_id = _project_firm_id(instance)
+    if instance.date:
+        buckets += time_entry_buckets(firm_id, instance.project_id, instance.user_id, instance.date)
+    old_project_id, old_user_id, old_date = _stored_snapshot(instance) or (None, None, None)
+    if old_date and (old_project_id, old_user_id, old_date) != (instance.project_id, instance.user_id, instance.date):
+        old_firm_id = firm_id
+        if old_project_id != instance.project_id:
+            old_firm_id = Project.objects.filter(pk=old_project_id).values_list("firm_id", flat=True).first()
+        buckets += time_entry_buckets(old_firm_id, old_project_id, old_user_id, old_date)
+    _mark_on_commit(buckets)
+
+
+@receiver(post_save, sender=Invoice, dispatch_uid="reporting_invoice_saved")
+@receiver(post_delete, sender=Invoice, dispatch_uid="reporting_invoice_deleted")
+def invoice_changed(sender, instance, **kwargs):
+    buckets = []
+    if instance.project_id and instance.issue_date:
+        buckets.append((REVENUE, instance.firm_id, instance.project_id, month_start(instance.issue_date)))
+    old_firm_id, old_project_id, old_issue_date = _stored_snapshot(instance) or (None, None, None)
+    if old_project_id and old_issue_date:
+        buckets.append((REVENUE, old_firm_id, old_project_id, month_start(old_issue_date)))
+    _mark_on_commit(buckets)
+
+
+@receiver(post_save, sender=Expense, dispatch_uid="reporting_expense_saved")
+@receiver(post_delete, sender=Expense, dispatch_uid="reporting_expense_deleted")
+def expense_changed(sender, instance, **kwargs):
+    firm_id = _project_firm_id(instance)
+    buckets = []
+    if instance.date:
+        buckets.append((REVENUE, firm_id, instance.project_id, month_start(instance.date)))
+    old_project_id, old_date = _stored_snapshot(instance) or (None, None)
+    if old_date and (old_project_id, old_date) != (instance.project_id, instance.date):
+        old_firm_id = firm_id
+        if old_project_id != instance.project_id:
+            old_firm_id = Project.objects.filter(pk=old_project_id).values_list("firm_id", flat=True).first()
+        buckets.append((REVENUE, old_firm_id, old_project_id, month_start(old_date)))
+    _mark_on_commit(buckets)
+
+
+@receiver(post_save, sender=Project, dispatch_uid="reporting_project_saved")
+def project_changed(sender, instance, created, **kwargs):
+    """Project name, code and client are denormalized into the project summaries."""
+    previous = _stored_snapshot(instance)
+    if created or previous is None or previous == _snapshot(instance):
+        return
+    buckets = [
+        (REVENUE, instance.firm_id, instance.pk, month)
+        for month in RevenueByProjectMonthMV.objects.filter(project_id=instance.pk).values_list("month", flat=True)
+    ] + [
+        (UTILIZATION_PROJECT, instance.firm_id, instance.pk, month)
+        for month in UtilizationByProjectMonthMV.objects.filter(project_id=instance.pk).values_list("month", flat=True)
+    ]
+    _mark_on_commit(buckets)
+
+
+def mark_all_dirty(view_name: str, firm_id: Optional[int] = None) -> int:
+    """Mark every bucket with source data in the retention window, or with a summary row, dirty."""
+    since = retention_start(view_name)
+    entries = TimeEntry.objects.filter(date__gte=since)
+    if firm_id:
+        entries = entries.filter(project__firm_id=firm_id)
+
+    if view_name == UTILIZATION_USER:
+        sources = [entries.annotate(period=TruncWeek("date")).values_list("project__firm_id", "user_id", "period")]
+        summary = UtilizationByUserWeekMV.objects.values_list("firm_id", "user_id", "week_start")
+    else:
+        sources = [entries.annotate(period=TruncMonth("date")).values_list("project__firm_id", "project_id", "period")]
+        summary_model = RevenueByProjectMonthMV if view_name == REVENUE else UtilizationByProjectMonthMV
+        summary = summary_model.objects.values_list("firm_id", "project_id", "month")
+        if view_name == REVENUE:
+            invoices = Invoice.objects.filter(project__isnull=False, issue_date__gte=since)
+            expenses = Expense.objects.filter(date__gte=since)
+            if firm_id:
+                invoices = invoices.filter(project__firm_id=firm_id)
+                expenses = expenses.filter(project__firm_id=firm_id)
+            sources += [
+                invoices.annotate(period=TruncMonth("issue_date")).values_list(
+                    "project__firm_id", "project_id", "period"
+                ),
+                expenses.annotate(period=TruncMonth("date")).values_list("project__firm_id", "project_id", "period"),
+            ]
+    if firm_id:
+        summary = summary.filter(firm_id=firm_id)
+
+    buckets = set()
+    for queryset in sources + [summary]:
+        buckets.update((view_name, *row) for row in queryset.order_by().distinct())
+    return mark_dirty(buckets)
+
+
+# Recompute
+
+
+def _by_bucket(rows, firm_key: str, subject_key: str, period_key: str) -> Dict[Tuple[int, int, date], dict]:
+    return {(row[firm_key], row[subject_key], row[period_key]): row for row in rows}
+
+
+def _cost(**kwargs):
+    return Sum(F("hours") * F("hourly_rate"), output_field=DecimalField(max_digits=14, decimal_places=2), **kwargs)
+
+
+def _period_range(view_name: str, periods: Set[date]) -> Tuple[date, date]:
+    return min(periods), _next_period(view_name, max(periods))
+
+
+def _compute_revenue(keys: Set[Tuple[int, int, date]], now) -> list:
+    project_ids = {project_id for _, project_id, _ in keys}
+    low, high = _period_range(REVENUE, {period for _, _, period in keys})
+    projects = {
+        row["pk"]: row
+        for row in Project.objects.filter(pk__in=project_ids).values(
+            "pk", "firm_id", "name", "project_code", "client_id"
+        )
+    }
+    labor = _by_bucket(
+        TimeEntry.objects.filter(project_id__in=project_ids, date__gte=low, date__lt=high)
+        .annotate(month=TruncMonth("date"))
+        .values("project__firm_id", "project_id", "month")
+        .annotate(
+            labor_cost=_cost(),
+            total_hours=Sum("hours"),
+            billable_hours=Sum("hours", filter=Q(is_billable=True)),
+            team_members=Count("user_id", distinct=True),
+        )
+        .order_by(),
+        "project__firm_id",
+        "project_id",
+        "month",
+    )
+    invoices = _by_bucket(
+        Invoice.objects.filter(project_id__in=project_ids, issue_date__gte=low, issue_date__lt=high)
+        .annotate(month=TruncMonth("issue_date"))
+        .values("project__firm_id", "project_id", "month")
+        .annotate(
+            total_revenue=Sum("amount_paid", filter=Q(status__in=["paid", "partial"])),
+            invoice_count=Count("id"),
+            paid_invoice_count=Count("id", filter=Q(status="paid")),
+        )
+        .order_by(),
+        "project__firm_id",
+        "project_id",
+        "month",
+    )
+    expenses = _by_bucket(
+        Expense.objects.filter(project_id__in=project_ids, date__gte=low, date__lt=high)
+        .annotate(month=TruncMonth("date"))
+        .values("project__firm_id", "project_id", "month")
+        .annotate(expense_cost=Sum("amount", filter=Q(status="approved")))
+        .order_by(),
+        "project__firm_id",
+        "project_id",
+        "month",
+    )
+
+    rows = []
+    for key in keys:
+        project = projects.get(key[1])
+        if project is None or project["firm_id"] != key[0]:
+            continue
+        time_row, invoice_row, expense_row = labor.get(key), invoices.get(key), expenses.get(key)
+        if not (time_row or invoice_row or expense_row):
+            continue
+        time_row, invoice_row, expense_row = time_row or {}, invoice_row or {}, expense_row or {}
+        labor_cost = time_row.get("labor_cost") or 0
+        rows.append(
+            RevenueByProjectMonthMV(
+                firm_id=key[0],
+                project_id=key[1],
+                project_name=project["name"],
+                project_code=project["project_code"],
+                client_id=project["client_id"],
+                month=key[2],
+                total_revenue=invoice_row.get("total_revenue") or 0,
+                labor_cost=labor_cost,
+                expense_cost=expense_row.get("expense_cost") or 0,
+                overhead_cost=labor_cost * RevenueByProjectMonthMV.OVERHEAD_RATE,
+                team_members=time_row.get("team_members", 0),
+                total_hours=time_row.get("total_hours") or 0,
+                billable_hours=time_row.get("billable_hours") or 0,
+                invoice_count=invoice_row.get("invoice_count", 0),
+                paid_invoice_count=invoice_row.get("paid_invoice_count", 0),
+                refreshed_at=now,
+            )
+        )
+    return rows
+
+
+def _compute_utilization_project(keys: Set[Tuple[int, int, date]], now) -> list:
+    project_ids = {project_id for _, project_id, _ in keys}
+    low, high = _period_range(UTILIZATION_PROJECT, {period for _, _, period in keys})
+    projects = {
+        row["pk"]: row
+        for row in Project.objects.filter(pk__in=project_ids).values("pk", "name", "project_code", "client_id")
+    }
+    aggregates = (
+        TimeEntry.objects.filter(project_id__in=project_ids, date__gte=low, date__lt=high)
+        .annotate(month=TruncMonth("date"))
+        .values("project__firm_id", "project_id", "month")
+        .annotate(
+            total_hours=Sum("hours"),
+            billable_hours=Sum("hours", filter=Q(is_billable=True)),
+            non_billable_hours=Sum("hours", filter=Q(is_billable=False)),
+            team_members=Count("user_id", distinct=True),
+            days_worked=Count("date", distinct=True),
+            total_cost=_cost(),
+            billable_cost=_cost(filter=Q(is_billable=True)),
+            tasks_worked=Count("task_id", distinct=True),
+        )
+        .order_by()
+    )
+    rows = []
+    for key, row in _by_bucket(aggregates, "project__firm_id", "project_id", "month").items():
+        if key not in keys:
+            continue
+        project = projects[key[1]]
+        rows.append(
+            UtilizationByProjectMonthMV(
+                firm_id=key[0],
+                project_id=key[1],
+                project_name=project["name"],
+                project_code=project["project_code"],
+                client_id=project["client_id"],
+                month=key[2],
+                total_hours=row["total_hours"],
+                billable_hours=row["billable_hours"] or 0,
+                non_billable_hours=row["non_billable_hours"] or 0,
+                team_members=row["team_members"],
+                days_worked=row["days_worked"],
+                total_cost=row["total_cost"],
+                billable_cost=row["billable_cost"] or 0,
+                tasks_worked=row["tasks_worked"],
+                refreshed_at=now,
+            )
+        )
+    return rows
+
+
+def _compute_utilization_user(keys: Set[Tuple[int, int, date]], now) -> list:
+    firm_ids = {firm_id for firm_id, _, _ in keys}
+    user_ids = {user_id for _, user_id, _ in keys}
+    low, high = _period_range(UTILIZATION_USER, {period for _, _, period in keys})
+    aggregates = (
+        TimeEntry.objects.filter(project__firm_id__in=firm_ids, user_id__in=user_ids, date__gte=low, date__lt=high)
+        .annotate(week=TruncWeek("date"))
+        .values("project__firm_id", "user_id", "week")
+        .annotate(
+            total_hours=Sum("hours"),
+            billable_hours=Sum("hours", filter=Q(is_billable=True)),
+            non_billable_hours=Sum("hours", filter=Q(is_billable=False)),
+            projects_worked=Count("project_id", distinct=True),
+            days_worked=Count("date", distinct=True),
+            total_cost=_cost(),
+            billable_cost=_cost(filter=Q(is_billable=True)),
+        )
+        .order_by()
+    )
+    return [
+        UtilizationByUserWeekMV(
+            firm_id=key[0],
+            user_id=key[1],
+            week_start=key[2],
+            total_hours=row["total_hours"],
+            billable_hours=row["billable_hours"] or 0,
+            non_billable_hours=row["non_billable_hours"] or 0,
+            projects_worked=row["projects_worked"],
+            days_worked=row["days_worked"],
+            total_cost=row["total_cost"],
+            billable_cost=row["billable_cost"] or 0,
+            refreshed_at=now,
+        )
+        for key, row in _by_bucket(aggregates, "project__firm_id", "user_id", "week").items()
+        if key in keys
+    ]
+
+
+VIEWS = {
+    REVENUE: (RevenueByProjectMonthMV, "project_id", "month", _compute_revenue),
+    UTILIZATION_PROJECT: (UtilizationByProjectMonthMV, "project_id", "month", _compute_utilization_project),
+    UTILIZATION_USER: (UtilizationByUserWeekMV, "user_id", "week_start", _compute_utilization_user),
+}
+
+
+def _refresh_chunk(view_name: str, dirty: List[ReportingDirtyBucket], now) -> int:
+    model, subject_field, period_field, compute = VIEWS[view_name]
+    since = retention_start(view_name, now.date())
+    keys = {(bucket.firm_id, bucket.subject_id, bucket.period) for bucket in dirty if bucket.period >= since}
+    rows = compute(keys, now) if keys else []
+
+    # Replace every claimed bucket's row, including ones that fell out of the retention window
+    subjects = defaultdict(set)
+    for bucket in dirty:
+        subjects[(bucket.firm_id, bucket.period)].add(bucket.subject_id)
+    for (firm_id, period), subject_ids in subjects.items():
+        model.objects.filter(
+            **{"firm_id": firm_id, period_field: period, f"{subject_field}__in": subject_ids}
+        ).delete()
+    model.objects.bulk_create(rows)
+    return len(rows)
+
+
+def refresh_view(view_name: str, firm_id: Optional[int] = None, triggered_by: str = "manual") -> dict:
+    """
+    Recompute the dirty buckets of one summary table (optionally for one firm).
+
+    Returns the same status dict as the former materialized-view refresh.
+    """
+    start_time = time.time()
+    started_at = timezone.now()
+    log = MVRefreshLog.objects.create(
+        view_name=view_name,
+        firm_id=firm_id,
+        refresh_started_at=started_at,
+        refresh_status="running",
+        triggered_by=triggered_by,
+    )
+
+    buckets = rows_written = 0
+    try:
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                dirty = ReportingDirtyBucket.objects.filter(view_name=view_name, pk__gt=last_id)
+                if firm_id:
+                    dirty = dirty.filter(firm_id=firm_id)
+                dirty = list(dirty.select_for_update(skip_locked=True).order_by("pk")[: _chunk_size()])
+                if not dirty:
+                    break
+                last_id = dirty[-1].pk
+                claimed_at = timezone.now()
+                rows_written += _refresh_chunk(view_name, dirty, claimed_at)
+                # Buckets marked again since the claim stay dirty
+                ReportingDirtyBucket.objects.filter(
+                    pk__in=[bucket.pk for bucket in dirty], marked_at__lte=claimed_at
+                ).delete()
+            buckets += len(dirty)
+    except Exception as e:
+        completed_at = timezone.now()
+        MVRefreshLog.objects.filter(pk=log.pk).update(
+            refresh_completed_at=completed_at, refresh_status="failed", error_message=str(e)
+        )
+        logger.exception(f"Refresh of {view_name} failed")
+        return {
+            "status": "failed",
+            "view_name": view_name,
+            "error": str(e),
+            "completed_at": completed_at.isoformat(),
+        }
+
+    completed_at = timezone.now()
+    MVRefreshLog.objects.filter(pk=log.pk).update(
+        refresh_completed_at=completed_at, refresh_status="success", rows_affected=rows_written
+    )
+    return {
+        "status": "success",
+        "view_name": view_name,
+        "firm_id": firm_id,
+        "buckets_refreshed": buckets,
+        "rows_affected": rows_written,
+        "duration_seconds": round(time.time() - start_time, 2),
+        "completed_at": completed_at.isoformat(),
+    }
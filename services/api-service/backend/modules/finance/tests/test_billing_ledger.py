@@ -0,0 +1,227 @@
+"""
+Tests for billing balance snapshots and their verification against the ledger.
+"""
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from modules.clients.models import Client, ClientEngagement
+from modules.crm.models import Contract
+from modules.finance.billing_ledger import (
+    BillingAccountBalance,
+    BillingAllocation,
+    BillingLedgerEntry,
+    _seed_balance,
+    compute_account_balances,
+    get_account_balances,
+    get_ar_balance,
+    get_retainer_balance,
+    post_invoice_issued,
+    post_payment_received,
+    post_retainer_deposit,
+    verify_account_balances,
+)
+from modules.finance.models import Invoice
+from modules.firm.audit import AuditEvent
+from modules.firm.models import Firm
+
+ZERO = Decimal("0.00")
+
+
+@pytest.fixture
+def firm(db):
+    return Firm.objects.create(name="Ledger Firm", slug="ledger-firm")
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(username="ledger-user", password="testpass123")
+
+
+def _client(firm, name):
+    client = Client.objects.create(
+        firm=firm,
+        company_name=name,
+        primary_contact_name=f"{name} Contact",
+        primary_contact_email=f"billing@{name.lower()}.test",
+        client_since=date(2025, 1, 1),
+    )
+    contract = Contract.objects.create(
+        firm=firm,
+        client=client,
+        contract_number=f"C-{name}",
+        title="Retainer",
+        description="Monthly retainer",
+        total_value=Decimal("12000.00"),
+        start_date=date(2026, 1, 1),
+        end_date=date(2026, 12, 31),
+    )
+    ClientEngagement.objects.create(
+        client=client,
+        contract=contract,
+        version=1,
+        status="current",
+        pricing_mode="hourly",
+        hourly_rate_default=Decimal("150"),
+        start_date=date(2026, 1, 1),
+        end_date=date(2026, 12, 31),
+        contracted_value=Decimal("12000.00"),
+    )
+    return client
+
+
+@pytest.fixture
+def client(firm):
+    return _client(firm, "Acme")
+
+
+def _posting_kwargs(actor):
+    return {"created_by_actor": actor, "source": "test"}
+
+
+def _invoice_entry(client, amount, actor, number="INV-1"):
+    invoice = Invoice.objects.create(
+        firm=client.firm,
+        client=client,
+        invoice_number=number,
+        status="sent",
+        subtotal=amount,
+        tax_amount=ZERO,
+        total_amount=amount,
+        issue_date=date(2026, 5, 1),
+        due_date=date(2026, 5, 31),
+    )
+    return post_invoice_issued(
+        client.firm, client, invoice, amount, timezone.now(), f"invoice-{number}", **_posting_kwargs(actor)
+    )
+
+
+def _allocate(from_entry, to_entry, amount, actor):
+    allocation = BillingAllocation(
+        firm=from_entry.firm,
+        from_entry=from_entry,
+        to_entry=to_entry,
+        amount=amount,
+        created_by_actor=actor,
+        metadata={"source": "test"},
+    )
+    allocation.save()
+    return allocation
+
+
+def _snapshot(client):
+    balance = BillingAccountBalance.objects.get(firm=client.firm, account=client)
+    return balance.ar_balance, balance.retainer_balance
+
+
+@pytest.mark.django_db
+def test_postings_and_allocations_move_the_snapshot(firm, client, user):
+    invoice = _invoice_entry(client, Decimal("500.00"), user)
+    assert _snapshot(client) == (Decimal("500.00"), ZERO)
+
+    payment = post_payment_received(
+        firm, client, Decimal("200.00"), timezone.now(), "payment-1", **_posting_kwargs(user)
+    )
+    allocation = _allocate(payment, invoice, Decimal("200.00"), user)
+    deposit = post_retainer_deposit(
+        firm, client, Decimal("1000.00"), timezone.now(), "deposit-1", **_posting_kwargs(user)
+    )
+    BillingLedgerEntry(
+        firm=firm,
+        entry_type="credit_memo",
+        account=client,
+        amount=Decimal("50.00"),
+        occurred_at=timezone.now(),
+        idempotency_key="credit-1",
+        metadata={"reason_code": "goodwill"},
+        created_by_actor=user,
+    ).save()
+    assert _snapshot(client) == (Decimal("250.00"), Decimal("1000.00"))
+
+    allocation.amount = Decimal("150.00")
+    allocation.save()
+    _allocate(deposit, invoice, Decimal("100.00"), user)
+    assert _snapshot(client) == (Decimal("300.00"), Decimal("900.00"))
+
+    allocation.delete()
+    assert _snapshot(client) == (Decimal("450.00"), Decimal("900.00")) == compute_account_balances(firm)[client.id]
+
+    with pytest.raises(ValidationError):
+        invoice.delete()
+    assert (get_ar_balance(firm, client), get_retainer_balance(firm, client)) == _snapshot(client)
+
+
+@pytest.mark.django_db
+def test_snapshots_are_seeded_lazily_from_the_ledger(firm, client, user):
+    other = _client(firm, "Globex")
+    _invoice_entry(client, Decimal("500.00"), user)
+    _invoice_entry(other, Decimal("80.00"), user, number="INV-2")
+    BillingAccountBalance.objects.all().delete()
+
+    # The first posting without a snapshot seeds from the ledger, which already holds it
+    post_retainer_deposit(firm, client, Decimal("300.00"), timezone.now(), "deposit-1", **_posting_kwargs(user))
+    assert _snapshot(client) == (Decimal("500.00"), Decimal("300.00"))
+
+    # A concurrently seeded snapshot only takes the posting's deltas
+    _seed_balance(firm.id, client.id, Decimal("10.00"), ZERO)
+    assert _snapshot(client) == (Decimal("510.00"), Decimal("300.00"))
+
+    assert not BillingAccountBalance.objects.filter(account=other).exists()
+    balances = get_account_balances(firm, [other, client.id])
+    assert balances[other.id] == {"ar_balance": Decimal("80.00"), "retainer_balance": ZERO}
+    assert balances[client.id]["ar_balance"] == Decimal("510.00")
+    assert _snapshot(other) == (Decimal("80.00"), ZERO)
+
+
+@pytest.mark.django_db
+def test_verify_flags_drift_and_repairs_it(firm, client, user):
+    other = _client(firm, "Globex")
+    unsnapshotted = _client(firm, "Initech")
+    _invoice_entry(client, Decimal("500.00"), user)
+    _invoice_entry(other, Decimal("80.00"), user, number="INV-2")
+    _invoice_entry(unsnapshotted, Decimal("40.00"), user, number="INV-3")
+    BillingAccountBalance.objects.filter(account=unsnapshotted).delete()
+    BillingAccountBalance.objects.filter(account=client).update(ar_balance=Decimal("999.00"))
+
+    stats = verify_account_balances(firm, chunk_size=1)
+
+    assert stats == {"verified": 2, "drifted": 1, "repaired": 0, "seeded": 1}
+    drifted = BillingAccountBalance.objects.get(account=client)
+    assert drifted.ar_balance == Decimal("999.00")
+    assert drifted.drift_detected_at is not None and drifted.verified_at is not None
+    assert BillingAccountBalance.objects.get(account=other).drift_detected_at is None
+    event = AuditEvent.objects.get(action="billing_balance_drift_detected")
+    assert event.metadata["ledger_ar_balance"] == "500.00"
+    assert event.metadata["repaired"] is False
+    assert _snapshot(unsnapshotted) == (Decimal("40.00"), ZERO)
+
+    stats = verify_account_balances(firm, repair=True)
+
+    assert stats == {"verified": 3, "drifted": 1, "repaired": 1, "seeded": 0}
+    assert _snapshot(client) == (Decimal("500.00"), ZERO)
+    assert verify_account_balances(firm)["drifted"] == 0
+
+
+@pytest.mark.django_db
+def test_verify_command_reports_and_repairs(firm, client, user):
+    _invoice_entry(client, Decimal("500.00"), user)
+    BillingAccountBalance.objects.filter(account=client).update(ar_balance=ZERO)
+
+    out = StringIO()
+    call_command("verify_billing_balances", firm_id=firm.id, stdout=out)
+    assert f"Firm {firm.id}: 1 verified, 1 drifted, 0 repaired, 0 seeded" in out.getvalue()
+    assert "rerun with --repair" in out.getvalue()
+
+    out = StringIO()
+    call_command("verify_billing_balances", "--repair", firm_id=firm.id, stdout=out)
+    assert "1 drifted, 1 repaired" in out.getvalue()
+    assert _snapshot(client) == (Decimal("500.00"), ZERO)
+
+    with pytest.raises(CommandError):
+        call_command("verify_billing_balances", firm_id=firm.id + 1000)
@@ -0,0 +1,308 @@
+"""
+Tests for batched package invoicing, autopay and dunning runs.
+"""
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from itertools import product
+
+import pytest
+
+from modules.clients.models import Client, ClientEngagement
+from modules.crm.models import Contract
+from modules.finance import billing_runs
+from modules.finance.billing import should_generate_package_invoice, should_send_dunning_reminder
+from modules.finance.billing_runs import (
+    autopay_idempotency_key,
+    dunning_candidates,
+    package_invoice_candidates,
+    run_autopay,
+    run_dunning,
+    run_package_invoicing,
+)
+from modules.finance.models import BillingRun, Invoice
+from modules.firm.audit import AuditEvent
+from modules.firm.models import Firm
+
+REFERENCE_DATE = date(2026, 5, 20)
+
+
+@pytest.fixture
+def firm():
+    return Firm.objects.create(name="Billing Firm", slug="billing-firm")
+
+
+@pytest.fixture
+def client(firm):
+    return Client.objects.create(
+        firm=firm,
+        company_name="Acme",
+        primary_contact_name="Ada Acme",
+        primary_contact_email="ada@acme.test",
+        client_since=date(2025, 1, 1),
+        autopay_enabled=True,
+        autopay_payment_method_id="pm_card",
+    )
+
+
+@pytest.fixture
+def contract(firm, client):
+    return Contract.objects.create(
+        firm=firm,
+        client=client,
+        contract_number="C-1",
+        title="Retainer",
+        description="Monthly retainer",
+        total_value=Decimal("12000.00"),
+        start_date=date(2026, 1, 1),
+        end_date=date(2026, 12, 31),
+    )
+
+
+def _engagement(client, contract, version, **kwargs):
+    fields = {
+        "status": "current",
+        "pricing_mode": "package",
+        "package_fee": Decimal("1000.00"),
+        "package_fee_schedule": "Monthly",
+        "start_date": date(2026, 1, 1),
+        "end_date": date(2026, 12, 31),
+        "contracted_value": Decimal("12000.00"),
+    }
+    fields.update(kwargs)
+    return ClientEngagement.objects.create(client=client, contract=contract, version=version, **fields)
+
+
+@pytest.fixture
+def engagement(client, contract):
+    """Active engagement that invoices created without one are linked to."""
+    return _engagement(client, contract, 1, pricing_mode="hourly", package_fee=None, hourly_rate_default=Decimal("150"))
+
+
+def _invoice(client, number, **kwargs):
+    fields = {
+        "status": "sent",
+        "subtotal": Decimal("500.00"),
+        "tax_amount": Decimal("0.00"),
+        "total_amount": Decimal("500.00"),
+        "issue_date": REFERENCE_DATE - timedelta(days=90),
+        "due_date": REFERENCE_DATE - timedelta(days=60),
+    }
+    fields.update(kwargs)
+    return Invoice.objects.create(firm=client.firm, client=client, invoice_number=number, **fields)
+
+
+@pytest.mark.django_db
+def test_package_candidates_match_should_generate_package_invoice(client, contract):
+    variants = [
+        {},
+        {"package_fee_schedule": "Quarterly"},
+        {"package_fee_schedule": "Annual"},
+        {"package_fee_schedule": "one-time", "start_date": date(2026, 2, 10)},
+        {"package_fee_schedule": ""},
+        {"start_date": date(2026, 5, 10)},
+        {"end_date": date(2026, 4, 30)},
+        {"status": "on_hold"},
+        {"pricing_mode": "mixed", "hourly_rate_default": Decimal("150.00")},
+        {"pricing_mode": "hourly", "package_fee": None, "hourly_rate_default": Decimal("150.00")},
+    ]
+    engagements = [_engagement(client, contract, version, **kwargs) for version, kwargs in enumerate(variants, 1)]
+    invoiced = _engagement(client, contract, len(variants) + 1)
+    _invoice(client, "EXISTING", engagement=invoiced, period_start=date(2026, 5, 1))
+    engagements.append(invoiced)
+
+    expected = {e.id for e in engagements if should_generate_package_invoice(e, REFERENCE_DATE)}
+
+    assert set(package_invoice_candidates(REFERENCE_DATE).values_list("id", flat=True)) == expected
+    assert invoiced.id not in expected and len(expected) >= 5
+
+
+@pytest.mark.django_db
+def test_dunning_candidates_match_should_send_dunning_reminder(client, engagement):
+    def sent_days_ago(days):
+        return None if days is None else datetime.combine(
+            REFERENCE_DATE - timedelta(days=days), datetime.min.time(), tzinfo=dt_timezone.utc
+        ) + timedelta(hours=23)
+
+    invoices = []
+    grid = product(
+        billing_runs.DUNNING_STATUSES,
+        [0, 1, 2, 3, 4],
+        [3, 7, 20, 40],
+        [None, 13, 14, 29, 30],
+        [False, True],
+    )
+    for number, (status, level, overdue, last_sent, paused) in enumerate(grid):
+        invoices.append(
+            _invoice(
+                client,
+                f"DUN-{number}",
+                status=status,
+                dunning_level=level,
+                dunning_paused=paused,
+                due_date=REFERENCE_DATE - timedelta(days=overdue),
+                last_dunning_sent_at=sent_days_ago(last_sent),
+            )
+        )
+    _invoice(client, "NOT-DUE", due_date=REFERENCE_DATE + timedelta(days=1))
+
+    expected = {
+        invoice.id
+        for invoice in Invoice.objects.filter(status__in=billing_runs.DUNNING_STATUSES)
+        if should_send_dunning_reminder(invoice, REFERENCE_DATE)
+    }
+
+    assert set(dunning_candidates(REFERENCE_DATE).values_list("id", flat=True)) == expected
+    assert expected
+
+
+@pytest.mark.django_db
+def test_package_invoicing_chunks_and_records_the_run(client, contract, settings):
+    settings.BILLING_RUN_CHUNK_SIZE = 2
+    engagements = [_engagement(client, contract, version) for version in range(1, 6)]
+
+    created = run_package_invoicing(reference_date=REFERENCE_DATE, issue_date=REFERENCE_DATE)
+    rerun = run_package_invoicing(reference_date=REFERENCE_DATE, issue_date=REFERENCE_DATE)
+
+    assert sorted(invoice.engagement_id for invoice in created) == [e.id for e in engagements]
+    assert all(invoice.pk for invoice in created)
+    assert {invoice.invoice_number for invoice in created} == {f"PKG-{e.id}-2026-05-01" for e in engagements}
+    assert rerun == []
+    assert AuditEvent.objects.filter(action="package_invoice_auto_generated").count() == 5
+
+    first_run, second_run = BillingRun.objects.filter(run_type="package_invoices").order_by("started_at", "pk")
+    assert first_run.status == "success"
+    assert first_run.stats == {"candidates": 5, "created": 5}
+    assert first_run.reference_date == REFERENCE_DATE
+    assert second_run.stats == {}
+
+
+@pytest.mark.django_db
+def test_package_invoicing_counts_only_invoices_it_inserted(client, contract, monkeypatch):
+    engagements = [_engagement(client, contract, version) for version in range(1, 4)]
+    not_yet_invoiced = billing_runs._not_yet_invoiced
+
+    def invoiced_concurrently(invoices):
+        # Another run commits the first engagement's invoice after our candidate query
+        _invoice(
+            client,
+            f"PKG-{engagements[0].id}-2026-05-01",
+            engagement=engagements[0],
+            period_start=date(2026, 5, 1),
+            is_auto_generated=True,
+        )
+        return not_yet_invoiced(invoices)
+
+    monkeypatch.setattr(billing_runs, "_not_yet_invoiced", invoiced_concurrently)
+
+    created = run_package_invoicing(reference_date=REFERENCE_DATE, issue_date=REFERENCE_DATE)
+
+    assert [invoice.engagement_id for invoice in created] == [e.id for e in engagements[1:]]
+    assert BillingRun.objects.get().stats["created"] == 2
+    assert sorted(
+        AuditEvent.objects.filter(action="package_invoice_auto_generated").values_list(
+            "metadata__engagement_id", flat=True
+        )
+    ) == [e.id for e in engagements[1:]]
+
+
+@pytest.mark.django_db
+def test_package_invoicing_skips_rows_inserted_outside_a_run(client, contract):
+    engagements = [_engagement(client, contract, version) for version in range(1, 3)]
+    invoices = [
+        Invoice(
+            engagement=engagement,
+            period_start=date(2026, 5, 1),
+            **billing_runs.package_invoice_fields(engagement, REFERENCE_DATE, date(2026, 5, 1), date(2026, 5, 31)),
+        )
+        for engagement in engagements
+    ]
+    _invoice(client, invoices[1].invoice_number, engagement=engagements[1], period_start=date(2026, 5, 1))
+
+    created = billing_runs._insert_package_invoices(invoices)
+
+    assert created == [invoices[0]]
+    assert Invoice.objects.filter(engagement=engagements[0]).count() == 1
+
+
+class RecordingPaymentService:
+    def __init__(self, fail_for=()):
+        self.keys = []
+        self.fail_for = set(fail_for)
+
+    def create_payment_intent(self, amount, currency, customer_id, metadata, payment_method, idempotency_key):
+        self.keys.append(idempotency_key)
+        if metadata["invoice_id"] in self.fail_for:
+            raise RuntimeError("card_declined")
+        return {"id": f"pi_{metadata['invoice_id']}"}
+
+
+@pytest.mark.django_db
+def test_autopay_idempotency_key_is_stable_across_a_crashed_run(client, engagement, monkeypatch):
+    invoice = _invoice(client, "AUTO-1", autopay_opt_in=True)
+    service = RecordingPaymentService()
+    bulk_update = Invoice.objects.bulk_update
+    calls = []
+
+    def crash_after_charging(objs, fields, **kwargs):
+        calls.append(fields)
+        if "amount_paid" in fields:
+            raise RuntimeError("worker died")
+        return bulk_update(objs, fields, **kwargs)
+
+    monkeypatch.setattr(Invoice.objects, "bulk_update", crash_after_charging)
+    with pytest.raises(RuntimeError):
+        run_autopay(payment_service=service)
+    monkeypatch.undo()
+
+    run_autopay(payment_service=service)
+
+    invoice.refresh_from_db()
+    assert service.keys == [autopay_idempotency_key(invoice)] * 2 == [f"invoice_{invoice.id}_autopay_0"] * 2
+    assert invoice.status == "paid"
+    assert invoice.stripe_payment_intent_id == f"pi_{invoice.id}"
+    failed_run, retried_run = BillingRun.objects.filter(run_type="autopay").order_by("started_at", "pk")
+    assert (failed_run.status, failed_run.error_message) == ("failed", "RuntimeError")
+    assert retried_run.status == "success"
+    assert retried_run.stats["charged"] == 1
+
+
+@pytest.mark.django_db
+def test_autopay_failure_moves_to_the_next_attempt_key(client, engagement, settings):
+    settings.BILLING_RUN_CHUNK_SIZE = 1
+    declined = _invoice(client, "AUTO-1", autopay_opt_in=True)
+    paid = _invoice(client, "AUTO-2", autopay_opt_in=True)
+    service = RecordingPaymentService(fail_for={declined.id})
+
+    run_autopay(payment_service=service)
+
+    declined.refresh_from_db()
+    paid.refresh_from_db()
+    assert sorted(service.keys) == sorted([f"invoice_{declined.id}_autopay_0", f"invoice_{paid.id}_autopay_0"])
+    assert declined.status == "failed"
+    assert declined.autopay_status == "failed"
+    assert autopay_idempotency_key(declined) == f"invoice_{declined.id}_autopay_1"
+    assert paid.status == "paid"
+    assert BillingRun.objects.get(run_type="autopay").stats == {
+        "cancelled": 0,
+        "candidates": 2,
+        "charged": 1,
+        "failed": 1,
+    }
+
+
+@pytest.mark.django_db
+def test_dunning_run_advances_levels_in_chunks(client, engagement, settings, monkeypatch):
+    settings.BILLING_RUN_CHUNK_SIZE = 2
+    sent = []
+    monkeypatch.setattr(billing_runs, "send_dunning_notification", lambda invoice: sent.append(invoice.id))
+    due = [_invoice(client, f"DUE-{n}", due_date=REFERENCE_DATE - timedelta(days=10)) for n in range(3)]
+    _invoice(client, "RECENT", due_date=REFERENCE_DATE - timedelta(days=3))
+    _invoice(client, "PAUSED", dunning_paused=True)
+
+    processed = run_dunning(reference_date=REFERENCE_DATE)
+
+    assert sorted(invoice.id for invoice in processed) == sorted(sent) == [invoice.id for invoice in due]
+    assert set(Invoice.objects.filter(id__in=sent).values_list("dunning_level", "status")) == {(1, "overdue")}
+    assert run_dunning(reference_date=REFERENCE_DATE) == []
+    first_run = BillingRun.objects.filter(run_type="dunning").order_by("started_at", "pk").first()
+    assert first_run.stats == {"candidates": 3, "level_1": 3, "sent": 3}
@@ -0,0 +1,311 @@
+"""
+Tests for incremental reporting summary refresh.
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from modules.clients.models import Client
+from modules.finance.models import Invoice, ReportingDirtyBucket, RevenueByProjectMonthMV
+from modules.finance.reporting import (
+    REVENUE,
+    UTILIZATION_PROJECT,
+    UTILIZATION_USER,
+    VIEW_NAMES,
+    mark_all_dirty,
+    mark_dirty,
+    month_start,
+    refresh_view,
+    week_start,
+)
+from modules.firm.models import Firm
+from modules.projects.models import Expense, Project, TimeEntry, UtilizationByProjectMonthMV, UtilizationByUserWeekMV
+
+User = get_user_model()
+
+
+@pytest.fixture
+def firm():
+    return Firm.objects.create(name="Reporting Firm", slug="reporting-firm")
+
+
+@pytest.fixture
+def user(firm):
+    return User.objects.create_user(username="consultant", email="consultant@example.com", password="testpass123")
+
+
+@pytest.fixture
+def client(firm):
+    return Client.objects.create(
+        firm=firm,
+        company_name="Acme",
+        primary_contact_name="Ada Acme",
+        primary_contact_email="ada@acme.test",
+        client_since=date(2025, 1, 1),
+    )
+
+
+def _project(client, code):
+    return Project.objects.create(
+        firm=client.firm,
+        client=client,
+        project_code=code,
+        name=f"Project {code}",
+        start_date=date(2026, 1, 1),
+        end_date=date(2026, 12, 31),
+    )
+
+
+@pytest.fixture
+def project(client):
+    return _project(client, "P-1")
+
+
+def _time_entry(project, user, day, hours, is_billable=True):
+    return TimeEntry.objects.create(
+        project=project,
+        user=user,
+        date=day,
+        hours=Decimal(hours),
+        hourly_rate=Decimal("100.00"),
+        is_billable=is_billable,
+        description="Work",
+    )
+
+
+def _invoice(project, user, number, issue_date, **kwargs):
+    fields = {
+        "status": "paid",
+        "subtotal": Decimal("1000.00"),
+        "total_amount": Decimal("1000.00"),
+        "amount_paid": Decimal("1000.00"),
+        "due_date": date(2026, 12, 31),
+        "engagement_override": True,
+        "engagement_override_reason": "Reporting test",
+        "engagement_override_by": user,
+    }
+    fields.update(kwargs)
+    return Invoice.objects.create(
+        firm=project.firm, client=project.client, project=project, invoice_number=number, issue_date=issue_date, **fields
+    )
+
+
+def _expense(project, user, day, amount, **kwargs):
+    fields = {"status": "approved", "approved_by": user}
+    fields.update(kwargs)
+    return Expense.objects.create(
+        project=project, submitted_by=user, date=day, amount=Decimal(amount), description="Travel", **fields
+    )
+
+
+def _dirty():
+    return set(ReportingDirtyBucket.objects.values_list("view_name", "firm_id", "subject_id", "period"))
+
+
+def test_period_starts_match_date_trunc():
+    assert month_start(date(2026, 3, 15)) == date(2026, 3, 1)
+    assert week_start(date(2026, 3, 15)) == date(2026, 3, 9)
+    assert week_start(date(2026, 3, 9)) == date(2026, 3, 9)
+
+
+@pytest.mark.django_db
+def test_marking_a_bucket_twice_keeps_one_row(firm):
+    bucket = (UTILIZATION_USER, firm.id, 7, date(2026, 3, 9))
+
+    mark_dirty([bucket])
+    mark_dirty([bucket])
+
+    assert ReportingDirtyBucket.objects.filter(view_name=UTILIZATION_USER, firm_id=firm.id).count() == 1
+
+
+@pytest.mark.django_db
+def test_refresh_replaces_only_dirty_buckets(firm):
+    def summary_row(project_id, month):
+        return RevenueByProjectMonthMV(
+            firm=firm,
+            project_id=project_id,
+            project_name="Gone",
+            project_code="GONE",
+            client_id=1,
+            month=month,
+            total_revenue=Decimal("100.00"),
+            labor_cost=Decimal("0.00"),
+            expense_cost=Decimal("0.00"),
+            overhead_cost=Decimal("0.00"),
+            team_members=0,
+            total_hours=Decimal("0.00"),
+            billable_hours=Decimal("0.00"),
+            invoice_count=1,
+            paid_invoice_count=1,
+            refreshed_at=timezone.now(),
+        )
+
+    RevenueByProjectMonthMV.objects.bulk_create(
+        [summary_row(999, date(2026, 2, 1)), summary_row(999, date(2026, 3, 1))]
+    )
+    mark_dirty([(REVENUE, firm.id, 999, date(2026, 3, 1))])
+
+    result = refresh_view(REVENUE, firm_id=firm.id)
+
+    assert result["status"] == "success"
+    assert result["buckets_refreshed"] == 1
+    # The project no longer has source data, so only its dirty month disappears.
+    assert list(RevenueByProjectMonthMV.objects.values_list("month", flat=True)) == [date(2026, 2, 1)]
+    assert not ReportingDirtyBucket.objects.exists()
+
+
+@pytest.mark.django_db
+def test_time_entry_changes_mark_old_and_new_buckets(firm, user, client, project, django_capture_on_commit_callbacks):
+    other_project = _project(client, "P-2")
+    with django_capture_on_commit_callbacks(execute=True):
+        entry = _time_entry(project, user, date(2026, 3, 10), "2.00")
+    assert _dirty() == {
+        (REVENUE, firm.id, project.id, date(2026, 3, 1)),
+        (UTILIZATION_PROJECT, firm.id, project.id, date(2026, 3, 1)),
+        (UTILIZATION_USER, firm.id, user.id, date(2026, 3, 9)),
+    }
+
+    ReportingDirtyBucket.objects.all().delete()
+    entry = TimeEntry.objects.get(pk=entry.pk)
+    entry.project = other_project
+    entry.date = date(2026, 4, 15)
+    with django_capture_on_commit_callbacks(execute=True):
+        entry.save()
+    assert _dirty() == {
+        (REVENUE, firm.id, project.id, date(2026, 3, 1)),
+        (UTILIZATION_PROJECT, firm.id, project.id, date(2026, 3, 1)),
+        (UTILIZATION_USER, firm.id, user.id, date(2026, 3, 9)),
+        (REVENUE, firm.id, other_project.id, date(2026, 4, 1)),
+        (UTILIZATION_PROJECT, firm.id, other_project.id, date(2026, 4, 1)),
+        (UTILIZATION_USER, firm.id, user.id, date(2026, 4, 13)),
+    }
+
+    ReportingDirtyBucket.objects.all().delete()
+    with django_capture_on_commit_callbacks(execute=True):
+        entry.delete()
+    assert _dirty() == {
+        (REVENUE, firm.id, other_project.id, date(2026, 4, 1)),
+        (UTILIZATION_PROJECT, firm.id, other_project.id, date(2026, 4, 1)),
+        (UTILIZATION_USER, firm.id, user.id, date(2026, 4, 13)),
+    }
+
+
+@pytest.mark.django_db
+def test_invoice_and_expense_changes_mark_old_and_new_buckets(
+    firm, user, project, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        invoice = _invoice(project, user, "INV-1", date(2026, 3, 20))
+        expense = _expense(project, user, date(2026, 5, 2), "50.00")
+    assert _dirty() == {(REVENUE, firm.id, project.id, date(2026, 3, 1)), (REVENUE, firm.id, project.id, date(2026, 5, 1))}
+
+    ReportingDirtyBucket.objects.all().delete()
+    invoice = Invoice.objects.get(pk=invoice.pk)
+    invoice.issue_date = date(2026, 4, 1)
+    expense = Expense.objects.get(pk=expense.pk)
+    expense.date = date(2026, 6, 30)
+    with django_capture_on_commit_callbacks(execute=True):
+        invoice.save()
+        expense.save()
+    assert _dirty() == {
+        (REVENUE, firm.id, project.id, date(2026, month, 1)) for month in (3, 4, 5, 6)
+    }
+
+    ReportingDirtyBucket.objects.all().delete()
+    with django_capture_on_commit_callbacks(execute=True):
+        invoice.delete()
+        expense.delete()
+    assert _dirty() == {(REVENUE, firm.id, project.id, date(2026, 4, 1)), (REVENUE, firm.id, project.id, date(2026, 6, 1))}
+
+
+@pytest.mark.django_db
+def test_snapshots_are_read_only_for_updates_that_can_move_buckets(
+    firm, user, project, django_capture_on_commit_callbacks
+):
+    snapshot_select = 'SELECT "projects_time_entries"."project_id", "projects_time_entries"."user_id", '
+
+    def snapshot_reads(queries):
+        return [query for query in queries if query["sql"].startswith(snapshot_select)]
+
+    with django_capture_on_commit_callbacks(execute=True), CaptureQueriesContext(connection) as inserted:
+        entry = _time_entry(project, user, date(2026, 3, 10), "2.00")
+    assert not snapshot_reads(inserted.captured_queries)
+
+    loaded = list(TimeEntry.objects.filter(pk=entry.pk))
+    assert not hasattr(loaded[0], "_reporting_snapshot")
+
+    ReportingDirtyBucket.objects.all().delete()
+    entry = loaded[0]
+    entry.description = "Reworded"
+    with django_capture_on_commit_callbacks(execute=True), CaptureQueriesContext(connection) as unrelated:
+        entry.save(update_fields=["description"])
+    assert not snapshot_reads(unrelated.captured_queries)
+    # Without a snapshot only the current buckets are marked.
+    assert _dirty() == {
+        (REVENUE, firm.id, project.id, date(2026, 3, 1)),
+        (UTILIZATION_PROJECT, firm.id, project.id, date(2026, 3, 1)),
+        (UTILIZATION_USER, firm.id, user.id, date(2026, 3, 9)),
+    }
+
+    ReportingDirtyBucket.objects.all().delete()
+    entry.date = date(2026, 4, 15)
+    with django_capture_on_commit_callbacks(execute=True), CaptureQueriesContext(connection) as moved:
+        entry.save(update_fields=["date"])
+    assert len(snapshot_reads(moved.captured_queries)) == 1
+    assert (REVENUE, firm.id, project.id, date(2026, 3, 1)) in _dirty()
+    assert (REVENUE, firm.id, project.id, date(2026, 4, 1)) in _dirty()
+    assert not hasattr(entry, "_reporting_snapshot")
+
+
+@pytest.mark.django_db
+def test_refresh_recomputes_summaries_from_source_rows(firm, user, project):
+    other_user = User.objects.create_user(username="analyst", email="analyst@example.com", password="testpass123")
+    _time_entry(project, user, date(2026, 3, 10), "3.00")
+    _time_entry(project, user, date(2026, 3, 11), "1.00", is_billable=False)
+    _time_entry(project, other_user, date(2026, 3, 17), "2.00")
+    _invoice(project, user, "INV-1", date(2026, 3, 5))
+    _invoice(project, user, "INV-2", date(2026, 3, 25), status="partial", amount_paid=Decimal("250.00"))
+    _invoice(project, user, "INV-3", date(2026, 3, 26), status="sent", amount_paid=Decimal("0.00"))
+    _expense(project, user, date(2026, 3, 12), "80.00")
+    _expense(project, user, date(2026, 3, 13), "999.00", status="draft", approved_by=None)
+
+    for view_name in VIEW_NAMES:
+        mark_all_dirty(view_name, firm_id=firm.id)
+        assert refresh_view(view_name, firm_id=firm.id)["status"] == "success"
+
+    revenue = RevenueByProjectMonthMV.objects.get()
+    assert (revenue.project_id, revenue.month, revenue.project_code) == (project.id, date(2026, 3, 1), "P-1")
+    assert revenue.total_revenue == Decimal("1250.00")
+    assert (revenue.invoice_count, revenue.paid_invoice_count) == (3, 1)
+    assert revenue.labor_cost == Decimal("600.00")
+    assert revenue.overhead_cost == Decimal("120.00")
+    assert revenue.expense_cost == Decimal("80.00")
+    assert (revenue.total_hours, revenue.billable_hours, revenue.team_members) == (
+        Decimal("6.00"),
+        Decimal("5.00"),
+        2,
+    )
+
+    utilization = UtilizationByProjectMonthMV.objects.get()
+    assert (utilization.total_hours, utilization.billable_hours, utilization.non_billable_hours) == (
+        Decimal("6.00"),
+        Decimal("5.00"),
+        Decimal("1.00"),
+    )
+    assert (utilization.team_members, utilization.days_worked) == (2, 3)
+    assert (utilization.total_cost, utilization.billable_cost) == (Decimal("600.00"), Decimal("500.00"))
+
+    weeks = {
+        (row.user_id, row.week_start): (row.total_hours, row.billable_hours, row.days_worked)
+        for row in UtilizationByUserWeekMV.objects.all()
+    }
+    assert weeks == {
+        (user.id, date(2026, 3, 9)): (Decimal("4.00"), Decimal("3.00"), 2),
+        (other_user.id, date(2026, 3, 16)): (Decimal("2.00"), Decimal("2.00"), 1),
+    }
+    assert not ReportingDirtyBucket.objects.exists()
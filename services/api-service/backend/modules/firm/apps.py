@@ -6,3 +6,7 @@ class FirmConfig(AppConfig):
     name = "modules.firm"
     label = "firm"
     verbose_name = "Firm (Workspace) Management"
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import modules.firm.signals  # noqa: F401
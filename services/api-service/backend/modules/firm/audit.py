@@ -278,7 +278,7 @@ class AuditEventManager:
             category=category,
             action=action,
             actor=actor,
-            target_model=target_model,
+            target_model=target_model or "",
             target_id=str(target_id) if target_id else "",
             target_repr=target_repr or "",
             reason=reason,
@@ -286,8 +286,8 @@ class AuditEventManager:
             severity=severity,
             metadata=metadata,
             ip_address=ip_address,
-            user_agent=user_agent,
-            request_id=request_id,
+            user_agent=user_agent or "",
+            request_id=request_id or "",
             actor_role=actor_role,
         )
 
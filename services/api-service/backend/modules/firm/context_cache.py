@@ -0,0 +1,165 @@
+"""
+Firm Context Cache (TIER 0).
+
+Caches the lookups FirmContextMiddleware and BreakGlassImpersonationMiddleware
+perform on every authenticated request:
+
+- subdomain slug -> firm id
+- firm id -> active Firm instance
+- (user, firm) membership -> firm id
+- firm id -> active BreakGlassSession (or "none")
+
+Entries are invalidated explicitly from model signals (see modules.firm.signals)
+whenever a Firm, FirmMembership or BreakGlassSession changes, and expire after
+FIRM_CONTEXT_CACHE_TTL_SECONDS as a backstop. QuerySet.update() and
+bulk_update() skip the signals, so the models' querysets invalidate the rows
+they update themselves; raw SQL writes must call the invalidate_* helpers.
+Cross-process invalidation requires a shared cache backend; with the default
+local-memory cache the TTL bounds how long another worker may serve a stale
+entry.
+
+SECURITY: Only firms in ACTIVE_FIRM_STATUSES are ever cached, and cached
+break-glass sessions are re-checked against expires_at on every read.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from modules.firm.models import BreakGlassSession, Firm, FirmMembership
+
+ACTIVE_FIRM_STATUSES = ("trial", "active")
+CACHE_PREFIX = "firm_ctx"
+_MISSING = "__none__"
+
+
+def _ttl() -> int:
+    return getattr(settings, "FIRM_CONTEXT_CACHE_TTL_SECONDS", 60)
+
+
+def _slug_key(slug: str) -> str:
+    return f"{CACHE_PREFIX}:slug:{slug}"
+
+
+def _firm_key(firm_id: int) -> str:
+    return f"{CACHE_PREFIX}:firm:{firm_id}"
+
+
+def _membership_key(user_id: int, firm_id: int | None) -> str:
+    return f"{CACHE_PREFIX}:member:{user_id}:{firm_id if firm_id is not None else 'default'}"
+
+
+def _break_glass_key(firm_id: int) -> str:
+    return f"{CACHE_PREFIX}:break_glass:{firm_id}"
+
+
+def get_active_firm(firm_id: int) -> Firm | None:
+    """Return the active/trial Firm for an id, caching positive and negative results."""
+    key = _firm_key(firm_id)
+    cached = cache.get(key)
+    if cached == _MISSING:
+        return None
+    if cached is not None:
+        return cached
+
+    firm = Firm.objects.filter(id=firm_id, status__in=ACTIVE_FIRM_STATUSES).first()
+    cache.set(key, firm if firm is not None else _MISSING, _ttl())
+    return firm
+
+
+def get_active_firm_by_slug(slug: str) -> Firm | None:
+    """Resolve a subdomain slug to an active Firm via the cached id mapping."""
+    key = _slug_key(slug)
+    cached = cache.get(key)
+    if cached == _MISSING:
+        return None
+    if cached is not None:
+        firm = get_active_firm(cached)
+        # Guard against a renamed slug still pointing at the old firm id.
+        if firm is not None and firm.slug == slug:
+            return firm
+        cache.delete(key)
+
+    firm = Firm.objects.filter(slug=slug, status__in=ACTIVE_FIRM_STATUSES).first()
+    if firm is None:
+        cache.set(key, _MISSING, _ttl())
+        return None
+    cache.set(key, firm.id, _ttl())
+    cache.set(_firm_key(firm.id), firm, _ttl())
+    return firm
+
+
+def get_membership_firm(user_id: int, firm_id: int | None = None) -> Firm | None:
+    """
+    Resolve the firm a user may act in via FirmMembership.
+
+    With ``firm_id`` the membership for that firm is verified; without it the
+    user's first membership in an active firm is used.
+    """
+    key = _membership_key(user_id, firm_id)
+    cached = cache.get(key)
+    if cached == _MISSING:
+        return None
+    if cached is not None:
+        firm = get_active_firm(cached)
+        if firm is not None:
+            return firm
+        cache.delete(key)
+
+    memberships = FirmMembership.objects.filter(user_id=user_id, firm__status__in=ACTIVE_FIRM_STATUSES)
+    if firm_id is not None:
+        memberships = memberships.filter(firm_id=firm_id)
+    membership = memberships.select_related("firm").first()
+    if membership is None:
+        cache.set(key, _MISSING, _ttl())
+        return None
+    cache.set(key, membership.firm_id, _ttl())
+    cache.set(_firm_key(membership.firm_id), membership.firm, _ttl())
+    return membership.firm
+
+
+def get_active_break_glass_session(firm: Firm) -> BreakGlassSession | None:
+    """Cached equivalent of modules.firm.utils.get_active_break_glass_session."""
+    key = _break_glass_key(firm.id)
+    cached = cache.get(key)
+    if cached == _MISSING:
+        return None
+    if cached is not None:
+        if cached.status == BreakGlassSession.STATUS_ACTIVE and cached.expires_at > timezone.now():
+            return cached
+        cache.delete(key)
+
+    session = (
+        BreakGlassSession.objects.for_firm(firm)
+        .active()
+        .select_related("firm", "operator", "impersonated_user")
+        .first()
+    )
+    if session is None:
+        cache.set(key, _MISSING, _ttl())
+        return None
+    remaining = int((session.expires_at - timezone.now()).total_seconds())
+    if remaining > 0:
+        cache.set(key, session, min(_ttl(), remaining))
+    return session
+
+
+def invalidate_firm(firm: Firm) -> None:
+    """
+    Drop cached entries for a firm (status, settings or slug changed, or deleted).
+
+    A stale mapping from a previous slug is caught by the slug check in
+    get_active_firm_by_slug once the firm entry is gone.
+    """
+    cache.delete_many([_firm_key(firm.id), _slug_key(firm.slug), _break_glass_key(firm.id)])
+
+
+def invalidate_membership(user_id: int, firm_id: int) -> None:
+    """Drop cached membership resolutions for a user after a membership change."""
+    cache.delete_many([_membership_key(user_id, firm_id), _membership_key(user_id, None)])
+
+
+def invalidate_break_glass(firm_id: int) -> None:
+    """Drop the cached break-glass lookup for a firm after a session starts or ends."""
+    cache.delete(_break_glass_key(firm_id))
+
@@ -2,13 +2,24 @@
 Firm data export helpers for offboarding workflows.
 
 Defines export schema, data domains, integrity checks, and retention sequencing.
+
+Exports are streamed: each dataset is read with a chunked iterator and written
+as NDJSON into a zip archive, while counts, checksums and integrity checks are
+accumulated incrementally.
 """
 
 import hashlib
 import json
+import os
+import zipfile
+from array import array
+from bisect import bisect_left
 from datetime import timedelta
+from pathlib import Path
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
 from modules.clients.models import (
@@ -141,227 +152,236 @@ def export_schema():
     }
 
 
-def _serialize_instances(instances, field_names, extra_field_getter=None):
-    data = []
-    for instance in instances:
-        record = {field: getattr(instance, field) for field in field_names if hasattr(instance, field)}
-        if extra_field_getter:
-            record.update(extra_field_getter(instance))
-        data.append(record)
-    return data
-
-
-def _assigned_team_ids(client):
-    return {"assigned_team_ids": list(client.assigned_team.values_list("id", flat=True))}
-
-
-def _export_domains(firm):
-    organizations = Organization.objects.filter(firm=firm)
-    clients = Client.objects.filter(firm=firm).prefetch_related("assigned_team")
-    portal_users = ClientPortalUser.objects.filter(client__firm=firm)
-    notes = ClientNote.objects.filter(client__firm=firm)
-    engagements = ClientEngagement.objects.filter(firm=firm)
-    comments = ClientComment.objects.filter(client__firm=firm)
-    chat_threads = ClientChatThread.objects.filter(client__firm=firm)
-    messages = ClientMessage.objects.filter(thread__client__firm=firm)
-
-    projects = Project.objects.filter(firm=firm)
-    tasks = Task.objects.filter(project__firm=firm)
-    time_entries = TimeEntry.objects.filter(project__firm=firm)
-
-    invoices = Invoice.objects.filter(firm=firm)
-    disputes = PaymentDispute.objects.filter(firm=firm)
-    failures = PaymentFailure.objects.filter(firm=firm)
-    chargebacks = Chargeback.objects.filter(firm=firm)
-    bills = Bill.objects.filter(firm=firm)
-    ledger_entries = LedgerEntry.objects.filter(firm=firm)
-    credit_entries = CreditLedgerEntry.objects.filter(firm=firm)
-
-    audit_events = AuditEvent.objects.filter(firm=firm)
-    purged_content = PurgedContent.objects.filter(firm=firm)
-
-    schema = export_schema()
-    client_fields = schema["domains"]["clients"]["clients"]["fields"]
-    return {
-        "clients": {
-            "organizations": _serialize_instances(
-                organizations, schema["domains"]["clients"]["organizations"]["fields"]
-            ),
-            "clients": _serialize_instances(clients, client_fields, _assigned_team_ids),
-            "portal_users": _serialize_instances(portal_users, schema["domains"]["clients"]["portal_users"]["fields"]),
-            "notes": _serialize_instances(notes, schema["domains"]["clients"]["notes"]["fields"]),
-            "engagements": _serialize_instances(engagements, schema["domains"]["clients"]["engagements"]["fields"]),
-            "comments": _serialize_instances(comments, schema["domains"]["clients"]["comments"]["fields"]),
-            "chat_threads": _serialize_instances(chat_threads, schema["domains"]["clients"]["chat_threads"]["fields"]),
-            "messages": _serialize_instances(messages, schema["domains"]["clients"]["messages"]["fields"]),
-        },
-        "projects": {
-            "projects": _serialize_instances(projects, schema["domains"]["projects"]["projects"]["fields"]),
-            "tasks": _serialize_instances(tasks, schema["domains"]["projects"]["tasks"]["fields"]),
-            "time_entries": _serialize_instances(time_entries, schema["domains"]["projects"]["time_entries"]["fields"]),
-        },
-        "billing": {
-            "invoices": _serialize_instances(invoices, schema["domains"]["billing"]["invoices"]["fields"]),
-            "payment_disputes": _serialize_instances(
-                disputes, schema["domains"]["billing"]["payment_disputes"]["fields"]
-            ),
-            "payment_failures": _serialize_instances(
-                failures, schema["domains"]["billing"]["payment_failures"]["fields"]
-            ),
-            "chargebacks": _serialize_instances(chargebacks, schema["domains"]["billing"]["chargebacks"]["fields"]),
-            "bills": _serialize_instances(bills, schema["domains"]["billing"]["bills"]["fields"]),
-            "ledger_entries": _serialize_instances(
-                ledger_entries, schema["domains"]["billing"]["ledger_entries"]["fields"]
+EXPORT_CHUNK_SIZE = 2000
+
+# (check name, [(detail key, child dataset, fk field, parent dataset, nullable)])
+INTEGRITY_LINK_CHECKS = [
+    (
+        "clients.organization_links",
+        [("invalid_organization_ids", ("clients", "clients"), "organization_id", ("clients", "organizations"), True)],
+    ),
+    (
+        "projects.client_links",
+        [("invalid_client_ids", ("projects", "projects"), "client_id", ("clients", "clients"), False)],
+    ),
+    (
+        "projects.task_links",
+        [("invalid_project_ids", ("projects", "tasks"), "project_id", ("projects", "projects"), False)],
+    ),
+    (
+        "projects.time_entry_links",
+        [
+            ("invalid_project_ids", ("projects", "time_entries"), "project_id", ("projects", "projects"), False),
+            ("invalid_task_ids", ("projects", "time_entries"), "task_id", ("projects", "tasks"), True),
+        ],
+    ),
+    (
+        "billing.invoice_links",
+        [
+            ("invalid_client_ids", ("billing", "invoices"), "client_id", ("clients", "clients"), False),
+            ("invalid_project_ids", ("billing", "invoices"), "project_id", ("projects", "projects"), True),
+            ("invalid_engagement_ids", ("billing", "invoices"), "engagement_id", ("clients", "engagements"), True),
+        ],
+    ),
+    (
+        "billing.dispute_links",
+        [
+            (
+                "invalid_dispute_invoice_ids",
+                ("billing", "payment_disputes"),
+                "invoice_id",
+                ("billing", "invoices"),
+                False,
             ),
-            "credit_ledger_entries": _serialize_instances(
-                credit_entries, schema["domains"]["billing"]["credit_ledger_entries"]["fields"]
+            (
+                "invalid_failure_invoice_ids",
+                ("billing", "payment_failures"),
+                "invoice_id",
+                ("billing", "invoices"),
+                False,
             ),
-        },
-        "audit": {
-            "events": _serialize_instances(audit_events, schema["domains"]["audit"]["events"]["fields"]),
-            "purged_content": _serialize_instances(
-                purged_content, schema["domains"]["audit"]["purged_content"]["fields"]
+            (
+                "invalid_chargeback_invoice_ids",
+                ("billing", "chargebacks"),
+                "invoice_id",
+                ("billing", "invoices"),
+                False,
             ),
-        },
-    }
+        ],
+    ),
+]
+
+
+class CompactIdSet:
+    """
+    Memory-compact membership set for integer primary keys.
+
+    Ids are stored in a typed array (8 bytes each) and looked up by binary search.
+    Datasets are streamed in primary-key order, so the array is normally built
+    already sorted; out-of-order or non-integer ids are still handled.
+    """
+
+    def __init__(self):
+        self._ids = array("q")
+        self._sorted = True
+        self._other = set()
+
+    def add(self, value):
+        if not isinstance(value, int):
+            self._other.add(value)
+            return
+        if self._ids and value < self._ids[-1]:
+            self._sorted = False
+        self._ids.append(value)
+
+    def __contains__(self, value):
+        if not isinstance(value, int):
+            return value in self._other
+        if not self._sorted:
+            self._ids = array("q", sorted(self._ids))
+            self._sorted = True
+        index = bisect_left(self._ids, value)
+        return index < len(self._ids) and self._ids[index] == value
+
+    def __len__(self):
+        return len(self._ids) + len(self._other)
+
+
+class _ExportEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return str(o)
+
+
+def _dataset_querysets(firm):
+    """Yield (domain, dataset, queryset, extra_field_getter) with parents before children."""
+    yield "clients", "organizations", Organization.objects.filter(firm=firm), None
+    yield "clients", "clients", Client.objects.filter(firm=firm).prefetch_related("assigned_team"), _assigned_team_ids
+    yield "clients", "portal_users", ClientPortalUser.objects.filter(client__firm=firm), None
+    yield "clients", "notes", ClientNote.objects.filter(client__firm=firm), None
+    yield "clients", "engagements", ClientEngagement.objects.filter(firm=firm), None
+    yield "clients", "comments", ClientComment.objects.filter(client__firm=firm), None
+    yield "clients", "chat_threads", ClientChatThread.objects.filter(client__firm=firm), None
+    yield "clients", "messages", ClientMessage.objects.filter(thread__client__firm=firm), None
+
+    yield "projects", "projects", Project.objects.filter(firm=firm), None
+    yield "projects", "tasks", Task.objects.filter(project__firm=firm), None
+    yield "projects", "time_entries", TimeEntry.objects.filter(project__firm=firm), None
+
+    yield "billing", "invoices", Invoice.objects.filter(firm=firm), None
+    yield "billing", "payment_disputes", PaymentDispute.objects.filter(firm=firm), None
+    yield "billing", "payment_failures", PaymentFailure.objects.filter(firm=firm), None
+    yield "billing", "chargebacks", Chargeback.objects.filter(firm=firm), None
+    yield "billing", "bills", Bill.objects.filter(firm=firm), None
+    yield "billing", "ledger_entries", LedgerEntry.objects.filter(firm=firm), None
+    yield "billing", "credit_ledger_entries", CreditLedgerEntry.objects.filter(firm=firm), None
+
+    yield "audit", "events", AuditEvent.objects.filter(firm=firm), None
+    yield "audit", "purged_content", PurgedContent.objects.filter(firm=firm), None
+
+
+def _serialize_instance(instance, field_names, extra_field_getter=None):
+    record = {field: getattr(instance, field) for field in field_names if hasattr(instance, field)}
+    if extra_field_getter:
+        record.update(extra_field_getter(instance))
+    return record
 
 
-def _build_manifest(domains):
-    manifest = {"counts": {}, "total_records": 0}
-    for domain_name, datasets in domains.items():
-        manifest["counts"][domain_name] = {}
-        for dataset_name, records in datasets.items():
-            count = len(records)
-            manifest["counts"][domain_name][dataset_name] = count
-            manifest["total_records"] += count
-    return manifest
-
-
-def _collect_ids(records, key="id"):
-    return {record[key] for record in records if record.get(key) is not None}
-
-
-def _check_fk_membership(records, key, allowed_ids):
-    return sorted({record[key] for record in records if record.get(key) not in allowed_ids})
-
-
-def _integrity_report(firm, domains):
-    checks = []
-    firm_id = firm.id
-
-    client_ids = _collect_ids(domains["clients"]["clients"])
-    organization_ids = _collect_ids(domains["clients"]["organizations"])
-    engagement_ids = _collect_ids(domains["clients"]["engagements"])
-    project_ids = _collect_ids(domains["projects"]["projects"])
-    task_ids = _collect_ids(domains["projects"]["tasks"])
-    invoice_ids = _collect_ids(domains["billing"]["invoices"])
-
-    invalid_client_orgs = _check_fk_membership(
-        domains["clients"]["clients"], "organization_id", organization_ids | {None}
-    )
-    checks.append(
-        {
-            "name": "clients.organization_links",
-            "status": "ok" if not invalid_client_orgs else "failed",
-            "details": {"invalid_organization_ids": invalid_client_orgs},
-        }
-    )
-
-    invalid_project_clients = _check_fk_membership(domains["projects"]["projects"], "client_id", client_ids)
-    checks.append(
-        {
-            "name": "projects.client_links",
-            "status": "ok" if not invalid_project_clients else "failed",
-            "details": {"invalid_client_ids": invalid_project_clients},
-        }
-    )
-
-    invalid_task_projects = _check_fk_membership(domains["projects"]["tasks"], "project_id", project_ids)
-    checks.append(
-        {
-            "name": "projects.task_links",
-            "status": "ok" if not invalid_task_projects else "failed",
-            "details": {"invalid_project_ids": invalid_task_projects},
-        }
-    )
-
-    invalid_time_projects = _check_fk_membership(domains["projects"]["time_entries"], "project_id", project_ids)
-    invalid_time_tasks = _check_fk_membership(domains["projects"]["time_entries"], "task_id", task_ids | {None})
-    checks.append(
-        {
-            "name": "projects.time_entry_links",
-            "status": "ok" if not invalid_time_projects and not invalid_time_tasks else "failed",
-            "details": {
-                "invalid_project_ids": invalid_time_projects,
-                "invalid_task_ids": invalid_time_tasks,
-            },
-        }
-    )
-
-    invalid_invoice_clients = _check_fk_membership(domains["billing"]["invoices"], "client_id", client_ids)
-    invalid_invoice_projects = _check_fk_membership(domains["billing"]["invoices"], "project_id", project_ids | {None})
-    invalid_invoice_engagements = _check_fk_membership(
-        domains["billing"]["invoices"], "engagement_id", engagement_ids | {None}
-    )
-    checks.append(
-        {
-            "name": "billing.invoice_links",
-            "status": (
-                "ok"
-                if not invalid_invoice_clients and not invalid_invoice_projects and not invalid_invoice_engagements
-                else "failed"
-            ),
-            "details": {
-                "invalid_client_ids": invalid_invoice_clients,
-                "invalid_project_ids": invalid_invoice_projects,
-                "invalid_engagement_ids": invalid_invoice_engagements,
-            },
-        }
-    )
-
-    invalid_dispute_invoices = _check_fk_membership(domains["billing"]["payment_disputes"], "invoice_id", invoice_ids)
-    invalid_failure_invoices = _check_fk_membership(domains["billing"]["payment_failures"], "invoice_id", invoice_ids)
-    invalid_chargeback_invoices = _check_fk_membership(domains["billing"]["chargebacks"], "invoice_id", invoice_ids)
-    checks.append(
-        {
-            "name": "billing.dispute_links",
-            "status": (
-                "ok"
-                if not invalid_dispute_invoices and not invalid_failure_invoices and not invalid_chargeback_invoices
-                else "failed"
-            ),
-            "details": {
-                "invalid_dispute_invoice_ids": invalid_dispute_invoices,
-                "invalid_failure_invoice_ids": invalid_failure_invoices,
-                "invalid_chargeback_invoice_ids": invalid_chargeback_invoices,
-            },
-        }
-    )
-
-    invalid_domain_firms = []
-    for domain_name, datasets in domains.items():
-        for dataset_name, records in datasets.items():
-            for record in records:
-                record_firm_id = record.get("firm_id")
-                if record_firm_id is not None and record_firm_id != firm_id:
-                    invalid_domain_firms.append(
-                        {
-                            "domain": domain_name,
-                            "dataset": dataset_name,
-                            "id": record.get("id"),
-                            "firm_id": record_firm_id,
-                        }
-                    )
-    checks.append(
-        {
-            "name": "tenant_isolation.firm_id_match",
-            "status": "ok" if not invalid_domain_firms else "failed",
-            "details": {"mismatched_firm_records": invalid_domain_firms},
-        }
-    )
-
-    overall_status = "ok" if all(check["status"] == "ok" for check in checks) else "failed"
-    return {"status": overall_status, "checks": checks}
+def _assigned_team_ids(client):
+    # Reads the prefetch cache populated per iterator chunk.
+    return {"assigned_team_ids": [member.id for member in client.assigned_team.all()]}
+
+
+class _IntegrityTracker:
+    """Accumulates integrity findings while datasets stream past."""
+
+    def __init__(self, firm_id):
+        self.firm_id = firm_id
+        self.parent_datasets = {parent for _, links in INTEGRITY_LINK_CHECKS for *_, parent, _ in links}
+        self.id_sets = {parent: CompactIdSet() for parent in self.parent_datasets}
+        self.links_by_child = {}
+        for _, links in INTEGRITY_LINK_CHECKS:
+            for detail_key, child, fk_field, parent, nullable in links:
+                self.links_by_child.setdefault(child, []).append((detail_key, fk_field, parent, nullable))
+        self.invalid = {}
+        self.mismatched_firm_records = []
+
+    def observe(self, domain, dataset, record):
+        key = (domain, dataset)
+        if key in self.id_sets and record.get("id") is not None:
+            self.id_sets[key].add(record["id"])
+
+        for detail_key, fk_field, parent, nullable in self.links_by_child.get(key, ()):
+            value = record.get(fk_field)
+            if value is None and nullable:
+                continue
+            if value is None or value not in self.id_sets[parent]:
+                self.invalid.setdefault((key, fk_field), set()).add(value)
+
+        record_firm_id = record.get("firm_id")
+        if record_firm_id is not None and record_firm_id != self.firm_id:
+            self.mismatched_firm_records.append(
+                {"domain": domain, "dataset": dataset, "id": record.get("id"), "firm_id": record_firm_id}
+            )
+
+    def report(self):
+        checks = []
+        for check_name, links in INTEGRITY_LINK_CHECKS:
+            details = {
+                detail_key: sorted(self.invalid.get((child, fk_field), set()), key=str)
+                for detail_key, child, fk_field, _, _ in links
+            }
+            checks.append(
+                {
+                    "name": check_name,
+                    "status": "ok" if not any(details.values()) else "failed",
+                    "details": details,
+                }
+            )
+        checks.append(
+            {
+                "name": "tenant_isolation.firm_id_match",
+                "status": "ok" if not self.mismatched_firm_records else "failed",
+                "details": {"mismatched_firm_records": self.mismatched_firm_records},
+            }
+        )
+        overall_status = "ok" if all(check["status"] == "ok" for check in checks) else "failed"
+        return {"status": overall_status, "checks": checks}
+
+
+def _write_datasets(firm, archive, chunk_size):
+    """
+    Stream every dataset into ``archive`` as NDJSON.
+
+    Returns (manifest, integrity report). Only one iterator chunk of model
+    instances plus the compact parent id sets are held in memory at a time.
+    """
+    schema = export_schema()
+    integrity = _IntegrityTracker(firm.id)
+    manifest = {"counts": {}, "checksums": {}, "files": {}, "total_records": 0}
+
+    for domain, dataset, queryset, extra_field_getter in _dataset_querysets(firm):
+        field_names = schema["domains"][domain][dataset]["fields"]
+        member_name = f"{domain}/{dataset}.ndjson"
+        digest = hashlib.sha256()
+        count = 0
+        with archive.open(member_name, mode="w", force_zip64=True) as handle:
+            for instance in queryset.order_by("pk").iterator(chunk_size=chunk_size):
+                record = _serialize_instance(instance, field_names, extra_field_getter)
+                line = (json.dumps(record, sort_keys=True, cls=_ExportEncoder) + "\n").encode("utf-8")
+                handle.write(line)
+                digest.update(line)
+                integrity.observe(domain, dataset, record)
+                count += 1
+
+        manifest["counts"].setdefault(domain, {})[dataset] = count
+        manifest["checksums"].setdefault(domain, {})[dataset] = digest.hexdigest()
+        manifest["files"].setdefault(domain, {})[dataset] = member_name
+        manifest["total_records"] += count
+
+    return manifest, integrity.report()
 
 
 def _retention_plan(retention_days, purge_grace_days):
@@ -398,42 +418,67 @@ def _checksum_payload(payload):
     return hashlib.sha256(raw).hexdigest()
 
 
+def _archive_path(firm, generated_at):
+    export_root = Path(getattr(settings, "FIRM_EXPORT_ROOT", Path(settings.BASE_DIR) / "exports" / "firms"))
+    return export_root / f"firm-{firm.id}" / f"export-{generated_at:%Y%m%dT%H%M%S%f}.zip"
+
+
 def export_firm_data(
     *,
     firm,
     requested_by=None,
     retention_days=DEFAULT_RETENTION_DAYS,
     purge_grace_days=DEFAULT_PURGE_GRACE_DAYS,
+    archive_path=None,
+    chunk_size=EXPORT_CHUNK_SIZE,
 ):
-    """Export firm data with schema, integrity checks, and retention sequencing."""
+    """
+    Export firm data with schema, integrity checks, and retention sequencing.
+
+    Records are streamed into a zip archive as one NDJSON file per dataset plus a
+    ``manifest.json``; the returned payload carries the manifest (counts and
+    per-dataset SHA-256 checksums), integrity report and archive location rather
+    than the records themselves, so memory stays flat regardless of firm size.
+    """
     if retention_days is None:
         retention_days = DEFAULT_RETENTION_DAYS
     if purge_grace_days is None:
         purge_grace_days = DEFAULT_PURGE_GRACE_DAYS
-    domains = _export_domains(firm)
-    manifest = _build_manifest(domains)
-    integrity = _integrity_report(firm, domains)
-    retention = _retention_plan(retention_days, purge_grace_days)
-
-    payload = {
-        "schema": export_schema(),
-        "generated_at": timezone.now(),
-        "firm": {
-            "id": firm.id,
-            "name": firm.name,
-            "slug": firm.slug,
-            "status": firm.status,
-        },
-        "requested_by": {
-            "id": requested_by.id if requested_by else None,
-            "email": requested_by.email if requested_by else None,
-        },
-        "domains": domains,
-        "manifest": manifest,
-        "integrity": integrity,
-        "retention": retention,
-    }
-    payload["checksum"] = _checksum_payload(payload)
+    generated_at = timezone.now()
+    archive_path = Path(archive_path) if archive_path else _archive_path(firm, generated_at)
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = archive_path.with_name(f"{archive_path.name}.partial")
+
+    try:
+        with zipfile.ZipFile(partial_path, mode="w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+            manifest, integrity = _write_datasets(firm, archive, chunk_size)
+            retention = _retention_plan(retention_days, purge_grace_days)
+
+            payload = {
+                "schema": export_schema(),
+                "generated_at": generated_at,
+                "firm": {
+                    "id": firm.id,
+                    "name": firm.name,
+                    "slug": firm.slug,
+                    "status": firm.status,
+                },
+                "requested_by": {
+                    "id": requested_by.id if requested_by else None,
+                    "email": requested_by.email if requested_by else None,
+                },
+                "manifest": manifest,
+                "integrity": integrity,
+                "retention": retention,
+            }
+            payload["checksum"] = _checksum_payload(payload)
+            archive.writestr("manifest.json", json.dumps(payload, sort_keys=True, indent=2, cls=_ExportEncoder))
+        os.replace(partial_path, archive_path)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+
+    payload["archive"] = {"path": str(archive_path), "size_bytes": archive_path.stat().st_size}
     return payload
 
 
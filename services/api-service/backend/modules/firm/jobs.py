@@ -42,6 +42,7 @@ def firm_offboarding_export_job(*, firm_id=None, requested_by_id=None, retention
         export_manifest=payload["manifest"],
         integrity_report=payload["integrity"],
         export_checksum=payload["checksum"],
+        export_archive_path=payload["archive"]["path"],
         status=(
             FirmOffboardingRecord.STATUS_EXPORTED
             if payload["integrity"]["status"] == "ok"
@@ -22,10 +22,10 @@ from django.db import connection
 from django.utils.deprecation import MiddlewareMixin
 
 from modules.auth.authentication import CookieJWTAuthentication
-from modules.firm.models import BreakGlassSession, Firm, FirmMembership
+from modules.firm import context_cache
+from modules.firm.models import BreakGlassSession, Firm
 from modules.firm.utils import (
     clear_current_firm_db_session,
-    get_active_break_glass_session,
     set_current_firm_db_session,
 )
 
@@ -37,6 +37,9 @@ class FirmContextMiddleware(MiddlewareMixin):
     TIER 0: Firm Context Resolution Middleware.
 
     Attaches firm context to every request or rejects it.
+
+    Firm, slug and membership lookups go through modules.firm.context_cache, so a
+    warm request resolves its firm without touching the database.
     """
 
     # Public endpoints that don't require firm context
@@ -173,12 +176,10 @@ class FirmContextMiddleware(MiddlewareMixin):
         if potential_slug in ["www", "api", "admin", "platform"]:
             return None
 
-        try:
-            firm = Firm.objects.get(slug=potential_slug, status__in=["trial", "active"])
-            return firm
-        except Firm.DoesNotExist:
+        firm = context_cache.get_active_firm_by_slug(potential_slug)
+        if firm is None:
             logger.debug(f"No active firm found for subdomain: {potential_slug}")
-            return None
+        return firm
 
     def _resolve_from_token(self, request: HttpRequest) -> Firm | None:
         """
@@ -197,11 +198,10 @@ class FirmContextMiddleware(MiddlewareMixin):
             return None
 
         try:
-            firm = Firm.objects.get(id=firm_id, status__in=["trial", "active"])
+            firm = context_cache.get_active_firm(firm_id)
+            if firm is None:
+                logger.warning(f"Firm {firm_id} from token not found or inactive")
             return firm
-        except Firm.DoesNotExist:
-            logger.warning(f"Firm {firm_id} from token not found or inactive")
-            return None
         except Exception as e:
             logger.error(f"Error resolving firm from token: {e}")
             return None
@@ -220,27 +220,17 @@ class FirmContextMiddleware(MiddlewareMixin):
         # Check if user has explicitly set an active firm in their session
         active_firm_id = request.session.get("active_firm_id")
         if active_firm_id:
-            try:
-                # Verify user has access to this firm
-                membership = FirmMembership.objects.select_related("firm").get(
-                    user=request.user, firm_id=active_firm_id, firm__status__in=["trial", "active"]
-                )
-                return membership.firm
-            except FirmMembership.DoesNotExist:
-                logger.warning(f"User {request.user.id} session references inaccessible firm {active_firm_id}")
-                # Clear invalid session firm
-                del request.session["active_firm_id"]
+            # Verify user has access to this firm
+            firm = context_cache.get_membership_firm(request.user.id, active_firm_id)
+            if firm:
+                return firm
+            logger.warning(f"User {request.user.id} session references inaccessible firm {active_firm_id}")
+            # Clear invalid session firm
+            del request.session["active_firm_id"]
 
         # Fall back to user's first firm (primary firm)
         try:
-            membership = (
-                FirmMembership.objects.select_related("firm")
-                .filter(user=request.user, firm__status__in=["trial", "active"])
-                .first()
-            )
-
-            if membership:
-                return membership.firm
+            return context_cache.get_membership_firm(request.user.id)
         except Exception as e:
             logger.error(f"Error resolving firm from session: {e}")
 
@@ -283,7 +273,7 @@ class BreakGlassImpersonationMiddleware:
         if not getattr(request, "firm", None):
             return None
 
-        session = get_active_break_glass_session(request.firm)
+        session = context_cache.get_active_break_glass_session(request.firm)
         if session and session.operator_id == request.user.id:
             return session
 
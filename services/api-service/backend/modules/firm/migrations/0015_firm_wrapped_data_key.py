@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firm', '0014_enable_rls_policies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='firm',
+            name='wrapped_data_key',
+            field=models.TextField(
+                blank=True,
+                editable=False,
+                help_text="Per-firm field encryption data key, wrapped by the firm's KMS key (envelope encryption)",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firm', '0015_firm_wrapped_data_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='firmoffboardingrecord',
+            name='export_archive_path',
+            field=models.CharField(
+                blank=True,
+                help_text='Location of the streamed NDJSON export archive',
+                max_length=500,
+            ),
+        ),
+    ]
@@ -20,6 +20,42 @@ from django.utils import timezone
 from django.utils.text import slugify
 
 
+def _invalidate_context(invalidate, *args) -> None:
+    """Run a context_cache invalidation now and again on commit (as modules.firm.signals does)."""
+    invalidate(*args)
+    transaction.on_commit(lambda: invalidate(*args))
+
+
+class FirmQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """QuerySet.update() bypasses the post_save signals; drop the updated firms' cached contexts too."""
+        from modules.firm import context_cache
+
+        firms = list(self.only("id", "slug"))
+        rows = super().update(**kwargs)
+        # Both the old and (after a slug change) the new slug entries are dropped
+        firms += Firm.objects.filter(pk__in=[firm.pk for firm in firms]).only("id", "slug")
+        for firm in firms:
+            _invalidate_context(context_cache.invalidate_firm, firm)
+        return rows
+
+
+class FirmMembershipQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """QuerySet.update() bypasses the post_save signals; drop the affected membership lookups too."""
+        from modules.firm import context_cache
+
+        before = {pk: (user_id, firm_id) for pk, user_id, firm_id in self.values_list("pk", "user_id", "firm_id")}
+        rows = super().update(**kwargs)
+        # A membership moved to another user or firm also changes the lookups for its new pair
+        pairs = set(before.values()) | set(
+            FirmMembership.objects.filter(pk__in=list(before)).values_list("user_id", "firm_id").order_by()
+        )
+        for user_id, firm_id in pairs:
+            _invalidate_context(context_cache.invalidate_membership, user_id, firm_id)
+        return rows
+
+
 class Firm(models.Model):
     """
     Top-level tenant boundary.
@@ -79,6 +115,11 @@ class Firm(models.Model):
     kms_key_id = models.CharField(
         max_length=255, blank=True, help_text="Firm-scoped KMS key or alias for content encryption"
     )
+    wrapped_data_key = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="Per-firm field encryption data key, wrapped by the firm's KMS key (envelope encryption)",
+    )
 
     # Usage Tracking
     current_users_count = models.IntegerField(default=0, help_text="Current number of active users")
@@ -101,6 +142,8 @@ class Firm(models.Model):
     # Metadata
     notes = models.TextField(blank=True, help_text="Internal platform notes (not visible to firm)")
 
+    objects = FirmQuerySet.as_manager()
+
     class Meta:
         db_table = "firm_firm"
         ordering = ["name"]
@@ -259,8 +302,20 @@ class Firm(models.Model):
             for field, value in updates.items():
                 setattr(locked, field, value)
 
+            update_fields = [*updates.keys(), "updated_at"]
+            if "kms_key_id" in updates and locked.wrapped_data_key:
+                from modules.core.encryption import _resolve_key_id, field_encryption_service
+
+                locked.wrapped_data_key = field_encryption_service.rewrap_data_key(
+                    locked.wrapped_data_key,
+                    old_key_id=_resolve_key_id(previous_values["kms_key_id"]),
+                    new_key_id=_resolve_key_id(updates["kms_key_id"]),
+                )
+                update_fields.append("wrapped_data_key")
+                transaction.on_commit(lambda: field_encryption_service.invalidate_firm(locked.pk))
+
             locked.full_clean()
-            locked.save(update_fields=[*updates.keys(), "updated_at"])
+            locked.save(update_fields=update_fields)
 
             from modules.firm.audit import audit
 
@@ -344,6 +399,8 @@ class FirmMembership(models.Model):
     invited_at = models.DateTimeField(auto_now_add=True)
     last_active_at = models.DateTimeField(null=True, blank=True, help_text="Last time user was active in this firm")
 
+    objects = FirmMembershipQuerySet.as_manager()
+
     class Meta:
         db_table = "firm_membership"
         unique_together = [["firm", "user"]]
@@ -526,6 +583,16 @@ class BreakGlassSession(models.Model):
                 raise ValueError("Firm context is required to scope break-glass sessions.")
             return self.filter(firm=firm)
 
+        def update(self, **kwargs):
+            """QuerySet.update() bypasses the post_save signals; drop the affected break-glass lookups too."""
+            from modules.firm import context_cache
+
+            firm_ids = set(self.values_list("firm_id", flat=True).order_by())
+            rows = super().update(**kwargs)
+            for firm_id in firm_ids:
+                _invalidate_context(context_cache.invalidate_break_glass, firm_id)
+            return rows
+
     objects = BreakGlassSessionQuerySet.as_manager()
 
     class Meta:
@@ -714,6 +781,11 @@ class FirmOffboardingRecord(models.Model):
     export_manifest = models.JSONField(default=dict, blank=True)
     integrity_report = models.JSONField(default=dict, blank=True)
     export_checksum = models.CharField(max_length=64, blank=True)
+    export_archive_path = models.CharField(
+        max_length=500,
+        blank=True,
+        help_text="Location of the streamed NDJSON export archive",
+    )
 
     class Meta:
         db_table = "firm_offboarding_record"
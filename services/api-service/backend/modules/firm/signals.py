@@ -0,0 +1,38 @@
+"""
+Firm Signals.
+
+Invalidates the firm context cache (modules.firm.context_cache) when firms,
+memberships or break-glass sessions change. Entries are dropped immediately and
+again on commit so a concurrent request cannot re-cache pre-commit state.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from modules.firm import context_cache
+from modules.firm.models import BreakGlassSession, Firm, FirmMembership
+
+
+@receiver(post_save, sender=Firm)
+@receiver(post_delete, sender=Firm)
+def invalidate_firm_context(sender, instance, **kwargs):
+    """Firm status/slug/settings changes must be visible to the next request."""
+    context_cache.invalidate_firm(instance)
+    transaction.on_commit(lambda: context_cache.invalidate_firm(instance))
+
+
+@receiver(post_save, sender=FirmMembership)
+@receiver(post_delete, sender=FirmMembership)
+def invalidate_membership_context(sender, instance, **kwargs):
+    """Membership grants and removals change which firm a session resolves to."""
+    context_cache.invalidate_membership(instance.user_id, instance.firm_id)
+    transaction.on_commit(lambda: context_cache.invalidate_membership(instance.user_id, instance.firm_id))
+
+
+@receiver(post_save, sender=BreakGlassSession)
+@receiver(post_delete, sender=BreakGlassSession)
+def invalidate_break_glass_context(sender, instance, **kwargs):
+    """Break-glass activation, revocation and expiry take effect immediately."""
+    context_cache.invalidate_break_glass(instance.firm_id)
+    transaction.on_commit(lambda: context_cache.invalidate_break_glass(instance.firm_id))
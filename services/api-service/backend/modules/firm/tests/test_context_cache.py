@@ -0,0 +1,116 @@
+"""
+Tests for the firm context cache and its invalidation.
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+
+from modules.firm import context_cache
+from modules.firm.models import BreakGlassSession, Firm, FirmMembership
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def firm(db):
+    return Firm.objects.create(name="Context Firm", slug="context-firm")
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="member", password="testpass123")
+
+
+@pytest.mark.django_db
+def test_lookups_are_served_from_cache(firm, user, django_assert_num_queries):
+    FirmMembership.objects.create(firm=firm, user=user)
+    context_cache.get_active_firm_by_slug("context-firm")
+    context_cache.get_membership_firm(user.id)
+    context_cache.get_active_break_glass_session(firm)
+
+    with django_assert_num_queries(0):
+        assert context_cache.get_active_firm_by_slug("context-firm") == firm
+        assert context_cache.get_active_firm(firm.id) == firm
+        assert context_cache.get_membership_firm(user.id) == firm
+        assert context_cache.get_active_break_glass_session(firm) is None
+
+
+@pytest.mark.django_db
+def test_firm_save_and_queryset_update_invalidate(firm):
+    assert context_cache.get_active_firm_by_slug("context-firm") == firm
+
+    firm.status = "suspended"
+    firm.save()
+    assert context_cache.get_active_firm(firm.id) is None
+
+    Firm.objects.filter(pk=firm.pk).update(status="active")
+    assert context_cache.get_active_firm_by_slug("context-firm") == firm
+
+    assert context_cache.get_active_firm_by_slug("renamed-firm") is None
+    Firm.objects.filter(pk=firm.pk).update(slug="renamed-firm")
+    assert context_cache.get_active_firm_by_slug("renamed-firm").slug == "renamed-firm"
+    assert context_cache.get_active_firm_by_slug("context-firm") is None
+
+    Firm.objects.filter(pk=firm.pk).update(status="canceled")
+    assert context_cache.get_active_firm_by_slug("renamed-firm") is None
+    assert context_cache.get_active_firm(firm.id) is None
+
+
+@pytest.mark.django_db
+def test_renamed_slug_stops_resolving(firm):
+    assert context_cache.get_active_firm_by_slug("context-firm") == firm
+
+    firm.slug = "renamed-firm"
+    firm.save()
+
+    assert context_cache.get_active_firm_by_slug("context-firm") is None
+    assert context_cache.get_active_firm_by_slug("renamed-firm") == firm
+
+
+@pytest.mark.django_db
+def test_membership_changes_invalidate(firm, user):
+    other_firm = Firm.objects.create(name="Other Firm", slug="other-firm")
+    assert context_cache.get_membership_firm(user.id, firm.id) is None
+    assert context_cache.get_membership_firm(user.id, other_firm.id) is None
+
+    membership = FirmMembership.objects.create(firm=firm, user=user)
+    assert context_cache.get_membership_firm(user.id, firm.id) == firm
+    assert context_cache.get_membership_firm(user.id) == firm
+
+    FirmMembership.objects.filter(pk=membership.pk).update(firm=other_firm)
+    assert context_cache.get_membership_firm(user.id) == other_firm
+    assert context_cache.get_membership_firm(user.id, other_firm.id) == other_firm
+    assert context_cache.get_membership_firm(user.id, firm.id) is None
+
+    membership.delete()
+    assert context_cache.get_membership_firm(user.id) is None
+
+
+@pytest.mark.django_db
+def test_break_glass_changes_invalidate(firm, user):
+    session = BreakGlassSession.objects.create(
+        firm=firm, operator=user, reason="Incident 42", expires_at=timezone.now() + timedelta(hours=1)
+    )
+    assert context_cache.get_active_break_glass_session(firm) == session
+
+    BreakGlassSession.objects.filter(pk=session.pk).update(status=BreakGlassSession.STATUS_REVOKED)
+    assert context_cache.get_active_break_glass_session(firm) is None
+
+    BreakGlassSession.objects.filter(pk=session.pk).update(status=BreakGlassSession.STATUS_ACTIVE)
+    assert context_cache.get_active_break_glass_session(firm) == session
+
+    session.refresh_from_db()
+    session.revoke("Resolved")
+    session.save()
+    assert context_cache.get_active_break_glass_session(firm) is None
+
@@ -0,0 +1,37 @@
+"""
+Tests for the streaming firm offboarding export.
+"""
+import json
+import zipfile
+
+import pytest
+
+from modules.firm.export import CompactIdSet, export_firm_data
+from modules.firm.models import Firm
+
+
+def test_compact_id_set_membership():
+    ids = CompactIdSet()
+    for value in (5, 1, 9, 3):
+        ids.add(value)
+
+    assert 3 in ids and 9 in ids
+    assert 4 not in ids and None not in ids
+    assert len(ids) == 4
+
+
+@pytest.mark.django_db
+def test_export_streams_datasets_into_archive(tmp_path):
+    firm = Firm.objects.create(name="Export Firm", slug="export-firm")
+    archive_path = tmp_path / "export.zip"
+
+    payload = export_firm_data(firm=firm, archive_path=archive_path, chunk_size=2)
+
+    assert payload["archive"]["path"] == str(archive_path)
+    assert payload["integrity"]["status"] == "ok"
+    with zipfile.ZipFile(archive_path) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        assert manifest["checksum"] == payload["checksum"]
+        assert archive.read(payload["manifest"]["files"]["clients"]["clients"]) == b""
+    assert payload["manifest"]["counts"]["clients"]["clients"] == 0
+    assert not (tmp_path / "export.zip.partial").exists()
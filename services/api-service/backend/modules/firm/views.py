@@ -296,6 +296,7 @@ class FirmOffboardingViewSet(viewsets.ViewSet):
         record.export_manifest = payload["manifest"]
         record.integrity_report = payload["integrity"]
         record.export_checksum = payload["checksum"]
+        record.export_archive_path = payload["archive"]["path"]
         record.status = (
             FirmOffboardingRecord.STATUS_EXPORTED
             if payload["integrity"]["status"] == "ok"
@@ -329,6 +330,7 @@ class FirmOffboardingViewSet(viewsets.ViewSet):
                 "export_manifest": record.export_manifest,
                 "integrity_report": record.integrity_report,
                 "export_checksum": record.export_checksum,
+                "export_archive_path": record.export_archive_path,
             }
         )
 
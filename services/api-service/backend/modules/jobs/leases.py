@@ -0,0 +1,91 @@
+"""
+Job claim leases.
+
+A claimed job holds a lease until ``lease_expires_at``. Running workers renew
+the leases of their in-flight jobs with one UPDATE per heartbeat. A claim
+whose lease has lapsed belongs to a worker that crashed or hung, and
+reap_expired_leases() recovers it in bulk:
+
+- jobs with attempts left go back to ``pending`` with one UPDATE
+- jobs that used up max_attempts go to the DLQ with one bulk insert and one UPDATE
+
+Claims made before leases existed (``lease_expires_at`` NULL) are treated as
+expired once ``claimed_at`` is older than one lease.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import JobDLQ, JobQueue
+
+LEASE_EXPIRED_ERROR = "Worker lease expired before the job finished"
+
+
+def lease_seconds() -> int:
+    return getattr(settings, "JOB_LEASE_SECONDS", 300)
+
+
+def heartbeat_interval_seconds() -> int:
+    return getattr(settings, "JOB_HEARTBEAT_INTERVAL_SECONDS", 60)
+
+
+def reaper_interval_seconds() -> int:
+    return getattr(settings, "JOB_REAPER_INTERVAL_SECONDS", 60)
+
+
+def lease_deadline(now: Optional[datetime] = None) -> datetime:
+    return (now or timezone.now()) + timedelta(seconds=lease_seconds())
+
+
+def heartbeat(worker_id: str, job_ids: Iterable) -> int:
+    """Extend the leases of a worker's in-flight jobs; returns the number still held."""
+    job_ids = list(job_ids)
+    if not job_ids:
+        return 0
+    now = timezone.now()
+    return JobQueue.objects.filter(job_id__in=job_ids, claimed_by_worker=worker_id, status="processing").update(
+        lease_expires_at=lease_deadline(now), updated_at=now
+    )
+
+
+def expired_claims(now: Optional[datetime] = None):
+    now = now or timezone.now()
+    return JobQueue.objects.filter(
+        Q(lease_expires_at__lt=now)
+        | Q(lease_expires_at__isnull=True, claimed_at__lt=now - timedelta(seconds=lease_seconds())),
+        status="processing",
+    )
+
+
+def reap_expired_leases(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Requeue or dead-letter every job whose lease has lapsed."""
+    now = now or timezone.now()
+    expired = expired_claims(now)
+
+    with transaction.atomic():
+        exhausted = list(expired.filter(attempt_count__gte=F("max_attempts")).select_for_update(skip_locked=True))
+        if exhausted:
+            JobDLQ.objects.bulk_create([job.build_dlq_entry("transient", LEASE_EXPIRED_ERROR) for job in exhausted])
+            JobQueue.objects.filter(job_id__in=[job.job_id for job in exhausted]).update(
+                status="dlq",
+                error_class="transient",
+                last_error=LEASE_EXPIRED_ERROR,
+                lease_expires_at=None,
+                updated_at=now,
+            )
+
+    requeued = expired.filter(attempt_count__lt=F("max_attempts")).update(
+        status="pending",
+        claimed_by_worker="",
+        lease_expires_at=None,
+        next_retry_at=now,
+        error_class="transient",
+        last_error=LEASE_EXPIRED_ERROR,
+        updated_at=now,
+    )
+    return {"requeued": requeued, "dlq": len(exhausted)}
@@ -0,0 +1,72 @@
+"""
+Django management command to run a JobQueue worker.
+
+Claims due jobs in batches (SELECT ... FOR UPDATE SKIP LOCKED) and dispatches
+them through the handler registry on a thread pool. Run one process per
+worker host; several processes can share the queue safely. SIGTERM/SIGINT
+stop claiming and let in-flight jobs finish.
+
+Usage:
+    python manage.py run_job_worker
+    python manage.py run_job_worker --batch-size 50 --concurrency 8
+    python manage.py run_job_worker --category sync --category notifications
+    python manage.py run_job_worker --job-type webhook_delivery --max-jobs 100
+"""
+
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from modules.jobs import registry
+from modules.jobs.worker import JobWorker
+
+
+class Command(BaseCommand):
+    help = "Run a background job worker for the JobQueue"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10, help="Maximum jobs claimed per query")
+        parser.add_argument("--concurrency", type=int, default=4, help="Number of worker threads")
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0, help="Seconds to wait when the queue is empty"
+        )
+        parser.add_argument(
+            "--job-type", action="append", dest="job_types", help="Only process this job type (repeatable)"
+        )
+        parser.add_argument(
+            "--category", action="append", dest="categories", help="Only process this category (repeatable)"
+        )
+        parser.add_argument("--worker-id", help="Worker identifier recorded on claimed jobs")
+        parser.add_argument(
+            "--max-jobs", type=int, help="Exit after processing this many jobs or when the queue is drained"
+        )
+
+    def handle(self, *args, **options):
+        job_types = options.get("job_types")
+        if job_types:
+            unknown = sorted(set(job_types) - set(registry.registered_job_types()))
+            if unknown:
+                raise CommandError(f"No handler registered for job types: {', '.join(unknown)}")
+
+        worker = JobWorker(
+            worker_id=options.get("worker_id"),
+            batch_size=options["batch_size"],
+            concurrency=options["concurrency"],
+            poll_interval=options["poll_interval"],
+            job_types=job_types,
+            categories=options.get("categories"),
+        )
+
+        def _shutdown(signum, frame):
+            self.stdout.write(f"Received signal {signum}, finishing in-flight jobs...")
+            worker.stop()
+
+        signal.signal(signal.SIGTERM, _shutdown)
+        signal.signal(signal.SIGINT, _shutdown)
+
+        self.stdout.write(
+            f"Worker {worker.worker_id} processing {', '.join(worker.job_types)} "
+            f"(batch size {worker.batch_size}, concurrency {worker.concurrency})"
+        )
+        processed = worker.run(max_jobs=options.get("max_jobs"))
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker.worker_id} stopped after {processed} jobs"))
@@ -0,0 +1,22 @@
+# Lease-based claims: workers renew lease_expires_at by heartbeat; expired leases are reaped
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobqueue',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, help_text="When the worker's claim lapses unless renewed by a heartbeat", null=True),
+        ),
+        migrations.AddIndex(
+            model_name='jobqueue',
+            index=models.Index(fields=['status', 'lease_expires_at'], name='jobs_sta_lea_idx'),
+        ),
+    ]
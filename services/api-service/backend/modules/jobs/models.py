@@ -5,8 +5,10 @@ Implements DOC-20.1: Workers/queues payload rules, concurrency locks, DLQ reproc
 Complies with docs/03-reference/requirements/DOC-20.md WORKERS_AND_QUEUES.
 """
 
+import logging
 import uuid
 import json
+from datetime import timedelta
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models, transaction
@@ -14,6 +16,8 @@ from django.utils import timezone
 
 from modules.firm.utils import FirmScopedManager
 
+logger = logging.getLogger(__name__)
+
 
 class JobQueue(models.Model):
     """
@@ -118,6 +122,11 @@ class JobQueue(models.Model):
         blank=True,
         help_text="Worker ID that claimed this job",
     )
+    lease_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the worker's claim lapses unless renewed by a heartbeat",
+    )
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
@@ -171,6 +180,7 @@ class JobQueue(models.Model):
             models.Index(fields=["correlation_id"], name="jobs_que_cor_idx"),
             models.Index(fields=["category", "status"], name="jobs_que_cat_sta_idx"),
             models.Index(fields=["claimed_at"], name="jobs_cla_idx"),
+            models.Index(fields=["status", "lease_expires_at"], name="jobs_sta_lea_idx"),
         ]
         # Uniqueness constraint for idempotency per docs/03-reference/requirements/DOC-20.md section 3
         constraints = [
@@ -215,8 +225,7 @@ class JobQueue(models.Model):
             True if successfully claimed, False if already claimed
 
         Meta-commentary:
-        - **Current Status:** Claiming relies on database row locks only; there is no secondary heartbeat to detect abandoned claims or worker crashes.
-        - **Follow-up (T-067):** Add lock TTL/heartbeat column and a reaper that requeues jobs when `claimed_at` is stale to avoid indefinite stuck jobs.
+        - **Current Status:** Claims are leases: `lease_expires_at` is renewed by worker heartbeats and expired claims are requeued or moved to the DLQ by `modules.jobs.leases.reap_expired_leases`.
         - **Assumption:** Workers supply unique `worker_id` values; duplicate IDs across processes could mask concurrent processing collisions.
         - **Limitation:** Priority ordering and per-category concurrency limits are handled upstream; this method will claim any pending job matching the PK regardless of queue saturation.
         """
@@ -230,11 +239,15 @@ class JobQueue(models.Model):
         if not job:
             return False
 
+        from .leases import lease_seconds
+
         # Claim the job
+        now = timezone.now()
         job.status = "processing"
-        job.claimed_at = timezone.now()
+        job.claimed_at = now
         job.claimed_by_worker = worker_id
-        job.started_at = timezone.now()
+        job.started_at = now
+        job.lease_expires_at = now + timedelta(seconds=lease_seconds())
         job.attempt_count += 1
         job.save()
 
@@ -242,15 +255,55 @@ class JobQueue(models.Model):
         self.refresh_from_db()
         return True
 
-    def mark_completed(self, result=None):
-        """Mark job as completed with optional result."""
-        self.status = "completed"
-        self.completed_at = timezone.now()
+    def build_dlq_entry(self, error_class: str, error_message: str) -> "JobDLQ":
+        """Build (unsaved) the DLQ entry preserving this job for reprocessing."""
+        return JobDLQ(
+            original_job=self,
+            firm_id=self.firm_id,
+            category=self.category,
+            job_type=self.job_type,
+            payload_version=self.payload_version,
+            payload=self.payload,
+            idempotency_key=self.idempotency_key,
+            correlation_id=self.correlation_id,
+            error_class=error_class,
+            error_message=error_message,
+            attempt_count=self.attempt_count,
+            original_created_at=self.created_at,
+        )
+
+    def _finish(self, **fields) -> bool:
+        """
+        Write a completion/failure transition while this worker still holds the claim.
+
+        The UPDATE is conditional on the job still being ``processing`` under
+        this instance's ``claimed_by_worker``. If the lease was reaped (and
+        possibly re-claimed by another worker) nothing is written, so a stale
+        worker cannot overwrite the new claim's status or attempts.
+
+        Returns:
+            True if the transition was recorded, False if the lease was lost
+        """
+        fields["updated_at"] = timezone.now()
+        updated = JobQueue.objects.filter(
+            job_id=self.job_id, claimed_by_worker=self.claimed_by_worker, status="processing"
+        ).update(**fields)
+        if not updated:
+            logger.warning(f"Job {self.job_id} lease lost by {self.claimed_by_worker}; result not recorded")
+            return False
+        for name, value in fields.items():
+            setattr(self, name, value)
+        return True
+
+    def mark_completed(self, result=None) -> bool:
+        """Mark job as completed with optional result; returns False if the lease was lost."""
+        fields = {"status": "completed", "completed_at": timezone.now(), "lease_expires_at": None}
         if result is not None:
-            self.result = result
-        self.save()
+            fields["result"] = result
+        return self._finish(**fields)
 
-    def mark_failed(self, error_class: str, error_message: str, should_retry: bool = True):
+    @transaction.atomic
+    def mark_failed(self, error_class: str, error_message: str, should_retry: bool = True) -> bool:
         """
         Mark job as failed with error classification.
 
@@ -260,41 +313,30 @@ class JobQueue(models.Model):
             error_class: Error classification (transient, retryable, non_retryable, rate_limited)
             error_message: Redacted error message
             should_retry: Whether to retry or move to DLQ
+
+        Returns:
+            True if the failure was recorded, False if the lease was lost
         """
-        self.error_class = error_class
-        self.last_error = error_message
+        fields = {"error_class": error_class, "last_error": error_message, "lease_expires_at": None}
 
         # Check if should move to DLQ per docs/03-reference/requirements/DOC-20.md section 4
         if not should_retry or self.attempt_count >= self.max_attempts or error_class == "non_retryable":
-            self.status = "dlq"
+            if not self._finish(status="dlq", **fields):
+                return False
             # Create DLQ entry
-            JobDLQ.objects.create(
-                original_job=self,
-                firm=self.firm,
-                category=self.category,
-                job_type=self.job_type,
-                payload_version=self.payload_version,
-                payload=self.payload,
-                idempotency_key=self.idempotency_key,
-                correlation_id=self.correlation_id,
-                error_class=error_class,
-                error_message=error_message,
-                attempt_count=self.attempt_count,
-                original_created_at=self.created_at,
-            )
-        else:
-            # Schedule retry
-            self.status = "pending"
-            # Calculate backoff (exponential with jitter)
-            import random
-            base_delay = 2 ** self.attempt_count  # 2, 4, 8, 16, 32...
-            jitter = random.uniform(0.8, 1.2)
-            delay_seconds = min(base_delay * jitter, 300)  # Max 5 minutes
-
-            from datetime import timedelta
-            self.next_retry_at = timezone.now() + timedelta(seconds=delay_seconds)
-
-        self.save()
+            self.build_dlq_entry(error_class, error_message).save()
+            return True
+
+        # Schedule retry
+        # Calculate backoff (exponential with jitter)
+        import random
+        base_delay = 2 ** self.attempt_count  # 2, 4, 8, 16, 32...
+        jitter = random.uniform(0.8, 1.2)
+        delay_seconds = min(base_delay * jitter, 300)  # Max 5 minutes
+
+        return self._finish(
+            status="pending", next_retry_at=timezone.now() + timedelta(seconds=delay_seconds), **fields
+        )
 
 
 class JobDLQ(models.Model):
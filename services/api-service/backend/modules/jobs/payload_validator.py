@@ -88,9 +88,9 @@ class PayloadValidator:
                 errors.append("Sync jobs require connection_id")
 
         elif category == "recurrence":
-            # Recurrence: recurrence_rule_id, period_key
-            if "recurrence_rule_id" not in payload:
-                errors.append("Recurrence jobs require recurrence_rule_id")
+            # Recurrence: recurrence_rule_id, period_key (or an as_of generation shard)
+            if "recurrence_rule_id" not in payload and "as_of" not in payload:
+                errors.append("Recurrence jobs require recurrence_rule_id or as_of")
 
         elif category == "orchestration":
             # Orchestration: orchestration_execution_id, step_id
@@ -103,9 +103,9 @@ class PayloadValidator:
                 errors.append("Document jobs require document_id")
 
         elif category == "notifications":
-            # Notifications: recipient_id, notification_type
-            if "recipient_id" not in payload and "recipient_ids" not in payload:
-                errors.append("Notification jobs require recipient_id or recipient_ids")
+            # Notifications: recipient_id (or a recipient_ids / recipient_range shard), notification_type
+            if not any(key in payload for key in ("recipient_id", "recipient_ids", "recipient_range")):
+                errors.append("Notification jobs require recipient_id, recipient_ids or recipient_range")
 
         return errors
 
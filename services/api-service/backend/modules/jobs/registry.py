@@ -0,0 +1,50 @@
+"""
+Job handler registry.
+
+Maps JobQueue.job_type to the callable that processes it. Handlers are
+registered as dotted paths and imported on first use, so the registry can be
+loaded by the worker without importing every module up front.
+
+Handlers normally receive the JobQueue row and call mark_completed/mark_failed
+themselves. Handlers registered with ``payload_only=True`` receive the payload
+dict instead; the worker marks those jobs completed when they return.
+"""
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
+
+from django.utils.module_loading import import_string
+
+
+class JobHandler(NamedTuple):
+    target: Union[str, Callable]
+    payload_only: bool = False
+
+    def resolve(self) -> Callable:
+        return import_string(self.target) if isinstance(self.target, str) else self.target
+
+
+_HANDLERS: Dict[str, JobHandler] = {
+    "calendar_ical_feed_refresh": JobHandler("modules.calendar.jobs.process_ical_feed_refresh_job"),
+    "email_campaign_send": JobHandler("modules.marketing.jobs.process_email_campaign_job"),
+    "recurrence_generate": JobHandler("modules.recurrence.jobs.process_recurrence_generation_job"),
+    "tracking_automation_dispatch": JobHandler("modules.tracking.jobs.process_tracking_automation_job"),
+    "webhook_delivery": JobHandler("modules.webhooks.jobs.process_webhook_delivery_job"),
+    "workflow_execution": JobHandler("modules.automation.executor.process_workflow_execution_job", payload_only=True),
+}
+
+
+def register(job_type: str, handler: Union[str, Callable], payload_only: bool = False) -> None:
+    """Register (or replace) the handler for a job type."""
+    _HANDLERS[job_type] = JobHandler(handler, payload_only)
+
+
+def unregister(job_type: str) -> None:
+    _HANDLERS.pop(job_type, None)
+
+
+def get_handler(job_type: str) -> Optional[JobHandler]:
+    return _HANDLERS.get(job_type)
+
+
+def registered_job_types() -> List[str]:
+    return sorted(_HANDLERS)
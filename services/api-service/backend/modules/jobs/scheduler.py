@@ -0,0 +1,194 @@
+"""
+Fair job scheduling at claim time.
+
+claim_batch (modules.jobs.worker) asks FairScheduler which due jobs to claim
+instead of taking the first ``limit`` rows in priority order, so one tenant's
+large campaign or export cannot starve everyone else:
+
+- **Concurrency limits:** at most JOB_CATEGORY_CONCURRENCY[category] jobs of a
+  category and JOB_FIRM_CONCURRENCY jobs of one firm are ``processing`` at
+  once (0 or missing = unlimited).
+- **Weighted fair queuing:** among jobs of equal effective priority, the next
+  slot goes to the firm with the lowest in-flight count divided by its weight
+  (JOB_FIRM_WEIGHTS, default 1), so tenants take turns in proportion to weight.
+- **Priority aging:** a job's effective priority improves by one level for
+  every JOB_PRIORITY_AGING_SECONDS it has been due, so low-priority work is
+  eventually scheduled under sustained high-priority load.
+
+Planning reads one aggregate over due jobs grouped by (firm, category) and one
+over in-flight jobs; each group's share is then locked with its own LIMITed
+``SELECT ... FOR UPDATE SKIP LOCKED``. SKIP LOCKED is applied while the LIMIT
+is being filled, so workers planning at the same moment take the next
+unlocked jobs of a group instead of all racing for its top rows. Limits are
+enforced per claim and can be exceeded by at most one batch per worker
+claiming at the same moment.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import Case, Count, F, IntegerField, Min, Q, Value, When
+from django.utils import timezone
+
+from modules.core.observability import track_dlq_depth, track_queue_depth
+
+from .models import JobDLQ, JobQueue
+
+LOWEST_PRIORITY = max(value for value, _ in JobQueue.PRIORITY_CHOICES)
+
+
+class QueueGroup(NamedTuple):
+    firm_id: int
+    category: str
+    effective_priority: int
+    oldest_scheduled_at: datetime
+    depth: int
+
+
+def effective_priority(now: datetime, aging_seconds: int):
+    """
+    Expression for a job's aged priority.
+
+    Priority ``p`` counts as ``e < p`` once the job has been due for
+    ``(p - e) * aging_seconds``.
+    """
+    if aging_seconds <= 0:
+        return F("priority")
+    whens = []
+    for level in range(LOWEST_PRIORITY):
+        condition = Q(priority__lte=level)
+        for priority in range(level + 1, LOWEST_PRIORITY + 1):
+            condition |= Q(
+                priority=priority, scheduled_at__lte=now - timedelta(seconds=(priority - level) * aging_seconds)
+            )
+        whens.append(When(condition, then=Value(level)))
+    return Case(*whens, default=F("priority"), output_field=IntegerField())
+
+
+class FairScheduler:
+    """Choose which due jobs a worker may claim next."""
+
+    def __init__(
+        self,
+        category_limits: Optional[Dict[str, int]] = None,
+        firm_limit: Optional[int] = None,
+        firm_weights: Optional[Dict[int, float]] = None,
+        aging_seconds: Optional[int] = None,
+    ):
+        self.category_limits = (
+            category_limits if category_limits is not None else getattr(settings, "JOB_CATEGORY_CONCURRENCY", {})
+        )
+        self.firm_limit = firm_limit if firm_limit is not None else getattr(settings, "JOB_FIRM_CONCURRENCY", 0)
+        self.firm_weights = firm_weights if firm_weights is not None else getattr(settings, "JOB_FIRM_WEIGHTS", {})
+        self.aging_seconds = (
+            aging_seconds if aging_seconds is not None else getattr(settings, "JOB_PRIORITY_AGING_SECONDS", 300)
+        )
+
+    def annotate(self, queryset, now: datetime):
+        return queryset.annotate(effective_priority=effective_priority(now, self.aging_seconds))
+
+    def queue_groups(self, due, now: datetime) -> List[QueueGroup]:
+        rows = (
+            self.annotate(due, now)
+            .order_by()
+            .values("firm_id", "category")
+            .annotate(best=Min("effective_priority"), oldest=Min("scheduled_at"), depth=Count("job_id"))
+        )
+        return [
+            QueueGroup(row["firm_id"], row["category"], row["best"], row["oldest"], row["depth"]) for row in rows
+        ]
+
+    @staticmethod
+    def in_flight() -> Dict:
+        """Return processing counts keyed by firm id and by category."""
+        counts = defaultdict(int)
+        rows = (
+            JobQueue.objects.filter(status="processing")
+            .order_by()
+            .values("firm_id", "category")
+            .annotate(count=Count("job_id"))
+        )
+        for row in rows:
+            counts[("firm", row["firm_id"])] += row["count"]
+            counts[("category", row["category"])] += row["count"]
+        return counts
+
+    def _has_capacity(self, loads: Dict, group: QueueGroup) -> bool:
+        category_limit = self.category_limits.get(group.category) or 0
+        if category_limit and loads[("category", group.category)] >= category_limit:
+            return False
+        return not (self.firm_limit and loads[("firm", group.firm_id)] >= self.firm_limit)
+
+    def allocate(self, groups: List[QueueGroup], loads: Dict, limit: int) -> Dict:
+        """
+        Return ``{(firm_id, category): n}`` jobs to claim, one slot at a time.
+
+        Each slot goes to the group with the best (effective priority, firm
+        load / weight, oldest job) among groups still under their limits.
+        """
+        remaining = {(group.firm_id, group.category): group.depth for group in groups}
+        loads = defaultdict(int, loads)
+        allocation = defaultdict(int)
+        for _ in range(limit):
+            candidates = [
+                group
+                for group in groups
+                if remaining[(group.firm_id, group.category)] and self._has_capacity(loads, group)
+            ]
+            if not candidates:
+                break
+            chosen = min(
+                candidates,
+                key=lambda group: (
+                    group.effective_priority,
+                    loads[("firm", group.firm_id)] / (self.firm_weights.get(group.firm_id) or 1),
+                    group.oldest_scheduled_at,
+                ),
+            )
+            key = (chosen.firm_id, chosen.category)
+            allocation[key] += 1
+            remaining[key] -= 1
+            loads[("firm", chosen.firm_id)] += 1
+            loads[("category", chosen.category)] += 1
+        return allocation
+
+    def lock(self, due, limit: int, now: datetime) -> List[JobQueue]:
+        """
+        Lock and return the jobs to claim, in priority order (must run in a transaction).
+
+        Each (firm, category) allocation is locked by its own LIMITed
+        ``SELECT ... FOR UPDATE SKIP LOCKED`` in effective-priority order, so
+        rows already locked by a concurrent worker are skipped within the group.
+        """
+        groups = self.queue_groups(due, now)
+        if not groups:
+            return []
+        allocation = self.allocate(groups, self.in_flight(), limit)
+
+        ordered = self.annotate(due, now).order_by("effective_priority", "scheduled_at", "job_id")
+        jobs = []
+        for (firm_id, category), count in allocation.items():
+            jobs.extend(ordered.filter(firm_id=firm_id, category=category).select_for_update(skip_locked=True)[:count])
+        jobs.sort(key=lambda job: (job.priority, job.scheduled_at))
+        return jobs
+
+
+def report_queue_metrics() -> None:
+    """Emit pending queue depth (and oldest wait) per category and DLQ depth per job type."""
+    now = timezone.now()
+    pending = (
+        JobQueue.objects.filter(status="pending")
+        .order_by()
+        .values("category")
+        .annotate(depth=Count("job_id"), oldest=Min("scheduled_at"))
+    )
+    for row in pending:
+        track_queue_depth(
+            row["category"], row["depth"], oldest_wait_seconds=max(int((now - row["oldest"]).total_seconds()), 0)
+        )
+
+    dlq = JobDLQ.objects.filter(status="pending_review").order_by().values("job_type").annotate(depth=Count("dlq_id"))
+    for row in dlq:
+        track_dlq_depth(row["job_type"], row["depth"])
@@ -0,0 +1,91 @@
+"""
+Tests for job claim leases, heartbeats and the expired-lease reaper.
+"""
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from modules.firm.models import Firm
+from modules.jobs.leases import LEASE_EXPIRED_ERROR, heartbeat, reap_expired_leases
+from modules.jobs.models import JobDLQ, JobQueue
+
+
+def _claimed_job(firm, worker_id="worker-1", lease_expires_at=None, attempt_count=1, max_attempts=5):
+    key = uuid.uuid4().hex
+    return JobQueue.objects.create(
+        firm=firm,
+        category="maintenance",
+        job_type="test_lease_job",
+        payload={"tenant_id": firm.id, "correlation_id": key, "idempotency_key": key},
+        idempotency_key=key,
+        correlation_id=uuid.uuid4(),
+        status="processing",
+        claimed_at=timezone.now() - timedelta(minutes=10),
+        claimed_by_worker=worker_id,
+        lease_expires_at=lease_expires_at,
+        attempt_count=attempt_count,
+        max_attempts=max_attempts,
+    )
+
+
+@pytest.fixture
+def firm():
+    return Firm.objects.create(name="Lease Firm", slug="lease-firm")
+
+
+@pytest.mark.django_db
+def test_heartbeat_only_extends_own_processing_jobs(firm):
+    expiring = timezone.now() + timedelta(seconds=5)
+    own = _claimed_job(firm, lease_expires_at=expiring)
+    other = _claimed_job(firm, worker_id="worker-2", lease_expires_at=expiring)
+
+    assert heartbeat("worker-1", [own.job_id, other.job_id]) == 1
+
+    own.refresh_from_db()
+    other.refresh_from_db()
+    assert own.lease_expires_at > expiring
+    assert other.lease_expires_at == expiring
+
+
+@pytest.mark.django_db
+def test_reaper_requeues_and_dead_letters_expired_leases(firm):
+    past = timezone.now() - timedelta(minutes=1)
+    retryable = _claimed_job(firm, lease_expires_at=past)
+    exhausted = _claimed_job(firm, lease_expires_at=past, attempt_count=5)
+    legacy = _claimed_job(firm, lease_expires_at=None)
+    healthy = _claimed_job(firm, lease_expires_at=timezone.now() + timedelta(minutes=5))
+
+    assert reap_expired_leases() == {"requeued": 2, "dlq": 1}
+
+    statuses = dict(JobQueue.objects.values_list("job_id", "status"))
+    assert statuses[retryable.job_id] == "pending"
+    assert statuses[legacy.job_id] == "pending"
+    assert statuses[exhausted.job_id] == "dlq"
+    assert statuses[healthy.job_id] == "processing"
+    dlq_entry = JobDLQ.objects.get(original_job=exhausted)
+    assert dlq_entry.error_message == LEASE_EXPIRED_ERROR
+    assert reap_expired_leases() == {"requeued": 0, "dlq": 0}
+
+
+@pytest.mark.django_db
+def test_stale_worker_cannot_finish_a_reclaimed_job(firm):
+    stale = _claimed_job(firm, lease_expires_at=timezone.now() - timedelta(minutes=1))
+    reap_expired_leases()
+    reclaimed = JobQueue.objects.get(job_id=stale.job_id)
+    assert reclaimed.claim_for_processing("worker-2")
+
+    assert stale.mark_completed(result={"stale": True}) is False
+    assert stale.mark_failed("non_retryable", "stale failure") is False
+
+    reclaimed.refresh_from_db()
+    assert reclaimed.status == "processing"
+    assert reclaimed.claimed_by_worker == "worker-2"
+    assert reclaimed.attempt_count == 2
+    assert reclaimed.result is None
+    assert not JobDLQ.objects.filter(original_job=reclaimed).exists()
+
+    assert reclaimed.mark_completed(result={"ok": True}) is True
+    reclaimed.refresh_from_db()
+    assert reclaimed.status == "completed"
@@ -0,0 +1,117 @@
+"""
+Tests for fair scheduling at claim time.
+"""
+import threading
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.db import connection, transaction
+from django.utils import timezone
+
+from modules.firm.models import Firm
+from modules.jobs import registry
+from modules.jobs.models import JobQueue
+from modules.jobs.scheduler import FairScheduler, QueueGroup
+from modules.jobs.worker import claim_batch
+
+JOB_TYPE = "test_scheduler_job"
+NOW = timezone.now()
+
+
+def _group(firm_id, category="notifications", priority=2, depth=100, age_minutes=0):
+    return QueueGroup(firm_id, category, priority, NOW - timedelta(minutes=age_minutes), depth)
+
+
+def test_allocate_alternates_between_firms_of_equal_priority():
+    scheduler = FairScheduler(category_limits={}, firm_limit=0, firm_weights={}, aging_seconds=0)
+
+    allocation = scheduler.allocate([_group(1, age_minutes=60), _group(2)], {}, 6)
+
+    assert allocation == {(1, "notifications"): 3, (2, "notifications"): 3}
+
+
+def test_allocate_respects_limits_weights_and_priority():
+    scheduler = FairScheduler(category_limits={"export": 1}, firm_limit=4, firm_weights={2: 3}, aging_seconds=0)
+    groups = [_group(1), _group(2), _group(3, category="export"), _group(4, priority=0, depth=1)]
+
+    allocation = scheduler.allocate(groups, {("firm", 1): 2}, 8)
+
+    assert allocation[(4, "notifications")] == 1
+    assert allocation[(3, "export")] == 1
+    assert allocation[(1, "notifications")] == 2
+    assert allocation[(2, "notifications")] == 4
+
+
+@pytest.mark.django_db
+def test_claim_batch_does_not_let_one_firm_starve_another():
+    busy = Firm.objects.create(name="Busy Firm", slug="busy-firm")
+    quiet = Firm.objects.create(name="Quiet Firm", slug="quiet-firm")
+    for firm, count, age in ((busy, 20, 60), (quiet, 1, 0)):
+        for _ in range(count):
+            key = uuid.uuid4().hex
+            JobQueue.objects.create(
+                firm=firm,
+                category="notifications",
+                job_type=JOB_TYPE,
+                payload={"tenant_id": firm.id, "correlation_id": key, "idempotency_key": key},
+                idempotency_key=key,
+                correlation_id=uuid.uuid4(),
+                scheduled_at=timezone.now() - timedelta(minutes=age),
+            )
+
+    registry.register(JOB_TYPE, lambda job: None)
+    try:
+        scheduler = FairScheduler(category_limits={}, firm_limit=3, firm_weights={}, aging_seconds=300)
+        jobs = claim_batch("worker-1", 10, [JOB_TYPE], scheduler=scheduler)
+    finally:
+        registry.unregister(JOB_TYPE)
+
+    claimed_firms = [job.firm_id for job in jobs]
+    assert claimed_firms.count(quiet.id) == 1
+    assert claimed_firms.count(busy.id) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="SKIP LOCKED needs PostgreSQL")
+def test_concurrent_workers_lock_disjoint_jobs_of_one_group():
+    firm = Firm.objects.create(name="Shared Firm", slug="shared-firm")
+    for minutes in range(6):
+        key = uuid.uuid4().hex
+        JobQueue.objects.create(
+            firm=firm,
+            category="notifications",
+            job_type=JOB_TYPE,
+            payload={"tenant_id": firm.id, "correlation_id": key, "idempotency_key": key},
+            idempotency_key=key,
+            correlation_id=uuid.uuid4(),
+            scheduled_at=timezone.now() - timedelta(minutes=minutes),
+        )
+    scheduler = FairScheduler(category_limits={}, firm_limit=0, firm_weights={}, aging_seconds=0)
+    due = JobQueue.objects.filter(status="pending", job_type=JOB_TYPE)
+    locked = threading.Event()
+    release = threading.Event()
+    first = []
+
+    def hold_first_batch():
+        try:
+            with transaction.atomic():
+                first.extend(scheduler.lock(due, 3, timezone.now()))
+                locked.set()
+                release.wait(10)
+        finally:
+            locked.set()
+            connection.close()
+
+    holder = threading.Thread(target=hold_first_batch)
+    holder.start()
+    try:
+        assert locked.wait(10)
+        with transaction.atomic():
+            second = scheduler.lock(due, 3, timezone.now())
+    finally:
+        release.set()
+        holder.join()
+
+    assert len(first) == len(second) == 3
+    assert not {job.job_id for job in first} & {job.job_id for job in second}
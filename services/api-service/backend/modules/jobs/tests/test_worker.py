@@ -0,0 +1,131 @@
+"""
+Tests for batched job claiming and handler dispatch.
+"""
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from modules.firm.models import Firm
+from modules.jobs import registry
+from modules.jobs.models import JobQueue
+from modules.jobs.worker import JobWorker, claim_batch, execute_job
+
+JOB_TYPE = "test_worker_job"
+
+
+def _job(firm, priority=2, scheduled_at=None, job_type=JOB_TYPE):
+    key = uuid.uuid4().hex
+    return JobQueue.objects.create(
+        firm=firm,
+        category="maintenance",
+        job_type=job_type,
+        payload={"tenant_id": firm.id, "correlation_id": key, "idempotency_key": key},
+        idempotency_key=key,
+        correlation_id=uuid.uuid4(),
+        priority=priority,
+        scheduled_at=scheduled_at or timezone.now() - timedelta(seconds=1),
+    )
+
+
+@pytest.fixture
+def firm():
+    return Firm.objects.create(name="Worker Firm", slug="worker-firm")
+
+
+@pytest.fixture
+def handled():
+    calls = []
+
+    def handler(job):
+        calls.append(job.job_id)
+        job.mark_completed(result={"ok": True})
+
+    registry.register(JOB_TYPE, handler)
+    yield calls
+    registry.unregister(JOB_TYPE)
+
+
+@pytest.mark.django_db
+def test_claim_batch_orders_by_priority_and_skips_unregistered_types(firm, handled):
+    low = _job(firm, priority=3)
+    critical = _job(firm, priority=0)
+    _job(firm, priority=0, job_type="unregistered_job")
+    _job(firm, priority=0, scheduled_at=timezone.now() + timedelta(hours=1))
+
+    jobs = claim_batch("worker-1", 5, [JOB_TYPE])
+
+    assert [job.job_id for job in jobs] == [critical.job_id, low.job_id]
+    critical.refresh_from_db()
+    assert critical.status == "processing"
+    assert critical.claimed_by_worker == "worker-1"
+    assert critical.attempt_count == 1
+    assert claim_batch("worker-2", 5, [JOB_TYPE]) == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_drains_queue_with_max_jobs(firm, handled):
+    jobs = [_job(firm) for _ in range(3)]
+
+    worker = JobWorker(worker_id="worker-1", batch_size=2, concurrency=1, poll_interval=0.01)
+    processed = worker.run(max_jobs=10)
+
+    assert processed == 3
+    assert sorted(handled) == sorted(job.job_id for job in jobs)
+    assert set(JobQueue.objects.values_list("status", flat=True)) == {"completed"}
+
+
+@pytest.mark.django_db
+def test_handler_exception_schedules_retry(firm):
+    def handler(job):
+        raise RuntimeError("boom with tenant data")
+
+    registry.register(JOB_TYPE, handler)
+    try:
+        _job(firm)
+        job = claim_batch("worker-1", 1, [JOB_TYPE])[0]
+        status = execute_job(job)
+    finally:
+        registry.unregister(JOB_TYPE)
+
+    job.refresh_from_db()
+    assert status == "pending"
+    assert job.error_class == "transient"
+    assert "tenant data" not in job.last_error
+    assert job.next_retry_at is not None
+
+
+@pytest.mark.django_db
+def test_payload_only_handler_is_marked_completed(firm):
+    payloads = []
+    registry.register(JOB_TYPE, payloads.append, payload_only=True)
+    try:
+        _job(firm)
+        job = claim_batch("worker-1", 1, [JOB_TYPE])[0]
+        assert execute_job(job) == "completed"
+    finally:
+        registry.unregister(JOB_TYPE)
+
+    assert payloads[0]["tenant_id"] == firm.id
+
+
+@pytest.mark.django_db
+def test_lost_lease_is_logged_and_not_recorded(firm, caplog):
+    def handler(job):
+        # Another worker took over the job after this worker's lease was reaped
+        JobQueue.objects.filter(job_id=job.job_id).update(claimed_by_worker="worker-2")
+        assert job.mark_completed() is False
+
+    registry.register(JOB_TYPE, handler)
+    try:
+        _job(firm)
+        job = claim_batch("worker-1", 1, [JOB_TYPE])[0]
+        with caplog.at_level("WARNING", logger="modules.jobs.worker"):
+            assert execute_job(job) == "processing"
+    finally:
+        registry.unregister(JOB_TYPE)
+
+    job.refresh_from_db()
+    assert (job.status, job.claimed_by_worker) == ("processing", "worker-2")
+    assert "finished without recording a result" in caplog.text
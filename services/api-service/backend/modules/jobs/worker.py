@@ -0,0 +1,279 @@
+"""
+Job queue worker runtime.
+
+JobWorker claims due JobQueue rows in batches and runs them on a thread pool:
+
+- One ``SELECT ... FOR UPDATE SKIP LOCKED`` per scheduled (firm, category)
+  group, followed by one UPDATE marking the batch processing. Concurrent workers skip each other's locked
+  rows instead of blocking, so workers scale horizontally without per-job
+  claim round-trips.
+- Which jobs a batch takes is decided by modules.jobs.scheduler.FairScheduler
+  (per-category and per-firm concurrency limits, weighted fair queuing across
+  firms, priority aging).
+- Only job types with a registered handler (modules.jobs.registry) are claimed.
+- A worker never claims more than its free thread capacity, so claimed jobs
+  start immediately.
+- Claims are leases (modules.jobs.leases): a heartbeat thread renews the
+  leases of in-flight jobs, and the loop reaps other workers' expired leases
+  (and reports queue/DLQ depth) every JOB_REAPER_INTERVAL_SECONDS.
+- stop() finishes in-flight jobs before run() returns (graceful shutdown).
+
+Handler exceptions are recorded through JobQueue.mark_failed as transient
+errors, which applies the normal retry/backoff and DLQ rules. A job that is
+still ``processing`` after its handler returns (lease lost, or no mark_*
+call) is logged and left to the lease reaper.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, List, Optional
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from modules.core.observability import track_job_execution, track_job_wait
+
+from . import leases, registry
+from .models import JobQueue
+from .scheduler import FairScheduler, report_queue_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def claim_batch(
+    worker_id: str,
+    limit: int,
+    job_types: Iterable[str],
+    categories: Optional[Iterable[str]] = None,
+    scheduler: Optional[FairScheduler] = None,
+) -> List[JobQueue]:
+    """
+    Claim up to ``limit`` due pending jobs for a worker, as chosen by the scheduler.
+
+    Returns the claimed jobs with their in-memory state matching the UPDATE.
+    """
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    due = JobQueue.objects.filter(
+        Q(next_retry_at__isnull=True) | Q(next_retry_at__lte=now),
+        status="pending",
+        scheduled_at__lte=now,
+        job_type__in=list(job_types),
+    )
+    if categories:
+        due = due.filter(category__in=list(categories))
+
+    scheduler = scheduler or FairScheduler()
+    with transaction.atomic():
+        jobs = scheduler.lock(due, limit, now)
+        if not jobs:
+            return []
+        JobQueue.objects.filter(job_id__in=[job.job_id for job in jobs]).update(
+            status="processing",
+            claimed_at=now,
+            claimed_by_worker=worker_id,
+            started_at=now,
+            lease_expires_at=leases.lease_deadline(now),
+            attempt_count=F("attempt_count") + 1,
+            updated_at=now,
+        )
+
+    for job in jobs:
+        job.status = "processing"
+        job.claimed_at = now
+        job.claimed_by_worker = worker_id
+        job.started_at = now
+        job.lease_expires_at = leases.lease_deadline(now)
+        job.attempt_count += 1
+        job.updated_at = now
+        due_at = max(job.scheduled_at, job.next_retry_at or job.scheduled_at)
+        track_job_wait(
+            job.job_type,
+            max(int((now - due_at).total_seconds() * 1000), 0),
+            job.priority,
+            correlation_id=str(job.correlation_id),
+            tenant_id=job.firm_id,
+        )
+    return jobs
+
+
+def execute_job(job: JobQueue) -> str:
+    """Run one claimed job through its registered handler and return the resulting status."""
+    handler = registry.get_handler(job.job_type)
+    started = time.monotonic()
+    try:
+        if handler is None:
+            job.mark_failed("non_retryable", f"No handler registered for job type {job.job_type}", should_retry=False)
+        elif handler.payload_only:
+            handler.resolve()(job.payload or {})
+            if job.status == "processing":
+                job.mark_completed()
+        else:
+            handler.resolve()(job)
+    except Exception as e:
+        # Only the exception type is stored: messages may contain tenant data
+        logger.exception(f"Job {job.job_id} ({job.job_type}) raised {type(e).__name__}")
+        try:
+            job.mark_failed("transient", f"Unhandled {type(e).__name__} in job handler")
+        except Exception:
+            logger.exception(f"Could not record failure for job {job.job_id}")
+
+    if job.status == "processing":
+        # mark_* only updates the instance when the transition is written, so
+        # the lease was lost (reaped, possibly re-claimed) or the handler never
+        # recorded an outcome; the reaper settles the row either way.
+        logger.warning(f"Job {job.job_id} ({job.job_type}) finished without recording a result")
+
+    track_job_execution(
+        job.job_type,
+        job.status,
+        int((time.monotonic() - started) * 1000),
+        retry_count=max(job.attempt_count - 1, 0),
+        correlation_id=str(job.correlation_id),
+        tenant_id=job.firm_id,
+    )
+    return job.status
+
+
+class JobWorker:
+    """Poll-claim-dispatch loop over JobQueue."""
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        batch_size: int = 10,
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        job_types: Optional[Iterable[str]] = None,
+        categories: Optional[Iterable[str]] = None,
+    ):
+        self.worker_id = worker_id or default_worker_id()
+        self.batch_size = max(batch_size, 1)
+        self.concurrency = max(concurrency, 1)
+        self.poll_interval = poll_interval
+        self.job_types = list(job_types) if job_types else registry.registered_job_types()
+        self.categories = list(categories) if categories else None
+        self.scheduler = FairScheduler()
+        self._stop = threading.Event()
+        self._active_lock = threading.Lock()
+        self._active_ids = set()
+        self._last_reap: Optional[float] = None
+
+    def stop(self) -> None:
+        """Stop claiming new jobs; run() returns once in-flight jobs finish."""
+        self._stop.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def claim(self, limit: int) -> List[JobQueue]:
+        return claim_batch(self.worker_id, limit, self.job_types, self.categories, self.scheduler)
+
+    def _run_one(self, job: JobQueue) -> str:
+        close_old_connections()
+        try:
+            return execute_job(job)
+        finally:
+            with self._active_lock:
+                self._active_ids.discard(job.job_id)
+            close_old_connections()
+
+    def heartbeat(self) -> int:
+        """Renew the leases of this worker's claimed jobs."""
+        with self._active_lock:
+            job_ids = list(self._active_ids)
+        return leases.heartbeat(self.worker_id, job_ids)
+
+    def _heartbeat_loop(self, done: threading.Event) -> None:
+        try:
+            while not done.wait(leases.heartbeat_interval_seconds()):
+                try:
+                    self.heartbeat()
+                except Exception:
+                    logger.exception("Job lease heartbeat failed")
+                    close_old_connections()
+        finally:
+            connection.close()
+
+    def reap_if_due(self) -> None:
+        """Reap expired leases and report queue metrics every JOB_REAPER_INTERVAL_SECONDS."""
+        if self._last_reap is not None and time.monotonic() - self._last_reap < leases.reaper_interval_seconds():
+            return
+        self._last_reap = time.monotonic()
+        try:
+            reaped = leases.reap_expired_leases()
+            report_queue_metrics()
+        except Exception:
+            logger.exception("Job lease reaper failed")
+            close_old_connections()
+            return
+        if reaped["requeued"] or reaped["dlq"]:
+            logger.warning(f"Reaped expired job leases: {reaped}")
+
+    def run(self, max_jobs: Optional[int] = None) -> int:
+        """
+        Process jobs until stop() is called (or ``max_jobs`` have been claimed).
+
+        Returns the number of jobs processed.
+        """
+        processed = 0
+        claimed = 0
+        in_flight = set()
+        heartbeat_done = threading.Event()
+        heartbeat_thread = threading.Thread(
+            target=self._heartbeat_loop, args=(heartbeat_done,), name="job-worker-heartbeat", daemon=True
+        )
+        heartbeat_thread.start()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job-worker") as pool:
+            while not self.stopping:
+                self.reap_if_due()
+                done = {future for future in in_flight if future.done()}
+                processed += len(done)
+                in_flight -= done
+
+                capacity = min(self.concurrency - len(in_flight), self.batch_size)
+                if max_jobs is not None:
+                    capacity = min(capacity, max_jobs - claimed)
+                    if capacity <= 0 and not in_flight:
+                        break
+
+                jobs = []
+                if capacity > 0:
+                    try:
+                        jobs = self.claim(capacity)
+                    except Exception:
+                        logger.exception("Job claim failed")
+                        close_old_connections()
+                claimed += len(jobs)
+                with self._active_lock:
+                    self._active_ids.update(job.job_id for job in jobs)
+                for job in jobs:
+                    in_flight.add(pool.submit(self._run_one, job))
+
+                if jobs and len(in_flight) < self.concurrency:
+                    # More work may be due; claim again right away
+                    continue
+                if in_flight:
+                    wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                elif max_jobs is not None:
+                    break
+                else:
+                    self._stop.wait(self.poll_interval)
+
+            wait(in_flight)
+            processed += len(in_flight)
+        heartbeat_done.set()
+        heartbeat_thread.join()
+        return processed
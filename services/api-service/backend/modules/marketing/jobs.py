@@ -1,15 +1,27 @@
 """
 Marketing background job handlers.
+
+Each job sends one shard of a campaign (see modules.marketing.queue); the
+shard that leaves no pending recipients behind completes the execution.
+Sends go out in chunks of CAMPAIGN_SEND_CHUNK_SIZE pending recipients
+over one shared email connection (BulkEmailSender). After each chunk the
+recipient statuses are written with one bulk_update and the execution counters
+advanced in the same transaction, so that chunk is checkpointed: a crashed or
+retried job resumes from the recipients still pending. At most one chunk can
+be re-sent after a crash.
 """
 
 from __future__ import annotations
 
 import logging
 
+from django.conf import settings
 from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
+from django.utils.html import strip_tags
 
-from modules.core.notifications import EmailNotification
+from modules.core.notifications import BulkEmailSender, EmailNotification
 from modules.firm.utils import firm_db_session
 from modules.jobs.models import JobQueue
 from modules.marketing.models import CampaignExecution, CampaignRecipientStatus
@@ -17,6 +29,65 @@ from modules.marketing.models import CampaignExecution, CampaignRecipientStatus
 logger = logging.getLogger(__name__)
 
 
+def _chunk_size() -> int:
+    return getattr(settings, "CAMPAIGN_SEND_CHUNK_SIZE", 200)
+
+
+def _send_pending_recipients(execution: CampaignExecution, template, recipients) -> tuple[int, int]:
+    """Send to pending recipients chunk by chunk, checkpointing each chunk; returns (sent, failed)."""
+    html_content = template.html_content
+    text_content = template.plain_text_content or (strip_tags(html_content) if html_content else None)
+    sent_count = 0
+    failed_count = 0
+    last_id = 0
+
+    with BulkEmailSender() as sender:
+        while True:
+            chunk = list(recipients.filter(id__gt=last_id)[: _chunk_size()])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+
+            messages = [
+                EmailNotification.build_message(
+                    to=recipient.email,
+                    subject=template.subject_line,
+                    html_content=html_content,
+                    text_content=text_content,
+                )
+                for recipient in chunk
+            ]
+            results = sender.send(messages)
+
+            now = timezone.now()
+            chunk_sent = 0
+            for recipient, success in zip(chunk, results):
+                if success:
+                    recipient.status = "sent"
+                    recipient.sent_at = now
+                    chunk_sent += 1
+                else:
+                    recipient.status = "failed"
+                    recipient.failed_at = now
+                    recipient.error_message = "Email send failed"
+                recipient.updated_at = now
+            chunk_failed = len(chunk) - chunk_sent
+
+            with transaction.atomic():
+                CampaignRecipientStatus.objects.bulk_update(
+                    chunk, ["status", "sent_at", "failed_at", "error_message", "updated_at"]
+                )
+                CampaignExecution.objects.filter(pk=execution.pk).update(
+                    emails_sent=F("emails_sent") + chunk_sent,
+                    emails_failed=F("emails_failed") + chunk_failed,
+                    updated_at=now,
+                )
+            sent_count += chunk_sent
+            failed_count += chunk_failed
+
+    return sent_count, failed_count
+
+
 def process_email_campaign_job(job: JobQueue) -> None:
     """
     Process a queued email campaign send job.
@@ -49,43 +120,26 @@ def process_email_campaign_job(job: JobQueue) -> None:
             job.mark_failed("non_retryable", execution.error_message, should_retry=False)
             return
 
-        recipient_queryset = CampaignRecipientStatus.objects.filter(execution=execution, status="pending")
+        pending = CampaignRecipientStatus.objects.filter(execution=execution, status="pending")
+        recipient_queryset = pending
+        recipient_range = payload.get("recipient_range")
         recipient_ids = payload.get("recipient_ids")
-        if recipient_ids:
+        if recipient_range:
+            recipient_queryset = recipient_queryset.filter(id__gte=recipient_range[0], id__lte=recipient_range[1])
+        elif recipient_ids:
+            # Payload version 1.0 jobs queued before sharding
             recipient_queryset = recipient_queryset.filter(contact_id__in=recipient_ids)
 
-        sent_count = 0
-        failed_count = 0
+        sent_count, failed_count = _send_pending_recipients(execution, template, recipient_queryset.order_by("id"))
 
-        for recipient in recipient_queryset.iterator():
-            success = EmailNotification.send(
-                to=recipient.email,
-                subject=template.subject_line,
-                html_content=template.html_content,
-                text_content=template.plain_text_content or None,
-            )
-            if success:
-                recipient.mark_sent()
-                sent_count += 1
-            else:
-                recipient.mark_failed("Email send failed")
-                failed_count += 1
-
-        with transaction.atomic():
-            execution.emails_sent += sent_count
-            execution.emails_failed += failed_count
-            execution.completed_at = timezone.now()
-            execution.status = "sent" if execution.emails_sent > 0 else "failed"
-            execution.save(
-                update_fields=[
-                    "emails_sent",
-                    "emails_failed",
-                    "completed_at",
-                    "status",
-                    "updated_at",
-                ]
-            )
-            execution.calculate_rates()
+        # The last shard to finish closes out the execution
+        if not pending.exists():
+            with transaction.atomic():
+                execution.refresh_from_db(fields=["emails_sent", "emails_failed"])
+                execution.completed_at = timezone.now()
+                execution.status = "sent" if execution.emails_sent > 0 else "failed"
+                execution.save(update_fields=["completed_at", "status", "updated_at"])
+                execution.calculate_rates()
 
         logger.info(
             "Processed email campaign job",
@@ -96,10 +150,17 @@ def process_email_campaign_job(job: JobQueue) -> None:
             },
         )
 
-        job.mark_completed(
+        recorded = job.mark_completed(
             result={
                 "execution_id": execution.id,
                 "sent": sent_count,
                 "failed": failed_count,
             }
         )
+        if not recorded:
+            # Sent recipients are no longer pending, so a re-run of this shard
+            # after the lease is reaped only picks up what is left.
+            logger.warning(
+                "Email campaign job result not recorded; lease lost",
+                extra={"job_id": str(job.job_id), "execution_id": execution.id},
+            )
@@ -2,79 +2,126 @@
 Marketing campaign queue helpers.
 
 Queues campaign execution send jobs and prepares per-recipient status records.
+
+Fan-out streams the audience in keyset chunks (CAMPAIGN_FANOUT_CHUNK_SIZE) into
+CampaignRecipientStatus rows, then splits the send into shard jobs of up to
+CAMPAIGN_SEND_SHARD_SIZE recipients. Each shard payload carries only a
+``recipient_range`` of CampaignRecipientStatus ids, so memory use and job row
+size stay constant however large the audience is.
 """
 
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import QuerySet
 
 from modules.clients.models import Contact
 from modules.jobs.models import JobQueue
 from modules.marketing.models import CampaignExecution, CampaignRecipientStatus
 
 
-def _resolve_contacts(execution: CampaignExecution) -> List[Contact]:
+def _fanout_chunk_size() -> int:
+    return getattr(settings, "CAMPAIGN_FANOUT_CHUNK_SIZE", 2000)
+
+
+def _shard_size() -> int:
+    return getattr(settings, "CAMPAIGN_SEND_SHARD_SIZE", 1000)
+
+
+def _resolve_contacts(execution: CampaignExecution) -> QuerySet:
     firm = execution.campaign.firm
     queryset = Contact.objects.filter(
         client__firm=firm,
         status=Contact.STATUS_ACTIVE,
         opt_out_marketing=False,
-    )
+    ).exclude(email="")
 
     if execution.segment and execution.segment.criteria:
         contact_ids = execution.segment.criteria.get("contact_ids")
         if contact_ids:
             queryset = queryset.filter(id__in=contact_ids)
 
-    return list(queryset)
-
-
-def _ensure_recipient_records(
-    execution: CampaignExecution,
-    contacts: Iterable[Contact],
-) -> List[int]:
-    records = [
-        CampaignRecipientStatus(
-            execution=execution,
-            contact=contact,
-            email=contact.email,
-            status="pending",
+    return queryset
+
+
+def _ensure_recipient_records(execution: CampaignExecution, contacts: QuerySet) -> None:
+    """Create pending recipient rows chunk by chunk (keyset on contact id); existing rows are kept."""
+    chunk_size = _fanout_chunk_size()
+    last_id = 0
+    while True:
+        chunk = list(contacts.filter(id__gt=last_id).order_by("id").values_list("id", "email")[:chunk_size])
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+        CampaignRecipientStatus.objects.bulk_create(
+            [
+                CampaignRecipientStatus(execution=execution, contact_id=contact_id, email=email, status="pending")
+                for contact_id, email in chunk
+                if email
+            ],
+            ignore_conflicts=True,
         )
-        for contact in contacts
-        if contact.email
-    ]
 
-    if records:
-        CampaignRecipientStatus.objects.bulk_create(records, ignore_conflicts=True)
 
-    return [record.contact_id for record in records if record.contact_id]
+def _recipient_shards(execution: CampaignExecution) -> List[Tuple[int, int]]:
+    """Split pending recipients into contiguous (first_id, last_id) ranges of up to the shard size."""
+    pending = CampaignRecipientStatus.objects.filter(execution=execution, status="pending").order_by("id")
+    shard_size = _shard_size()
+    shards = []
+    last_id = 0
+    while True:
+        first_id = pending.filter(id__gt=last_id).values_list("id", flat=True).first()
+        if first_id is None:
+            break
+        boundary = pending.filter(id__gte=first_id).values_list("id", flat=True)[shard_size - 1 : shard_size]
+        end_id: Optional[int] = next(iter(boundary), None)
+        if end_id is None:
+            end_id = pending.filter(id__gte=first_id).values_list("id", flat=True).last()
+        shards.append((first_id, end_id))
+        last_id = end_id
+    return shards
 
 
 def queue_campaign_execution(
     execution: CampaignExecution,
     correlation_id: str,
-) -> JobQueue:
-    contacts = _resolve_contacts(execution)
-    recipient_ids = _ensure_recipient_records(execution, contacts)
-
-    idempotency_key = f"email_campaign_{execution.id}_{execution.started_at.isoformat()}"
-    payload = {
-        "tenant_id": execution.campaign.firm_id,
-        "correlation_id": str(correlation_id),
-        "idempotency_key": idempotency_key,
-        "execution_id": execution.id,
-        "campaign_id": execution.campaign_id,
-        "template_id": execution.email_template_id,
-        "recipient_ids": recipient_ids,
-    }
-
-    return JobQueue.objects.create(
-        firm=execution.campaign.firm,
-        category="notifications",
-        job_type="email_campaign_send",
-        payload_version="1.0",
-        payload=payload,
-        idempotency_key=idempotency_key,
-        correlation_id=correlation_id,
-        priority=1,
-    )
+) -> List[JobQueue]:
+    """Create recipient rows and queue one send job per recipient shard."""
+    _ensure_recipient_records(execution, _resolve_contacts(execution))
+
+    base_key = f"email_campaign_{execution.id}_{execution.started_at.isoformat()}"
+    jobs = []
+    for shard, (first_id, last_id) in enumerate(_recipient_shards(execution)):
+        idempotency_key = f"{base_key}_{shard}"
+        payload = {
+            "tenant_id": execution.campaign.firm_id,
+            "correlation_id": str(correlation_id),
+            "idempotency_key": idempotency_key,
+            "execution_id": execution.id,
+            "campaign_id": execution.campaign_id,
+            "template_id": execution.email_template_id,
+            "recipient_range": [first_id, last_id],
+        }
+        jobs.append(
+            JobQueue(
+                firm_id=execution.campaign.firm_id,
+                category="notifications",
+                job_type="email_campaign_send",
+                payload_version="1.1",
+                payload=payload,
+                idempotency_key=idempotency_key,
+                correlation_id=correlation_id,
+                priority=1,
+            )
+        )
+
+    if not jobs:
+        execution.status = "failed"
+        execution.error_message = "Campaign has no eligible recipients."
+        execution.save(update_fields=["status", "error_message", "updated_at"])
+        return []
+
+    JobQueue.objects.bulk_create(jobs, ignore_conflicts=True)
+    return jobs
@@ -0,0 +1,169 @@
+"""
+Tests for campaign fan-out, recipient sharding and shard sends.
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from modules.clients.models import Client, Contact
+from modules.crm.models import Campaign
+from modules.firm.models import Firm
+from modules.jobs.models import JobQueue
+from modules.marketing import queue
+from modules.marketing.jobs import process_email_campaign_job
+from modules.marketing.models import CampaignExecution, CampaignRecipientStatus, EmailTemplate
+from modules.marketing.queue import _ensure_recipient_records, _recipient_shards, queue_campaign_execution
+
+CONTACT_HAS_EMAIL = any(field.name == "email" for field in Contact._meta.get_fields())
+
+
+@pytest.fixture
+def firm(db):
+    return Firm.objects.create(name="Campaign Firm", slug="campaign-firm")
+
+
+def _execution(firm, name="Launch"):
+    campaign = Campaign.objects.create(
+        firm=firm,
+        name=name,
+        type="email",
+        start_date=date(2026, 1, 1),
+        end_date=date(2026, 12, 31),
+        budget=Decimal("0.00"),
+    )
+    template = EmailTemplate.objects.create(
+        firm=firm, name=name, subject_line=f"{name} news", html_content="<p>Hello</p>"
+    )
+    return CampaignExecution.objects.create(
+        campaign=campaign, email_template=template, status="sending", started_at=timezone.now()
+    )
+
+
+@pytest.fixture
+def execution(firm):
+    return _execution(firm)
+
+
+def _recipients(execution, count, start=0):
+    return [
+        CampaignRecipientStatus.objects.create(execution=execution, email=f"r{n}@example.test")
+        for n in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def no_contacts(monkeypatch):
+    """Skip contact fan-out so only the recipient rows a test creates are sharded."""
+    monkeypatch.setattr(queue, "_resolve_contacts", lambda execution: None)
+    monkeypatch.setattr(queue, "_ensure_recipient_records", lambda execution, contacts: None)
+
+
+@pytest.mark.django_db
+def test_shards_split_pending_ids_at_the_shard_size(firm, execution, settings):
+    settings.CAMPAIGN_SEND_SHARD_SIZE = 2
+    other = _execution(firm, name="Other")
+    rows = []
+    for n in range(5):
+        rows += _recipients(execution, 1, start=n)
+        _recipients(other, 1, start=n)  # interleaved ids from another execution
+    CampaignRecipientStatus.objects.filter(pk=rows[1].pk).update(status="sent")
+
+    assert _recipient_shards(execution) == [(rows[0].id, rows[2].id), (rows[3].id, rows[4].id)]
+
+    settings.CAMPAIGN_SEND_SHARD_SIZE = 4
+    assert _recipient_shards(execution) == [(rows[0].id, rows[4].id)]
+
+    settings.CAMPAIGN_SEND_SHARD_SIZE = 3
+    assert _recipient_shards(execution) == [(rows[0].id, rows[3].id), (rows[4].id, rows[4].id)]
+
+    CampaignRecipientStatus.objects.filter(execution=execution).update(status="sent")
+    assert _recipient_shards(execution) == []
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(not CONTACT_HAS_EMAIL, reason="clients.Contact has no email field")
+def test_fan_out_chunks_contacts_and_keeps_existing_rows(firm, execution, settings):
+    settings.CAMPAIGN_FANOUT_CHUNK_SIZE = 2
+    client = Client.objects.create(
+        firm=firm,
+        company_name="Acme",
+        primary_contact_name="Ada Acme",
+        primary_contact_email="ada@acme.test",
+        client_since=date(2025, 1, 1),
+    )
+    contacts = [
+        Contact.objects.create(client=client, first_name="C", last_name=str(n), email=f"c{n}@example.test")
+        for n in range(5)
+    ]
+    CampaignRecipientStatus.objects.create(
+        execution=execution, contact=contacts[0], email=contacts[0].email, status="sent"
+    )
+
+    _ensure_recipient_records(execution, Contact.objects.filter(client=client))
+    _ensure_recipient_records(execution, Contact.objects.filter(client=client))
+
+    rows = CampaignRecipientStatus.objects.filter(execution=execution)
+    assert sorted(rows.values_list("contact_id", flat=True)) == [contact.id for contact in contacts]
+    assert rows.get(contact=contacts[0]).status == "sent"
+    assert rows.filter(status="pending").count() == 4
+
+
+@pytest.mark.django_db
+def test_requeue_reuses_shard_jobs_and_skips_sent_recipients(firm, execution, settings, no_contacts):
+    settings.CAMPAIGN_SEND_SHARD_SIZE = 2
+    rows = _recipients(execution, 3)
+
+    first = queue_campaign_execution(execution, correlation_id="00000000-0000-0000-0000-000000000001")
+    again = queue_campaign_execution(execution, correlation_id="00000000-0000-0000-0000-000000000001")
+
+    assert [job.payload["recipient_range"] for job in first] == [[rows[0].id, rows[1].id], [rows[2].id, rows[2].id]]
+    assert [job.idempotency_key for job in again] == [job.idempotency_key for job in first]
+    assert JobQueue.objects.filter(job_type="email_campaign_send").count() == 2
+
+    CampaignRecipientStatus.objects.filter(pk__in=[rows[0].pk, rows[1].pk]).update(status="sent")
+    remaining = queue_campaign_execution(execution, correlation_id="00000000-0000-0000-0000-000000000001")
+    assert [job.payload["recipient_range"] for job in remaining] == [[rows[2].id, rows[2].id]]
+
+
+@pytest.mark.django_db
+def test_queue_without_recipients_fails_the_execution(execution, no_contacts):
+    assert queue_campaign_execution(execution, correlation_id="00000000-0000-0000-0000-000000000001") == []
+
+    execution.refresh_from_db()
+    assert execution.status == "failed"
+    assert JobQueue.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_shard_jobs_send_only_their_range(firm, execution, settings, no_contacts, mailoutbox):
+    settings.CAMPAIGN_SEND_SHARD_SIZE = 2
+    rows = _recipients(execution, 4)
+    other_rows = _recipients(_execution(firm, name="Other"), 2, start=10)
+    queue_campaign_execution(execution, correlation_id="00000000-0000-0000-0000-000000000001")
+    first_job, second_job = JobQueue.objects.filter(job_type="email_campaign_send").order_by("idempotency_key")
+
+    assert second_job.claim_for_processing("worker-1")
+    process_email_campaign_job(second_job)
+
+    second_job.refresh_from_db()
+    assert (second_job.status, second_job.result["sent"]) == ("completed", 2)
+    assert [message.to for message in mailoutbox] == [[rows[2].email], [rows[3].email]]
+    execution.refresh_from_db()
+    assert (execution.status, execution.emails_sent) == ("sending", 2)
+    assert set(
+        CampaignRecipientStatus.objects.filter(execution=execution, status="pending").values_list("id", flat=True)
+    ) == {rows[0].id, rows[1].id}
+
+    assert first_job.claim_for_processing("worker-1")
+    process_email_campaign_job(first_job)
+
+    first_job.refresh_from_db()
+    assert (first_job.status, first_job.result["sent"]) == ("completed", 2)
+    assert sorted(message.to[0] for message in mailoutbox) == sorted(row.email for row in rows)
+    execution.refresh_from_db()
+    assert (execution.status, execution.emails_sent) == ("sent", 4)
+    assert set(
+        CampaignRecipientStatus.objects.filter(id__in=[row.id for row in other_rows]).values_list("status", flat=True)
+    ) == {"pending"}
@@ -0,0 +1,136 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def drop_materialized_views(apps, schema_editor):
+    """The summary tables replace the materialized views of the same names (PostgreSQL only)."""
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP MATERIALIZED VIEW IF EXISTS mv_utilization_by_user_week")
+        schema_editor.execute("DROP MATERIALIZED VIEW IF EXISTS mv_utilization_by_project_month")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("firm", "0016_firmoffboardingrecord_export_archive_path"),
+        ("projects", "0007_utilization_reporting_materialized_views"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_materialized_views, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="UtilizationByUserWeekMV",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("user_id", models.IntegerField(help_text="User ID (not a foreign key - summary is denormalized)")),
+                ("week_start", models.DateField(help_text="Week start date (Monday)")),
+                ("total_hours", models.DecimalField(decimal_places=2, help_text="Total hours logged", max_digits=10)),
+                (
+                    "billable_hours",
+                    models.DecimalField(decimal_places=2, help_text="Billable hours logged", max_digits=10),
+                ),
+                (
+                    "non_billable_hours",
+                    models.DecimalField(decimal_places=2, help_text="Non-billable hours logged", max_digits=10),
+                ),
+                ("projects_worked", models.IntegerField(help_text="Unique projects worked on")),
+                ("days_worked", models.IntegerField(help_text="Unique days with time entries")),
+                (
+                    "total_cost",
+                    models.DecimalField(decimal_places=2, help_text="Total cost (hours × rates)", max_digits=12),
+                ),
+                (
+                    "billable_cost",
+                    models.DecimalField(
+                        decimal_places=2, help_text="Billable cost (billable hours × rates)", max_digits=12
+                    ),
+                ),
+                ("refreshed_at", models.DateTimeField(help_text="When this MV was last refreshed")),
+                (
+                    "firm",
+                    models.ForeignKey(
+                        db_column="firm_id",
+                        help_text="Firm this utilization record belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="firm.firm",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Utilization by User Week (MV)",
+                "verbose_name_plural": "Utilization by User Week (MV)",
+                "db_table": "mv_utilization_by_user_week",
+                "ordering": ["-week_start", "user_id"],
+                "indexes": [
+                    models.Index(fields=["firm", "user_id", "-week_start"], name="idx_mv_util_user_firm_week"),
+                    models.Index(fields=["user_id", "-week_start"], name="idx_mv_util_user_week"),
+                    models.Index(fields=["firm", "-week_start"], name="idx_mv_util_firm_week"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(fields=("firm", "user_id", "week_start"), name="uniq_mv_util_user_bucket"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="UtilizationByProjectMonthMV",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "project_id",
+                    models.IntegerField(help_text="Project ID (not a foreign key - summary is denormalized)"),
+                ),
+                ("project_name", models.CharField(help_text="Project name (denormalized)", max_length=255)),
+                ("project_code", models.CharField(help_text="Project code (denormalized)", max_length=50)),
+                ("client_id", models.IntegerField(help_text="Client ID (denormalized)")),
+                ("month", models.DateField(help_text="Month start date (YYYY-MM-01)")),
+                ("total_hours", models.DecimalField(decimal_places=2, help_text="Total hours logged", max_digits=10)),
+                (
+                    "billable_hours",
+                    models.DecimalField(decimal_places=2, help_text="Billable hours logged", max_digits=10),
+                ),
+                (
+                    "non_billable_hours",
+                    models.DecimalField(decimal_places=2, help_text="Non-billable hours logged", max_digits=10),
+                ),
+                ("team_members", models.IntegerField(help_text="Unique team members with time entries")),
+                ("days_worked", models.IntegerField(help_text="Unique days with time entries")),
+                (
+                    "total_cost",
+                    models.DecimalField(decimal_places=2, help_text="Total cost (hours × rates)", max_digits=12),
+                ),
+                (
+                    "billable_cost",
+                    models.DecimalField(
+                        decimal_places=2, help_text="Billable cost (billable hours × rates)", max_digits=12
+                    ),
+                ),
+                ("tasks_worked", models.IntegerField(help_text="Unique tasks worked on")),
+                ("refreshed_at", models.DateTimeField(help_text="When this MV was last refreshed")),
+                (
+                    "firm",
+                    models.ForeignKey(
+                        db_column="firm_id",
+                        help_text="Firm this utilization record belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="firm.firm",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Utilization by Project Month (MV)",
+                "verbose_name_plural": "Utilization by Project Month (MV)",
+                "db_table": "mv_utilization_by_project_month",
+                "ordering": ["-month", "project_name"],
+                "indexes": [
+                    models.Index(fields=["firm", "-month"], name="idx_mv_proj_util_firm_month"),
+                    models.Index(fields=["project_id", "-month"], name="idx_mv_proj_util_project_month"),
+                    models.Index(fields=["client_id", "-month"], name="idx_mv_proj_util_client_month"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(fields=("firm", "project_id", "month"), name="uniq_mv_proj_util_bucket"),
+                ],
+            },
+        ),
+    ]
@@ -1653,15 +1653,16 @@ class TaskDependency(models.Model):
 
 class UtilizationByUserWeekMV(models.Model):
     """
-    Materialized View: Utilization reporting by user and week (Sprint 5.3).
+    Summary table: Utilization reporting by user and week (Sprint 5.3).
     
     Pre-aggregated utilization metrics for fast team capacity and performance reporting.
-    This is a READ-ONLY model backed by a PostgreSQL materialized view.
+    READ-ONLY for application code: rows are maintained per bucket by
+    modules.finance.reporting (formerly a PostgreSQL materialized view).
     
     Refresh Strategy:
-    - Scheduled: Daily at 2 AM
+    - Event-driven: Time entry changes mark their buckets dirty
+    - Scheduled: refresh_materialized_views recomputes dirty buckets every few minutes
     - On-demand: Via management command or API endpoint
-    - Event-driven: On time entry approval
     
     TIER 0: Scoped to Firm for tenant isolation.
     """
@@ -1669,14 +1670,14 @@ class UtilizationByUserWeekMV(models.Model):
     # TIER 0: Firm tenancy
     firm = models.ForeignKey(
         "firm.Firm",
-        on_delete=models.DO_NOTHING,  # MV is read-only
+        on_delete=models.CASCADE,
         related_name="+",  # No reverse relation needed
         help_text="Firm this utilization record belongs to",
         db_column="firm_id",
     )
     
     # User information
-    user_id = models.IntegerField(help_text="User ID (not a foreign key - MV denormalized)")
+    user_id = models.IntegerField(help_text="User ID (not a foreign key - summary is denormalized)")
     
     # Time dimension
     week_start = models.DateField(help_text="Week start date (Monday)")
@@ -1720,11 +1721,18 @@ class UtilizationByUserWeekMV(models.Model):
     objects = models.Manager()
     
     class Meta:
-        managed = False  # Django doesn't manage MV schema
         db_table = "mv_utilization_by_user_week"
         verbose_name = "Utilization by User Week (MV)"
         verbose_name_plural = "Utilization by User Week (MV)"
         ordering = ["-week_start", "user_id"]
+        indexes = [
+            models.Index(fields=["firm", "user_id", "-week_start"], name="idx_mv_util_user_firm_week"),
+            models.Index(fields=["user_id", "-week_start"], name="idx_mv_util_user_week"),
+            models.Index(fields=["firm", "-week_start"], name="idx_mv_util_firm_week"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["firm", "user_id", "week_start"], name="uniq_mv_util_user_bucket"),
+        ]
     
     def __str__(self) -> str:
         return f"User {self.user_id} - Week {self.week_start}: {self.total_hours}h"
@@ -1764,97 +1772,33 @@ class UtilizationByUserWeekMV(models.Model):
     @classmethod
     def refresh(cls, firm_id: int = None, concurrently: bool = True) -> dict:
         """
-        Refresh the materialized view.
+        Recompute the dirty (firm, user, week) buckets.
         
         Args:
-            firm_id: If provided, only refresh data for this firm (not supported by PostgreSQL MV)
-            concurrently: If True, use CONCURRENT refresh (allows reads during refresh)
+            firm_id: If provided, only refresh this firm's buckets
+            concurrently: Ignored; kept for callers of the former materialized view refresh
+                (buckets are replaced row by row, reads are never blocked)
         
         Returns:
             dict with refresh status and metadata
         """
-        from django.db import connection
-        from django.utils import timezone
-        import time
-        
-        # Import MVRefreshLog from finance (centralized logging)
-        from modules.finance.models import MVRefreshLog
-        
-        start_time = time.time()
-        started_at = timezone.now()
-        
-        # Log refresh start
-        MVRefreshLog.objects.create(
-            view_name="mv_utilization_by_user_week",
-            firm_id=firm_id,
-            refresh_started_at=started_at,
-            refresh_status="running",
-            triggered_by="manual",
-        )
-        
-        try:
-            with connection.cursor() as cursor:
-                refresh_sql = "REFRESH MATERIALIZED VIEW"
-                if concurrently:
-                    refresh_sql += " CONCURRENTLY"
-                refresh_sql += " mv_utilization_by_user_week"
-                
-                cursor.execute(refresh_sql)
-                
-                cursor.execute("SELECT COUNT(*) FROM mv_utilization_by_user_week")
-                row_count = cursor.fetchone()[0]
-            
-            duration = time.time() - start_time
-            completed_at = timezone.now()
-            
-            MVRefreshLog.objects.filter(
-                view_name="mv_utilization_by_user_week",
-                refresh_started_at=started_at,
-            ).update(
-                refresh_completed_at=completed_at,
-                refresh_status="success",
-                rows_affected=row_count,
-            )
-            
-            return {
-                "status": "success",
-                "view_name": "mv_utilization_by_user_week",
-                "rows_affected": row_count,
-                "duration_seconds": round(duration, 2),
-                "completed_at": completed_at.isoformat(),
-            }
+        from modules.finance.reporting import UTILIZATION_USER, refresh_view
         
-        except Exception as e:
-            completed_at = timezone.now()
-            
-            MVRefreshLog.objects.filter(
-                view_name="mv_utilization_by_user_week",
-                refresh_started_at=started_at,
-            ).update(
-                refresh_completed_at=completed_at,
-                refresh_status="failed",
-                error_message=str(e),
-            )
-            
-            return {
-                "status": "failed",
-                "view_name": "mv_utilization_by_user_week",
-                "error": str(e),
-                "completed_at": completed_at.isoformat(),
-            }
+        return refresh_view(UTILIZATION_USER, firm_id=firm_id)
 
 
 class UtilizationByProjectMonthMV(models.Model):
     """
-    Materialized View: Utilization reporting by project and month (Sprint 5.3).
+    Summary table: Utilization reporting by project and month (Sprint 5.3).
     
     Pre-aggregated utilization metrics for fast project performance reporting.
-    This is a READ-ONLY model backed by a PostgreSQL materialized view.
+    READ-ONLY for application code: rows are maintained per bucket by
+    modules.finance.reporting (formerly a PostgreSQL materialized view).
     
     Refresh Strategy:
-    - Scheduled: Daily at 2 AM
+    - Event-driven: Time entry changes mark their buckets dirty
+    - Scheduled: refresh_materialized_views recomputes dirty buckets every few minutes
     - On-demand: Via management command or API endpoint
-    - Event-driven: On time entry approval
     
     TIER 0: Scoped to Firm for tenant isolation.
     """
@@ -1862,14 +1806,14 @@ class UtilizationByProjectMonthMV(models.Model):
     # TIER 0: Firm tenancy
     firm = models.ForeignKey(
         "firm.Firm",
-        on_delete=models.DO_NOTHING,  # MV is read-only
+        on_delete=models.CASCADE,
         related_name="+",  # No reverse relation needed
         help_text="Firm this utilization record belongs to",
         db_column="firm_id",
     )
     
     # Project information
-    project_id = models.IntegerField(help_text="Project ID (not a foreign key - MV denormalized)")
+    project_id = models.IntegerField(help_text="Project ID (not a foreign key - summary is denormalized)")
     project_name = models.CharField(max_length=255, help_text="Project name (denormalized)")
     project_code = models.CharField(max_length=50, help_text="Project code (denormalized)")
     client_id = models.IntegerField(help_text="Client ID (denormalized)")
@@ -1919,11 +1863,18 @@ class UtilizationByProjectMonthMV(models.Model):
     objects = models.Manager()
     
     class Meta:
-        managed = False  # Django doesn't manage MV schema
         db_table = "mv_utilization_by_project_month"
         verbose_name = "Utilization by Project Month (MV)"
         verbose_name_plural = "Utilization by Project Month (MV)"
         ordering = ["-month", "project_name"]
+        indexes = [
+            models.Index(fields=["firm", "-month"], name="idx_mv_proj_util_firm_month"),
+            models.Index(fields=["project_id", "-month"], name="idx_mv_proj_util_project_month"),
+            models.Index(fields=["client_id", "-month"], name="idx_mv_proj_util_client_month"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["firm", "project_id", "month"], name="uniq_mv_proj_util_bucket"),
+        ]
     
     def __str__(self) -> str:
         return f"{self.project_name} ({self.month.strftime('%Y-%m')}): {self.total_hours}h"
@@ -1959,82 +1910,16 @@ class UtilizationByProjectMonthMV(models.Model):
     @classmethod
     def refresh(cls, firm_id: int = None, concurrently: bool = True) -> dict:
         """
-        Refresh the materialized view.
+        Recompute the dirty (firm, project, month) buckets.
         
         Args:
-            firm_id: If provided, only refresh data for this firm (not supported by PostgreSQL MV)
-            concurrently: If True, use CONCURRENT refresh (allows reads during refresh)
+            firm_id: If provided, only refresh this firm's buckets
+            concurrently: Ignored; kept for callers of the former materialized view refresh
+                (buckets are replaced row by row, reads are never blocked)
         
         Returns:
             dict with refresh status and metadata
         """
-        from django.db import connection
-        from django.utils import timezone
-        import time
-        
-        # Import MVRefreshLog from finance (centralized logging)
-        from modules.finance.models import MVRefreshLog
+        from modules.finance.reporting import UTILIZATION_PROJECT, refresh_view
         
-        start_time = time.time()
-        started_at = timezone.now()
-        
-        # Log refresh start
-        MVRefreshLog.objects.create(
-            view_name="mv_utilization_by_project_month",
-            firm_id=firm_id,
-            refresh_started_at=started_at,
-            refresh_status="running",
-            triggered_by="manual",
-        )
-        
-        try:
-            with connection.cursor() as cursor:
-                refresh_sql = "REFRESH MATERIALIZED VIEW"
-                if concurrently:
-                    refresh_sql += " CONCURRENTLY"
-                refresh_sql += " mv_utilization_by_project_month"
-                
-                cursor.execute(refresh_sql)
-                
-                cursor.execute("SELECT COUNT(*) FROM mv_utilization_by_project_month")
-                row_count = cursor.fetchone()[0]
-            
-            duration = time.time() - start_time
-            completed_at = timezone.now()
-            
-            MVRefreshLog.objects.filter(
-                view_name="mv_utilization_by_project_month",
-                refresh_started_at=started_at,
-            ).update(
-                refresh_completed_at=completed_at,
-                refresh_status="success",
-                rows_affected=row_count,
-            )
-            
-            return {
-                "status": "success",
-                "view_name": "mv_utilization_by_project_month",
-                "rows_affected": row_count,
-                "duration_seconds": round(duration, 2),
-                "completed_at": completed_at.isoformat(),
-            }
-        
-        except Exception as e:
-            completed_at = timezone.now()
-            
-            MVRefreshLog.objects.filter(
-                view_name="mv_utilization_by_project_month",
-                refresh_started_at=started_at,
-            ).update(
-                refresh_completed_at=completed_at,
-                refresh_status="failed",
-                error_message=str(e),
-            )
-            
-            return {
-                "status": "failed",
-                "view_name": "mv_utilization_by_project_month",
-                "error": str(e),
-                "completed_at": completed_at.isoformat(),
-            }
-
+        return refresh_view(UTILIZATION_PROJECT, firm_id=firm_id)
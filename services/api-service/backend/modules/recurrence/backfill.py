@@ -10,7 +10,11 @@ Per docs/03-reference/requirements/DOC-10.md section 7.2:
 - Generates RecurrenceGeneration rows for missed periods
 
 This service allows filling gaps when a recurrence was paused
-and the user wants to catch up on missed instances.
+and the user wants to catch up on missed instances. Missed periods are
+written with the generator's set-based bulk path. Catch-up for active rules
+after an outage runs as a backfill generation run instead
+(modules.recurrence.jobs.queue_recurrence_run(backfill=True, lookback_days=N)),
+sharded like the daily run but locked and prioritized separately from it.
 """
 
 from datetime import datetime, timedelta
@@ -22,7 +26,7 @@ from django.utils import timezone
 
 from modules.recurrence.models import RecurrenceRule, RecurrenceGeneration
 from modules.recurrence.generator import RecurrenceGenerator
-from modules.firm.audit import audit
+from modules.firm.audit import AuditEvent, audit
 
 
 @dataclass
@@ -45,10 +49,6 @@ class BackfillService:
     DOC-10.2: Implements backfill operation with permission gating and audit trail.
     """
 
-    def __init__(self):
-        """Initialize backfill service."""
-        self.generator = RecurrenceGenerator()
-
     @transaction.atomic
     def backfill_missed_periods(
         self,
@@ -99,54 +99,33 @@ class BackfillService:
                 f"Requested: {(end_date - start_date).days} days."
             )
 
-        # Compute candidate periods in the backfill window
-        periods_created = 0
-        periods_skipped = 0
-        generation_ids = []
-
-        # Generate periods using the generator
-        candidate_periods = self.generator.compute_periods(
-            recurrence_rule=recurrence_rule,
-            as_of=end_date,  # Use end_date as "now" for computation
-            start_boundary=start_date,
-            end_boundary=end_date,
-        )
-
-        for period in candidate_periods:
-            # Try to create RecurrenceGeneration for this period
-            generation, created = RecurrenceGeneration.objects.get_or_create(
-                firm=recurrence_rule.firm,
+        # Compute candidate periods in the backfill window and create the
+        # missing ones in bulk (marked as backfilled)
+        generator = RecurrenceGenerator(recurrence_rule.firm, user)
+        candidate_periods = generator._compute_periods(recurrence_rule, start_date, end_date)
+        periods_created = generator._bulk_create_generations(
+            [(recurrence_rule, period) for period in candidate_periods],
+            backfilled=True,
+            backfill_reason=reason,
+        ).get(recurrence_rule.id, 0)
+        periods_skipped = len(candidate_periods) - periods_created
+        generation_ids = list(
+            RecurrenceGeneration.objects.filter(
                 recurrence_rule=recurrence_rule,
-                period_key=period["period_key"],
-                defaults={
-                    "target_object_type": "task",  # Default, can be customized
-                    "status": "planned",
-                    "period_starts_at": period["starts_at"],
-                    "period_ends_at": period["ends_at"],
-                    "period_label": period["label"],
-                    "idempotency_key": self.generator.compute_idempotency_key(
-                        recurrence_rule, period["period_key"]
-                    ),
-                    "backfilled": True,  # Mark as backfilled
-                    "backfill_reason": reason,
-                },
-            )
-
-            if created:
-                periods_created += 1
-                generation_ids.append(generation.id)
-            else:
-                periods_skipped += 1
+                correlation_id=generator.correlation_id,
+            ).values_list("id", flat=True)
+        )
 
         # Create audit event
         audit_event = audit.log_event(
             firm=recurrence_rule.firm,
-            event_type="recurrence_backfill",
-            severity="medium",
+            category=AuditEvent.CATEGORY_DATA_ACCESS,
+            action="recurrence_backfill",
+            severity=AuditEvent.SEVERITY_WARNING,
             actor=user,
             target_model="recurrence.RecurrenceRule",
             target_id=str(recurrence_rule.id),
-            description=f"Backfilled {periods_created} periods for recurrence rule",
+            reason=reason,
             metadata={
                 "recurrence_rule_id": recurrence_rule.id,
                 "start_date": start_date.isoformat(),
@@ -213,27 +192,27 @@ class BackfillService:
         end_date = timezone.now()
 
         # Compute periods
-        candidate_periods = self.generator.compute_periods(
-            recurrence_rule=recurrence_rule,
-            as_of=end_date,
-            start_boundary=start_date,
-            end_boundary=end_date,
+        candidate_periods = RecurrenceGenerator(recurrence_rule.firm)._compute_periods(
+            recurrence_rule, start_date, end_date
         )
 
-        # Check which periods already exist
-        result = []
-        for period in candidate_periods:
-            exists = RecurrenceGeneration.objects.filter(
+        # Check which periods already exist (one query)
+        existing = set(
+            RecurrenceGeneration.objects.filter(
                 recurrence_rule=recurrence_rule,
-                period_key=period["period_key"],
-            ).exists()
+                period_key__in=[period.period_key for period in candidate_periods],
+            ).values_list("period_key", flat=True)
+        )
 
+        result = []
+        for period in candidate_periods:
+            exists = period.period_key in existing
             result.append(
                 {
-                    "period_key": period["period_key"],
-                    "starts_at": period["starts_at"],
-                    "ends_at": period["ends_at"],
-                    "label": period["label"],
+                    "period_key": period.period_key,
+                    "starts_at": period.starts_at,
+                    "ends_at": period.ends_at,
+                    "label": period.label,
                     "exists": exists,
                     "would_create": not exists,
                 }
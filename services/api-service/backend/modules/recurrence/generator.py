@@ -8,19 +8,34 @@ Implements deterministic period generation with:
 - Concurrent-safe operations
 
 DOC-10.1: Generator MUST be safe under retries and concurrency.
+
+Generation is set-based: rules are processed in batches of
+RECURRENCE_GENERATION_BATCH_SIZE; each batch computes its candidate periods in
+memory, reads the existing (rule, period_key) pairs with one query, and
+inserts only the missing RecurrenceGeneration rows (and their audit events)
+with bulk_create. ignore_conflicts keeps concurrent generators safe: the
+unique constraint still decides which insert wins.
 """
 
+import logging
 import uuid
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
-from django.db import IntegrityError, transaction
+from django.conf import settings
 from django.utils import timezone
 
 from modules.firm.audit import AuditEvent
 from modules.recurrence.models import RecurrenceGeneration, RecurrenceRule
 
+logger = logging.getLogger(__name__)
+
+
+def _batch_size() -> int:
+    return getattr(settings, "RECURRENCE_GENERATION_BATCH_SIZE", 1000)
+
 
 class Period:
     """
@@ -78,6 +93,7 @@ class RecurrenceGenerator:
         as_of: datetime,
         lookahead_days: int = 90,
         lookback_days: int = 0,
+        rule_range: Optional[Tuple[int, int]] = None,
     ) -> Dict[str, Any]:
         """
         Generate recurrence instances for a time window per docs/03-reference/requirements/DOC-10.md section 6.2.
@@ -86,6 +102,7 @@ class RecurrenceGenerator:
             as_of: Deterministic clock time (timezone-aware)
             lookahead_days: Days to look ahead for generation
             lookback_days: Days to look back for recovery
+            rule_range: Optional inclusive (first_id, last_id) range of rules (one shard)
 
         Returns:
             Dict with generation stats
@@ -104,58 +121,146 @@ class RecurrenceGenerator:
             firm=self.firm,
             status="active",
         )
+        if rule_range:
+            rules = rules.filter(id__gte=rule_range[0], id__lte=rule_range[1])
 
         window_start = as_of - timedelta(days=lookback_days)
         window_end = as_of + timedelta(days=lookahead_days)
 
-        for rule in rules:
-            try:
-                rule_stats = self._generate_for_rule(
-                    rule, as_of, window_start, window_end
-                )
-                stats["rules_processed"] += 1
-                stats["periods_planned"] += rule_stats["planned"]
-                stats["periods_already_exists"] += rule_stats["exists"]
-            except Exception as e:
-                stats["periods_failed"] += 1
-                # Log error but continue processing other rules
-                print(f"Error generating for rule {rule.id}: {e}")
+        batch = []
+        for rule in rules.order_by("id").iterator(chunk_size=_batch_size()):
+            batch.append(rule)
+            if len(batch) >= _batch_size():
+                self._generate_for_rules(batch, as_of, window_start, window_end, stats)
+                batch = []
+        if batch:
+            self._generate_for_rules(batch, as_of, window_start, window_end, stats)
 
         return stats
 
-    def _generate_for_rule(
+    def _generate_for_rules(
         self,
-        rule: RecurrenceRule,
+        rules: List[RecurrenceRule],
         as_of: datetime,
         window_start: datetime,
         window_end: datetime,
-    ) -> Dict[str, int]:
+        stats: Dict[str, Any],
+    ) -> None:
         """
-        Generate periods for a single rule per docs/03-reference/requirements/DOC-10.md section 6.2.
+        Generate periods for a batch of rules per docs/03-reference/requirements/DOC-10.md section 6.2.
 
         Args:
-            rule: RecurrenceRule to generate for
+            rules: RecurrenceRules to generate for
             as_of: Current time
             window_start: Start of generation window
             window_end: End of generation window
+            stats: Run stats, updated in place
+        """
+        candidates = []
+        for rule in rules:
+            try:
+                periods = self._compute_periods(rule, window_start, window_end)
+            except Exception:
+                stats["periods_failed"] += 1
+                # Log error but continue processing other rules
+                logger.exception(f"Error generating for rule {rule.id}")
+                continue
+            stats["rules_processed"] += 1
+            candidates.extend((rule, period) for period in periods)
+
+        created = self._bulk_create_generations(candidates)
+        planned = sum(created.values())
+        stats["periods_planned"] += planned
+        stats["periods_already_exists"] += len(candidates) - planned
+
+        rules_by_id = {rule.id: rule for rule in rules}
+        AuditEvent.objects.bulk_create(
+            [
+                AuditEvent(
+                    firm_id=rules_by_id[rule_id].firm_id,
+                    category=AuditEvent.CATEGORY_SYSTEM,
+                    action="recurrence_periods_generated",
+                    severity=AuditEvent.SEVERITY_INFO,
+                    actor=self.user,
+                    actor_email=getattr(self.user, "email", "") or "",
+                    target_model="RecurrenceRule",
+                    target_id=str(rule_id),
+                    metadata={
+                        "rule_name": rules_by_id[rule_id].name,
+                        "as_of": as_of.isoformat(),
+                        "periods_planned": count,
+                        "correlation_id": self.correlation_id,
+                    },
+                )
+                for rule_id, count in created.items()
+            ],
+            batch_size=_batch_size(),
+        )
+
+    def _bulk_create_generations(
+        self,
+        candidates: List[Tuple[RecurrenceRule, Period]],
+        backfilled: bool = False,
+        backfill_reason: str = "",
+    ) -> Dict[int, int]:
+        """
+        Create RecurrenceGeneration records for candidate periods that do not exist yet.
+
+        DOC-10.1: Uses unique constraint for dedupe. Existing keys are read in
+        one query; a row inserted concurrently after that read is skipped by
+        ignore_conflicts (and still counted as planned here).
+
+        Args:
+            candidates: (rule, period) pairs
+            backfilled: Whether the records come from a backfill operation
+            backfill_reason: Reason recorded on backfilled records
 
         Returns:
-            Dict with stats (planned, exists)
+            Dict of rule id -> number of records planned
         """
-        stats = {"planned": 0, "exists": 0}
+        if not candidates:
+            return {}
+
+        seen = set(
+            RecurrenceGeneration.objects.filter(
+                recurrence_rule_id__in={rule.id for rule, _ in candidates},
+                period_key__in={period.period_key for _, period in candidates},
+                target_discriminator="",
+            ).values_list("recurrence_rule_id", "period_key")
+        )
 
-        # Compute candidate periods
-        periods = self._compute_periods(rule, window_start, window_end)
+        missing = []
+        for rule, period in candidates:
+            key = (rule.id, period.period_key)
+            if key in seen:
+                continue
+            seen.add(key)
+            missing.append(
+                RecurrenceGeneration(
+                    firm_id=rule.firm_id,
+                    recurrence_rule=rule,
+                    period_key=period.period_key,
+                    period_starts_at=period.starts_at,
+                    period_ends_at=period.ends_at,
+                    period_label=period.label,
+                    target_object_type="task",  # Default; can be configured
+                    status="planned",
+                    # bulk_create bypasses save(), which normally computes this
+                    idempotency_key=RecurrenceGeneration.compute_idempotency_key(
+                        rule.firm_id, rule.id, period.period_key
+                    ),
+                    backfilled=backfilled,
+                    backfill_reason=backfill_reason,
+                    correlation_id=self.correlation_id,
+                )
+            )
 
-        for period in periods:
-            # Attempt to create RecurrenceGeneration record
-            created = self._try_create_generation(rule, period, as_of)
-            if created:
-                stats["planned"] += 1
-            else:
-                stats["exists"] += 1
+        RecurrenceGeneration.objects.bulk_create(missing, batch_size=_batch_size(), ignore_conflicts=True)
 
-        return stats
+        created = defaultdict(int)
+        for generation in missing:
+            created[generation.recurrence_rule_id] += 1
+        return dict(created)
 
     def _compute_periods(
         self,
@@ -362,40 +467,6 @@ class RecurrenceGenerator:
 
         return Period(period_key, starts_at, ends_at, label)
 
-    @transaction.atomic
-    def _try_create_generation(
-        self, rule: RecurrenceRule, period: Period, as_of: datetime
-    ) -> bool:
-        """
-        Attempt to create RecurrenceGeneration record per docs/03-reference/requirements/DOC-10.md section 6.2.
-
-        DOC-10.1: Uses unique constraint for dedupe.
-
-        Args:
-            rule: RecurrenceRule
-            period: Period to generate for
-            as_of: Current time
-
-        Returns:
-            True if created, False if already exists
-        """
-        try:
-            RecurrenceGeneration.objects.create(
-                firm=rule.firm,
-                recurrence_rule=rule,
-                period_key=period.period_key,
-                period_starts_at=period.starts_at,
-                period_ends_at=period.ends_at,
-                period_label=period.label,
-                target_object_type="task",  # Default; can be configured
-                status="planned",
-                correlation_id=self.correlation_id,
-            )
-            return True
-        except IntegrityError:
-            # Already exists (unique constraint violation)
-            return False
-
     def backfill_periods(
         self,
         rule: RecurrenceRule,
@@ -418,17 +489,13 @@ class RecurrenceGenerator:
         Returns:
             Dict with backfill stats
         """
-        stats = {"planned": 0, "exists": 0}
-
         # Compute periods in backfill range
         periods = self._compute_periods(rule, start_date, end_date)
 
-        for period in periods:
-            created = self._try_create_generation(rule, period, timezone.now())
-            if created:
-                stats["planned"] += 1
-            else:
-                stats["exists"] += 1
+        planned = self._bulk_create_generations(
+            [(rule, period) for period in periods], backfilled=True
+        ).get(rule.id, 0)
+        stats = {"planned": planned, "exists": len(periods) - planned}
 
         # Audit the backfill
         AuditEvent.objects.create(
@@ -436,9 +503,10 @@ class RecurrenceGenerator:
             category=AuditEvent.CATEGORY_DATA_ACCESS,
             action="recurrence_backfill",
             severity=AuditEvent.SEVERITY_INFO,
-            actor_user=self.user,
-            resource_type="RecurrenceRule",
-            resource_id=str(rule.id),
+            actor=self.user,
+            actor_email=getattr(self.user, "email", "") or "",
+            target_model="RecurrenceRule",
+            target_id=str(rule.id),
             metadata={
                 "rule_name": rule.name,
                 "start_date": start_date.isoformat(),
@@ -0,0 +1,212 @@
+"""
+Recurrence background jobs.
+
+Generation runs as sharded ``recurrence_generate`` JobQueue jobs instead of one
+serial loop over firms:
+
+- queue_recurrence_run() fixes a single deterministic ``as_of`` for the run
+  (start of the UTC day by default) and queues one job per firm, or one per
+  range of up to RECURRENCE_SHARD_SIZE active rule ids for larger firms.
+  Run ids and idempotency keys derive from (mode, as_of, window), so queueing
+  the same run twice is a no-op.
+- Shards execute in parallel across run_job_worker processes
+  (``run_job_worker --category recurrence``; add processes to scale out).
+- Each shard runs in one transaction holding a PostgreSQL advisory lock on
+  (mode, firm, first rule id); a shard whose lock is held is retried later
+  instead of generating concurrently.
+- Backfill runs (outage catch-up with a lookback window) lock separately and
+  queue at lower priority, so they never block the daily run.
+- recurrence_run_summary() merges the per-shard stats stored as job results.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import uuid
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from modules.firm.models import Firm
+from modules.firm.utils import firm_db_session
+from modules.jobs.models import JobQueue
+from modules.recurrence.generator import RecurrenceGenerator
+from modules.recurrence.models import RecurrenceRule
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPE = "recurrence_generate"
+MODE_DAILY = "daily"
+MODE_BACKFILL = "backfill"
+STAT_KEYS = ("rules_processed", "periods_planned", "periods_already_exists", "periods_failed")
+
+
+def _shard_size() -> int:
+    return getattr(settings, "RECURRENCE_SHARD_SIZE", 5000)
+
+
+def run_as_of(as_of: Optional[datetime] = None) -> datetime:
+    """Deterministic clock for a run: the start of the (UTC) day of ``as_of`` or now."""
+    as_of = (as_of or timezone.now()).astimezone(dt_timezone.utc)
+    return as_of.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def run_id_for(mode: str, as_of: datetime, lookahead_days: int, lookback_days: int) -> uuid.UUID:
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"recurrence:{mode}:{as_of.isoformat()}:{lookahead_days}:{lookback_days}")
+
+
+def rule_shards(firm_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, Optional[Tuple[int, int]]]]:
+    """
+    Split active rules into ``(firm_id, rule_range)`` shards.
+
+    Firms with up to RECURRENCE_SHARD_SIZE active rules get one shard
+    (``rule_range`` None); larger firms are split into contiguous id ranges.
+    """
+    active = RecurrenceRule.objects.filter(status="active")
+    if firm_ids is not None:
+        active = active.filter(firm_id__in=list(firm_ids))
+    shard_size = _shard_size()
+
+    shards = []
+    counts = active.order_by().values("firm_id").annotate(rules=Count("id")).order_by("firm_id")
+    for row in counts:
+        if row["rules"] <= shard_size:
+            shards.append((row["firm_id"], None))
+            continue
+        rule_ids = active.filter(firm_id=row["firm_id"]).order_by("id").values_list("id", flat=True)
+        last_id = 0
+        while True:
+            first_id = rule_ids.filter(id__gt=last_id).first()
+            if first_id is None:
+                break
+            end_id = next(iter(rule_ids.filter(id__gte=first_id)[shard_size - 1 : shard_size]), None)
+            if end_id is None:
+                end_id = rule_ids.filter(id__gte=first_id).last()
+            shards.append((row["firm_id"], (first_id, end_id)))
+            last_id = end_id
+    return shards
+
+
+def queue_recurrence_run(
+    as_of: Optional[datetime] = None,
+    lookahead_days: int = 90,
+    lookback_days: int = 0,
+    backfill: bool = False,
+    firm_ids: Optional[Iterable[int]] = None,
+) -> uuid.UUID:
+    """
+    Queue one generation job per shard and return the run id.
+
+    Args:
+        as_of: Run clock; truncated to the start of its UTC day (default: today)
+        lookahead_days: Days to look ahead for generation
+        lookback_days: Days to look back (outage recovery)
+        backfill: Queue as a lower-priority backfill run
+        firm_ids: Restrict the run to these firms
+    """
+    as_of = run_as_of(as_of)
+    mode = MODE_BACKFILL if backfill else MODE_DAILY
+    run_id = run_id_for(mode, as_of, lookahead_days, lookback_days)
+
+    jobs = []
+    for firm_id, rule_range in rule_shards(firm_ids):
+        idempotency_key = f"recurrence_{run_id}_{rule_range[0] if rule_range else 0}"
+        jobs.append(
+            JobQueue(
+                firm_id=firm_id,
+                category="recurrence",
+                job_type=JOB_TYPE,
+                payload={
+                    "tenant_id": firm_id,
+                    "correlation_id": str(run_id),
+                    "idempotency_key": idempotency_key,
+                    "mode": mode,
+                    "as_of": as_of.isoformat(),
+                    "lookahead_days": lookahead_days,
+                    "lookback_days": lookback_days,
+                    "rule_range": list(rule_range) if rule_range else None,
+                },
+                idempotency_key=idempotency_key,
+                correlation_id=run_id,
+                priority=3 if backfill else 1,
+            )
+        )
+    JobQueue.objects.bulk_create(jobs, ignore_conflicts=True)
+    return run_id
+
+
+def _shard_lock_id(mode: str, firm_id: int, rule_range: Optional[List[int]]) -> int:
+    key = f"recurrence:{mode}:{firm_id}:{rule_range[0] if rule_range else 0}"
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], "big", signed=True)
+
+
+def _try_shard_lock(lock_id: int) -> bool:
+    """Take a transaction-scoped advisory lock (always granted off PostgreSQL)."""
+    if connection.vendor != "postgresql":
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [lock_id])
+        return cursor.fetchone()[0]
+
+
+def process_recurrence_generation_job(job: JobQueue) -> None:
+    """
+    Generate one shard's periods.
+
+    This function is designed to be invoked by a worker process.
+    """
+    payload = job.payload or {}
+    try:
+        as_of = datetime.fromisoformat(payload["as_of"])
+    except (KeyError, TypeError, ValueError):
+        job.mark_failed("non_retryable", "Missing or invalid as_of in payload", should_retry=False)
+        return
+    mode = payload.get("mode", MODE_DAILY)
+    rule_range = payload.get("rule_range")
+
+    with firm_db_session(job.firm_id):
+        firm = Firm.objects.filter(pk=job.firm_id).first()
+        if firm is None:
+            job.mark_completed(result={"skipped": True})
+            return
+
+        stats = None
+        with transaction.atomic():
+            if _try_shard_lock(_shard_lock_id(mode, job.firm_id, rule_range)):
+                stats = RecurrenceGenerator(firm).generate_for_window(
+                    as_of,
+                    lookahead_days=payload.get("lookahead_days", 90),
+                    lookback_days=payload.get("lookback_days", 0),
+                    rule_range=tuple(rule_range) if rule_range else None,
+                )
+
+        if stats is None:
+            logger.info(f"Recurrence shard for firm {job.firm_id} ({mode}) is locked; retrying later")
+            job.mark_failed("transient", "Recurrence shard is locked by another worker")
+            return
+        job.mark_completed(result=stats)
+
+
+def recurrence_run_summary(run_id: uuid.UUID) -> Dict[str, Any]:
+    """Merge the per-shard stats of a run; ``complete`` once no shard is pending or processing."""
+    shards = JobQueue.objects.filter(job_type=JOB_TYPE, correlation_id=run_id).values_list("status", "result")
+    statuses = Counter()
+    totals = dict.fromkeys(STAT_KEYS, 0)
+    for status, result in shards:
+        statuses[status] += 1
+        if status == "completed" and result:
+            for key in STAT_KEYS:
+                totals[key] += result.get(key, 0)
+    return {
+        "run_id": str(run_id),
+        "shards": sum(statuses.values()),
+        "shard_statuses": dict(statuses),
+        "complete": not (statuses["pending"] or statuses["processing"]),
+        **totals,
+    }
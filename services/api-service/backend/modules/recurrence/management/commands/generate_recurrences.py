@@ -0,0 +1,67 @@
+"""
+Django management command to queue a sharded recurrence generation run.
+
+Queues one ``recurrence_generate`` job per firm (or per rule-id range for
+large firms) with a shared deterministic as_of; run_job_worker processes
+execute the shards in parallel. Intended to run from cron once a day.
+
+Usage:
+    python manage.py generate_recurrences
+    python manage.py generate_recurrences --as-of 2026-03-15 --lookahead-days 60
+    python manage.py generate_recurrences --backfill --lookback-days 7
+    python manage.py generate_recurrences --summary <run_id>
+"""
+
+import json
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from modules.recurrence.jobs import queue_recurrence_run, recurrence_run_summary
+
+
+class Command(BaseCommand):
+    help = "Queue sharded recurrence generation jobs (or report a run's merged stats)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--as-of", help="Run date (ISO 8601, UTC); defaults to today")
+        parser.add_argument("--lookahead-days", type=int, default=90, help="Days to look ahead for generation")
+        parser.add_argument("--lookback-days", type=int, default=0, help="Days to look back for recovery")
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            help="Queue as a lower-priority backfill run that does not block the daily run",
+        )
+        parser.add_argument(
+            "--firm-id", type=int, action="append", dest="firm_ids", help="Only generate for this firm (repeatable)"
+        )
+        parser.add_argument("--summary", help="Print the merged stats of a queued run instead of queueing")
+
+    def handle(self, *args, **options):
+        if options["summary"]:
+            try:
+                run_id = uuid.UUID(options["summary"])
+            except ValueError:
+                raise CommandError("--summary must be a run id")
+            self.stdout.write(json.dumps(recurrence_run_summary(run_id), indent=2))
+            return
+
+        as_of = None
+        if options["as_of"]:
+            try:
+                as_of = datetime.fromisoformat(options["as_of"])
+            except ValueError:
+                raise CommandError("--as-of must be an ISO 8601 date or datetime")
+            if as_of.tzinfo is None:
+                as_of = as_of.replace(tzinfo=dt_timezone.utc)
+
+        run_id = queue_recurrence_run(
+            as_of=as_of,
+            lookahead_days=options["lookahead_days"],
+            lookback_days=options["lookback_days"],
+            backfill=options["backfill"],
+            firm_ids=options["firm_ids"],
+        )
+        summary = recurrence_run_summary(run_id)
+        self.stdout.write(self.style.SUCCESS(f"Queued recurrence run {run_id} ({summary['shards']} shards)"))
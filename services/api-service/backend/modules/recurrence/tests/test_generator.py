@@ -0,0 +1,72 @@
+"""
+Tests for set-based recurrence period generation.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+
+from modules.firm.audit import AuditEvent
+from modules.firm.models import Firm
+from modules.recurrence.generator import RecurrenceGenerator
+from modules.recurrence.models import RecurrenceGeneration, RecurrenceRule
+
+AS_OF = datetime(2026, 3, 15, 12, 0, tzinfo=dt_timezone.utc)
+
+
+@pytest.fixture
+def firm():
+    return Firm.objects.create(name="Recurrence Firm", slug="recurrence-firm")
+
+
+def _rule(firm, frequency="monthly", **kwargs):
+    return RecurrenceRule.objects.create(
+        firm=firm,
+        scope="engagement",
+        frequency=frequency,
+        timezone="America/New_York",
+        start_at=AS_OF - timedelta(days=365),
+        name=f"{frequency} rule",
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+def test_generate_for_window_is_idempotent(firm, settings):
+    settings.RECURRENCE_GENERATION_BATCH_SIZE = 1
+    monthly = _rule(firm)
+    weekly = _rule(firm, frequency="weekly")
+    _rule(firm, status="paused")
+
+    first = RecurrenceGenerator(firm).generate_for_window(AS_OF, lookahead_days=60)
+    planned = RecurrenceGeneration.objects.count()
+    second = RecurrenceGenerator(firm).generate_for_window(AS_OF, lookahead_days=60)
+
+    assert first["rules_processed"] == 2
+    assert first["periods_planned"] == planned > 0
+    assert first["periods_already_exists"] == 0
+    assert second["periods_planned"] == 0
+    assert second["periods_already_exists"] == planned
+    assert RecurrenceGeneration.objects.count() == planned
+
+    generation = RecurrenceGeneration.objects.filter(recurrence_rule=monthly, period_key="2026-03").get()
+    assert generation.idempotency_key == RecurrenceGeneration.compute_idempotency_key(firm.id, monthly.id, "2026-03")
+    assert set(
+        AuditEvent.objects.filter(action="recurrence_periods_generated").values_list("target_id", flat=True)
+    ) == {str(monthly.id), str(weekly.id)}
+
+
+@pytest.mark.django_db
+def test_backfill_periods_skips_existing_periods(firm):
+    rule = _rule(firm)
+    generator = RecurrenceGenerator(firm)
+    generator.generate_for_window(AS_OF, lookahead_days=1)
+
+    stats = generator.backfill_periods(rule, AS_OF - timedelta(days=60), AS_OF)
+
+    assert stats == {"planned": 2, "exists": 1}
+    assert RecurrenceGeneration.objects.filter(recurrence_rule=rule, backfilled=True).count() == 2
+
+    audit = AuditEvent.objects.get(action="recurrence_backfill")
+    assert audit.target_model == "RecurrenceRule"
+    assert audit.target_id == str(rule.id)
+    assert audit.metadata["periods_planned"] == 2
@@ -0,0 +1,64 @@
+"""
+Tests for sharded recurrence generation runs.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+
+from modules.firm.models import Firm
+from modules.jobs.models import JobQueue
+from modules.recurrence.jobs import process_recurrence_generation_job, queue_recurrence_run, recurrence_run_summary
+from modules.recurrence.models import RecurrenceGeneration, RecurrenceRule
+
+AS_OF = datetime(2026, 3, 15, 12, 0, tzinfo=dt_timezone.utc)
+
+
+def _rule(firm):
+    return RecurrenceRule.objects.create(
+        firm=firm,
+        scope="engagement",
+        frequency="monthly",
+        timezone="UTC",
+        start_at=AS_OF - timedelta(days=365),
+        name="Monthly close",
+    )
+
+
+@pytest.mark.django_db
+def test_run_is_sharded_deterministic_and_summarized(settings):
+    settings.RECURRENCE_SHARD_SIZE = 2
+    large = Firm.objects.create(name="Large Firm", slug="large-firm")
+    small = Firm.objects.create(name="Small Firm", slug="small-firm")
+    for _ in range(3):
+        _rule(large)
+    _rule(small)
+
+    run_id = queue_recurrence_run(as_of=AS_OF, lookahead_days=40)
+    assert queue_recurrence_run(as_of=AS_OF + timedelta(hours=6), lookahead_days=40) == run_id
+
+    jobs = list(JobQueue.objects.filter(correlation_id=run_id))
+    assert len(jobs) == 3
+    assert {job.payload["as_of"] for job in jobs} == {"2026-03-15T00:00:00+00:00"}
+    assert recurrence_run_summary(run_id)["complete"] is False
+
+    for job in jobs:
+        assert job.claim_for_processing("worker-1")
+        process_recurrence_generation_job(job)
+
+    summary = recurrence_run_summary(run_id)
+    assert summary["complete"] is True
+    assert summary["shard_statuses"] == {"completed": 3}
+    assert summary["rules_processed"] == 4
+    assert summary["periods_planned"] == RecurrenceGeneration.objects.count() == 8
+
+
+@pytest.mark.django_db
+def test_backfill_run_is_separate_from_daily_run():
+    firm = Firm.objects.create(name="Backfill Firm", slug="backfill-firm")
+    _rule(firm)
+
+    daily = queue_recurrence_run(as_of=AS_OF)
+    backfill = queue_recurrence_run(as_of=AS_OF, backfill=True)
+
+    assert daily != backfill
+    assert JobQueue.objects.get(correlation_id=backfill).priority > JobQueue.objects.get(correlation_id=daily).priority
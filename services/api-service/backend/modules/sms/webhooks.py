@@ -20,7 +20,6 @@ from django.http import HttpResponse
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
-from django_ratelimit.decorators import ratelimit
 
 from modules.core.rate_limiting import enforce_webhook_rate_limit
 
@@ -97,12 +96,6 @@ def _verify_twilio_signature(request):
 
 @csrf_exempt
 @require_POST
-@ratelimit(
-    key="ip",
-    rate=settings.WEBHOOK_RATE_LIMITS["sms_status"],
-    method="POST",
-    block=False,
-)
 def twilio_status_webhook(request):
     """
     Handle Twilio delivery status webhook (SEC-1: Idempotency tracking, SEC-2: Rate limiting).
@@ -122,7 +115,10 @@ def twilio_status_webhook(request):
     from modules.sms.models import SMSWebhookEvent
 
     rate_limit_response = enforce_webhook_rate_limit(
-        request, provider="twilio", endpoint="twilio_status_webhook"
+        request,
+        provider="twilio",
+        endpoint="twilio_status_webhook",
+        rate=settings.WEBHOOK_RATE_LIMITS["sms_status"],
     )
     if rate_limit_response:
         return rate_limit_response
@@ -227,12 +223,6 @@ def twilio_status_webhook(request):
 
 @csrf_exempt
 @require_POST
-@ratelimit(
-    key="ip",
-    rate=settings.WEBHOOK_RATE_LIMITS["sms_inbound"],
-    method="POST",
-    block=False,
-)
 def twilio_inbound_webhook(request):
     """
     Handle Twilio inbound SMS webhook (SEC-2: Rate limiting).
@@ -251,7 +241,10 @@ def twilio_inbound_webhook(request):
     SEC-2: Rate limited per settings to prevent webhook flooding.
     """
     rate_limit_response = enforce_webhook_rate_limit(
-        request, provider="twilio", endpoint="twilio_inbound_webhook"
+        request,
+        provider="twilio",
+        endpoint="twilio_inbound_webhook",
+        rate=settings.WEBHOOK_RATE_LIMITS["sms_inbound"],
     )
     if rate_limit_response:
         return rate_limit_response
@@ -0,0 +1,150 @@
+"""
+Batched tracking ingestion pipeline.
+
+Persists a validated beacon batch with a constant number of queries regardless of
+batch size: sessions are upserted in bulk, contacts are resolved in one query,
+events are written with bulk_create, rollups are folded in once the request
+commits, and automation dispatch is handed to the JobQueue as a single batched
+job.
+
+This is the only write path for tracking events: TrackingIngestView and the
+ingest serializers' save()/create() all go through ingest_batch, so rollups and
+automation never miss an event.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Iterable
+from uuid import uuid4
+
+from django.utils import timezone
+
+from modules.clients.models import Contact
+from modules.firm.models import Firm
+from modules.tracking.models import TrackingEvent, TrackingSession
+from modules.tracking.rollups import apply_events
+
+TRACKING_TRIGGER_TYPES = ("site_page_view", "site_custom_event")
+
+
+def automation_trigger_type(event: TrackingEvent) -> str:
+    return "site_page_view" if event.event_type == "page_view" else "site_custom_event"
+
+
+def automation_event_data(event: TrackingEvent) -> dict[str, Any]:
+    """Build the TriggerDetector event payload for a tracking event."""
+    return {
+        "event_name": event.name,
+        "event_type": event.event_type,
+        "url": event.url,
+        "referrer": event.referrer,
+        "properties": event.properties,
+        "session_id": str(event.session.session_id),
+        "visitor_id": str(event.session.visitor_id),
+        "occurred_at": event.occurred_at.isoformat(),
+        "discriminator": f"{event.session.session_id}:{event.name}:{event.occurred_at.isoformat()}",
+    }
+
+
+def _upsert_sessions(firm: Firm, batch: list[dict[str, Any]]) -> dict:
+    """Create missing sessions and touch existing ones; returns {session_id: TrackingSession}."""
+    latest: dict = {}
+    for data in batch:
+        latest[data["session_id"]] = data  # last event in the batch wins
+
+    TrackingSession.objects.bulk_create(
+        [
+            TrackingSession(
+                firm=firm,
+                session_id=session_id,
+                visitor_id=data["visitor_id"],
+                consent_state=data.get("consent_state", "pending"),
+                user_agent_hash=TrackingSession.hash_user_agent(data.get("user_agent")),
+            )
+            for session_id, data in latest.items()
+        ],
+        ignore_conflicts=True,
+    )
+    sessions = {
+        session.session_id: session
+        for session in TrackingSession.objects.filter(firm=firm, session_id__in=list(latest))
+    }
+
+    now = timezone.now()
+    pks_by_consent: dict[str | None, list[int]] = defaultdict(list)
+    for session_id, data in latest.items():
+        session = sessions[session_id]
+        consent_state = data.get("consent_state")
+        if consent_state:
+            session.consent_state = consent_state
+        session.last_seen_at = now
+        pks_by_consent[consent_state].append(session.pk)
+
+    for consent_state, pks in pks_by_consent.items():
+        updates: dict[str, Any] = {"last_seen_at": now}
+        if consent_state:
+            updates["consent_state"] = consent_state
+        TrackingSession.objects.filter(pk__in=pks).update(**updates)
+
+    return sessions
+
+
+def ingest_batch(
+    *,
+    firm: Firm,
+    validated_events: Iterable[tuple[dict[str, Any], Any, bool]],
+    request_meta: dict[str, Any],
+) -> list[TrackingEvent]:
+    """
+    Persist a validated batch for a single firm.
+
+    Args:
+        firm: Firm all events target
+        validated_events: (validated_data, tracking_key, used_fallback_key) per event
+        request_meta: request.META for IP/user-agent normalization
+    """
+    validated_events = list(validated_events)
+    batch = [data for data, _, _ in validated_events]
+    sessions = _upsert_sessions(firm, batch)
+
+    contact_ids = {data["contact_id"] for data in batch if data.get("contact_id")}
+    contacts = {}
+    if contact_ids:
+        contacts = {contact.id: contact for contact in Contact.objects.filter(firm=firm, id__in=contact_ids)}
+
+    events = TrackingEvent.record_events(
+        [
+            TrackingEvent.build_event(
+                firm=firm,
+                session=sessions[data["session_id"]],
+                payload=data,
+                contact=contacts.get(data.get("contact_id")),
+                request_meta=request_meta,
+                tracking_key=tracking_key,
+                used_fallback_key=used_fallback_key,
+            )
+            for data, tracking_key, used_fallback_key in validated_events
+        ]
+    )
+
+    apply_events(firm, events)
+    _queue_automation(firm, events)
+    return events
+
+
+def _queue_automation(firm: Firm, events: list[TrackingEvent]) -> None:
+    from modules.automation.models import WorkflowTrigger
+    from modules.tracking.queue import queue_tracking_automation
+
+    event_ids = [event.pk for event in events if event.pk]
+    if not event_ids:
+        return
+    has_triggers = WorkflowTrigger.objects.filter(
+        firm=firm,
+        trigger_type__in=TRACKING_TRIGGER_TYPES,
+        is_active=True,
+        workflow__status="active",
+    ).exists()
+    if has_triggers:
+        queue_tracking_automation(firm, event_ids, batch_id=uuid4())
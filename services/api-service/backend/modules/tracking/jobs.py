@@ -0,0 +1,72 @@
+"""
+Tracking background job handlers.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+
+from modules.automation.models import WorkflowTrigger
+from modules.automation.triggers import TriggerDetector
+from modules.firm.utils import firm_db_session
+from modules.jobs.models import JobQueue
+from modules.tracking.ingestion import automation_event_data, automation_trigger_type
+from modules.tracking.models import TrackingEvent
+
+logger = logging.getLogger(__name__)
+
+
+def process_tracking_automation_job(job: JobQueue) -> None:
+    """
+    Dispatch a batch of ingested tracking events to automation triggers.
+
+    Active triggers are loaded once per trigger type for the whole batch.
+    This function is designed to be invoked by a worker process.
+    """
+    with firm_db_session(job.firm_id):
+        payload = job.payload or {}
+        event_ids = payload.get("event_ids")
+
+        if not event_ids:
+            job.mark_failed("non_retryable", "Missing event_ids in payload", should_retry=False)
+            return
+
+        events = list(
+            TrackingEvent.objects.filter(firm_id=job.firm_id, id__in=event_ids)
+            .select_related("firm", "session", "contact")
+            .order_by("occurred_at", "id")
+        )
+
+        events_by_trigger = defaultdict(list)
+        for event in events:
+            events_by_trigger[automation_trigger_type(event)].append(event)
+
+        dispatched = 0
+        failed = 0
+        for trigger_type, typed_events in events_by_trigger.items():
+            triggers = list(
+                WorkflowTrigger.objects.filter(
+                    firm_id=job.firm_id,
+                    trigger_type=trigger_type,
+                    is_active=True,
+                    workflow__status="active",
+                ).select_related("workflow")
+            )
+            if not triggers:
+                continue
+            for event in typed_events:
+                try:
+                    TriggerDetector.detect_and_trigger(
+                        firm=event.firm,
+                        trigger_type=trigger_type,
+                        event_data=automation_event_data(event),
+                        contact=event.contact,
+                        triggers=triggers,
+                    )
+                    dispatched += 1
+                except Exception:
+                    failed += 1
+                    logger.exception("Failed to dispatch tracking event to automation")
+
+        job.mark_completed(result={"events": len(events), "dispatched": dispatched, "failed": failed})
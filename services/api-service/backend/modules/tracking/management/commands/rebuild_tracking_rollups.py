@@ -0,0 +1,51 @@
+"""
+Django management command to rebuild tracking rollups from raw events.
+
+Backfills TrackingHourlyRollup, TrackingDailyRollup, TrackingDimensionRollup and
+TrackingWebVitalRollup for firms whose events predate incremental rollups, or
+repairs a firm's rollups. Run it before turning on TRACKING_SUMMARY_USE_ROLLUPS.
+
+Usage:
+    python manage.py rebuild_tracking_rollups
+    python manage.py rebuild_tracking_rollups --days 30
+    python manage.py rebuild_tracking_rollups --firm-id 123
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from modules.firm.models import Firm
+from modules.tracking.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild tracking rollup tables from raw TrackingEvent rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="How many days of events to rebuild (default: 90, the summary maximum)",
+        )
+        parser.add_argument(
+            "--firm-id",
+            type=int,
+            help="Only rebuild rollups for this firm",
+        )
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options["days"])
+        firms = Firm.objects.filter(tracking_events__occurred_at__gte=since).distinct()
+        if options.get("firm_id"):
+            firms = firms.filter(id=options["firm_id"])
+
+        total = 0
+        for firm in firms.iterator():
+            count = rebuild_rollups(firm, since)
+            total += count
+            self.stdout.write(f"Rebuilt rollups for {firm.slug}: {count} events")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt tracking rollups from {total} events"))
@@ -0,0 +1,111 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("firm", "0001_initial"),
+        ("tracking", "0003_sitemessageimpression"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrackingHourlyRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "bucket_start",
+                    models.DateTimeField(help_text="Start of the hour (UTC) covered by this bucket"),
+                ),
+                ("events", models.PositiveBigIntegerField(default=0)),
+                ("page_views", models.PositiveBigIntegerField(default=0)),
+                ("custom_events", models.PositiveBigIntegerField(default=0)),
+                ("fallback_key_events", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "firm",
+                    models.ForeignKey(
+                        on_delete=models.deletion.CASCADE, related_name="tracking_hourly_rollups", to="firm.firm"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "tracking_hourly_rollup",
+                "ordering": ["-bucket_start"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="trackinghourlyrollup",
+            constraint=models.UniqueConstraint(fields=["firm", "bucket_start"], name="tracking_hourly_rollup_unique"),
+        ),
+        migrations.CreateModel(
+            name="TrackingDailyRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                (
+                    "visitor_sketch",
+                    models.BinaryField(default=bytes, help_text="HyperLogLog registers for unique visitors"),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "firm",
+                    models.ForeignKey(
+                        on_delete=models.deletion.CASCADE, related_name="tracking_daily_rollups", to="firm.firm"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "tracking_daily_rollup",
+                "ordering": ["-day"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="trackingdailyrollup",
+            constraint=models.UniqueConstraint(fields=["firm", "day"], name="tracking_daily_rollup_unique"),
+        ),
+        migrations.CreateModel(
+            name="TrackingDimensionRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[
+                            ("page", "Page"),
+                            ("event", "Custom event"),
+                            ("referrer", "Referrer"),
+                            ("campaign", "Campaign"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("key_hash", models.CharField(max_length=64)),
+                ("value", models.TextField(blank=True)),
+                (
+                    "secondary_value",
+                    models.TextField(blank=True, help_text="utm_campaign for the campaign dimension"),
+                ),
+                ("count", models.PositiveBigIntegerField(default=0)),
+                (
+                    "firm",
+                    models.ForeignKey(
+                        on_delete=models.deletion.CASCADE, related_name="tracking_dimension_rollups", to="firm.firm"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "tracking_dimension_rollup",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="trackingdimensionrollup",
+            constraint=models.UniqueConstraint(
+                fields=["firm", "day", "dimension", "key_hash"], name="tracking_dimension_rollup_unique"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trackingdimensionrollup",
+            index=models.Index(fields=["firm", "dimension", "day"], name="tracking_dim_rollup_day_idx"),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("firm", "0001_initial"),
+        ("tracking", "0004_tracking_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrackingWebVitalRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("metric", models.CharField(max_length=16)),
+                (
+                    "sketch",
+                    models.JSONField(blank=True, default=dict, help_text="Serialized DDSketch of metric values"),
+                ),
+                ("count", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "firm",
+                    models.ForeignKey(
+                        on_delete=models.deletion.CASCADE, related_name="tracking_web_vital_rollups", to="firm.firm"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "tracking_web_vital_rollup",
+                "ordering": ["-day"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="trackingwebvitalrollup",
+            constraint=models.UniqueConstraint(
+                fields=["firm", "day", "metric"], name="tracking_web_vital_rollup_unique"
+            ),
+        ),
+    ]
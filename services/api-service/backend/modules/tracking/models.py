@@ -128,7 +128,7 @@ class TrackingEvent(models.Model):
         return str(network.network_address)
 
     @classmethod
-    def record_event(
+    def build_event(
         cls,
         *,
         firm: Firm,
@@ -139,7 +139,7 @@ class TrackingEvent(models.Model):
         tracking_key: "TrackingKey | None" = None,
         used_fallback_key: bool = False,
     ) -> "TrackingEvent":
-        """Persist a tracking event with normalized fields."""
+        """Build an unsaved tracking event with normalized fields."""
         ip_address = payload.get("ip_address") or request_meta.get("REMOTE_ADDR")
         user_agent = payload.get("user_agent") or request_meta.get("HTTP_USER_AGENT")
         truncated_ip = cls.truncate_ip(ip_address)
@@ -160,7 +160,7 @@ class TrackingEvent(models.Model):
         if len(str(properties).encode("utf-8")) > max_bytes:
             properties = {"truncated": True}
 
-        event = cls.objects.create(
+        return cls(
             firm=firm,
             session=session,
             contact=contact,
@@ -176,7 +176,11 @@ class TrackingEvent(models.Model):
             tracking_key=tracking_key,
             used_fallback_key=used_fallback_key,
         )
-        return event
+
+    @classmethod
+    def record_events(cls, events: list["TrackingEvent"], batch_size: int = 500) -> list["TrackingEvent"]:
+        """Persist events built with build_event() in bulk INSERTs."""
+        return cls.objects.bulk_create(events, batch_size=batch_size)
 
 
 class TrackingKey(models.Model):
@@ -393,3 +397,112 @@ class SiteMessageImpression(models.Model):
 
     def __str__(self) -> str:
         return f"{self.firm.slug}:{self.site_message_id}:{self.kind}"
+
+
+class TrackingHourlyRollup(models.Model):
+    """
+    Hourly per-firm event counters maintained incrementally at ingestion.
+
+    Feeds TrackingSummaryView totals and the daily time series without scanning
+    raw TrackingEvent rows.
+    """
+
+    firm = models.ForeignKey(Firm, on_delete=models.CASCADE, related_name="tracking_hourly_rollups")
+    bucket_start = models.DateTimeField(help_text="Start of the hour (UTC) covered by this bucket")
+    events = models.PositiveBigIntegerField(default=0)
+    page_views = models.PositiveBigIntegerField(default=0)
+    custom_events = models.PositiveBigIntegerField(default=0)
+    fallback_key_events = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "tracking_hourly_rollup"
+        ordering = ["-bucket_start"]
+        constraints = [
+            models.UniqueConstraint(fields=["firm", "bucket_start"], name="tracking_hourly_rollup_unique"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.firm_id}:{self.bucket_start:%Y-%m-%dT%H}"
+
+
+class TrackingDailyRollup(models.Model):
+    """Daily per-firm HyperLogLog sketch of page-view visitors (see modules.tracking.sketches)."""
+
+    firm = models.ForeignKey(Firm, on_delete=models.CASCADE, related_name="tracking_daily_rollups")
+    day = models.DateField()
+    visitor_sketch = models.BinaryField(default=bytes, help_text="HyperLogLog registers for unique visitors")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "tracking_daily_rollup"
+        ordering = ["-day"]
+        constraints = [
+            models.UniqueConstraint(fields=["firm", "day"], name="tracking_daily_rollup_unique"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.firm_id}:{self.day}"
+
+
+class TrackingDimensionRollup(models.Model):
+    """
+    Daily per-firm counts for one dimension value (page, event, referrer, campaign).
+
+    ``key_hash`` identifies (dimension, value, secondary_value) so long URLs can be
+    part of the uniqueness constraint.
+    """
+
+    DIMENSION_CHOICES = [
+        ("page", "Page"),
+        ("event", "Custom event"),
+        ("referrer", "Referrer"),
+        ("campaign", "Campaign"),
+    ]
+
+    firm = models.ForeignKey(Firm, on_delete=models.CASCADE, related_name="tracking_dimension_rollups")
+    day = models.DateField()
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key_hash = models.CharField(max_length=64)
+    value = models.TextField(blank=True)
+    secondary_value = models.TextField(blank=True, help_text="utm_campaign for the campaign dimension")
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = "tracking_dimension_rollup"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["firm", "day", "dimension", "key_hash"], name="tracking_dimension_rollup_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["firm", "dimension", "day"], name="tracking_dim_rollup_day_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.firm_id}:{self.day}:{self.dimension}:{self.value}"
+
+    @staticmethod
+    def hash_key(dimension: str, value: str, secondary_value: str = "") -> str:
+        return hashlib.sha256(f"{dimension}\x00{value}\x00{secondary_value}".encode("utf-8")).hexdigest()
+
+
+class TrackingWebVitalRollup(models.Model):
+    """Daily per-firm DDSketch of one Web Vitals metric (see modules.tracking.sketches)."""
+
+    firm = models.ForeignKey(Firm, on_delete=models.CASCADE, related_name="tracking_web_vital_rollups")
+    day = models.DateField()
+    metric = models.CharField(max_length=16)
+    sketch = models.JSONField(default=dict, blank=True, help_text="Serialized DDSketch of metric values")
+    count = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "tracking_web_vital_rollup"
+        ordering = ["-day"]
+        constraints = [
+            models.UniqueConstraint(fields=["firm", "day", "metric"], name="tracking_web_vital_rollup_unique"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.firm_id}:{self.day}:{self.metric}"
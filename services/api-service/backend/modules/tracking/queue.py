@@ -0,0 +1,48 @@
+"""
+Tracking automation queue integration.
+
+Queues automation dispatch for an ingested batch of tracking events as a single
+JobQueue job, so the public beacon endpoint never evaluates triggers inline.
+"""
+
+from __future__ import annotations
+
+from uuid import UUID
+
+from modules.firm.models import Firm
+from modules.jobs.models import JobQueue
+
+TRACKING_AUTOMATION_JOB_TYPE = "tracking_automation_dispatch"
+
+
+def queue_tracking_automation(
+    firm: Firm,
+    event_ids: list[int],
+    batch_id: UUID,
+) -> JobQueue:
+    """
+    Queue automation trigger evaluation for a batch of tracking events.
+
+    Args:
+        firm: Firm that owns the events
+        event_ids: Primary keys of the persisted TrackingEvent rows
+        batch_id: Ingest batch identifier (also used as correlation id)
+    """
+    idempotency_key = f"tracking_automation_{batch_id}"
+    payload = {
+        "tenant_id": firm.id,
+        "correlation_id": str(batch_id),
+        "idempotency_key": idempotency_key,
+        "event_ids": event_ids,
+    }
+
+    return JobQueue.objects.create(
+        firm=firm,
+        category="ingestion",
+        job_type=TRACKING_AUTOMATION_JOB_TYPE,
+        payload_version="1.0",
+        payload=payload,
+        idempotency_key=idempotency_key,
+        correlation_id=batch_id,
+        priority=2,
+    )
@@ -0,0 +1,412 @@
+"""
+Incremental tracking rollups.
+
+Ingestion folds every persisted batch into four pre-aggregated tables:
+
+- TrackingHourlyRollup: event / page view / custom event / fallback-key counters per hour
+- TrackingDailyRollup: a HyperLogLog sketch of page-view visitors per day
+- TrackingDimensionRollup: daily counts per page, custom event, referrer and campaign
+- TrackingWebVitalRollup: a DDSketch of each Web Vitals metric per day
+
+With TRACKING_SUMMARY_USE_ROLLUPS on, TrackingSummaryView and
+TrackingWebVitalsSummaryView read only these tables, so dashboard latency
+depends on the window length rather than on raw event volume.
+
+Each batch is folded in after the ingest transaction commits, in a short
+transaction of its own, so rollup row locks are never held for the rest of an
+ingest request. Counters are incremented with single UPDATE statements
+(``count = count + CASE ...``), so concurrent batches never lose updates;
+sketches are merged under SELECT ... FOR UPDATE.
+
+Existing events can be folded in with the rebuild_tracking_rollups command;
+both views keep aggregating raw events until TRACKING_SUMMARY_USE_ROLLUPS is
+turned on, which should happen only after that backfill.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from functools import partial
+from typing import Any, Iterable
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Case, F, Sum, Value, When
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+
+from modules.firm.models import Firm
+from modules.tracking.models import (
+    TrackingDailyRollup,
+    TrackingDimensionRollup,
+    TrackingEvent,
+    TrackingHourlyRollup,
+    TrackingWebVitalRollup,
+)
+from modules.tracking.sketches import DDSketch, HyperLogLog
+
+HOURLY_COUNTERS = ("events", "page_views", "custom_events", "fallback_key_events")
+WEB_VITAL_EVENT_NAME = "web_vital"
+WEB_VITAL_METRICS = ("LCP", "FID", "CLS", "TTFB", "FCP", "TTI", "INP")
+
+
+def _aware(occurred_at: datetime) -> datetime:
+    return timezone.make_aware(occurred_at) if timezone.is_naive(occurred_at) else occurred_at
+
+
+def _hour_bucket(occurred_at: datetime) -> datetime:
+    return _aware(occurred_at).astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _day_bucket(occurred_at: datetime) -> date:
+    return timezone.localtime(_aware(occurred_at)).date()
+
+
+def _event_dimensions(event: TrackingEvent) -> list[tuple[str, str, str]]:
+    """Return the (dimension, value, secondary_value) tuples an event contributes to."""
+    dimensions = []
+    if event.event_type == "page_view":
+        dimensions.append(("page", event.url, ""))
+    elif event.event_type == "custom_event":
+        dimensions.append(("event", event.name, ""))
+    if event.referrer:
+        dimensions.append(("referrer", event.referrer, ""))
+    properties = event.properties if isinstance(event.properties, dict) else {}
+    if properties.get("utm_source") is not None:
+        dimensions.append(
+            ("campaign", str(properties["utm_source"]), str(properties.get("utm_campaign") or ""))
+        )
+    return dimensions
+
+
+def _web_vital_sample(event: TrackingEvent) -> tuple[str, float] | None:
+    """Return (metric, value) for a well-formed ``web_vital`` custom event."""
+    if event.event_type != "custom_event" or event.name != WEB_VITAL_EVENT_NAME:
+        return None
+    properties = event.properties if isinstance(event.properties, dict) else {}
+    metric = properties.get("metric")
+    value = properties.get("value")
+    if metric not in WEB_VITAL_METRICS or isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if value < 0 or not math.isfinite(value):
+        return None
+    return metric, float(value)
+
+
+def _increment_case(pk_to_amount: dict[int, int]):
+    return Case(
+        *[When(pk=pk, then=Value(amount)) for pk, amount in pk_to_amount.items()],
+        default=Value(0),
+        output_field=BigIntegerField(),
+    )
+
+
+def _apply_hourly(firm: Firm, hourly: dict[datetime, Counter]) -> None:
+    TrackingHourlyRollup.objects.bulk_create(
+        [TrackingHourlyRollup(firm=firm, bucket_start=bucket) for bucket in hourly],
+        ignore_conflicts=True,
+    )
+    ids = dict(
+        TrackingHourlyRollup.objects.filter(firm=firm, bucket_start__in=list(hourly)).values_list(
+            "bucket_start", "id"
+        )
+    )
+    updates = {}
+    for counter_name in HOURLY_COUNTERS:
+        amounts = {ids[bucket]: counts[counter_name] for bucket, counts in hourly.items() if counts[counter_name]}
+        if amounts:
+            updates[counter_name] = F(counter_name) + _increment_case(amounts)
+    if updates:
+        TrackingHourlyRollup.objects.filter(id__in=ids.values()).update(updated_at=timezone.now(), **updates)
+
+
+def _apply_sketches(firm: Firm, visitors_by_day: dict[date, set]) -> None:
+    if not visitors_by_day:
+        return
+    TrackingDailyRollup.objects.bulk_create(
+        [TrackingDailyRollup(firm=firm, day=day) for day in visitors_by_day],
+        ignore_conflicts=True,
+    )
+    rows = list(
+        TrackingDailyRollup.objects.select_for_update().filter(firm=firm, day__in=list(visitors_by_day))
+    )
+    now = timezone.now()
+    for row in rows:
+        sketch = HyperLogLog.from_bytes(row.visitor_sketch).update(visitors_by_day[row.day])
+        row.visitor_sketch = sketch.to_bytes()
+        row.updated_at = now
+    TrackingDailyRollup.objects.bulk_update(rows, ["visitor_sketch", "updated_at"])
+
+
+def _apply_web_vitals(firm: Firm, samples: dict[tuple[date, str], list[float]]) -> None:
+    if not samples:
+        return
+    TrackingWebVitalRollup.objects.bulk_create(
+        [TrackingWebVitalRollup(firm=firm, day=day, metric=metric) for day, metric in samples],
+        ignore_conflicts=True,
+    )
+    rows = [
+        row
+        for row in TrackingWebVitalRollup.objects.select_for_update().filter(
+            firm=firm,
+            day__in={day for day, _ in samples},
+            metric__in={metric for _, metric in samples},
+        )
+        if (row.day, row.metric) in samples
+    ]
+    now = timezone.now()
+    for row in rows:
+        values = samples[(row.day, row.metric)]
+        row.sketch = DDSketch.from_dict(row.sketch).update(values).to_dict()
+        row.count += len(values)
+        row.updated_at = now
+    TrackingWebVitalRollup.objects.bulk_update(rows, ["sketch", "count", "updated_at"])
+
+
+def _apply_dimensions(firm: Firm, dimensions: Counter) -> None:
+    if not dimensions:
+        return
+    rows = {}
+    for (day, dimension, value, secondary_value), _count in dimensions.items():
+        key_hash = TrackingDimensionRollup.hash_key(dimension, value, secondary_value)
+        rows[(day, dimension, key_hash)] = TrackingDimensionRollup(
+            firm=firm,
+            day=day,
+            dimension=dimension,
+            key_hash=key_hash,
+            value=value,
+            secondary_value=secondary_value,
+        )
+    TrackingDimensionRollup.objects.bulk_create(list(rows.values()), ignore_conflicts=True)
+
+    ids = {
+        (day, dimension, key_hash): pk
+        for pk, day, dimension, key_hash in TrackingDimensionRollup.objects.filter(
+            firm=firm,
+            day__in={day for day, _, _ in rows},
+            key_hash__in={key_hash for _, _, key_hash in rows},
+        ).values_list("id", "day", "dimension", "key_hash")
+    }
+    amounts = {}
+    for (day, dimension, value, secondary_value), count in dimensions.items():
+        key_hash = TrackingDimensionRollup.hash_key(dimension, value, secondary_value)
+        amounts[ids[(day, dimension, key_hash)]] = count
+    TrackingDimensionRollup.objects.filter(id__in=list(amounts)).update(count=F("count") + _increment_case(amounts))
+
+
+def _aggregate(events: Iterable[TrackingEvent]) -> tuple[dict, dict, Counter, dict]:
+    """Group events into (hourly counters, visitors per day, dimension counts, web-vital samples)."""
+    hourly: dict[datetime, Counter] = defaultdict(Counter)
+    visitors_by_day: dict[date, set] = defaultdict(set)
+    dimensions: Counter = Counter()
+    web_vitals: dict[tuple[date, str], list[float]] = defaultdict(list)
+
+    for event in events:
+        counts = hourly[_hour_bucket(event.occurred_at)]
+        counts["events"] += 1
+        if event.event_type == "page_view":
+            counts["page_views"] += 1
+        elif event.event_type == "custom_event":
+            counts["custom_events"] += 1
+        if event.used_fallback_key:
+            counts["fallback_key_events"] += 1
+
+        day = _day_bucket(event.occurred_at)
+        if event.event_type == "page_view":
+            visitors_by_day[day].add(str(event.session.visitor_id))
+        for dimension, value, secondary_value in _event_dimensions(event):
+            dimensions[(day, dimension, value, secondary_value)] += 1
+        sample = _web_vital_sample(event)
+        if sample:
+            web_vitals[(day, sample[0])].append(sample[1])
+
+    return hourly, visitors_by_day, dimensions, web_vitals
+
+
+def _write_aggregates(firm: Firm, hourly: dict, visitors_by_day: dict, dimensions: Counter, web_vitals: dict) -> None:
+    if not hourly:
+        return
+    with transaction.atomic():
+        _apply_hourly(firm, hourly)
+        _apply_sketches(firm, visitors_by_day)
+        _apply_dimensions(firm, dimensions)
+        _apply_web_vitals(firm, web_vitals)
+
+
+def apply_events(firm: Firm, events: Iterable[TrackingEvent]) -> None:
+    """
+    Fold persisted events (with ``session`` loaded) into the rollup tables.
+
+    The fold runs once the caller's transaction commits, in its own short
+    transaction, so ingest requests (ATOMIC_REQUESTS) never hold rollup row
+    locks while the rest of the request runs. A fold that fails is logged;
+    rebuild_tracking_rollups repairs the affected days.
+    """
+    aggregates = _aggregate(events)
+    if aggregates[0]:
+        transaction.on_commit(partial(_write_aggregates, firm, *aggregates), robust=True)
+
+
+def rebuild_rollups(firm: Firm, since: datetime, batch_size: int = 2000) -> int:
+    """
+    Recompute rollups for a firm from raw events, starting at the day containing ``since``.
+
+    Returns the number of events folded in. Events ingested while a rebuild runs
+    may be counted twice; run it before enabling rollup reads or off-peak.
+    """
+    start_day = _day_bucket(since)
+    start = timezone.make_aware(datetime.combine(start_day, datetime.min.time()))
+    with transaction.atomic():
+        TrackingHourlyRollup.objects.filter(firm=firm, bucket_start__gte=_hour_bucket(start)).delete()
+        TrackingDailyRollup.objects.filter(firm=firm, day__gte=start_day).delete()
+        TrackingDimensionRollup.objects.filter(firm=firm, day__gte=start_day).delete()
+        TrackingWebVitalRollup.objects.filter(firm=firm, day__gte=start_day).delete()
+
+    events = (
+        TrackingEvent.objects.filter(firm=firm, occurred_at__gte=start)
+        .select_related("session")
+        .order_by("occurred_at", "id")
+    )
+    total = 0
+    batch: list[TrackingEvent] = []
+    for event in events.iterator(chunk_size=batch_size):
+        batch.append(event)
+        if len(batch) >= batch_size:
+            _write_aggregates(firm, *_aggregate(batch))
+            total += len(batch)
+            batch = []
+    if batch:
+        _write_aggregates(firm, *_aggregate(batch))
+        total += len(batch)
+    return total
+
+
+def _top_dimension(firm: Firm, dimension: str, since_day: date, limit: int) -> list[dict[str, Any]]:
+    return list(
+        TrackingDimensionRollup.objects.filter(firm=firm, dimension=dimension, day__gte=since_day)
+        .values("value", "secondary_value")
+        .annotate(total=Sum("count"))
+        .order_by("-total")[:limit]
+    )
+
+
+def summarize(firm: Firm, since: datetime) -> dict[str, Any]:
+    """Build the TrackingSummaryView aggregates from rollups for the window starting at ``since``."""
+    hourly = TrackingHourlyRollup.objects.filter(firm=firm, bucket_start__gte=_hour_bucket(since))
+    totals = hourly.aggregate(**{name: Sum(name) for name in HOURLY_COUNTERS})
+    time_series = list(
+        hourly.annotate(day=TruncDay("bucket_start"))
+        .values("day")
+        .annotate(count=Sum("events"))
+        .order_by("day")
+    )
+
+    since_day = _day_bucket(since)
+    visitors = HyperLogLog()
+    for sketch in TrackingDailyRollup.objects.filter(firm=firm, day__gte=since_day).values_list(
+        "visitor_sketch", flat=True
+    ):
+        visitors.merge(HyperLogLog.from_bytes(sketch))
+
+    return {
+        "page_views": totals["page_views"] or 0,
+        "unique_visitors": visitors.count(),
+        "custom_events": totals["custom_events"] or 0,
+        "fallback_key_used": bool(totals["fallback_key_events"]),
+        "time_series": time_series,
+        "top_pages": [
+            {"url": row["value"], "count": row["total"]} for row in _top_dimension(firm, "page", since_day, 10)
+        ],
+        "top_events": [
+            {"name": row["value"], "count": row["total"]} for row in _top_dimension(firm, "event", since_day, 10)
+        ],
+        "referrers": [
+            {"referrer": row["value"], "count": row["total"]}
+            for row in _top_dimension(firm, "referrer", since_day, 10)
+        ],
+        "campaigns": [
+            {
+                "properties__utm_source": row["value"],
+                "properties__utm_campaign": row["secondary_value"] or None,
+                "count": row["total"],
+            }
+            for row in _top_dimension(firm, "campaign", since_day, 15)
+        ],
+    }
+
+
+def web_vital_quantiles(
+    firm: Firm,
+    start_day: date,
+    end_day: date | None = None,
+    quantiles: Iterable[float] = (0.5, 0.75, 0.95),
+) -> dict[str, dict[str, Any]]:
+    """
+    Estimate Web Vitals quantiles for ``start_day``..``end_day`` (inclusive) by merging daily sketches.
+
+    Returns {metric: {"count": n, "quantiles": {q: value | None}}} for every metric in WEB_VITAL_METRICS.
+    """
+    rollups = TrackingWebVitalRollup.objects.filter(firm=firm, day__gte=start_day)
+    if end_day is not None:
+        rollups = rollups.filter(day__lte=end_day)
+
+    sketches = {metric: DDSketch() for metric in WEB_VITAL_METRICS}
+    for metric, sketch in rollups.values_list("metric", "sketch"):
+        if metric in sketches:
+            sketches[metric].merge(DDSketch.from_dict(sketch))
+
+    quantiles = tuple(quantiles)
+    return {
+        metric: {
+            "count": sketch.count,
+            "quantiles": {q: sketch.quantile(q) for q in quantiles},
+        }
+        for metric, sketch in sketches.items()
+    }
+
+
+def _exact_quantile(values_sorted: list[float], q: float) -> float | None:
+    if not values_sorted:
+        return None
+    rank = (len(values_sorted) - 1) * q
+    lower, upper = math.floor(rank), math.ceil(rank)
+    return values_sorted[lower] + (values_sorted[upper] - values_sorted[lower]) * (rank - lower)
+
+
+def raw_web_vital_quantiles(
+    firm: Firm,
+    start_day: date,
+    end_day: date,
+    quantiles: Iterable[float] = (0.5, 0.75, 0.95),
+) -> dict[str, dict[str, Any]]:
+    """
+    Exact Web Vitals quantiles for ``start_day``..``end_day`` (inclusive) from raw ``web_vital`` events.
+
+    Same shape as web_vital_quantiles(); used until the web-vital rollups are backfilled.
+    """
+    start = timezone.make_aware(datetime.combine(start_day, datetime.min.time()))
+    end = timezone.make_aware(datetime.combine(end_day + timedelta(days=1), datetime.min.time()))
+    events = TrackingEvent.objects.filter(
+        firm=firm,
+        event_type="custom_event",
+        name=WEB_VITAL_EVENT_NAME,
+        occurred_at__gte=start,
+        occurred_at__lt=end,
+    ).only("event_type", "name", "properties")
+
+    values: dict[str, list[float]] = {metric: [] for metric in WEB_VITAL_METRICS}
+    for event in events.iterator():
+        sample = _web_vital_sample(event)
+        if sample is not None:
+            values[sample[0]].append(sample[1])
+
+    quantiles = tuple(quantiles)
+    return {
+        metric: {
+            "count": len(metric_values),
+            "quantiles": {q: _exact_quantile(sorted(metric_values), q) for q in quantiles},
+        }
+        for metric, metric_values in values.items()
+    }
@@ -4,11 +4,11 @@ import hmac
 from typing import Any
 
 from django.conf import settings
-from django.utils import timezone
 from rest_framework import serializers
 
 from modules.clients.models import Contact
 from modules.firm.models import Firm
+from modules.tracking.ingestion import ingest_batch
 from modules.tracking.models import SiteMessage, SiteMessageImpression, TrackingEvent, TrackingKey, TrackingSession
 
 
@@ -66,13 +66,36 @@ class TrackingEventIngestSerializer(serializers.Serializer):
     contact_id = serializers.IntegerField(required=False)
     user_agent = serializers.CharField(required=False, allow_blank=True)
 
+    def _memoized(self, key: tuple, factory):
+        """
+        Resolve ``factory()`` once per batch.
+
+        TrackingBatchIngestor passes a shared ``batch_cache`` dict in the serializer
+        context so firm and tracking-key lookups (including key.touch()) run once per
+        distinct value rather than once per event. Validation errors are memoized too.
+        """
+        batch_cache = self.context.get("batch_cache")
+        if batch_cache is None:
+            return factory()
+        if key not in batch_cache:
+            try:
+                batch_cache[key] = (factory(), None)
+            except serializers.ValidationError as exc:
+                batch_cache[key] = (None, exc)
+        result, error = batch_cache[key]
+        if error is not None:
+            raise error
+        return result
+
     def validate_firm_slug(self, value: str) -> str:
-        try:
-            firm = Firm.objects.get(slug=value, status__in=["active", "trial"])
-            self._firm = firm
-            return value
-        except Firm.DoesNotExist as exc:  # noqa: B904
-            raise serializers.ValidationError("Invalid or inactive firm slug") from exc
+        def lookup() -> Firm:
+            try:
+                return Firm.objects.get(slug=value, status__in=["active", "trial"])
+            except Firm.DoesNotExist as exc:  # noqa: B904
+                raise serializers.ValidationError("Invalid or inactive firm slug") from exc
+
+        self._firm = self._memoized(("firm", value), lookup)
+        return value
 
     def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
         max_bytes = getattr(settings, "TRACKING_MAX_PROPERTIES_BYTES", 16384)
@@ -80,38 +103,22 @@ class TrackingEventIngestSerializer(serializers.Serializer):
             raise serializers.ValidationError("Event properties exceed 16KB limit.")
 
         firm = getattr(self, "_firm", None) or Firm.objects.get(slug=attrs["firm_slug"])
-        self._tracking_key, self._used_fallback_key = validate_tracking_key(
-            firm=firm, secret=attrs["tracking_key"], public_id=attrs.get("tracking_key_id")
+        public_id = attrs.get("tracking_key_id")
+        self._tracking_key, self._used_fallback_key = self._memoized(
+            ("tracking_key", firm.id, attrs["tracking_key"], public_id),
+            lambda: validate_tracking_key(firm=firm, secret=attrs["tracking_key"], public_id=public_id),
         )
         return attrs
 
+    def ingest_args(self) -> tuple[dict[str, Any], TrackingKey | None, bool]:
+        """(validated_data, tracking_key, used_fallback_key) as ingest_batch expects them."""
+        return self.validated_data, getattr(self, "_tracking_key", None), getattr(self, "_used_fallback_key", False)
+
     def save(self, **kwargs: Any) -> TrackingEvent:
+        """Persist one event through the batched pipeline (sessions, rollups, automation)."""
         firm = getattr(self, "_firm", None) or Firm.objects.get(slug=self.validated_data["firm_slug"])
-        session, _created = TrackingSession.objects.get_or_create(
-            firm=firm,
-            session_id=self.validated_data["session_id"],
-            defaults={
-                "visitor_id": self.validated_data["visitor_id"],
-                "consent_state": self.validated_data.get("consent_state", "pending"),
-                "user_agent_hash": TrackingSession.hash_user_agent(self.validated_data.get("user_agent")),
-            },
-        )
-        session.consent_state = self.validated_data.get("consent_state", session.consent_state)
-        session.last_seen_at = timezone.now()
-        session.save(update_fields=["consent_state", "last_seen_at"])
-
-        contact = None
-        if contact_id := self.validated_data.get("contact_id"):
-            contact = Contact.objects.filter(firm=firm, id=contact_id).first()
-
-        event = TrackingEvent.record_event(
-            firm=firm,
-            session=session,
-            payload=self.validated_data,
-            contact=contact,
-            request_meta=self.context.get("request_meta", {}),
-            tracking_key=getattr(self, "_tracking_key", None),
-            used_fallback_key=getattr(self, "_used_fallback_key", False),
+        (event,) = ingest_batch(
+            firm=firm, validated_events=[self.ingest_args()], request_meta=self.context.get("request_meta", {})
         )
         return event
 
@@ -120,13 +127,22 @@ class TrackingEventBatchSerializer(serializers.Serializer):
     events = serializers.ListField(child=TrackingEventIngestSerializer())
 
     def create(self, validated_data: dict[str, Any]) -> list[TrackingEvent]:
-        events = []
+        """Persist the batch through ingest_batch, once per target firm."""
+        request_meta = self.context.get("request_meta", {})
+        context = {"request_meta": request_meta, "batch_cache": {}}
+        by_firm: dict[Firm, list[TrackingEventIngestSerializer]] = {}
         for event_data in validated_data["events"]:
-            serializer = TrackingEventIngestSerializer(
-                data=event_data, context={"request_meta": self.context.get("request_meta", {})}
-            )
+            serializer = TrackingEventIngestSerializer(data=event_data, context=context)
             serializer.is_valid(raise_exception=True)
-            events.append(serializer.save())
+            by_firm.setdefault(serializer._firm, []).append(serializer)
+
+        events = []
+        for firm, serializers_for_firm in by_firm.items():
+            events += ingest_batch(
+                firm=firm,
+                validated_events=[serializer.ingest_args() for serializer in serializers_for_firm],
+                request_meta=request_meta,
+            )
         return events
 
 
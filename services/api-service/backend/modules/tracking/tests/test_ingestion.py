@@ -0,0 +1,154 @@
+"""
+Tests for the batched tracking ingestion pipeline.
+"""
+from uuid import uuid4
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from modules.automation.models import Workflow, WorkflowTrigger
+from modules.firm.models import Firm
+from modules.tracking import ingestion
+from modules.tracking.ingestion import ingest_batch
+from modules.tracking.models import TrackingEvent, TrackingHourlyRollup, TrackingKey, TrackingSession
+from modules.tracking.serializers import TrackingEventBatchSerializer, TrackingEventIngestSerializer
+
+
+@pytest.fixture
+def firm(db):
+    return Firm.objects.create(name="Ingest Firm", slug="ingest-firm")
+
+
+@pytest.fixture
+def secret(firm):
+    _key, secret = TrackingKey.issue(firm=firm, label="site")
+    return secret
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "modules.tracking.queue.queue_tracking_automation",
+        lambda firm, event_ids, batch_id: calls.append((firm.id, sorted(event_ids))),
+    )
+    return calls
+
+
+def _payload(session_id, name="page_view", firm_slug="ingest-firm", **extra):
+    return {
+        "firm_slug": firm_slug,
+        "event_type": "page_view" if name == "page_view" else "custom_event",
+        "name": name,
+        "url": "/pricing",
+        "visitor_id": uuid4(),
+        "session_id": session_id,
+        **extra,
+    }
+
+
+def _ingest(firm, batch):
+    return ingest_batch(firm=firm, validated_events=[(data, None, False) for data in batch], request_meta={})
+
+
+def _hourly_totals(firm):
+    rows = TrackingHourlyRollup.objects.filter(firm=firm)
+    return sum(row.events for row in rows), sum(row.page_views for row in rows), sum(row.custom_events for row in rows)
+
+
+@pytest.mark.django_db
+def test_batch_upserts_sessions_and_applies_rollups(firm, django_capture_on_commit_callbacks):
+    existing = TrackingSession.objects.create(firm=firm, session_id=uuid4(), visitor_id=uuid4())
+    new_session = uuid4()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        events = _ingest(
+            firm,
+            [
+                _payload(existing.session_id, consent_state="granted"),
+                _payload(new_session),
+                _payload(new_session, name="signup", consent_state="denied"),
+            ],
+        )
+
+    assert len(events) == 3 and all(event.pk for event in events)
+    assert TrackingSession.objects.filter(firm=firm).count() == 2
+    existing.refresh_from_db()
+    assert existing.consent_state == "granted"
+    assert existing.last_seen_at is not None
+    assert TrackingSession.objects.get(session_id=new_session).consent_state == "denied"
+    assert _hourly_totals(firm) == (3, 2, 1)
+
+
+@pytest.mark.django_db
+def test_query_count_does_not_grow_with_batch_size(firm, django_capture_on_commit_callbacks):
+    def queries_for(size):
+        batch = [_payload(uuid4()) for _ in range(size)]
+        with CaptureQueriesContext(connection) as captured:
+            with django_capture_on_commit_callbacks(execute=True):
+                _ingest(firm, batch)
+        return len(captured)
+
+    queries_for(1)  # Rollup rows for this hour now exist in both runs below
+    assert queries_for(3) == queries_for(30)
+
+
+@pytest.mark.django_db
+def test_rollups_are_folded_after_the_ingest_transaction(firm, django_capture_on_commit_callbacks):
+    with CaptureQueriesContext(connection) as ingest_queries:
+        with django_capture_on_commit_callbacks() as callbacks:
+            _ingest(firm, [_payload(uuid4()), _payload(uuid4(), name="signup")])
+
+    assert not any("FOR UPDATE" in query["sql"] for query in ingest_queries)
+    assert _hourly_totals(firm) == (0, 0, 0)
+    assert len(callbacks) == 1
+
+    callbacks[0]()
+    assert _hourly_totals(firm) == (2, 1, 1)
+
+
+@pytest.mark.django_db
+def test_automation_is_queued_once_per_batch_only_with_active_triggers(firm, queued):
+    _ingest(firm, [_payload(uuid4())])
+    assert queued == []
+
+    workflow = Workflow.objects.create(firm=firm, name="Site visits", status="active")
+    WorkflowTrigger.objects.create(firm=firm, workflow=workflow, trigger_type="site_page_view", is_active=True)
+    events = _ingest(firm, [_payload(uuid4()), _payload(uuid4(), name="signup")])
+
+    assert queued == [(firm.id, sorted(event.pk for event in events))]
+
+
+@pytest.mark.django_db
+def test_ingest_serializer_save_runs_the_pipeline(firm, secret, monkeypatch):
+    calls = []
+    monkeypatch.setattr(ingestion, "apply_events", lambda firm, events: calls.append(len(events)))
+    serializer = TrackingEventIngestSerializer(data=_payload(uuid4(), tracking_key=secret))
+    serializer.is_valid(raise_exception=True)
+
+    event = serializer.save()
+
+    assert event.pk and event.tracking_key.firm == firm
+    assert TrackingEvent.objects.filter(firm=firm).count() == 1
+    assert calls == [1]
+
+
+@pytest.mark.django_db
+def test_batch_serializer_ingests_once_per_firm(firm, secret, django_capture_on_commit_callbacks):
+    other_firm = Firm.objects.create(name="Other Firm", slug="other-firm")
+    _key, other_secret = TrackingKey.issue(firm=other_firm)
+    batch = [
+        _payload(uuid4(), tracking_key=secret),
+        _payload(uuid4(), name="signup", tracking_key=secret),
+        _payload(uuid4(), firm_slug="other-firm", tracking_key=other_secret),
+    ]
+    serializer = TrackingEventBatchSerializer(data={"events": batch})
+    serializer.is_valid(raise_exception=True)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        events = serializer.save()
+
+    assert sorted(event.firm_id for event in events) == sorted([firm.id, firm.id, other_firm.id])
+    assert _hourly_totals(firm) == (2, 1, 1)
+    assert _hourly_totals(other_firm) == (1, 1, 0)
@@ -0,0 +1,160 @@
+"""
+Tests for incremental tracking rollups and visitor sketches.
+"""
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from modules.firm.models import Firm, FirmMembership
+from modules.tracking.ingestion import ingest_batch
+from modules.tracking.models import TrackingHourlyRollup, TrackingWebVitalRollup
+from modules.tracking.rollups import raw_web_vital_quantiles, rebuild_rollups, summarize, web_vital_quantiles
+from modules.tracking.sketches import DDSketch, HyperLogLog
+from modules.tracking.views import TrackingSummaryView, TrackingWebVitalsSummaryView
+
+
+def test_hyperloglog_merge_estimates_union():
+    first = HyperLogLog().update(range(0, 3000))
+    second = HyperLogLog().update(range(2000, 5000))
+
+    assert first.merge(second).count() == pytest.approx(5000, rel=0.05)
+
+
+def test_ddsketch_merge_keeps_relative_accuracy():
+    first = DDSketch().update(range(1, 501))
+    second = DDSketch.from_dict(DDSketch().update(range(501, 1001)).to_dict())
+
+    merged = first.merge(second)
+
+    assert merged.count == 1000
+    assert merged.quantile(0.5) == pytest.approx(500, rel=0.02)
+    assert merged.quantile(0.95) == pytest.approx(950, rel=0.02)
+
+
+@pytest.fixture
+def firm(db):
+    return Firm.objects.create(name="Rollup Firm", slug="rollup-firm")
+
+
+def _payload(event_type, name, url, visitor_id, session_id, **extra):
+    return {
+        "firm_slug": "rollup-firm",
+        "event_type": event_type,
+        "name": name,
+        "url": url,
+        "visitor_id": visitor_id,
+        "session_id": session_id,
+        "consent_state": "granted",
+        **extra,
+    }
+
+
+@pytest.mark.django_db
+def test_ingested_events_are_summarized_from_rollups(firm, django_capture_on_commit_callbacks):
+    visitor_a, visitor_b = uuid4(), uuid4()
+    batch = [
+        _payload("page_view", "page_view", "/pricing", visitor_a, uuid4(), referrer="https://example.com"),
+        _payload("page_view", "page_view", "/pricing", visitor_b, uuid4()),
+        _payload("page_view", "page_view", "/about", visitor_a, uuid4()),
+        _payload("custom_event", "signup", "/pricing", visitor_b, uuid4(), properties={"utm_source": "news"}),
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        ingest_batch(firm=firm, validated_events=[(data, None, False) for data in batch], request_meta={})
+
+    summary = summarize(firm, timezone.now() - timedelta(days=30))
+
+    assert summary["page_views"] == 3
+    assert summary["custom_events"] == 1
+    assert summary["unique_visitors"] == 2
+    assert summary["top_pages"][0] == {"url": "/pricing", "count": 2}
+    assert summary["top_events"] == [{"name": "signup", "count": 1}]
+    assert summary["referrers"] == [{"referrer": "https://example.com", "count": 1}]
+    assert summary["campaigns"][0]["properties__utm_source"] == "news"
+    assert sum(point["count"] for point in summary["time_series"]) == 4
+
+    # Rebuilding from raw events reproduces the incremental result.
+    assert rebuild_rollups(firm, timezone.now() - timedelta(days=30)) == 4
+    assert summarize(firm, timezone.now() - timedelta(days=30))["page_views"] == 3
+
+
+@pytest.mark.django_db
+def test_web_vitals_are_sketched_at_ingest(firm, django_capture_on_commit_callbacks):
+    batch = [
+        _payload("custom_event", "web_vital", "/", uuid4(), uuid4(), properties={"metric": "LCP", "value": value})
+        for value in range(100, 4100, 100)
+    ]
+    batch.append(_payload("custom_event", "web_vital", "/", uuid4(), uuid4(), properties={"metric": "LCP"}))
+    with django_capture_on_commit_callbacks(execute=True):
+        ingest_batch(firm=firm, validated_events=[(data, None, False) for data in batch], request_meta={})
+
+    estimates = web_vital_quantiles(firm, timezone.localdate() - timedelta(days=1))
+
+    assert estimates["LCP"]["count"] == 40
+    assert estimates["LCP"]["quantiles"][0.75] == pytest.approx(3025, rel=0.03)
+    assert estimates["CLS"]["quantiles"][0.75] is None
+
+
+@pytest.mark.django_db
+def test_summary_view_reads_rollups_only_when_enabled(firm, settings):
+    user = get_user_model().objects.create_user(username="analyst", password="testpass123")
+    FirmMembership.objects.create(firm=firm, user=user)
+    data = _payload("page_view", "page_view", "/pricing", uuid4(), uuid4())
+    ingest_batch(firm=firm, validated_events=[(data, None, False)], request_meta={})
+    # Events stored before rollups existed have no rollup rows until rebuild_tracking_rollups runs
+    TrackingHourlyRollup.objects.all().delete()
+
+    def page_views():
+        request = APIRequestFactory().get("/api/tracking/summary/")
+        force_authenticate(request, user=user)
+        request.firm = firm
+        return TrackingSummaryView.as_view()(request).data["page_views"]
+
+    assert page_views() == 1
+    settings.TRACKING_SUMMARY_USE_ROLLUPS = True
+    assert page_views() == 0
+    rebuild_rollups(firm, timezone.now() - timedelta(days=30))
+    assert page_views() == 1
+
+
+@pytest.mark.django_db
+def test_raw_web_vital_quantiles_match_the_window(firm):
+    batch = [
+        _payload("custom_event", "web_vital", "/", uuid4(), uuid4(), properties={"metric": "LCP", "value": value})
+        for value in (100, 200, 300, 400, 500)
+    ]
+    ingest_batch(firm=firm, validated_events=[(data, None, False) for data in batch], request_meta={})
+    today = timezone.localdate()
+
+    estimates = raw_web_vital_quantiles(firm, today, today, quantiles=(0.5, 0.75))
+
+    assert estimates["LCP"] == {"count": 5, "quantiles": {0.5: 300, 0.75: 400}}
+    assert estimates["CLS"] == {"count": 0, "quantiles": {0.5: None, 0.75: None}}
+    assert raw_web_vital_quantiles(firm, today - timedelta(days=2), today - timedelta(days=1))["LCP"]["count"] == 0
+
+
+@pytest.mark.django_db
+def test_web_vitals_view_reads_rollups_only_when_enabled(firm, settings):
+    user = get_user_model().objects.create_user(username="analyst", password="testpass123")
+    FirmMembership.objects.create(firm=firm, user=user)
+    data = _payload("custom_event", "web_vital", "/", uuid4(), uuid4(), properties={"metric": "LCP", "value": 1200})
+    ingest_batch(firm=firm, validated_events=[(data, None, False)], request_meta={})
+    # Events stored before web-vital rollups existed have no sketches until rebuild_tracking_rollups runs
+    TrackingWebVitalRollup.objects.all().delete()
+
+    def lcp():
+        request = APIRequestFactory().get("/api/tracking/web-vitals/")
+        force_authenticate(request, user=user)
+        request.firm = firm
+        metrics = TrackingWebVitalsSummaryView.as_view()(request).data["metrics"]
+        return next(metric for metric in metrics if metric["metric"] == "LCP")
+
+    assert (lcp()["count"], lcp()["p75"], lcp()["status"]) == (1, 1200, "ok")
+    settings.TRACKING_SUMMARY_USE_ROLLUPS = True
+    assert (lcp()["count"], lcp()["p75"]) == (0, None)
+    rebuild_rollups(firm, timezone.now() - timedelta(days=30))
+    assert lcp()["count"] == 1
+    assert lcp()["p75"] == pytest.approx(1200, rel=0.03)
@@ -5,27 +5,27 @@ import io
 import json
 import logging
 import hashlib
-import math
 from datetime import timedelta
 from typing import Iterable
 from uuid import uuid4
 
 from django.conf import settings
-from django.core.cache import cache
 from django.core.signing import Signer
 from django.db import models
 from django.db.models import Count, Q
 from django.db.models.functions import TruncDay
 from django.http import HttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import ValidationError
 
-from modules.automation.triggers import TriggerDetector
+from modules.core.rate_limiting import RateLimit, rate_limiter
 from modules.firm.models import FirmMembership
+from modules.tracking.ingestion import ingest_batch
 from modules.tracking.models import (
     SiteMessage,
     SiteMessageImpression,
@@ -35,6 +35,8 @@ from modules.tracking.models import (
     TrackingKeyAudit,
     TrackingSession,
 )
+from modules.tracking.rollups import WEB_VITAL_METRICS, raw_web_vital_quantiles, web_vital_quantiles
+from modules.tracking.rollups import summarize as summarize_rollups
 from modules.tracking.serializers import (
     SiteMessageImpressionLogSerializer,
     SiteMessageManifestRequestSerializer,
@@ -54,6 +56,9 @@ class TrackingIngestView(APIView):
     Public ingestion endpoint for tracking events.
 
     Authentication is handled via firm-specific tracking key in the payload.
+    Batches are validated in one pass and persisted via
+    modules.tracking.ingestion.ingest_batch; automation dispatch runs as a
+    JobQueue job (tracking_automation_dispatch), not inside the request.
     """
 
     authentication_classes: list = []
@@ -67,11 +72,11 @@ class TrackingIngestView(APIView):
         raw_events = request.data.get("events") if isinstance(request.data, dict) else None
         payloads = raw_events if raw_events is not None else [request.data]
 
+        # Firm and tracking-key lookups are shared across the batch via batch_cache
+        batch_context = {"request_meta": request.META, "batch_cache": {}}
         serializers_to_save: list[TrackingEventIngestSerializer] = []
         for payload in payloads:
-            serializer = TrackingEventIngestSerializer(
-                data=payload, context={"request_meta": request.META}
-            )
+            serializer = TrackingEventIngestSerializer(data=payload, context=batch_context)
             try:
                 serializer.is_valid(raise_exception=True)
             except ValidationError as exc:
@@ -93,15 +98,15 @@ class TrackingIngestView(APIView):
         if any(s.validated_data["firm_slug"] != firm_slug for s in serializers_to_save):
             return Response({"detail": "All events must target the same firm"}, status=status.HTTP_400_BAD_REQUEST)
 
-        events = []
         firm = serializers_to_save[0]._firm  # set during validation
         if self._is_rate_limited(firm=firm, serializers_to_save=serializers_to_save, request_meta=request.META):
             return Response({"detail": "Tracking ingestion rate limit exceeded"}, status=status.HTTP_429_TOO_MANY_REQUESTS)
 
-        for serializer in serializers_to_save:
-            event = serializer.save()
-            events.append(event)
-            self._emit_automation_event(event)
+        events = ingest_batch(
+            firm=firm,
+            validated_events=[serializer.ingest_args() for serializer in serializers_to_save],
+            request_meta=request.META,
+        )
 
         return Response({"created": len(events)}, status=status.HTTP_201_CREATED)
 
@@ -112,56 +117,40 @@ class TrackingIngestView(APIView):
         serializers_to_save: Iterable[TrackingEventIngestSerializer],
         request_meta,
     ) -> bool:
+        """
+        Check the firm, tracking-key and IP budgets with one sliding-window call.
+
+        Each distinct tracking key is charged once with its event count rather than
+        once per event.
+        """
         limit = getattr(settings, "TRACKING_INGEST_RATE_LIMIT_PER_MINUTE", 300)
         ip_address = request_meta.get("REMOTE_ADDR", "")
-        bucket_suffix = timezone.now().strftime("%Y%m%d%H%M")
         event_count = len(serializers_to_save)
-        firm_bucket_key = f"tracking:firm:{firm.id}:{bucket_suffix}"
-        if self._increment_and_check(bucket_key=firm_bucket_key, increment=event_count, limit=limit):
-            self._record_abuse(
-                firm_slug=firm.slug,
-                reason="rate_limited",
-                request_meta=request_meta,
-                tracking_key=None,
-                request_count=event_count,
-            )
-            return True
 
+        limits = [RateLimit(f"tracking:firm:{firm.id}", limit, 60, cost=event_count)]
+        tracking_keys = {}
         for serializer in serializers_to_save:
             tk = getattr(serializer, "_tracking_key", None)
-            if not tk:
-                continue
-            key_bucket_key = f"tracking:key:{tk.public_id}:{bucket_suffix}"
-            if self._increment_and_check(bucket_key=key_bucket_key, increment=1, limit=limit):
-                self._record_abuse(
-                    firm_slug=firm.slug,
-                    reason="rate_limited",
-                    request_meta=request_meta,
-                    tracking_key=tk,
-                    request_count=1,
-                )
-                return True
-
+            if tk:
+                tracking_keys[f"tracking:key:{tk.public_id}"] = tk
+                limits.append(RateLimit(f"tracking:key:{tk.public_id}", limit, 60))
         if ip_address:
-            ip_bucket_key = f"tracking:ip:{ip_address}:{bucket_suffix}"
-            if self._increment_and_check(bucket_key=ip_bucket_key, increment=event_count, limit=limit):
-                self._record_abuse(
-                    firm_slug=firm.slug,
-                    reason="rate_limited",
-                    request_meta=request_meta,
-                    tracking_key=None,
-                    request_count=event_count,
-                )
-                return True
+            limits.append(RateLimit(f"tracking:ip:{ip_address}", limit, 60, cost=event_count))
 
-        return False
+        result = rate_limiter.check(limits)
+        if not result.limited:
+            return False
 
-    @staticmethod
-    def _increment_and_check(*, bucket_key: str, increment: int, limit: int) -> bool:
-        current = cache.get(bucket_key, 0)
-        new_value = current + increment
-        cache.set(bucket_key, new_value, timeout=60)
-        return new_value > limit
+        # Record abuse against the first exceeded budget, as before (firm, key, then IP).
+        exceeded = result.exceeded[0]
+        self._record_abuse(
+            firm_slug=firm.slug,
+            reason="rate_limited",
+            request_meta=request_meta,
+            tracking_key=tracking_keys.get(exceeded.key),
+            request_count=exceeded.cost,
+        )
+        return True
 
     def _record_abuse(self, *, firm_slug: str | None, reason: str, request_meta, tracking_key=None, request_count=0):
         if not firm_slug:
@@ -189,30 +178,6 @@ class TrackingIngestView(APIView):
                 detail=f"{reason} (source_ip={event.source_ip})",
             )
 
-    def _emit_automation_event(self, event: TrackingEvent) -> None:
-        trigger_type = "site_page_view" if event.event_type == "page_view" else "site_custom_event"
-        event_data = {
-            "event_name": event.name,
-            "event_type": event.event_type,
-            "url": event.url,
-            "referrer": event.referrer,
-            "properties": event.properties,
-            "session_id": str(event.session.session_id),
-            "visitor_id": str(event.session.visitor_id),
-            "occurred_at": event.occurred_at.isoformat(),
-            "discriminator": f"{event.session.session_id}:{event.name}:{event.occurred_at.isoformat()}",
-        }
-
-        try:
-            TriggerDetector.detect_and_trigger(
-                firm=event.firm,
-                trigger_type=trigger_type,
-                event_data=event_data,
-                contact=event.contact,
-            )
-        except Exception:
-            logger.exception("Failed to dispatch tracking event to automation")
-
 
 class TrackingEventViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = TrackingEventSerializer
@@ -236,6 +201,14 @@ class TrackingEventViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 class TrackingSummaryView(APIView):
+    """
+    Tracking dashboard summary.
+
+    With TRACKING_SUMMARY_USE_ROLLUPS on, unfiltered requests are served from the
+    rollup tables (modules.tracking.rollups); otherwise, and for url/event_name
+    drill-downs, raw events are aggregated.
+    """
+
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, *args, **kwargs) -> Response:
@@ -250,60 +223,77 @@ class TrackingSummaryView(APIView):
 
         since = timezone.now() - timedelta(days=days)
         events = TrackingEvent.objects.filter(firm=firm, occurred_at__gte=since)
+        if url_filter or event_name_filter or not getattr(settings, "TRACKING_SUMMARY_USE_ROLLUPS", False):
+            aggregates = self._raw_aggregates(events, url_filter=url_filter, event_name_filter=event_name_filter)
+        else:
+            aggregates = summarize_rollups(firm, since)
+        default_key_warning = (
+            aggregates.pop("fallback_key_used") or not firm.tracking_keys.filter(is_active=True).exists()
+        )
         if url_filter:
             events = events.filter(url__icontains=url_filter)
         if event_name_filter:
             events = events.filter(name__icontains=event_name_filter)
 
-        page_views = events.filter(event_type="page_view")
-        custom_events = events.filter(event_type="custom_event")
-
-        time_series = (
-            events.annotate(day=TruncDay("occurred_at"))
-            .values("day")
-            .annotate(count=Count("id"))
-            .order_by("day")
-        )
-        recent_referrers = list(
-            events.exclude(referrer="")
-            .values("referrer")
-            .annotate(count=Count("id"))
-            .order_by("-count")[:10]
-        )
-        campaign_breakdown = list(
-            events.filter(properties__utm_source__isnull=False)
-            .values("properties__utm_source", "properties__utm_campaign")
-            .annotate(count=Count("id"))
-            .order_by("-count")[:15]
-        )
-        fallback_key_used = events.filter(used_fallback_key=True).exists()
-        default_key_warning = fallback_key_used or not firm.tracking_keys.filter(is_active=True).exists()
-
         summary = {
             "window_days": days,
-            "page_views": page_views.count(),
-            "unique_visitors": page_views.values("session__visitor_id").distinct().count(),
-            "custom_events": custom_events.count(),
+            "page_views": aggregates["page_views"],
+            "unique_visitors": aggregates["unique_visitors"],
+            "custom_events": aggregates["custom_events"],
             "recent_events": list(
                 events.order_by("-occurred_at")[:20].values(
                     "name", "event_type", "url", "referrer", "occurred_at", "properties"
                 )
             ),
-            "top_pages": list(
-                page_views.values("url").annotate(count=Count("id")).order_by("-count")[:10]
-            ),
-            "top_events": list(
-                custom_events.values("name").annotate(count=Count("id")).order_by("-count")[:10]
-            ),
-            "time_series": list(time_series),
-            "referrers": recent_referrers,
-            "campaigns": campaign_breakdown,
+            "top_pages": aggregates["top_pages"],
+            "top_events": aggregates["top_events"],
+            "time_series": aggregates["time_series"],
+            "referrers": aggregates["referrers"],
+            "campaigns": aggregates["campaigns"],
             "filters": {"url": url_filter, "event_name": event_name_filter, "days": days},
             "default_key_warning": default_key_warning,
             "export_path": "/api/v1/tracking/analytics/export/",
         }
         return Response(summary)
 
+    @staticmethod
+    def _raw_aggregates(events, *, url_filter: str | None, event_name_filter: str | None) -> dict:
+        """
+        Aggregate raw events for filtered drill-downs.
+
+        Free-text url/event filters cannot be answered from the rollup tables.
+        """
+        if url_filter:
+            events = events.filter(url__icontains=url_filter)
+        if event_name_filter:
+            events = events.filter(name__icontains=event_name_filter)
+
+        page_views = events.filter(event_type="page_view")
+        custom_events = events.filter(event_type="custom_event")
+        return {
+            "page_views": page_views.count(),
+            "unique_visitors": page_views.values("session__visitor_id").distinct().count(),
+            "custom_events": custom_events.count(),
+            "fallback_key_used": events.filter(used_fallback_key=True).exists(),
+            "time_series": list(
+                events.annotate(day=TruncDay("occurred_at"))
+                .values("day")
+                .annotate(count=Count("id"))
+                .order_by("day")
+            ),
+            "top_pages": list(page_views.values("url").annotate(count=Count("id")).order_by("-count")[:10]),
+            "top_events": list(custom_events.values("name").annotate(count=Count("id")).order_by("-count")[:10]),
+            "referrers": list(
+                events.exclude(referrer="").values("referrer").annotate(count=Count("id")).order_by("-count")[:10]
+            ),
+            "campaigns": list(
+                events.filter(properties__utm_source__isnull=False)
+                .values("properties__utm_source", "properties__utm_campaign")
+                .annotate(count=Count("id"))
+                .order_by("-count")[:15]
+            ),
+        }
+
     @staticmethod
     def _is_member(user, firm) -> bool:
         return (
@@ -317,14 +307,17 @@ class TrackingWebVitalsSummaryView(APIView):
     Summarize Core Web Vitals captured via tracking events.
 
     Meta-commentary:
-    - **Functionality:** Aggregates `web_vital` custom events into P75 values per metric.
-    - **Mapping:** Uses `TrackingEvent.properties.metric/value` emitted by the frontend tracking client.
-    - **Reasoning:** Keeps aggregation server-side so the dashboard can compare against alert thresholds.
+    - **Functionality:** Reports P50/P75/P95 per metric for `days` or an explicit `start`/`end` date range.
+    - **Mapping:** Uses `web_vital` events' `TrackingEvent.properties.metric/value`. With
+      TRACKING_SUMMARY_USE_ROLLUPS on, merges the daily DDSketches built at ingest
+      (see modules.tracking.rollups); otherwise computes exact percentiles from raw events.
+    - **Reasoning:** Keeps aggregation server-side so the dashboard can compare against alert thresholds;
+      the rollup path costs one row per metric and day rather than one per event.
     """
 
     permission_classes = [permissions.IsAuthenticated]
 
-    METRIC_ORDER = ("LCP", "FID", "CLS", "TTFB", "FCP", "TTI", "INP")
+    METRIC_ORDER = WEB_VITAL_METRICS
     METRIC_UNITS = {
         "LCP": "ms",
         "FID": "ms",
@@ -347,35 +340,33 @@ class TrackingWebVitalsSummaryView(APIView):
 
         days = int(request.query_params.get("days", "30"))
         days = min(max(days, 1), 90)
-        since = timezone.now() - timedelta(days=days)
-
-        events = TrackingEvent.objects.filter(
-            firm=firm,
-            event_type="custom_event",
-            name="web_vital",
-            occurred_at__gte=since,
-        ).values_list("properties", flat=True)
-
-        metrics: dict[str, list[float]] = {metric: [] for metric in self.METRIC_ORDER}
-        for properties in events.iterator():
-            if not isinstance(properties, dict):
-                continue
-            metric_name = properties.get("metric")
-            value = properties.get("value")
-            if metric_name in metrics and isinstance(value, (int, float)):
-                metrics[metric_name].append(float(value))
+        try:
+            end_day = parse_date(request.query_params.get("end") or "") or timezone.localdate()
+            start_day = parse_date(request.query_params.get("start") or "") or (
+                timezone.localdate() - timedelta(days=days)
+            )
+        except ValueError:
+            return Response({"detail": "start/end must be YYYY-MM-DD dates"}, status=status.HTTP_400_BAD_REQUEST)
+        if start_day > end_day:
+            return Response({"detail": "start must be on or before end"}, status=status.HTTP_400_BAD_REQUEST)
+
+        quantiles = {"p50": 0.5, "p75": 0.75, "p95": 0.95}
+        if getattr(settings, "TRACKING_SUMMARY_USE_ROLLUPS", False):
+            estimates = web_vital_quantiles(firm, start_day, end_day, quantiles=quantiles.values())
+        else:
+            estimates = raw_web_vital_quantiles(firm, start_day, end_day, quantiles=quantiles.values())
 
         response_metrics = []
         for metric in self.METRIC_ORDER:
-            values = metrics[metric]
-            p75 = self._percentile(values, 75)
+            estimate = estimates[metric]
+            values = {label: estimate["quantiles"][q] for label, q in quantiles.items()}
             threshold = self.ALERT_THRESHOLDS.get(metric)
-            status_label = self._status_for_threshold(p75, threshold)
+            status_label = self._status_for_threshold(values["p75"], threshold)
             response_metrics.append(
                 {
                     "metric": metric,
-                    "p75": p75,
-                    "count": len(values),
+                    **values,
+                    "count": estimate["count"],
                     "unit": self.METRIC_UNITS.get(metric, "ms"),
                     "target": threshold,
                     "status": status_label,
@@ -384,27 +375,14 @@ class TrackingWebVitalsSummaryView(APIView):
 
         return Response(
             {
-                "window_days": days,
+                "window_days": (end_day - start_day).days,
+                "window": {"start": start_day.isoformat(), "end": end_day.isoformat()},
                 "generated_at": timezone.now().isoformat(),
                 "metrics": response_metrics,
                 "targets": self.ALERT_THRESHOLDS,
             }
         )
 
-    @staticmethod
-    def _percentile(values: list[float], percentile: int) -> float | None:
-        if not values:
-            return None
-        values_sorted = sorted(values)
-        rank = (len(values_sorted) - 1) * (percentile / 100)
-        lower = math.floor(rank)
-        upper = math.ceil(rank)
-        if lower == upper:
-            return values_sorted[int(rank)]
-        lower_value = values_sorted[lower]
-        upper_value = values_sorted[upper]
-        return lower_value + (upper_value - lower_value) * (rank - lower)
-
     @staticmethod
     def _status_for_threshold(value: float | None, threshold: float | None) -> str:
         if value is None: